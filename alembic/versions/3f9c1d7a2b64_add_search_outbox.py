@@ -0,0 +1,101 @@
+"""add search_outbox table and triggers
+
+Tags whose Meilisearch document must be rewritten, queued by triggers in the
+same transaction as the change (including the usage_count updates the
+tag_links triggers make) and drained by drain_search_outbox_job.
+
+Revision ID: 3f9c1d7a2b64
+Revises: 10eef13f525a
+Create Date: 2026-10-16 09:12:40.218764
+
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d7a2b64'
+down_revision: str | Sequence[str] | None = '10eef13f525a'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No FK to tags: a deleted tag's row is how its document gets removed.
+    op.create_table(
+        "search_outbox",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("tag_id", mysql.INTEGER(unsigned=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("current_timestamp()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.execute("DROP TRIGGER IF EXISTS tags_search_outbox_insert")
+    op.execute("""
+        CREATE TRIGGER tags_search_outbox_insert
+        AFTER INSERT ON tags
+        FOR EACH ROW
+        INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id)
+    """)
+
+    # Only columns the search document carries; usage_count changes arrive
+    # here from the tag_links triggers.
+    op.execute("DROP TRIGGER IF EXISTS tags_search_outbox_update")
+    op.execute("""
+        CREATE TRIGGER tags_search_outbox_update
+        AFTER UPDATE ON tags
+        FOR EACH ROW
+        BEGIN
+            IF NOT (NEW.title <=> OLD.title
+                    AND NEW.`desc` <=> OLD.`desc`
+                    AND NEW.type <=> OLD.type
+                    AND NEW.usage_count <=> OLD.usage_count
+                    AND NEW.alias_of <=> OLD.alias_of
+                    AND NEW.date_added <=> OLD.date_added) THEN
+                INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);
+            END IF;
+        END
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS tags_search_outbox_delete")
+    op.execute("""
+        CREATE TRIGGER tags_search_outbox_delete
+        AFTER DELETE ON tags
+        FOR EACH ROW
+        INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id)
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS tag_external_links_search_outbox_insert")
+    op.execute("""
+        CREATE TRIGGER tag_external_links_search_outbox_insert
+        AFTER INSERT ON tag_external_links
+        FOR EACH ROW
+        INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id)
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS tag_external_links_search_outbox_delete")
+    op.execute("""
+        CREATE TRIGGER tag_external_links_search_outbox_delete
+        AFTER DELETE ON tag_external_links
+        FOR EACH ROW
+        INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS tag_external_links_search_outbox_delete")
+    op.execute("DROP TRIGGER IF EXISTS tag_external_links_search_outbox_insert")
+    op.execute("DROP TRIGGER IF EXISTS tags_search_outbox_delete")
+    op.execute("DROP TRIGGER IF EXISTS tags_search_outbox_update")
+    op.execute("DROP TRIGGER IF EXISTS tags_search_outbox_insert")
+    op.drop_table("search_outbox")
@@ -0,0 +1,44 @@
+"""queue tag_external_links updates in search_outbox
+
+Re-pointing a link to another tag (the alias merge in app/api/v1/tags.py) or
+editing its URL changes the documents of the tags on both sides; neither was
+queued by the INSERT/DELETE triggers of 3f9c1d7a2b64.
+
+Revision ID: 8d41e6b0c3a5
+Revises: 3f9c1d7a2b64
+Create Date: 2026-10-16 15:02:11.604219
+
+"""
+from typing import Sequence
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6b0c3a5'
+down_revision: str | Sequence[str] | None = '3f9c1d7a2b64'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS tag_external_links_search_outbox_update")
+    op.execute("""
+        CREATE TRIGGER tag_external_links_search_outbox_update
+        AFTER UPDATE ON tag_external_links
+        FOR EACH ROW
+        BEGIN
+            IF NOT (NEW.tag_id <=> OLD.tag_id AND NEW.url <=> OLD.url) THEN
+                INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id);
+                IF NEW.tag_id <> OLD.tag_id THEN
+                    INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);
+                END IF;
+            END IF;
+        END
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS tag_external_links_search_outbox_update")
@@ -0,0 +1,101 @@
+"""add search_outbox table and triggers
+
+Postgres side of MariaDB migration 3f9c1d7a2b64. The trigger SQL is frozen
+here as it stands in app/core/pg_triggers.py (which build_pg_schema installs),
+so the chain and the model-built schema stay identical.
+
+Revision ID: 0002_search_outbox
+Revises: 0001_pg_baseline
+Create Date: 2026-10-16 09:12:40.218764
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_search_outbox"
+down_revision: str | Sequence[str] | None = "0001_pg_baseline"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TRIGGERS = (
+    (
+        "tags_search_outbox_insert",
+        "INSERT",
+        "tags",
+        "INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);",
+    ),
+    (
+        "tags_search_outbox_update",
+        "UPDATE",
+        "tags",
+        """
+        IF (NEW.title, NEW."desc", NEW.type, NEW.usage_count, NEW.alias_of, NEW.date_added)
+           IS DISTINCT FROM
+           (OLD.title, OLD."desc", OLD.type, OLD.usage_count, OLD.alias_of, OLD.date_added)
+        THEN
+            INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);
+        END IF;
+     """,
+    ),
+    (
+        "tags_search_outbox_delete",
+        "DELETE",
+        "tags",
+        "INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id);",
+    ),
+    (
+        "tag_external_links_search_outbox_insert",
+        "INSERT",
+        "tag_external_links",
+        "INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);",
+    ),
+    (
+        "tag_external_links_search_outbox_delete",
+        "DELETE",
+        "tag_external_links",
+        "INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id);",
+    ),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "search_outbox",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # One statement per op.execute: asyncpg refuses multi-command strings.
+    for name, event, table, body in _TRIGGERS:
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+            {body}
+            RETURN NULL;
+            END $$
+        """)
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+        op.execute(f"""
+            CREATE TRIGGER {name} AFTER {event} ON {table}
+                FOR EACH ROW EXECUTE FUNCTION {name}()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _, table, _ in reversed(_TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {name}()")
+    op.drop_table("search_outbox")
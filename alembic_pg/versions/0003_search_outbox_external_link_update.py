@@ -0,0 +1,50 @@
+"""queue tag_external_links updates in search_outbox
+
+Postgres side of MariaDB migration 8d41e6b0c3a5. The trigger SQL is frozen
+here as it stands in app/core/pg_triggers.py.
+
+Revision ID: 0003_search_outbox_link_update
+Revises: 0002_search_outbox
+Create Date: 2026-10-16 15:02:11.604219
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_search_outbox_link_update"
+down_revision: str | Sequence[str] | None = "0002_search_outbox"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_NAME = "tag_external_links_search_outbox_update"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One statement per op.execute: asyncpg refuses multi-command strings.
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {_NAME}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+        IF (NEW.tag_id, NEW.url) IS DISTINCT FROM (OLD.tag_id, OLD.url) THEN
+            INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id);
+            IF NEW.tag_id <> OLD.tag_id THEN
+                INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);
+            END IF;
+        END IF;
+        RETURN NULL;
+        END $$
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS {_NAME} ON tag_external_links")
+    op.execute(f"""
+        CREATE TRIGGER {_NAME} AFTER UPDATE ON tag_external_links
+            FOR EACH ROW EXECUTE FUNCTION {_NAME}()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP TRIGGER IF EXISTS {_NAME} ON tag_external_links")
+    op.execute(f"DROP FUNCTION IF EXISTS {_NAME}()")
@@ -0,0 +1,31 @@
+"""
+Fast JSON responses for large list endpoints.
+
+When a route returns a pydantic model, FastAPI dumps it to a dict, validates that
+dict against ``response_model`` a second time, runs the result through
+``jsonable_encoder`` and finally ``json.dumps``. For a page of 100 images with
+their tags and comments, that round trip costs more CPU than the queries behind it.
+
+:class:`ModelJSONResponse` serializes the already-validated response model
+straight to JSON bytes in pydantic-core, in one pass. FastAPI returns Response
+instances untouched, so the route keeps ``response_model`` for the OpenAPI schema
+and the handler must build exactly that model (same fields, same aliases: the
+output is byte-for-byte what the default path would produce).
+"""
+
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class ModelJSONResponse(Response):
+    """A response whose content is a pydantic model, rendered by pydantic-core."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return to_json(content, by_alias=True)
+        return super().render(content)
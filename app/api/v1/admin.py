@@ -39,6 +39,7 @@ from app.core.permission_cache import invalidate_group_permissions, invalidate_u
 from app.core.permission_deps import require_all_permissions, require_permission
 from app.core.permissions import Permission
 from app.core.redis import get_redis
+from app.core.viewer_context import invalidate_viewer_context
 from app.models.admin_action import AdminActions
 from app.models.comment import Comments
 from app.models.comment_report import CommentReports
@@ -108,6 +109,7 @@ from app.services.image_status import (
     enqueue_r2_sync_on_status_change,
 )
 from app.services.ml_suggestion_review import approve_pending_suggestions_for_links
+from app.services.post_commit import after_tag_links_change
 from app.services.rating import schedule_rating_recalculation
 from app.services.review_jobs import check_early_close
 from app.services.tag_type_flags import refresh_image_tag_type_flags
@@ -253,6 +255,7 @@ async def delete_group(
     group_id: Annotated[int, Path(description="Group ID")],
     _: Annotated[None, Depends(require_permission(Permission.GROUP_MANAGE))],
     db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> None:
     """
     Delete a group.
@@ -267,9 +270,16 @@ async def delete_group(
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
+    # Members lose the group's permissions; collect them before the rows cascade away
+    members = await db.execute(select(UserGroups.user_id).where(UserGroups.group_id == group_id))  # type: ignore[call-overload]
+    member_ids = list(members.scalars().all())
+
     await db.delete(group)
     await db.commit()
 
+    for member_id in member_ids:
+        await invalidate_user_permissions(redis_client, member_id)
+
 
 # ===== Group Membership =====
 
@@ -318,6 +328,7 @@ async def add_user_to_group(
     user_id: Annotated[int, Path(description="User ID")],
     _: Annotated[None, Depends(require_permission(Permission.GROUP_MANAGE))],
     db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> MessageResponse:
     """
     Add a user to a group.
@@ -348,6 +359,8 @@ async def add_user_to_group(
     membership = UserGroups(user_id=user_id, group_id=group_id)
     db.add(membership)
     await db.commit()
+    await invalidate_user_permissions(redis_client, user_id)
+    await invalidate_viewer_context(user_id)
 
     return MessageResponse(message="User added to group successfully")
 
@@ -361,6 +374,7 @@ async def remove_user_from_group(
     user_id: Annotated[int, Path(description="User ID")],
     _: Annotated[None, Depends(require_permission(Permission.GROUP_MANAGE))],
     db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> None:
     """
     Remove a user from a group.
@@ -381,6 +395,8 @@ async def remove_user_from_group(
 
     await db.delete(membership)
     await db.commit()
+    await invalidate_user_permissions(redis_client, user_id)
+    await invalidate_viewer_context(user_id)
 
 
 # ===== Group Permissions =====
@@ -789,6 +805,7 @@ async def change_image_status(
     # Schedule rating recalculation for original image after repost migration
     if status_data.status == ImageStatus.REPOST and status_data.replacement_id:
         await schedule_rating_recalculation(status_data.replacement_id)
+        await after_tag_links_change(db, [image_id, status_data.replacement_id])
 
     return ImageStatusResponse.model_validate(image)
 
@@ -1536,7 +1553,7 @@ async def apply_tag_suggestions(
     # Every row is re-fetched inside the unit — the rollback between attempts
     # expires the report and suggestion instances this mutates — and the
     # accumulators are rebuilt so a retry cannot report a tag once per attempt.
-    async def _apply() -> tuple[list[int], list[int], list[int], list[int]]:
+    async def _apply() -> tuple[int, list[int], list[int], list[int], list[int]]:
         # Get the report
         result = await db.execute(
             select(ImageReports).where(ImageReports.report_id == report_id)  # type: ignore[arg-type]
@@ -1671,16 +1688,20 @@ async def apply_tag_suggestions(
 
         await refresh_image_tag_type_flags(db, report.image_id)
 
+        # Read out before the commit, which expires the report instance.
+        report_image_id: int = report.image_id  # type: ignore[assignment]
         await db.commit()
 
-        return applied_tags, removed_tags, already_present, already_absent
+        return report_image_id, applied_tags, removed_tags, already_present, already_absent
 
     (
+        report_image_id,
         applied_tags,
         removed_tags,
         already_present,
         already_absent,
     ) = await retry_on_transient_conflict(db, _apply, what="apply_tag_suggestions")
+    await after_tag_links_change(db, [report_image_id], [*applied_tags, *removed_tags])
 
     return ApplyTagSuggestionsResponse(
         message=f"Applied {len(applied_tags)} tags, removed {len(removed_tags)} tags",
@@ -1774,6 +1795,7 @@ async def action_report(
     )
     if action_data.new_status == ImageStatus.REPOST and action_data.replacement_id:
         await schedule_rating_recalculation(action_data.replacement_id)
+        await after_tag_links_change(db, [reported_image_id, action_data.replacement_id])
 
     return MessageResponse(message="Report processed and image status updated")
 
@@ -2601,6 +2623,7 @@ async def suspend_user(
     db.add(suspension_record)
 
     await db.commit()
+    await invalidate_viewer_context(user_id)
 
     if is_warning:
         return MessageResponse(message="Warning issued to user")
@@ -2670,6 +2693,7 @@ async def reactivate_user(
     db.add(reactivation_record)
 
     await db.commit()
+    await invalidate_viewer_context(user_id)
 
     return MessageResponse(message="User reactivated successfully")
 
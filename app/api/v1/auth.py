@@ -30,14 +30,14 @@ from app.core.auth import (
 )
 from app.core.database import get_db
 from app.core.logging import get_logger
+from app.core.password_hashing import get_password_hash_async, verify_password_async
 from app.core.redis import get_redis
 from app.core.security import (
     RedactedStr,
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
 )
+from app.core.viewer_context import invalidate_viewer_context
 from app.models.permissions import UserGroups
 from app.models.refresh_token import RefreshTokens
 from app.models.user import Users
@@ -376,7 +376,7 @@ async def login(
     original_password_type = user.password_type
 
     if user.password_type == "bcrypt":
-        password_valid = verify_password(credentials.password, user.password)
+        password_valid = await verify_password_async(credentials.password, user.password)
     elif user.password_type == "sha1":
         # Legacy SHA1+salt verification — migrate to bcrypt on success
         password_valid = _verify_legacy_password(credentials.password, user.password, user.salt)
@@ -441,7 +441,7 @@ async def login(
 
     # Migrate password to bcrypt if needed
     if migrate_to_bcrypt:
-        user.password = get_password_hash(credentials.password)
+        user.password = await get_password_hash_async(credentials.password)
         user.password_type = "bcrypt"
         # Note: We'll commit this along with last_login update below
 
@@ -760,6 +760,7 @@ async def logout_all_devices(
     # Revoke all user's refresh tokens
     await db.execute(delete(RefreshTokens).where(RefreshTokens.user_id == current_user.user_id))  # type: ignore[arg-type]
     await db.commit()
+    await invalidate_viewer_context(current_user.user_id)
 
     # Clear authentication cookies
     _clear_auth_cookies(response)
@@ -804,7 +805,9 @@ async def change_password(
     # Verify current password (support both bcrypt and legacy SHA1)
     password_valid = False
     if current_user.password_type == "bcrypt":
-        password_valid = verify_password(request_data.current_password, current_user.password)
+        password_valid = await verify_password_async(
+            request_data.current_password, current_user.password
+        )
     else:
         password_valid = _verify_legacy_password(
             request_data.current_password, current_user.password, current_user.salt
@@ -817,7 +820,7 @@ async def change_password(
         )
 
     # Update password (always use bcrypt for new password)
-    current_user.password = get_password_hash(request_data.new_password)
+    current_user.password = await get_password_hash_async(request_data.new_password)
     current_user.password_type = "bcrypt"
 
     if current_user.user_id is None:
@@ -1073,7 +1076,7 @@ async def reset_password(
         )
 
     # Update password
-    user.password = get_password_hash(request_data.new_password)
+    user.password = await get_password_hash_async(request_data.new_password)
     user.password_type = "bcrypt"
 
     # Clear reset fields
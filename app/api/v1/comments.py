@@ -6,12 +6,13 @@ from datetime import UTC, datetime
 from typing import Annotated
 
 import redis.asyncio as redis
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import asc, desc, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.dependencies import CommentSortParams, PaginationParams
+from app.api.responses import ModelJSONResponse
 from app.config import AdminActionType, ReportStatus
 from app.core.auth import get_current_user
 from app.core.database import get_db, is_postgres, statement_timeout
@@ -66,7 +67,7 @@ async def list_comments(
     date_from: Annotated[str | None, Query(description="Start date (YYYY-MM-DD)")] = None,
     date_to: Annotated[str | None, Query(description="End date (YYYY-MM-DD)")] = None,
     db: AsyncSession = Depends(get_db),
-) -> CommentListResponse:
+) -> Response:
     # TODO: Add an automatic mode that detects the most efficient method based on input?
     """
     Search and list comments with filtering and flexible text search.
@@ -168,11 +169,13 @@ async def list_comments(
         result = await db.execute(query)
     comments = result.scalars().all()
 
-    return CommentListResponse(
-        total=total or 0,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        comments=[CommentResponse.model_validate(comment) for comment in comments],
+    return ModelJSONResponse(
+        CommentListResponse(
+            total=total or 0,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            comments=[CommentResponse.model_validate(comment) for comment in comments],
+        )
     )
 
 
@@ -204,7 +207,7 @@ async def get_image_comments(
     pagination: Annotated[PaginationParams, Depends()],
     sorting: Annotated[CommentSortParams, Depends()],
     db: AsyncSession = Depends(get_db),
-) -> CommentListResponse:
+) -> Response:
     """
     Get all comments for a specific image.
 
@@ -249,11 +252,13 @@ async def get_image_comments(
     result = await db.execute(query)
     comments = result.scalars().all()
 
-    return CommentListResponse(
-        total=total or 0,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        comments=[CommentResponse.model_validate(comment) for comment in comments],
+    return ModelJSONResponse(
+        CommentListResponse(
+            total=total or 0,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            comments=[CommentResponse.model_validate(comment) for comment in comments],
+        )
     )
 
 
@@ -263,7 +268,7 @@ async def get_user_comments(
     pagination: Annotated[PaginationParams, Depends()],
     sorting: Annotated[CommentSortParams, Depends()],
     db: AsyncSession = Depends(get_db),
-) -> CommentListResponse:
+) -> Response:
     """
     Get all comments by a specific user.
 
@@ -307,11 +312,13 @@ async def get_user_comments(
     result = await db.execute(query)
     comments = result.scalars().all()
 
-    return CommentListResponse(
-        total=total or 0,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        comments=[CommentResponse.model_validate(comment) for comment in comments],
+    return ModelJSONResponse(
+        CommentListResponse(
+            total=total or 0,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            comments=[CommentResponse.model_validate(comment) for comment in comments],
+        )
     )
 
 
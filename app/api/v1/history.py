@@ -17,7 +17,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import PaginationParams
 from app.config import ImageStatus
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.image_status_history import ImageStatusHistory
 from app.models.tag import Tags
 from app.models.tag_audit_log import TagAuditLog
@@ -367,7 +367,7 @@ async def _load_linked_tags(db: AsyncSession, tag_ids: set[int]) -> dict[int, Li
 async def get_user_history(
     user_id: Annotated[int, Path(description="User ID")],
     pagination: Annotated[PaginationParams, Depends()],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> UserHistoryListResponse:
     """
     Get all changes made by a user.
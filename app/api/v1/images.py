@@ -2,11 +2,13 @@
 Images API endpoints
 """
 
+import base64
+import json
 import math
 import random
 import shutil
 import tempfile
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from pathlib import Path as FilePath
@@ -22,13 +24,14 @@ from fastapi import (
     Path,
     Query,
     Request,
+    Response,
     UploadFile,
     status,
 )
 from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy import and_, asc, delete, desc, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import aliased, joinedload, selectinload
 
 from app.api.dependencies import (
     ImageRatingsSortParams,
@@ -36,7 +39,8 @@ from app.api.dependencies import (
     PaginationParams,
     UserSortParams,
 )
-from app.api.v1.tags import get_tag_hierarchy, resolve_tag_alias
+from app.api.responses import ModelJSONResponse
+from app.api.v1.tags import get_tag_hierarchies, resolve_tag_alias, resolve_tag_alias_ids
 from app.config import (
     AdminActionType,
     DeactivationReason,
@@ -47,8 +51,16 @@ from app.config import (
     ReviewStatus,
     settings,
 )
-from app.core.auth import CurrentUser, VerifiedUser, get_current_user, get_optional_current_user
-from app.core.database import get_db, is_postgres, statement_timeout
+from app.core.auth import (
+    CurrentReadViewer,
+    CurrentUser,
+    CurrentViewer,
+    VerifiedUser,
+    get_current_user,
+    get_optional_read_viewer,
+    get_optional_viewer,
+)
+from app.core.database import get_db, get_read_db, is_postgres, statement_timeout
 from app.core.db_retry import retry_on_transient_conflict
 from app.core.logging import get_logger
 from app.core.permission_deps import require_permission
@@ -56,6 +68,7 @@ from app.core.permissions import Permission, has_any_permission, has_permission
 from app.core.r2_constants import R2Location
 from app.core.redis import get_redis
 from app.core.user_loader import image_uploader_load
+from app.core.viewer_context import ViewerContext
 from app.models import (
     AdminActions,
     Comments,
@@ -119,22 +132,36 @@ from app.schemas.user import (
     UserWithRatingResponse,
 )
 from app.services.comments import comments_for_images
-from app.services.feed_count_cache import get_feed_counts, get_filtered_count
+from app.services.feed_count_cache import (
+    CountEstimate,
+    estimate_tag_count,
+    get_feed_counts,
+    get_filtered_count,
+    record_feed_count_change,
+)
+from app.services.feed_response_cache import (
+    FeedCacheSlot,
+    bump_feed_generation,
+    lookup_feed_response,
+)
+from app.services.image_list_loader import image_list_load
 from app.services.image_processing import (
     create_thumbnail,
     get_image_dimensions,
     validate_image_file,
 )
 from app.services.image_status import enqueue_r2_sync_on_status_change
-from app.services.image_visibility import PUBLIC_IMAGE_STATUSES
+from app.services.image_visibility import PUBLIC_IMAGE_STATUSES, can_moderate_images
 from app.services.iqdb import check_iqdb_similarity, check_iqdb_similarity_by_hash, remove_from_iqdb
 from app.services.ml_suggestion_lifecycle import sync_suggestions_for_status_transition
 from app.services.ml_suggestion_review import approve_pending_suggestions_for_links
+from app.services.page_enrichment import gather_stages, page_tags, viewer_favorites
+from app.services.post_commit import after_tag_links_change, after_tags_change
 from app.services.rate_limit import check_similarity_rate_limit
 from app.services.rating import RatingStats, recalculate_image_ratings
 from app.services.recommendations import get_recommended_images
-from app.services.search import sync_tag_to_search
 from app.services.tag_context import stamp_context_sources
+from app.services.tag_postings import TagPostingMatch, match_tags
 from app.services.tag_type_flags import refresh_image_tag_type_flags
 from app.services.upload import (
     check_upload_rate_limit,
@@ -266,7 +293,7 @@ async def check_similar_by_upload(
 async def _open_report_image_ids(
     db: AsyncSession,
     image_ids: list[int | None],
-    viewer: Users | None,
+    viewer: ViewerContext | None,
     redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
 ) -> set[int]:
     """Subset of `image_ids` that have a PENDING report — only for REPORT_VIEW viewers.
@@ -330,6 +357,116 @@ class _FeedFilters:
     reported: bool | None = None
 
 
+# Sorts that keyset (cursor) paging can serve. last_post and total_pixels are
+# nullable, and the two backends order NULLs at opposite ends, so a keyset
+# predicate over them would skip or repeat the NULL run on one of them. Those
+# sorts stay offset-only.
+_CURSOR_SORTS = {
+    ImageSortBy.image_id,
+    ImageSortBy.date_added,
+    ImageSortBy.favorites,
+    ImageSortBy.bayesian_rating,
+}
+
+
+def _encode_feed_cursor(sorting: ImageSortParams, image: Images) -> str:
+    """Opaque keyset cursor for the row *after* ``image`` in this sort.
+
+    Carries the sort it was issued for, so a cursor replayed against a different
+    sort is rejected rather than silently paging from a meaningless position.
+    """
+    payload = {
+        "s": sorting.sort_by.value,
+        "o": sorting.sort_order,
+        "v": getattr(image, sorting.sort_by.get_column(Images).key),
+        "i": image.image_id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    # Padding stripped: "=" would need percent-encoding in the query string.
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_feed_cursor(cursor: str, sorting: ImageSortParams) -> tuple[Any, int]:
+    """Decode a ``next_cursor`` back into ``(sort value, image_id)``; 400 if unusable."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, image_id = payload["v"], int(payload["i"])
+        issued_for = (payload["s"], payload["o"])
+    except ValueError, KeyError, TypeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from None
+    if issued_for != (sorting.sort_by.value, sorting.sort_order):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor was issued for a different sort_by/sort_order.",
+        )
+    return value, image_id
+
+
+def _keyset_after(sort_column: Any, sort_order: str, value: Any, image_id: int) -> Any:
+    """WHERE clause selecting the rows that follow ``(value, image_id)`` in feed order.
+
+    Feed order is ``sort_column <sort_order>, image_id DESC`` (the tiebreak is always
+    descending), so within a tie the next rows are the *lower* image_ids.
+
+    The boundary value is re-read from the anchor row rather than trusted from the
+    cursor: MariaDB's single-precision FLOAT comes back over the wire rounded, and
+    comparing the column to that rounded literal would repeat or skip the anchor's
+    tie group. The cursor's copy is only the fallback for an anchor deleted since.
+    """
+    if sort_column.key == "image_id":
+        if sort_order == "DESC":
+            return Images.image_id < image_id  # type: ignore[operator]
+        return Images.image_id > image_id  # type: ignore[operator]
+
+    anchor = aliased(Images)
+    boundary = func.coalesce(
+        select(getattr(anchor, sort_column.key))
+        .where(anchor.image_id == image_id)  # type: ignore[arg-type]
+        .scalar_subquery(),
+        value,
+    )
+    past_boundary = sort_column < boundary if sort_order == "DESC" else sort_column > boundary
+    return or_(
+        past_boundary,
+        and_(sort_column == boundary, Images.image_id < image_id),  # type: ignore[operator]
+    )
+
+
+# Deepest page (offset + per_page) served from posting-list candidates; past it
+# the candidate IN-list costs more than it saves.
+_POSTINGS_MAX_PAGE_ROWS = 1000
+
+
+async def _tag_postings_total(
+    db: AsyncSession,
+    postings: TagPostingMatch,
+    content_query: Any,
+    current_user: ViewerContext | None,
+) -> int:
+    """Pagination total for a tag-only search, counted from the posting-list bitmaps.
+
+    Same visibility branches as the SQL count paths in list_images. The viewer's own
+    hidden images stay a live SQL count: tiny, user_id-indexed, and never in the
+    shared bitmaps.
+    """
+    if current_user is None:
+        return await postings.count(db, public_only=True, hide_reposts=False)
+    hide_reposts = current_user.hide_reposts == 1
+    if current_user.show_all_images == 1:
+        return await postings.count(db, public_only=False, hide_reposts=hide_reposts)
+    public_count = await postings.count(db, public_only=True, hide_reposts=hide_reposts)
+    own_hidden_query = content_query.where(
+        Images.status.notin_(PUBLIC_IMAGE_STATUSES),  # type: ignore[attr-defined]
+        Images.user_id == current_user.user_id,  # type: ignore[arg-type]
+    )
+    own_hidden_count = (
+        await db.execute(select(func.count()).select_from(own_hidden_query.subquery()))
+    ).scalar() or 0
+    return public_count + own_hidden_count
+
+
 def _parse_user_id_list(raw: str | None, param: str) -> list[int]:
     """Parse a comma-separated user-id list param (``exclude_user_id`` etc.).
 
@@ -350,7 +487,7 @@ def _parse_user_id_list(raw: str | None, param: str) -> list[int]:
 
 async def _default_feed_total(
     db: AsyncSession,
-    current_user: Users | None,
+    current_user: ViewerContext | None,
     redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
 ) -> int:
     """Fast pagination total for the *bare* default feed (visibility filter only).
@@ -404,8 +541,16 @@ async def _default_feed_total(
 @router.get("/", response_model=ImageDetailedListResponse, include_in_schema=False)
 @router.get("", response_model=ImageDetailedListResponse)
 async def list_images(
+    request: Request,
     pagination: Annotated[PaginationParams, Depends()],
     sorting: Annotated[ImageSortParams, Depends()],
+    cursor: Annotated[
+        str | None,
+        Query(
+            description="Keyset cursor from a previous response's next_cursor. When set, "
+            "`page` is ignored and the page starts right after the cursor's image."
+        ),
+    ] = None,
     # Basic filters
     user_id: Annotated[int | None, Query(description="Filter by uploader user ID")] = None,
     favorited_by_user_id: Annotated[
@@ -518,15 +663,15 @@ async def list_images(
             "response, grouped by image id (comments map). Default false."
         ),
     ] = False,
-    db: AsyncSession = Depends(get_db),
-    current_user: Users | None = Depends(get_optional_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: ViewerContext | None = Depends(get_optional_read_viewer),
     redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
-) -> ImageDetailedListResponse:
+) -> Response:
     """
     Search and list images with comprehensive filtering.
 
     **Supports:**
-    - Pagination (page, per_page)
+    - Pagination (page, per_page), or keyset paging via `cursor`/`next_cursor`
     - Sorting by any field
     - Tag filtering (by ID, with ANY/ALL modes and tag exclusion)
     - Date range filtering
@@ -570,7 +715,27 @@ async def list_images(
     - `/images?exclude_user_id=5,6` - Hide uploads by users 5 and 6
     - `/images?exclude_commenter=10` - Hide images user 10 commented on
     - `/images?exclude_favorited_by_user_id=7` - Hide images user 7 favorited
+
+    **Keyset paging:** every full page under `sort_by` image_id, date_added, favorites
+    or bayesian_rating carries a `next_cursor`; pass it back as `cursor` (same filters
+    and sort) to fetch the following page. Unlike `page`, the cost does not grow with
+    depth. `total` is still reported. last_post and total_pixels sorts are offset-only.
     """
+    # Anonymous responses depend only on the query: serve them from the rendered
+    # response cache (with an ETag, so revalidation is a 304).
+    cache_slot: FeedCacheSlot | None = None
+    if current_user is None:
+        cached = await lookup_feed_response(request)
+        if isinstance(cached, Response):
+            return cached
+        cache_slot = cached
+
+    if cursor is not None and sorting.sort_by not in _CURSOR_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor paging is not supported for sort_by={sorting.sort_by.value}.",
+        )
+
     # A blank/whitespace-only commentsearch means "not searching," not "search for
     # nothing" -- normalize it to None up front so it reads as absent everywhere
     # below: the Comments JOIN guard, the count's JOIN guard, and the _FeedFilters
@@ -648,8 +813,11 @@ async def list_images(
         if current_user is not None and current_user.hide_reposts == 1:
             visibility_clauses.append(Images.status != ImageStatus.REPOST)
 
-    # Tag filtering
+    # Tag filtering. The resolved filter is also kept as plain id sets for the
+    # posting-list index: every include group must match, no exclude tag may.
     tag_ids: list[int] = []
+    include_tag_groups: list[set[int]] = []
+    exclude_tag_group: set[int] = set()
     if tags:
         # isdecimal() (not isdigit()): int() rejects chars like '²' that isdigit() matches.
         tag_ids = [int(tid.strip()) for tid in tags.split(",") if tid.strip().isdecimal()]
@@ -664,14 +832,16 @@ async def list_images(
             # None → default (10, full hierarchy)
             hierarchy_max_depth = tag_depth + 1 if tag_depth is not None else 10
 
+            resolved = await resolve_tag_alias_ids(db, tag_ids)
+            hierarchies = await get_tag_hierarchies(
+                db, resolved.values(), max_depth=hierarchy_max_depth
+            )
+
             if tags_mode == "all":
                 # Images must have ALL specified tags (including their descendants)
                 for tag_id in tag_ids:
-                    _, resolved_tag_id = await resolve_tag_alias(db, tag_id)
-                    # Expand hierarchy to configured depth
-                    hierarchy_ids = await get_tag_hierarchy(
-                        db, resolved_tag_id, max_depth=hierarchy_max_depth
-                    )
+                    hierarchy_ids = hierarchies[resolved[tag_id]]
+                    include_tag_groups.append(set(hierarchy_ids))
                     query = query.where(
                         Images.image_id.in_(  # type: ignore[union-attr]
                             select(TagLinks.image_id).where(TagLinks.tag_id.in_(hierarchy_ids))  # type: ignore[call-overload,attr-defined]
@@ -679,14 +849,10 @@ async def list_images(
                     )
             else:
                 # Images must have ANY of the specified tags (including their descendants)
-                # Resolve aliases and expand hierarchies for all tags
                 all_hierarchy_ids: set[int] = set()
                 for tag_id in tag_ids:
-                    _, resolved_tag_id = await resolve_tag_alias(db, tag_id)
-                    hierarchy_ids = await get_tag_hierarchy(
-                        db, resolved_tag_id, max_depth=hierarchy_max_depth
-                    )
-                    all_hierarchy_ids.update(hierarchy_ids)
+                    all_hierarchy_ids.update(hierarchies[resolved[tag_id]])
+                include_tag_groups.append(all_hierarchy_ids)
                 query = query.where(
                     Images.image_id.in_(  # type: ignore[union-attr]
                         select(TagLinks.image_id).where(TagLinks.tag_id.in_(all_hierarchy_ids))  # type: ignore[call-overload,attr-defined]
@@ -710,13 +876,13 @@ async def list_images(
                 )
 
             # Resolve aliases, then optionally expand each to its full subtree.
-            resolved_exclude_ids: set[int] = set()
-            for etid in exclude_tag_ids:
-                _, resolved_etid = await resolve_tag_alias(db, etid)
-                if exclude_descendants:
-                    resolved_exclude_ids.update(await get_tag_hierarchy(db, resolved_etid))
-                else:
-                    resolved_exclude_ids.add(resolved_etid)
+            resolved_exclude_ids = set((await resolve_tag_alias_ids(db, exclude_tag_ids)).values())
+            if exclude_descendants:
+                exclude_hierarchies = await get_tag_hierarchies(db, resolved_exclude_ids)
+                resolved_exclude_ids = {
+                    tag_id for hierarchy in exclude_hierarchies.values() for tag_id in hierarchy
+                }
+            exclude_tag_group = resolved_exclude_ids
 
             # Apply NOT IN subquery
             query = query.where(
@@ -906,180 +1072,237 @@ async def list_images(
     # _FeedFilters is covered automatically. Falsy strings (e.g. tags="") normalize to
     # None so an empty filter param still reads as "no filter", matching the old `not x`.
     is_bare_default_feed = active_filters == _FeedFilters()
-    if is_bare_default_feed:
-        total = await _default_feed_total(db, current_user, redis_client)
-    else:
-        # When comment filters JOIN Comments, one image can match multiple
-        # comment rows — count distinct images to match the page subquery's
-        # distinct() below, or the pagination total is inflated.
-        if commenter is not None or commentsearch is not None:
-            distinct_ids = query.with_only_columns(
-                Images.image_id.label("image_id")  # type: ignore[union-attr]
-            ).distinct()
-            count_query = select(func.count()).select_from(distinct_ids.subquery())
-            async with statement_timeout(db, search_timeout):
-                total = await get_filtered_count(db, count_query, redis_client)
-        elif decompose_count and current_user is not None:
-            # Default logged-in (show_all=0) feed. The visibility OR bakes the viewer's
-            # user_id into the count, which would give every user a private cache entry.
-            # Decompose instead (disjoint union):
-            #   count(F AND (public OR mine)) = count(F AND public) + count(F AND mine AND hidden)
-            # The public term is viewer-independent — one shared cache entry per filter
-            # combo (identical to the anonymous entry when hide_reposts is off). The
-            # own-hidden term is the viewer's own non-public uploads matching F: tiny,
-            # user_id-indexed, computed live. hide_reposts folds into the public term
-            # only — reposts are public, so the own-hidden term can never contain one.
-            public_query = content_query.where(Images.status.in_(PUBLIC_IMAGE_STATUSES))  # type: ignore[attr-defined]
-            if current_user.hide_reposts == 1:
-                public_query = public_query.where(Images.status != ImageStatus.REPOST)  # type: ignore[arg-type]
-            own_hidden_query = content_query.where(
-                Images.status.notin_(PUBLIC_IMAGE_STATUSES),  # type: ignore[attr-defined]
-                Images.user_id == current_user.user_id,  # type: ignore[arg-type]
-            )
-            async with statement_timeout(db, search_timeout):
-                public_count = await get_filtered_count(
-                    db,
-                    select(func.count()).select_from(public_query.subquery()),
-                    redis_client,
-                )
-                own_hidden_count = (
-                    await db.execute(select(func.count()).select_from(own_hidden_query.subquery()))
-                ).scalar() or 0
-            total = public_count + own_hidden_count
-        else:
-            count_query = select(func.count()).select_from(query.subquery())
-            async with statement_timeout(db, search_timeout):
-                total = await get_filtered_count(db, count_query, redis_client)
-
-    # Performance optimization: Two-stage query for fast filtering and sorting
-    #
-    # Stage 1 (Subquery): Apply filters, sorting, and pagination on just image_id
-    # - Uses indexes for filtering (user_id, status, dimensions, etc.)
-    # - Sorts only the IDs (lightweight operation)
-    # - Returns limited set of image_ids (e.g., 20 IDs)
-    #
-    # Stage 2 (Main query): Fetch full image data only for those IDs
-    # - Joins on primary key (fast)
-    # - Only retrieves 20 full image rows instead of thousands
-    #
-    # This generates SQL similar to:
-    # SELECT images.* FROM images
-    # JOIN (
-    #   SELECT image_id FROM images
-    #   WHERE ... (filters)
-    #   ORDER BY favorites DESC
-    #   LIMIT 20
-    # ) AS imageset ON images.image_id = imageset.image_id
-
-    # Apply sorting and pagination
-    # Use the centralized get_column() method which handles field aliasing
-    # (e.g., maps date_added -> image_id for performance)
-    sort_column = sorting.sort_by.get_column(Images)
 
-    if sorting.sort_order == "DESC":
-        subquery_order = desc(sort_column)
-    else:
-        subquery_order = asc(sort_column)
-
-    # Secondary sort by image_id ensures consistent ordering when primary sort has ties
-    # (e.g., multiple images with same favorites count). Use descending for "newest first".
-    secondary_order = desc(Images.image_id)  # type: ignore[var-annotated,arg-type]
-
-    # Subquery: Apply all filters, sort, and limit to get matching image_ids
-    # When comment filters are used with JOIN, apply distinct() to avoid duplicate rows
-    # (one image can have multiple comments)
-    # Only need distinct when we JOIN with Comments (commenter or commentsearch filters)
-    needs_distinct = commenter is not None or commentsearch is not None
-
-    subquery_columns = [Images.image_id.label("image_id")]  # type: ignore[union-attr]
-    if needs_distinct and sort_column.key != "image_id":
-        # Postgres rejects an ORDER BY expression that is absent from a SELECT
-        # DISTINCT select list; MySQL permits it, which is why this only broke
-        # after the cutover. Adding the sort column cannot change which rows
-        # survive DISTINCT: it comes from Images, so it is constant per
-        # image_id and (image_id, sort_column) collapses exactly as image_id
-        # alone. Sorts whose get_column() already resolves to image_id
-        # (image_id, date_added) satisfy the rule and must not add a duplicate.
-        subquery_columns.append(sort_column)
-
-    image_id_subquery = query.with_only_columns(*subquery_columns)
-    if needs_distinct:
-        image_id_subquery = image_id_subquery.distinct()
-
-    imageset = (
-        image_id_subquery.order_by(subquery_order, secondary_order)
-        .offset(pagination.offset)
-        .limit(pagination.per_page)
-        .subquery("imageset")
+    # Tag-only searches (tags/exclude_tags plus the implicit visibility filter) are
+    # counted from the posting-list bitmaps instead of the tag_links semijoin, and
+    # use them to narrow the page fetch below. None = not servable; SQL as usual.
+    is_tag_only = bool(include_tag_groups) and (
+        replace(active_filters, tags=None, exclude_tags=None) == _FeedFilters()
     )
+    postings: TagPostingMatch | None = None
+    if is_tag_only and (
+        current_user is None or current_user.show_all_images == 1 or decompose_count
+    ):
+        postings = await match_tags(db, include_tag_groups, exclude_tag_group)
 
-    # Main query: Fetch full image data only for the limited set of IDs
-    # Note: Must re-apply ORDER BY since JOIN doesn't preserve subquery order
-    final_query = (
-        select(Images)
-        .options(
-            selectinload(Images.user)  # type: ignore[arg-type]
-            .selectinload(Users.user_groups)  # type: ignore[arg-type]
-            .selectinload(UserGroups.group),  # type: ignore[arg-type]
-            selectinload(Images.tag_links).selectinload(TagLinks.tag),  # type: ignore[arg-type]
+    async def tag_estimate(*, public_only: bool, hide_reposts: bool) -> CountEstimate | None:
+        # Only tag-only searches have a cost model; anything else counts exactly.
+        if not is_tag_only:
+            return None
+        return await estimate_tag_count(
+            db,
+            include_tag_groups,
+            exclude_tag_group,
+            redis_client,
+            public_only=public_only,
+            hide_reposts=hide_reposts,
         )
-        .join(imageset, Images.image_id == imageset.c.image_id)  # type: ignore[arg-type]
-        .order_by(subquery_order, secondary_order)  # Re-apply same sort order
-    )
 
-    # Execute query
-    async with statement_timeout(db, search_timeout):
-        result = await db.execute(final_query)
-    images = result.scalars().all()
+    # The posting match holds temp bitmaps in Redis: release them whatever
+    # the count or page fetch below raises.
+    try:
+        total_is_estimate = False
+        if is_bare_default_feed:
+            total = await _default_feed_total(db, current_user, redis_client)
+        elif postings is not None:
+            total = await _tag_postings_total(db, postings, content_query, current_user)
+        else:
+            # When comment filters JOIN Comments, one image can match multiple
+            # comment rows — count distinct images to match the page subquery's
+            # distinct() below, or the pagination total is inflated.
+            if commenter is not None or commentsearch is not None:
+                distinct_ids = query.with_only_columns(
+                    Images.image_id.label("image_id")  # type: ignore[union-attr]
+                ).distinct()
+                count_query = select(func.count()).select_from(distinct_ids.subquery())
+                async with statement_timeout(db, search_timeout):
+                    total, _ = await get_filtered_count(db, count_query, redis_client)
+            elif decompose_count and current_user is not None:
+                # Default logged-in (show_all=0) feed. The visibility OR bakes the viewer's
+                # user_id into the count, which would give every user a private cache entry.
+                # Decompose instead (disjoint union):
+                #   count(F AND (public OR mine)) = count(F AND public) + count(F AND mine AND hidden)
+                # The public term is viewer-independent — one shared cache entry per filter
+                # combo (identical to the anonymous entry when hide_reposts is off). The
+                # own-hidden term is the viewer's own non-public uploads matching F: tiny,
+                # user_id-indexed, computed live. hide_reposts folds into the public term
+                # only — reposts are public, so the own-hidden term can never contain one.
+                public_query = content_query.where(Images.status.in_(PUBLIC_IMAGE_STATUSES))  # type: ignore[attr-defined]
+                if current_user.hide_reposts == 1:
+                    public_query = public_query.where(Images.status != ImageStatus.REPOST)  # type: ignore[arg-type]
+                own_hidden_query = content_query.where(
+                    Images.status.notin_(PUBLIC_IMAGE_STATUSES),  # type: ignore[attr-defined]
+                    Images.user_id == current_user.user_id,  # type: ignore[arg-type]
+                )
+                public_estimate = await tag_estimate(
+                    public_only=True, hide_reposts=current_user.hide_reposts == 1
+                )
+                async with statement_timeout(db, search_timeout):
+                    public_count, total_is_estimate = await get_filtered_count(
+                        db,
+                        select(func.count()).select_from(public_query.subquery()),
+                        redis_client,
+                        public_estimate,
+                    )
+                    own_hidden_count = (
+                        await db.execute(
+                            select(func.count()).select_from(own_hidden_query.subquery())
+                        )
+                    ).scalar() or 0
+                total = public_count + own_hidden_count
+            else:
+                count_query = select(func.count()).select_from(query.subquery())
+                # No explicit ?status= here (is_tag_only rules it out), so visibility is
+                # the viewer's default: public only unless show_all, less any reposts.
+                estimate = await tag_estimate(
+                    public_only=current_user is None or current_user.show_all_images != 1,
+                    hide_reposts=current_user is not None and current_user.hide_reposts == 1,
+                )
+                async with statement_timeout(db, search_timeout):
+                    total, total_is_estimate = await get_filtered_count(
+                        db, count_query, redis_client, estimate
+                    )
 
-    # Get favorite status for authenticated users (separate query for clean separation)
-    favorited_ids: set[int] = set()
-    if current_user and images:
-        image_ids = [img.image_id for img in images]
-        fav_result = await db.execute(
-            select(Favorites.image_id).where(  # type: ignore[call-overload]
-                Favorites.user_id == current_user.id,
-                Favorites.image_id.in_(image_ids),  # type: ignore[attr-defined]
+        # Performance optimization: Two-stage query for fast filtering and sorting
+        #
+        # Stage 1 (Subquery): Apply filters, sorting, and pagination on just image_id
+        # - Uses indexes for filtering (user_id, status, dimensions, etc.)
+        # - Sorts only the IDs (lightweight operation)
+        # - Returns limited set of image_ids (e.g., 20 IDs)
+        #
+        # Stage 2 (Main query): Fetch full image data only for those IDs
+        # - Joins on primary key (fast)
+        # - Only retrieves 20 full image rows instead of thousands
+        #
+        # This generates SQL similar to:
+        # SELECT images.* FROM images
+        # JOIN (
+        #   SELECT image_id FROM images
+        #   WHERE ... (filters)
+        #   ORDER BY favorites DESC
+        #   LIMIT 20
+        # ) AS imageset ON images.image_id = imageset.image_id
+
+        # Apply sorting and pagination
+        # Use the centralized get_column() method which handles field aliasing
+        # (e.g., maps date_added -> image_id for performance)
+        sort_column = sorting.sort_by.get_column(Images)
+
+        if sorting.sort_order == "DESC":
+            subquery_order = desc(sort_column)
+        else:
+            subquery_order = asc(sort_column)
+
+        # Secondary sort by image_id ensures consistent ordering when primary sort has ties
+        # (e.g., multiple images with same favorites count). Use descending for "newest first".
+        secondary_order = desc(Images.image_id)  # type: ignore[var-annotated,arg-type]
+
+        # Subquery: Apply all filters, sort, and limit to get matching image_ids
+        # When comment filters are used with JOIN, apply distinct() to avoid duplicate rows
+        # (one image can have multiple comments)
+        # Only need distinct when we JOIN with Comments (commenter or commentsearch filters)
+        needs_distinct = commenter is not None or commentsearch is not None
+
+        subquery_columns = [Images.image_id.label("image_id")]  # type: ignore[union-attr]
+        if needs_distinct and sort_column.key != "image_id":
+            # Postgres rejects an ORDER BY expression that is absent from a SELECT
+            # DISTINCT select list; MySQL permits it, which is why this only broke
+            # after the cutover. Adding the sort column cannot change which rows
+            # survive DISTINCT: it comes from Images, so it is constant per
+            # image_id and (image_id, sort_column) collapses exactly as image_id
+            # alone. Sorts whose get_column() already resolves to image_id
+            # (image_id, date_added) satisfy the rule and must not add a duplicate.
+            subquery_columns.append(sort_column)
+
+        image_id_subquery = query.with_only_columns(*subquery_columns)
+        if needs_distinct:
+            image_id_subquery = image_id_subquery.distinct()
+
+        # Keyset mode seeks past the cursor's row on the sort index instead of walking
+        # and discarding `offset` rows, so page 40,000 costs the same as page 2. It is
+        # applied after the count: the total covers the whole result, not the remainder.
+        cursor_image_id: int | None = None
+        if cursor is not None:
+            cursor_value, cursor_image_id = _decode_feed_cursor(cursor, sorting)
+            image_id_subquery = image_id_subquery.where(
+                _keyset_after(sort_column, sorting.sort_order, cursor_value, cursor_image_id)
             )
-        )
-        favorited_ids = set(fav_result.scalars().all())
+        else:
+            image_id_subquery = image_id_subquery.offset(pagination.offset)
 
-    # Mod-only open-report indicator (single query for the page).
-    open_report_ids = await _open_report_image_ids(
-        db, [img.image_id for img in images], current_user, redis_client
-    )
+        async def fetch_page(id_subquery: Any) -> list[Images]:
+            imageset = (
+                id_subquery.order_by(subquery_order, secondary_order)
+                .limit(pagination.per_page)
+                .subquery("imageset")
+            )
 
-    # Moderation reason visibility: mods (IMAGE_EDIT/REVIEW_VIEW) see every reason;
-    # owners see their own. The permission check is cache-backed (hot path).
-    viewer_can_moderate = (
-        current_user is not None
-        and current_user.user_id is not None
-        and await has_any_permission(
-            db, current_user.user_id, [Permission.IMAGE_EDIT, Permission.REVIEW_VIEW], redis_client
-        )
-    )
+            # Main query: Fetch full image data only for the limited set of IDs
+            # Note: Must re-apply ORDER BY since JOIN doesn't preserve subquery order
+            final_query = (
+                select(Images)
+                .options(*image_list_load())
+                .join(imageset, Images.image_id == imageset.c.image_id)  # type: ignore[arg-type]
+                .order_by(subquery_order, secondary_order)  # Re-apply same sort order
+            )
 
-    # ML suggestion counts: one grouped query for the page, only when the thumbnail
-    # badge is enabled AND for users who hold IMAGE_TAG_ADD or are admins (same
-    # predicate as the review queue gate). When ML_SUGGESTION_BADGE_ENABLED is off
-    # (default) the query is skipped entirely and the field stays None, so the
-    # frontend badge does not render. Anonymous users and plain users always get None.
-    # None means "not computed"; {} means "computed, all zero".
-    pending_counts: dict[int, int] | None = None
-    if (
-        settings.ML_SUGGESTION_BADGE_ENABLED
-        and current_user is not None
-        and current_user.user_id is not None
-        and images
-        and (
-            current_user.admin
-            or await has_permission(
-                db, current_user.user_id, Permission.IMAGE_TAG_ADD, redis_client
+            # Execute query
+            async with statement_timeout(db, search_timeout):
+                result = await db.execute(final_query)
+            return list(result.scalars().all())
+
+        # Under image_id order the bitmap lists the page's candidates directly: check
+        # only the first few hundred matching ids instead of walking the index until
+        # enough rows pass the stacked semijoins. The tag predicates stay on the
+        # query, so the bitmap only narrows. Too few rows with more candidates left
+        # (hidden images, index drift) falls back to the full query.
+        images: list[Images] | None = None
+        rows_needed = pagination.per_page + (0 if cursor is not None else pagination.offset)
+        if (
+            postings is not None
+            and sort_column.key == "image_id"
+            and rows_needed <= _POSTINGS_MAX_PAGE_ROWS
+        ):
+            candidate_ids, exhausted = await postings.image_ids(
+                rows_needed + max(rows_needed // 4, 16),
+                descending=sorting.sort_order == "DESC",
+                after=cursor_image_id,
             )
-        )
-    ):
-        page_ids = [img.image_id for img in images]
-        count_result = await db.execute(
+            images = await fetch_page(
+                image_id_subquery.where(Images.image_id.in_(candidate_ids))  # type: ignore[union-attr]
+            )
+            if len(images) < pagination.per_page and not exhausted:
+                images = None
+    finally:
+        if postings is not None:
+            await postings.release()
+    if images is None:
+        images = await fetch_page(image_id_subquery)
+
+    # Per-page lookups are independent of each other: run them as concurrent
+    # stages (see app.services.page_enrichment).
+    page_ids: list[int] = [img.image_id for img in images]  # type: ignore[misc]
+    viewer_id = current_user.user_id if current_user is not None else None
+
+    async def open_reports(session: AsyncSession) -> set[int]:
+        # Mod-only open-report indicator (single query for the page).
+        return await _open_report_image_ids(session, page_ids, current_user, redis_client)  # type: ignore[arg-type]
+
+    async def can_moderate(session: AsyncSession) -> bool:
+        # Moderation reason visibility: mods (IMAGE_EDIT/REVIEW_VIEW) see every reason;
+        # owners see their own. The permission check is cache-backed (hot path).
+        return await can_moderate_images(session, viewer_id, redis_client)  # type: ignore[arg-type]
+
+    async def ml_pending_counts(session: AsyncSession) -> dict[int, int] | None:
+        # ML suggestion counts: one grouped query for the page, only for users who
+        # hold IMAGE_TAG_ADD or are admins (same predicate as the review queue gate).
+        # None means "not computed"; {} means "computed, all zero".
+        if not (
+            current_user.admin  # type: ignore[union-attr]
+            or await has_permission(session, viewer_id, Permission.IMAGE_TAG_ADD, redis_client)  # type: ignore[arg-type]
+        ):
+            return None
+        count_result = await session.execute(
             select(MlTagSuggestions.image_id, func.count().label("cnt"))  # type: ignore[call-overload]
             .where(
                 MlTagSuggestions.image_id.in_(page_ids),  # type: ignore[attr-defined]
@@ -1087,7 +1310,34 @@ async def list_images(
             )
             .group_by(MlTagSuggestions.image_id)
         )
-        pending_counts = {row.image_id: row.cnt for row in count_result}
+        return {row.image_id: row.cnt for row in count_result}
+
+    async def page_comments(session: AsyncSession) -> dict[int, list[CommentResponse]]:
+        return await comments_for_images(session, page_ids)
+
+    # The ML badge stage only runs when ML_SUGGESTION_BADGE_ENABLED is on (default
+    # off): the field then stays None and the frontend badge does not render.
+    # Anonymous users and plain users always get None.
+    (
+        tags_by_image,
+        favorited_ids,
+        open_report_ids,
+        viewer_can_moderate,
+        pending_counts,
+        comments_map,
+    ) = await gather_stages(
+        db,
+        page_tags(page_ids),
+        viewer_favorites(viewer_id, page_ids) if viewer_id is not None else None,
+        open_reports if viewer_id is not None and page_ids else None,
+        can_moderate if viewer_id is not None else None,
+        ml_pending_counts
+        if settings.ML_SUGGESTION_BADGE_ENABLED and viewer_id is not None and page_ids
+        else None,
+        page_comments if include_comments else None,
+    )
+    favorited_ids = favorited_ids or set()
+    open_report_ids = open_report_ids or set()
 
     # Build response items; assign ml_suggestion_count after construction since
     # from_db_model does not accept it as a parameter.
@@ -1097,36 +1347,41 @@ async def list_images(
             img,
             is_favorited=img.image_id in favorited_ids,
             has_open_report=img.image_id in open_report_ids,
-            can_see_reason=viewer_can_moderate
+            can_see_reason=bool(viewer_can_moderate)
             or (current_user is not None and img.user_id == current_user.user_id),
+            tags=tags_by_image[img.image_id],
         )
         if pending_counts is not None:
             # Permitted user: set actual count (0 for images absent from grouped result).
-            item.ml_suggestion_count = pending_counts.get(img.image_id, 0)  # type: ignore[arg-type]
+            item.ml_suggestion_count = pending_counts.get(img.image_id, 0)
         response_items.append(item)
 
-    await stamp_context_sources(db, response_items)
-
-    comments_map: dict[int, list[CommentResponse]] | None = None
-    if include_comments:
-        comments_map = await comments_for_images(
-            db,
-            [img.image_id for img in images],  # type: ignore[misc]
-        )
+    # A short page is the last one; a full page may or may not be, and the next
+    # request answers that with an empty page rather than a second count here.
+    next_cursor = (
+        _encode_feed_cursor(sorting, images[-1])
+        if sorting.sort_by in _CURSOR_SORTS and len(images) == pagination.per_page
+        else None
+    )
 
-    return ImageDetailedListResponse(
+    result = ImageDetailedListResponse(
         total=total or 0,
         page=pagination.page,
         per_page=pagination.per_page,
         images=response_items,
         comments=comments_map,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
     )
+    if cache_slot is not None:
+        return await cache_slot.store(result)
+    return ModelJSONResponse(result)
 
 
 @router.get("/random", include_in_schema=True)
 async def random_images_page(
     per_page: Annotated[int | None, Query(ge=1, le=100, description="Items per page")] = None,
-    current_user: Users | None = Depends(get_optional_current_user),
+    current_user: ViewerContext | None = Depends(get_optional_viewer),
     db: AsyncSession = Depends(get_db),
 ) -> RedirectResponse:
     """Redirect to a random page of images.
@@ -1176,8 +1431,8 @@ async def random_images_page(
 @router.get("/recommended", response_model=RecommendedImagesResponse)
 async def get_recommended(
     pagination: Annotated[PaginationParams, Depends()],
-    current_user: Annotated[Users, Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db),
+    current_user: CurrentReadViewer,
+    db: AsyncSession = Depends(get_read_db),
 ) -> RecommendedImagesResponse:
     """
     Personalized feed: images scored against the caller's taste profile, plus
@@ -1205,27 +1460,27 @@ async def get_recommended(
         )
 
     query = (
-        select(Images)
-        .options(
-            selectinload(Images.user)  # type: ignore[arg-type]
-            .selectinload(Users.user_groups)  # type: ignore[arg-type]
-            .selectinload(UserGroups.group),  # type: ignore[arg-type]
-            selectinload(Images.tag_links).selectinload(TagLinks.tag),  # type: ignore[arg-type]
-        )
-        .where(Images.image_id.in_(rec.image_ids))  # type: ignore[union-attr]
+        select(Images).options(*image_list_load()).where(Images.image_id.in_(rec.image_ids))  # type: ignore[union-attr]
     )
     result = await db.execute(query)
     by_id = {img.image_id: img for img in result.scalars().all()}
+    page_ids = list(by_id)
+    tags_by_image, favorited_ids = await gather_stages(
+        db,
+        page_tags(page_ids),  # type: ignore[arg-type]
+        viewer_favorites(current_user.id, page_ids),  # type: ignore[arg-type]
+    )
     items: list[RecommendedImageResponse] = []
     for iid in rec.image_ids:
         img = by_id.get(iid)
         if img is None:
             continue
-        item = RecommendedImageResponse.from_db_model(img, is_favorited=False)
+        item = RecommendedImageResponse.from_db_model(
+            img, is_favorited=iid in favorited_ids, tags=tags_by_image[iid]
+        )
         item.because_tags = rec.because.get(iid, [])
         item.because_favorite = rec.because_favorite.get(iid)
         items.append(item)
-    await stamp_context_sources(db, items)
     return RecommendedImagesResponse(
         total=rec.total,
         page=pagination.page,
@@ -1239,7 +1494,7 @@ async def get_recommended(
 async def get_image(
     image_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: Users | None = Depends(get_optional_current_user),
+    current_user: ViewerContext | None = Depends(get_optional_viewer),
     redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> ImageDetailedResponse:
     """
@@ -1398,6 +1653,7 @@ async def delete_image(
             "status_before": image.status,
         },
     )
+    status_before: int = image.status  # type: ignore[assignment]
     db.add(admin_action)
     await db.flush()  # Ensure action is logged before deletion
 
@@ -1429,6 +1685,9 @@ async def delete_image(
     # (ORM delete tries to manage relationships in Python, causing issues with composite PKs)
     await db.execute(delete(Images).where(Images.image_id == image_id))  # type: ignore[arg-type]
     await db.commit()
+    # The cascade took the image's tag_links with it; clear its posting-list bits.
+    await after_tag_links_change(db, [image_id])
+    await record_feed_count_change(status_before, None)
 
     # Delete files from disk AFTER successful DB commit to avoid inconsistency
     for file_path in files_to_delete:
@@ -1610,6 +1869,12 @@ async def update_image(
             old_status=previous_status,
             new_status=new_status,
         )
+    if update_fields:
+        await bump_feed_generation()
+
+    # Repost migration moved the repost's tag_links onto the original
+    if new_status == ImageStatus.REPOST and replacement_id:
+        await after_tag_links_change(db, [image_id, replacement_id])
 
     # Recalculate ratings for the original image after repost migration
     if new_status == ImageStatus.REPOST and replacement_id:
@@ -1831,7 +2096,7 @@ async def get_image_tag_history(
 async def get_image_status_history(
     image_id: Annotated[int, Path(description="Image ID")],
     pagination: Annotated[PaginationParams, Depends()],
-    current_user: Annotated[Users | None, Depends(get_optional_current_user)],
+    current_user: Annotated[ViewerContext | None, Depends(get_optional_viewer)],
     db: AsyncSession = Depends(get_db),
     redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> ImageStatusHistoryListResponse:
@@ -2319,7 +2584,7 @@ async def get_similar_images(
 
 @router.get("/bookmark/me", response_model=ImageResponse)
 async def get_bookmark_image(
-    current_user: Annotated[Users, Depends(get_current_user)],
+    current_user: CurrentViewer,
     db: AsyncSession = Depends(get_db),
 ) -> ImageResponse:
     """
@@ -2344,7 +2609,7 @@ async def get_bookmark_image(
 
 @router.get("/bookmark/page", response_model=BookmarkPageResponse)
 async def get_bookmark_page(
-    current_user: Annotated[Users, Depends(get_current_user)],
+    current_user: CurrentViewer,
     db: AsyncSession = Depends(get_db),
 ) -> BookmarkPageResponse:
     """
@@ -2564,15 +2829,16 @@ async def add_tag_to_image(
         await db.commit()
         return resolved
 
-    # Non-DB side effect: the search sync stays outside the retried unit so a
-    # retry never repeats it.
+    # Non-DB side effects: the post-commit hooks stay outside the retried unit
+    # so a retry never repeats them.
     resolved_tag_id = await retry_on_transient_conflict(db, _apply_tag_add, what="image_tag_add")
+    await after_tag_links_change(db, [image_id], [resolved_tag_id])
 
     # Re-fetch tag to get updated usage_count (maintained by DB trigger)
     tag_result = await db.execute(select(Tags).where(Tags.tag_id == resolved_tag_id))  # type: ignore[arg-type]
     updated_tag = tag_result.scalar_one_or_none()
     if updated_tag:
-        await sync_tag_to_search(updated_tag, db=db)
+        await after_tags_change([updated_tag])
 
     return {"message": "Tag added successfully"}
 
@@ -2651,15 +2917,16 @@ async def remove_tag_from_image(
         await refresh_image_tag_type_flags(db, image_id)
         await db.commit()
 
-    # Non-DB side effect: the search sync stays outside the retried unit so a
-    # retry never repeats it.
+    # Non-DB side effects: the post-commit hooks stay outside the retried unit
+    # so a retry never repeats them.
     await retry_on_transient_conflict(db, _apply_tag_remove, what="image_tag_remove")
+    await after_tag_links_change(db, [image_id], [tag_id])
 
     # Re-fetch tag to get updated usage_count (maintained by DB trigger)
     tag_result = await db.execute(select(Tags).where(Tags.tag_id == tag_id))  # type: ignore[arg-type]
     updated_tag = tag_result.scalar_one_or_none()
     if updated_tag:
-        await sync_tag_to_search(updated_tag, db=db)
+        await after_tags_change([updated_tag])
 
 
 @router.post("/{image_id}/rating", status_code=status.HTTP_201_CREATED)
@@ -3160,6 +3427,8 @@ async def upload_image(
             await _discard_finalized_upload(db, image_id, staged_path)
             raise
         logger.info("image_saved", image_id=image_id, file_path=str(file_path))
+        await after_tag_links_change(db, [image_id])
+        await record_feed_count_change(None, ImageStatus.ACTIVE)
 
         logger.info(
             "image_upload_completed",
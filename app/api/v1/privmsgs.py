@@ -7,11 +7,12 @@ import uuid as uuid_mod
 from typing import Annotated, Literal
 
 import redis.asyncio as redis
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
 from sqlalchemy import and_, case, delete, desc, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import PaginationParams
+from app.api.responses import ModelJSONResponse
 from app.core.auth import VerifiedUser, get_current_user
 from app.core.database import get_db
 from app.core.permissions import Permission, has_permission
@@ -151,7 +152,7 @@ async def get_threads(
     current_user: Annotated[Users, Depends(get_current_user)],
     filter: Annotated[Literal["all", "unread"], Query(description="Filter threads")] = "all",
     db: AsyncSession = Depends(get_db),
-) -> ThreadList:
+) -> Response:
     """
     List conversation threads for the current user.
 
@@ -216,11 +217,13 @@ async def get_threads(
     thread_rows = result.all()
 
     if not thread_rows:
-        return ThreadList(
-            total=total,
-            page=pagination.page,
-            per_page=pagination.per_page,
-            threads=[],
+        return ModelJSONResponse(
+            ThreadList(
+                total=total,
+                page=pagination.page,
+                per_page=pagination.per_page,
+                threads=[],
+            )
         )
 
     # Collect other user IDs and thread IDs for batch lookups
@@ -292,11 +295,13 @@ async def get_threads(
             )
         )
 
-    return ThreadList(
-        total=total,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        threads=threads,
+    return ModelJSONResponse(
+        ThreadList(
+            total=total,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            threads=threads,
+        )
     )
 
 
@@ -305,7 +310,7 @@ async def get_thread_messages(
     thread_id: Annotated[str, Path(description="Thread ID")],
     current_user: VerifiedUser,
     db: AsyncSession = Depends(get_db),
-) -> PrivmsgMessages:
+) -> Response:
     """
     Retrieve all messages in a conversation thread.
 
@@ -433,11 +438,13 @@ async def get_thread_messages(
         }
         messages.append(PrivmsgMessage.model_validate(data))
 
-    return PrivmsgMessages(
-        total=len(messages),
-        page=1,
-        per_page=len(messages),
-        messages=messages,
+    return ModelJSONResponse(
+        PrivmsgMessages(
+            total=len(messages),
+            page=1,
+            per_page=len(messages),
+            messages=messages,
+        )
     )
 
 
@@ -515,7 +522,7 @@ async def get_received_privmsgs(
     user_id: Annotated[int | None, Query(description="Filter by user ID (admin only)")] = None,
     db: AsyncSession = Depends(get_db),
     redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
-) -> PrivmsgMessages:
+) -> Response:
     """
     Retrieve received private messages.
 
@@ -589,11 +596,13 @@ async def get_received_privmsgs(
         }
         messages.append(PrivmsgMessage.model_validate(data))
 
-    return PrivmsgMessages(
-        total=total or 0,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        messages=messages,
+    return ModelJSONResponse(
+        PrivmsgMessages(
+            total=total or 0,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            messages=messages,
+        )
     )
 
 
@@ -604,7 +613,7 @@ async def get_sent_privmsgs(
     user_id: Annotated[int | None, Query(description="Filter by user ID (admin only)")] = None,
     db: AsyncSession = Depends(get_db),
     redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
-) -> PrivmsgMessages:
+) -> Response:
     """
     Retrieve sent private messages.
 
@@ -678,11 +687,13 @@ async def get_sent_privmsgs(
         }
         messages.append(PrivmsgMessage.model_validate(data))
 
-    return PrivmsgMessages(
-        total=total or 0,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        messages=messages,
+    return ModelJSONResponse(
+        PrivmsgMessages(
+            total=total or 0,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            messages=messages,
+        )
     )
 
 
@@ -12,9 +12,11 @@ from starlette import status
 from app.api.dependencies import SortOrder, TagSortBy
 from app.core.database import get_db
 from app.core.logging import get_logger
+from app.core.metrics import record_cache
 from app.models.tag import Tags
 from app.schemas.search import SearchResponse, TagSearchHit
-from app.services.search import SearchService
+from app.services.search import SearchService, tag_hit_from_document
+from app.services.tag_autocomplete import MIN_WORD_QUERY_LENGTH, get_tag_autocomplete
 
 logger = get_logger(__name__)
 
@@ -33,6 +35,31 @@ def get_search_service() -> SearchService:
     )
 
 
+async def _hydrate_hits(db: AsyncSession, tag_ids: list[int]) -> dict[int, TagSearchHit]:
+    """Build hits for ``tag_ids`` from the database, keyed by tag_id.
+
+    Outerjoins a self-aliased Tags so alias hits include the parent's title as
+    alias_of_name — same pattern as list_tags in app/api/v1/tags.py.
+    """
+    AliasedTag = aliased(Tags)
+    query = (
+        select(
+            Tags,
+            AliasedTag.title.label("alias_of_name"),  # type: ignore[union-attr]
+            AliasedTag.usage_count.label("alias_of_usage_count"),  # type: ignore[attr-defined]
+        )
+        .outerjoin(AliasedTag, Tags.alias_of == AliasedTag.tag_id)  # type: ignore[arg-type]
+        .where(Tags.tag_id.in_(tag_ids))  # type: ignore[union-attr]
+    )
+    hits: dict[int, TagSearchHit] = {}
+    for tag, alias_of_name, alias_of_usage_count in (await db.execute(query)).all():
+        hit = TagSearchHit.model_validate(tag)
+        hit.alias_of_name = alias_of_name
+        hit.alias_of_usage_count = alias_of_usage_count
+        hits[hit.tag_id] = hit
+    return hits
+
+
 @router.get("", response_model=SearchResponse)
 async def search(
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -56,10 +83,45 @@ async def search(
     """Search across entities using Meilisearch.
 
     Currently supports tag search. Returns results in relevance order unless
-    sort_by is provided, in which case the user's sort dominates.
+    sort_by is provided, in which case the user's sort dominates. Hits are built
+    from the search documents; the database is only read for documents indexed
+    before the current document version. Short relevance queries, and any
+    relevance query while Meilisearch is unavailable, are answered from the
+    in-process autocomplete index (app/services/tag_autocomplete.py) instead.
     """
     sort = [f"{sort_by}:{sort_order.lower()}"] if sort_by is not None else None
 
+    # Relevance-ranked name searches can be answered by this worker's in-process
+    # index: always for short (prefix) queries, and for any query while
+    # Meilisearch is down.
+    autocomplete = get_tag_autocomplete() if q and sort is None else None
+
+    def from_index() -> SearchResponse | None:
+        matches = (
+            autocomplete.search(
+                q,
+                type_id=type_id,
+                exclude_aliases=exclude_aliases,
+                limit=limit,
+                offset=offset,
+            )
+            if autocomplete is not None
+            else None
+        )
+        if matches is None:
+            return None
+        return SearchResponse(
+            query=q,
+            entity="tags",
+            hits=[TagSearchHit.model_validate(hit) for hit in matches.tags],
+            total=matches.total,
+            limit=limit,
+            offset=offset,
+        )
+
+    if len(q) < MIN_WORD_QUERY_LENGTH and (response := from_index()) is not None:
+        return response
+
     try:
         result = await search_service.search_tags(
             q,
@@ -71,40 +133,27 @@ async def search(
         )
     except Exception:
         logger.warning("meilisearch_search_failed", query=q, exc_info=True)
+        if (response := from_index()) is not None:
+            return response
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Search service is temporarily unavailable",
         ) from None
 
-    # Fetch full tag records from MySQL, preserving Meilisearch order.
-    # Outerjoin a self-aliased Tags so alias hits include the parent's title
-    # as alias_of_name — same pattern as list_tags in app/api/v1/tags.py.
-    hits: list[TagSearchHit] = []
-    if result.tag_ids:
-        AliasedTag = aliased(Tags)
-        query = (
-            select(
-                Tags,
-                AliasedTag.title.label("alias_of_name"),  # type: ignore[union-attr]
-                AliasedTag.usage_count.label("alias_of_usage_count"),  # type: ignore[attr-defined]
-            )
-            .outerjoin(AliasedTag, Tags.alias_of == AliasedTag.tag_id)  # type: ignore[arg-type]
-            .where(Tags.tag_id.in_(result.tag_ids))  # type: ignore[union-attr]
-        )
-        db_result = await db.execute(query)
-        rows_by_id = {
-            tag.tag_id: (tag, alias_of_name, alias_of_usage_count)
-            for tag, alias_of_name, alias_of_usage_count in db_result.all()
-        }
-
-        for tag_id in result.tag_ids:
-            row = rows_by_id.get(tag_id)
-            if row:
-                tag, alias_of_name, alias_of_usage_count = row
-                hit = TagSearchHit.model_validate(tag)
-                hit.alias_of_name = alias_of_name
-                hit.alias_of_usage_count = alias_of_usage_count
-                hits.append(hit)
+    # Current documents carry every hit field; anything else (documents
+    # written before TAG_DOCUMENT_VERSION) is read back from the database.
+    hits_by_id: dict[int, TagSearchHit] = {}
+    for doc in result.documents:
+        hit = tag_hit_from_document(doc)
+        record_cache("tag_search_documents", hit=hit is not None)
+        if hit is not None:
+            hits_by_id[hit.tag_id] = hit
+    stale_ids = [tag_id for tag_id in result.tag_ids if tag_id not in hits_by_id]
+    if stale_ids:
+        hits_by_id.update(await _hydrate_hits(db, stale_ids))
+
+    # Preserve Meilisearch order; ids missing from the database are dropped.
+    hits = [hits_by_id[tag_id] for tag_id in result.tag_ids if tag_id in hits_by_id]
 
     return SearchResponse(
         query=q,
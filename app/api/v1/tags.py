@@ -2,16 +2,18 @@
 Tags API endpoints
 """
 
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from typing import Annotated, Any
 
 import redis.asyncio as redis
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
 from sqlalchemy import (
     ColumnElement,
     Integer,
     Numeric,
     asc,
+    bindparam,
     case,
     cast,
     delete,
@@ -30,13 +32,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased, selectinload
 
 from app.api.dependencies import ImageSortParams, PaginationParams, TagSortParams
+from app.api.responses import ModelJSONResponse
 from app.config import ImageStatus, TagAuditActionType, TagType
-from app.core.auth import get_current_user, get_optional_current_user
-from app.core.database import get_db, is_postgres
+from app.core.auth import get_current_user, get_optional_viewer
+from app.core.database import get_db, get_read_db, is_postgres
 from app.core.permission_deps import require_permission
 from app.core.permissions import Permission
 from app.core.redis import get_redis
-from app.core.user_loader import image_uploader_load
+from app.core.viewer_context import ViewerContext
 from app.models import Images, TagExternalLinks, TagLinks, Tags, Users
 from app.models.character_source_link import CharacterSourceLinks
 from app.models.character_source_link_picture import CharacterSourceLinkPictures
@@ -73,8 +76,23 @@ from app.schemas.tag import (
     TagWithStats,
 )
 from app.schemas.tag_suggestion_stats import TagSuggestionStatsResponse, TagSuggestionUserStats
+from app.services.feed_response_cache import bump_feed_generation, lookup_feed_response
+from app.services.image_list_loader import image_list_load
 from app.services.image_visibility import PUBLIC_IMAGE_STATUSES
-from app.services.search import sync_tag_delete_to_search, sync_tag_to_search
+from app.services.post_commit import (
+    after_tag_delete,
+    after_tag_hierarchy_change,
+    after_tag_links_change,
+    after_tags_change,
+)
+from app.services.search_outbox import request_drain
+from app.services.tag_autocomplete import (
+    FULLTEXT_MIN_TOKEN_SIZE,
+    FULLTEXT_STOPWORDS,
+    get_tag_autocomplete,
+)
+from app.services.tag_graph import get_tag_graph, publish_tag_graph_change
+from app.services.tag_subtree_counts import get_subtree_counts
 from app.services.tag_type_flags import refresh_images_tag_type_flags
 
 SUGGESTION_STATS_MIN_THRESHOLD = 5
@@ -149,51 +167,6 @@ character_source_links_router = APIRouter(
     prefix="/character-source-links", tags=["character-source-links"]
 )
 
-# MySQL/MariaDB default fulltext stopwords that cause search failures when used with `+` (required) operator
-# Source: INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD
-FULLTEXT_STOPWORDS = frozenset(
-    {
-        "a",
-        "about",
-        "an",
-        "are",
-        "as",
-        "at",
-        "be",
-        "by",
-        "com",
-        "de",
-        "en",
-        "for",
-        "from",
-        "how",
-        "i",
-        "in",
-        "is",
-        "it",
-        "la",
-        "of",
-        "on",
-        "or",
-        "that",
-        "the",
-        "this",
-        "to",
-        "was",
-        "what",
-        "when",
-        "where",
-        "who",
-        "will",
-        "with",
-        "und",
-        "www",
-    }
-)
-
-# Minimum token size for InnoDB fulltext (innodb_ft_min_token_size default is 3)
-FULLTEXT_MIN_TOKEN_SIZE = 3
-
 # MySQL fulltext boolean operators that need to be stripped from search terms
 # These characters have special meaning in BOOLEAN MODE and could cause unexpected behavior
 # e.g., "C++" would create "+C++*" which interprets the extra + as operators
@@ -285,6 +258,20 @@ async def resolve_tag_alias(
     return tag, tag_id
 
 
+async def resolve_tag_alias_id(db: AsyncSession, tag_id: int) -> int:
+    """
+    Resolve a tag alias to its actual tag ID, for callers that don't need the tag row.
+
+    Answered from the in-process tag graph when one is loaded; otherwise falls
+    back to resolve_tag_alias.
+    """
+    graph = get_tag_graph()
+    if graph is not None:
+        return graph.resolve_alias(tag_id)
+    _, resolved_id = await resolve_tag_alias(db, tag_id)
+    return resolved_id
+
+
 async def get_tag_hierarchy(db: AsyncSession, tag_id: int, max_depth: int = 10) -> list[int]:
     """
     Get all tag IDs in a tag's hierarchy (self + all descendants).
@@ -293,7 +280,8 @@ async def get_tag_hierarchy(db: AsyncSession, tag_id: int, max_depth: int = 10)
     (like "school swimsuit", "bikini") that have inheritedfrom_id pointing to it.
     This allows querying a parent tag to include all images tagged with child tags.
 
-    Uses a recursive CTE for single-query performance instead of N+1 queries.
+    Answered from the in-process tag graph when one is loaded; otherwise uses a
+    recursive CTE for single-query performance instead of N+1 queries.
 
     Args:
         db: Database session
@@ -303,6 +291,9 @@ async def get_tag_hierarchy(db: AsyncSession, tag_id: int, max_depth: int = 10)
     Returns:
         list[int]: List of tag IDs including the parent and all descendants
     """
+    graph = get_tag_graph()
+    if graph is not None:
+        return graph.hierarchy(tag_id, max_depth)
     query = text("""
         WITH RECURSIVE tag_tree AS (
             SELECT tag_id, 1 as depth
@@ -320,6 +311,66 @@ async def get_tag_hierarchy(db: AsyncSession, tag_id: int, max_depth: int = 10)
     return [row[0] for row in result.fetchall()]
 
 
+async def resolve_tag_alias_ids(db: AsyncSession, tag_ids: Iterable[int]) -> dict[int, int]:
+    """
+    resolve_tag_alias_id for several tags at once: ``tag_id -> resolved id``.
+
+    Answered from the tag graph when one is loaded; otherwise one query for all
+    of them rather than one per tag. Unknown tags map to themselves.
+    """
+    ids = set(tag_ids)
+    graph = get_tag_graph()
+    if graph is not None:
+        return {tag_id: graph.resolve_alias(tag_id) for tag_id in ids}
+    resolved = {tag_id: tag_id for tag_id in ids}
+    if ids:
+        result = await db.execute(
+            select(Tags.tag_id, Tags.alias_of).where(Tags.tag_id.in_(ids))  # type: ignore[call-overload,union-attr]
+        )
+        for tag_id, alias_of in result.tuples():
+            if alias_of:
+                resolved[tag_id] = alias_of
+    return resolved
+
+
+_HIERARCHIES_QUERY = text("""
+    WITH RECURSIVE tag_tree AS (
+        SELECT tag_id AS root_id, tag_id, 1 as depth
+        FROM tags
+        WHERE tag_id IN :root_ids
+        UNION ALL
+        SELECT tt.root_id, t.tag_id, tt.depth + 1
+        FROM tags t
+        INNER JOIN tag_tree tt ON t.inheritedfrom_id = tt.tag_id
+        WHERE tt.depth < :max_depth
+    )
+    SELECT root_id, tag_id FROM tag_tree
+""").bindparams(bindparam("root_ids", expanding=True))
+
+
+async def get_tag_hierarchies(
+    db: AsyncSession, tag_ids: Iterable[int], max_depth: int = 10
+) -> dict[int, list[int]]:
+    """
+    get_tag_hierarchy for several tags at once: ``tag_id -> hierarchy ids``.
+
+    One recursive CTE seeded with every root (or the tag graph when loaded)
+    instead of one query per tag. Unknown tags map to an empty list.
+    """
+    ids = set(tag_ids)
+    graph = get_tag_graph()
+    if graph is not None:
+        return {tag_id: graph.hierarchy(tag_id, max_depth) for tag_id in ids}
+    hierarchies: dict[int, list[int]] = {tag_id: [] for tag_id in ids}
+    if ids:
+        result = await db.execute(
+            _HIERARCHIES_QUERY, {"root_ids": list(ids), "max_depth": max_depth}
+        )
+        for root_id, tag_id in result.tuples():
+            hierarchies[root_id].append(tag_id)
+    return hierarchies
+
+
 async def validate_tag_relationships(
     db: AsyncSession,
     *,
@@ -609,7 +660,7 @@ async def list_tags(
         bool, Query(description="Exclude alias tags (tags that redirect to others)")
     ] = False,
     db: AsyncSession = Depends(get_db),
-) -> TagListResponse:
+) -> Response:
     """
     List and search tags with intelligent hybrid search.
 
@@ -630,6 +681,11 @@ async def list_tags(
     The full-text search solves the Japanese character name problem:
     Searching "sakura kinomoto" will find tags with "kinomoto sakura" in any word order.
 
+    Without sort_by (relevance order), searches are answered from the API
+    worker's in-process tag index with the same matching rules: exact title
+    first, then titles starting with the query, then the rest, each by usage
+    count.
+
     When filtering by IDs, invalid (non-numeric) IDs are reported in the response
     via the `invalid_ids` field, while valid tags are still returned.
 
@@ -642,6 +698,31 @@ async def list_tags(
     - Get child tags of a parent: `/tags?parent_tag_id=10`
     - Exclude alias tags: `/tags?search=sakura&exclude_aliases=true`
     """
+    # Autocomplete (a relevance-ranked name search) comes from this worker's
+    # in-process index when it has one; see app/services/tag_autocomplete.py.
+    if search and not ids and parent_tag_id is None and sorting.sort_by is None:
+        autocomplete = get_tag_autocomplete()
+        matches = (
+            autocomplete.search(
+                search,
+                type_id=type_id,
+                exclude_aliases=exclude_aliases,
+                limit=pagination.per_page,
+                offset=pagination.offset,
+            )
+            if autocomplete is not None
+            else None
+        )
+        if matches is not None:
+            return ModelJSONResponse(
+                TagListResponse(
+                    total=matches.total,
+                    page=pagination.page,
+                    per_page=pagination.per_page,
+                    tags=[TagResponse.model_validate(hit) for hit in matches.tags],
+                )
+            )
+
     # Create table alias to retrieve the parent tag's title and usage_count
     # for any tag that is aliased to it.
     AliasedTag = aliased(Tags)
@@ -878,17 +959,20 @@ async def list_tags(
         tag_resp.alias_of_usage_count = alias_usage_count
         tags_list.append(tag_resp)
 
-    return TagListResponse(
-        total=total or 0,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        tags=tags_list,
-        invalid_ids=invalid_ids if invalid_ids else None,
+    return ModelJSONResponse(
+        TagListResponse(
+            total=total or 0,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            tags=tags_list,
+            invalid_ids=invalid_ids if invalid_ids else None,
+        )
     )
 
 
 @router.get("/{tag_id}/images", response_model=ImageListResponse)
 async def get_images_by_tag(
+    request: Request,
     tag_id: Annotated[int, Path(description="Tag ID")],
     pagination: Annotated[PaginationParams, Depends()],
     sorting: Annotated[ImageSortParams, Depends()],
@@ -903,7 +987,7 @@ async def get_images_by_tag(
         ),
     ] = None,
     db: AsyncSession = Depends(get_db),
-) -> ImageListResponse:
+) -> Response:
     """
     Get all images with a specific tag.
 
@@ -915,7 +999,14 @@ async def get_images_by_tag(
     "cocktail dress", etc.
 
     For multiple tags, use `/images?tags=1,2,3` instead.
+
+    The response doesn't depend on the viewer, so every caller shares the
+    rendered-response cache.
     """
+    cache_slot = await lookup_feed_response(request)
+    if isinstance(cache_slot, Response):
+        return cache_slot
+
     # First resolve any alias (synonym)
     tag, resolved_tag_id = await resolve_tag_alias(db, tag_id)
 
@@ -975,7 +1066,7 @@ async def get_images_by_tag(
     sort_column = sorting.sort_by.get_column(Images)
     query = (
         select(Images)
-        .options(image_uploader_load())
+        .options(*image_list_load())
         .join(
             image_id_subquery,
             Images.image_id == image_id_subquery.columns.image_id,  # type: ignore[arg-type]
@@ -992,12 +1083,15 @@ async def get_images_by_tag(
     result = await db.execute(query)
     images = result.scalars().all()
 
-    return ImageListResponse(
+    response = ImageListResponse(
         total=total or 0,
         page=pagination.page,
         per_page=pagination.per_page,
         images=[ImageResponse.model_validate(img) for img in images],
     )
+    if cache_slot is not None:
+        return await cache_slot.store(response)
+    return ModelJSONResponse(response)
 
 
 @router.get("/{tag_id}/characters", response_model=TagListResponse)
@@ -1005,7 +1099,7 @@ async def get_characters_for_source(
     tag_id: Annotated[int, Path(description="Source tag ID")],
     pagination: Annotated[PaginationParams, Depends()],
     db: AsyncSession = Depends(get_db),
-) -> TagListResponse:
+) -> Response:
     """
     Get all character tags linked to a source tag.
 
@@ -1048,11 +1142,13 @@ async def get_characters_for_source(
     result = await db.execute(query)
     tags = result.scalars().all()
 
-    return TagListResponse(
-        total=total or 0,
-        page=pagination.page,
-        per_page=pagination.per_page,
-        tags=[TagResponse.model_validate(t) for t in tags],
+    return ModelJSONResponse(
+        TagListResponse(
+            total=total or 0,
+            page=pagination.page,
+            per_page=pagination.per_page,
+            tags=[TagResponse.model_validate(t) for t in tags],
+        )
     )
 
 
@@ -1094,11 +1190,54 @@ def _linked_tag_entry(row: Any) -> dict[str, Any]:
     return entry
 
 
+async def _count_subtree_images(
+    db: AsyncSession,
+    tag_hierarchy: list[int],
+    current_user: ViewerContext | None,
+    *,
+    show_all: bool,
+    hide_reposts: bool,
+) -> int:
+    """Distinct images the viewer can see tagged with any tag in ``tag_hierarchy``."""
+    count_query = select(func.count(TagLinks.image_id.distinct())).where(  # type: ignore[attr-defined]
+        TagLinks.tag_id.in_(tag_hierarchy)  # type: ignore[attr-defined]
+    )
+    joined = False
+    if not show_all:
+        count_query = count_query.join(
+            Images,
+            TagLinks.image_id == Images.image_id,  # type: ignore[arg-type]
+        )
+        joined = True
+        if current_user is not None:
+            # Logged in: public statuses OR user's own images (any status)
+            count_query = count_query.where(
+                or_(
+                    Images.status.in_(PUBLIC_IMAGE_STATUSES),  # type: ignore[attr-defined]
+                    Images.user_id == current_user.user_id,  # type: ignore[arg-type]
+                )
+            )
+        else:
+            # Anonymous: only public statuses
+            count_query = count_query.where(
+                Images.status.in_(PUBLIC_IMAGE_STATUSES)  # type: ignore[attr-defined]
+            )
+    if hide_reposts:
+        if not joined:
+            count_query = count_query.join(
+                Images,
+                TagLinks.image_id == Images.image_id,  # type: ignore[arg-type]
+            )
+        count_query = count_query.where(Images.status != ImageStatus.REPOST)  # type: ignore[arg-type]
+    count_result = await db.execute(count_query)
+    return count_result.scalar() or 0
+
+
 @router.get("/{tag_id}", response_model=TagWithStats)
 async def get_tag(
     tag_id: Annotated[int, Path(description="Tag ID")],
     db: AsyncSession = Depends(get_db),
-    current_user: Users | None = Depends(get_optional_current_user),
+    current_user: ViewerContext | None = Depends(get_optional_viewer),
 ) -> TagWithStats:
     """
     Get a single tag by ID with usage statistics.
@@ -1138,38 +1277,28 @@ async def get_tag(
     # Respect user's show_all_images and hide_reposts settings (matches image search behavior)
     show_all = current_user is not None and current_user.show_all_images == 1
     hide_reposts = current_user is not None and current_user.hide_reposts == 1
-    count_query = select(func.count(TagLinks.image_id.distinct())).where(  # type: ignore[attr-defined]
-        TagLinks.tag_id.in_(tag_hierarchy)  # type: ignore[attr-defined]
-    )
-    joined = False
-    if not show_all:
-        count_query = count_query.join(
-            Images,
-            TagLinks.image_id == Images.image_id,  # type: ignore[arg-type]
-        )
-        joined = True
-        if current_user is not None:
-            # Logged in: public statuses OR user's own images (any status)
-            count_query = count_query.where(
-                or_(
-                    Images.status.in_(PUBLIC_IMAGE_STATUSES),  # type: ignore[attr-defined]
+    subtree_counts = await get_subtree_counts(resolved_tag_id)
+    if subtree_counts is not None:
+        # Large subtree: precomputed counts, plus the viewer's own hidden images
+        # (hidden statuses are never reposts, so hide_reposts doesn't touch them).
+        total_image_count = subtree_counts.visible(show_all=show_all, hide_reposts=hide_reposts)
+        if current_user is not None and not show_all:
+            own_hidden = await db.execute(
+                select(func.count())
+                .select_from(Images)
+                .where(
                     Images.user_id == current_user.user_id,  # type: ignore[arg-type]
+                    Images.status.notin_(PUBLIC_IMAGE_STATUSES),  # type: ignore[attr-defined]
+                    Images.image_id.in_(  # type: ignore[union-attr]
+                        select(TagLinks.image_id).where(TagLinks.tag_id.in_(tag_hierarchy))  # type: ignore[call-overload,attr-defined]
+                    ),
                 )
             )
-        else:
-            # Anonymous: only public statuses
-            count_query = count_query.where(
-                Images.status.in_(PUBLIC_IMAGE_STATUSES)  # type: ignore[attr-defined]
-            )
-    if hide_reposts:
-        if not joined:
-            count_query = count_query.join(
-                Images,
-                TagLinks.image_id == Images.image_id,  # type: ignore[arg-type]
-            )
-        count_query = count_query.where(Images.status != ImageStatus.REPOST)  # type: ignore[arg-type]
-    count_result = await db.execute(count_query)
-    total_image_count = count_result.scalar()
+            total_image_count += own_hidden.scalar() or 0
+    else:
+        total_image_count = await _count_subtree_images(
+            db, tag_hierarchy, current_user, show_all=show_all, hide_reposts=hide_reposts
+        )
 
     # Count direct children (tags that inherit from this tag)
     children_result = await db.execute(
@@ -1618,7 +1747,7 @@ async def _tag_usage_history_total(db: AsyncSession, tag_id: int) -> int:
 async def get_tag_usage_history(
     tag_id: Annotated[int, Path(description="Tag ID")],
     pagination: Annotated[PaginationParams, Depends()],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> TagHistoryListResponse:
     """
     Get tag usage history (add/remove on images).
@@ -1682,6 +1811,7 @@ async def create_tag(
     current_user: Annotated[Users, Depends(get_current_user)],
     _: Annotated[None, Depends(require_permission(Permission.TAG_CREATE))],
     db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> TagResponse:
     """
     Create a new tag.
@@ -1746,7 +1876,8 @@ async def create_tag(
     await db.commit()
     await db.refresh(new_tag)
 
-    await sync_tag_to_search(new_tag, db=db)
+    await publish_tag_graph_change(redis_client)
+    await after_tags_change([new_tag])
 
     return TagResponse.model_validate(new_tag)
 
@@ -1758,6 +1889,7 @@ async def update_tag(
     current_user: Annotated[Users, Depends(get_current_user)],
     _: Annotated[None, Depends(require_permission(Permission.TAG_UPDATE))],
     db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> TagResponse:
     """
     Update an existing tag.
@@ -1988,6 +2120,7 @@ async def update_tag(
 
     # Migrate tag_links when alias is set
     reparented_alias_ids: list[int | None] = []
+    migrated_image_ids: list[int] = []
     if tag.alias_of is not None and tag.alias_of != original_alias_of:
         canonical_id = tag.alias_of
 
@@ -1996,6 +2129,7 @@ async def update_tag(
             select(TagLinks.image_id).where(TagLinks.tag_id == tag_id)  # type: ignore[call-overload]
         )
         flag_affected_ids = [row[0] for row in flag_affected]
+        migrated_image_ids = flag_affected_ids
 
         # Find images already linked to canonical tag (to avoid PK conflicts)
         existing_result = await db.execute(
@@ -2163,28 +2297,28 @@ async def update_tag(
     await db.commit()
     await db.refresh(tag)
 
-    await sync_tag_to_search(tag, db=db)
-
-    # If alias was set and tag_links migrated, also sync the canonical tag
-    # (its usage_count changed)
+    await publish_tag_graph_change(redis_client)
+    # Hierarchy and alias edits change which images a tag page lists.
+    await bump_feed_generation()
+    if tag.alias_of != original_alias_of or tag.inheritedfrom_id != original_inheritedfrom_id:
+        await after_tag_hierarchy_change()
+    if migrated_image_ids:
+        await after_tag_links_change(db, migrated_image_ids, [tag_id, tag.alias_of])  # type: ignore[list-item]
+
+    # The canonical tag of a new alias (its usage_count changed when tag_links
+    # migrated) and the re-pointed / type-cascaded incoming aliases (their
+    # canonical tag / type changed) show up in autocomplete too.
+    changed_ids = set(reparented_alias_ids) | set(type_cascaded_alias_ids)
     if tag.alias_of is not None and tag.alias_of != original_alias_of:
-        canonical_result = await db.execute(
-            select(Tags).where(Tags.tag_id == tag.alias_of)  # type: ignore[arg-type]
-        )
-        canonical_tag = canonical_result.scalar_one_or_none()
-        if canonical_tag:
-            await sync_tag_to_search(canonical_tag, db=db)
-
-    # Re-pointed and type-cascaded incoming aliases also need re-syncing: their
-    # indexed canonical tag / type changed. A combined type+alias request can
-    # cascade the same alias into both sets, so dedupe before syncing.
-    cascaded_alias_ids = set(reparented_alias_ids) | set(type_cascaded_alias_ids)
-    if cascaded_alias_ids:
-        cascaded_result = await db.execute(
-            select(Tags).where(Tags.tag_id.in_(cascaded_alias_ids))  # type: ignore[union-attr]
+        changed_ids.add(tag.alias_of)
+    changed_ids.discard(tag_id)
+    changed_tags = [tag]
+    if changed_ids:
+        changed_result = await db.execute(
+            select(Tags).where(Tags.tag_id.in_(changed_ids))  # type: ignore[union-attr]
         )
-        for cascaded_alias in cascaded_result.scalars().all():
-            await sync_tag_to_search(cascaded_alias, db=db)
+        changed_tags.extend(changed_result.scalars().all())
+    await after_tags_change(changed_tags)
 
     return TagResponse.model_validate(tag)
 
@@ -2194,6 +2328,7 @@ async def delete_tag(
     tag_id: Annotated[int, Path(description="Tag ID")],
     _: Annotated[None, Depends(require_permission(Permission.TAG_DELETE))],
     db: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> None:
     """
     Delete a tag.
@@ -2210,13 +2345,23 @@ async def delete_tag(
         select(TagLinks.image_id).where(TagLinks.tag_id == tag_id)  # type: ignore[call-overload]
     )
     affected_image_ids = [row[0] for row in affected]
+    # Its children are detached (inheritedfrom_id SET NULL): their images leave
+    # every ancestor's subtree.
+    children = await db.execute(
+        select(Tags.tag_id).where(Tags.inheritedfrom_id == tag_id).limit(1)  # type: ignore[call-overload,arg-type]
+    )
+    has_children = children.first() is not None
 
     await db.delete(tag)
     await db.flush()  # apply the FK CASCADE within this transaction before recompute
     await refresh_images_tag_type_flags(db, affected_image_ids)
     await db.commit()
 
-    await sync_tag_delete_to_search(tag_id)
+    await publish_tag_graph_change(redis_client)
+    await after_tag_links_change(db, affected_image_ids, [tag_id])
+    if has_children:
+        await after_tag_hierarchy_change()
+    await after_tag_delete(tag_id)
 
 
 @router.post("/{tag_id}/links", response_model=TagExternalLinkResponse, status_code=201)
@@ -2272,11 +2417,8 @@ async def add_tag_link(
         await db.rollback()
         raise HTTPException(status_code=409, detail="URL already exists for this tag") from None
 
-    # Refresh tag: commit expires its attributes, and sync_tag_to_search reads
-    # alias_of — a lazy load there would raise MissingGreenlet (silently
-    # swallowed) and the new external URL would never reach Meilisearch.
-    await db.refresh(tag)
-    await sync_tag_to_search(tag, db=db)
+    # The tag_external_links trigger queued the tag's search document.
+    await request_drain()
     return TagExternalLinkResponse.model_validate(new_link)
 
 
@@ -2363,11 +2505,8 @@ async def delete_tag_link(
     await db.delete(link)
     await db.commit()
 
-    # Re-sync tag to update external_urls in search index
-    tag_result = await db.execute(select(Tags).where(Tags.tag_id == tag_id))  # type: ignore[arg-type]
-    tag = tag_result.scalar_one_or_none()
-    if tag:
-        await sync_tag_to_search(tag, db=db)
+    # The tag_external_links trigger queued the tag's search document.
+    await request_drain()
 
 
 @router.patch("/{tag_id}/links/{link_id}", response_model=TagExternalLinkResponse)
@@ -44,12 +44,13 @@ from app.core.auth import (
 from app.core.database import get_db, is_postgres
 from app.core.db_retry import retry_on_transient_conflict
 from app.core.logging import get_logger
+from app.core.password_hashing import get_password_hash_async
 from app.core.permissions import Permission, has_permission
 from app.core.r2_client import get_r2_storage
 from app.core.redis import get_redis
-from app.core.security import RedactedStr, get_password_hash, validate_password_strength
-from app.core.user_loader import image_uploader_load
-from app.models import Favorites, ImageRatings, Images, TagLinks, Tags, Users
+from app.core.security import RedactedStr, validate_password_strength
+from app.core.viewer_context import invalidate_viewer_context
+from app.models import Favorites, ImageRatings, Images, Tags, Users
 from app.models.character_source_link import CharacterSourceLinks
 from app.models.character_source_link_picture import CharacterSourceLinkPictures
 from app.models.permissions import UserGroups
@@ -90,9 +91,10 @@ from app.services.avatar import (
     validate_avatar_upload,
 )
 from app.services.feeds import TAG_TYPE_NAME
-from app.services.image_visibility import PUBLIC_IMAGE_STATUSES
+from app.services.image_list_loader import image_list_load
+from app.services.image_visibility import PUBLIC_IMAGE_STATUSES, can_moderate_images
+from app.services.page_enrichment import gather_stages, page_tags, viewer_favorites
 from app.services.rate_limit import check_registration_rate_limit
-from app.services.tag_context import stamp_context_sources
 from app.services.turnstile import verify_turnstile_token
 from app.services.user import build_user_private_response
 from app.tasks.queue import enqueue_job
@@ -756,7 +758,7 @@ async def _update_user_profile(
             is_valid, error_message = validate_password_strength(password)
             if not is_valid:
                 raise HTTPException(status_code=400, detail=error_message)
-            user.password = get_password_hash(password)
+            user.password = await get_password_hash_async(password)
             user.password_type = "bcrypt"
             # A forced reset usually responds to a compromised account: revoke the
             # target's sessions so holders of the old credentials are logged out.
@@ -787,7 +789,9 @@ async def _update_user_profile(
         # public or private response schemas depending on the endpoint.
         return user
 
-    return await retry_on_transient_conflict(db, _apply, what="user_profile_update")
+    user = await retry_on_transient_conflict(db, _apply, what="user_profile_update")
+    await invalidate_viewer_context(user_id)
+    return user
 
 
 @router.get("/{user_id}/images", response_model=ImageDetailedListResponse)
@@ -797,6 +801,7 @@ async def get_user_images(
     sorting: Annotated[ImageSortParams, Depends()],
     db: AsyncSession = Depends(get_db),
     current_user: Users | None = Depends(get_optional_current_user),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> ImageDetailedListResponse:
     """
     Get all images uploaded by a specific user.
@@ -813,12 +818,7 @@ async def get_user_images(
 
     # Get user's images
     query = (
-        select(Images)
-        .options(
-            image_uploader_load(),
-            selectinload(Images.tag_links).selectinload(TagLinks.tag),  # type: ignore[arg-type]
-        )
-        .where(Images.user_id == user_id)  # type: ignore[arg-type]
+        select(Images).options(*image_list_load()).where(Images.user_id == user_id)  # type: ignore[arg-type]
     )
 
     # Visibility filtering: anonymous see only public statuses, authenticated
@@ -859,8 +859,40 @@ async def get_user_images(
         total=total or 0,
         page=pagination.page,
         per_page=pagination.per_page,
-        images=[ImageDetailedResponse.model_validate(img) for img in images],
+        images=await _detailed_items(db, images, current_user, redis_client),
+    )
+
+
+async def _detailed_items(
+    db: AsyncSession,
+    images: Sequence[Images],
+    current_user: Users | None,
+    redis_client: redis.Redis,  # type: ignore[type-arg]
+) -> list[ImageDetailedResponse]:
+    """Response items for a user's image or favorites page; moderators see every
+    image's moderation reason and owners their own, as on /images."""
+    page_ids: list[int] = [img.image_id for img in images]  # type: ignore[misc]
+    viewer_id = current_user.user_id if current_user is not None else None
+
+    async def can_moderate(session: AsyncSession) -> bool:
+        return await can_moderate_images(session, viewer_id, redis_client)  # type: ignore[arg-type]
+
+    tags_by_image, favorited_ids, viewer_can_moderate = await gather_stages(
+        db,
+        page_tags(page_ids),
+        viewer_favorites(viewer_id, page_ids) if viewer_id is not None else None,
+        can_moderate if viewer_id is not None else None,
     )
+    return [
+        ImageDetailedResponse.from_db_model(
+            img,
+            is_favorited=img.image_id in (favorited_ids or ()),
+            can_see_reason=bool(viewer_can_moderate)
+            or (viewer_id is not None and img.user_id == viewer_id),
+            tags=tags_by_image[img.image_id],
+        )
+        for img in images
+    ]
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -912,6 +944,7 @@ async def get_user_favorites(
     sorting: Annotated[ImageSortParams, Depends()],
     db: AsyncSession = Depends(get_db),
     current_user: Users | None = Depends(get_optional_current_user),
+    redis_client: redis.Redis = Depends(get_redis),  # type: ignore[type-arg]
 ) -> ImageDetailedListResponse:
     """
     Get all images favorited by a specific user.
@@ -926,10 +959,7 @@ async def get_user_favorites(
     # Get user's favorite images
     query = (
         select(Images)
-        .options(
-            image_uploader_load(),
-            selectinload(Images.tag_links).selectinload(TagLinks.tag),  # type: ignore[arg-type]
-        )
+        .options(*image_list_load())
         .join(Favorites)
         .where(Favorites.user_id == user_id)  # type: ignore[arg-type]
     )
@@ -972,7 +1002,7 @@ async def get_user_favorites(
         total=total or 0,
         page=pagination.page,
         per_page=pagination.per_page,
-        images=[ImageDetailedResponse.model_validate(img) for img in images],
+        images=await _detailed_items(db, images, current_user, redis_client),
     )
 
 
@@ -1446,10 +1476,7 @@ async def get_user_ratings(
         )
         .join(ImageRatings, ImageRatings.image_id == Images.image_id)  # type: ignore[arg-type]
         .where(ImageRatings.user_id == user_id)  # type: ignore[arg-type]
-        .options(
-            image_uploader_load(),
-            selectinload(Images.tag_links).selectinload(TagLinks.tag),  # type: ignore[arg-type]
-        )
+        .options(*image_list_load())
     )
 
     # Moderators bypass both filters — hiding deactivated images would hide the
@@ -1492,23 +1519,17 @@ async def get_user_ratings(
 
     # Favorite status reflects the *viewer's* favorites, not the ratings subject's —
     # a mod auditing someone else's ratings sees their own hearts, not the subject's.
-    page_ids = [image.image_id for image, _, _ in rows]
-    favorited_ids: set[int] = set()
-    if page_ids:
-        fav_result = await db.execute(
-            select(Favorites.image_id).where(  # type: ignore[call-overload]
-                Favorites.user_id == current_user.user_id,
-                Favorites.image_id.in_(page_ids),  # type: ignore[attr-defined]
-            )
-        )
-        favorited_ids = set(fav_result.scalars().all())
-
+    page_ids: list[int] = [image.image_id for image, _, _ in rows]
+    tags_by_image, favorited_ids = await gather_stages(
+        db, page_tags(page_ids), viewer_favorites(current_user.id, page_ids)
+    )
     items: list[ImageWithRatingResponse] = []
     for image, rating_value, rated_at in rows:
         item = ImageWithRatingResponse.from_db_model(
             image,
             is_favorited=image.image_id in favorited_ids,
             can_see_reason=is_mod or image.user_id == current_user.user_id,
+            tags=tags_by_image[image.image_id],
         )
         # from_db_model has no rating parameter, so assign after construction —
         # the same pattern list_images uses for ml_suggestion_count.
@@ -1516,8 +1537,6 @@ async def get_user_ratings(
         item.rated_at = rated_at
         items.append(item)
 
-    await stamp_context_sources(db, items)
-
     return UserRatingsListResponse(
         total=total,
         page=pagination.page,
@@ -1581,7 +1600,7 @@ async def create_user(
 
     new_user = Users(
         username=user_data.username,
-        password=get_password_hash(user_data.password),
+        password=await get_password_hash_async(user_data.password),
         password_type="bcrypt",  # Mark as bcrypt password
         salt="",  # Legacy field - empty for bcrypt users
         email=user_data.email,
@@ -35,6 +35,16 @@ class Settings(BaseSettings):
     # bcrypt cost factor (gensalt accepts 4-31); tests override to 4 for
     # speed (see tests/conftest.py)
     BCRYPT_ROUNDS: int = Field(default=12, ge=4, le=31)
+    # Request handlers hash off the event loop (app/core/password_hashing.py)
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=2, ge=1, description="bcrypt threads per API process (concurrent hashes)"
+    )
+    PASSWORD_HASH_MAX_WAITING: int = Field(
+        default=32, ge=0, description="Hashes queued behind the workers before returning 429"
+    )
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = Field(
+        default=3.0, description="Seconds to wait for a hashing worker before returning 429"
+    )
 
     # CORS
     # Allow str because it can be a comma-separated string in .env
@@ -47,13 +57,44 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "YOU MUST SET A VALID MARIADB DATABASE URL"
     # Sync URL for Alembic migrations
     DATABASE_URL_SYNC: str = "YOU MUST SET A VALID MARIADB SYNC DATABASE URL"
+    # Optional read replica for heavy read-only endpoints (get_read_db). Unset =
+    # those endpoints read from the primary like everything else.
+    DATABASE_READ_URL: str | None = None
+    # After a user's own successful write, their reads stay on the primary this
+    # long so they see it despite replication lag.
+    DB_READ_STICKY_SECONDS: int = 5
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 10
     DB_ECHO: bool = False
+    # Extra pooled connections, across the whole process, that list requests may
+    # borrow for their per-page lookups (favorites, reports, tags, ...). Lookups
+    # that find none free run on the request's own session; 0 always does that.
+    # Must leave room in the pool for the requests' own connections.
+    PAGE_ENRICHMENT_CONNECTIONS: int = Field(default=4, ge=0)
 
     # Redis
     REDIS_URL: str = Field(default="redis://localhost:6379/0")
+    # Per-process connection pools (app/core/redis.py): connections per pool, how
+    # long a caller waits for a free one, and how long a connection may sit idle
+    # before it is pinged on checkout.
+    REDIS_MAX_CONNECTIONS: int = Field(default=50, ge=1)
+    REDIS_POOL_TIMEOUT: float = Field(default=5.0, gt=0)
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(default=30, ge=0)
     CACHE_TTL: int = 300  # 5 minutes
+    # Tags with at least this many links get a posting-list bitmap in Redis
+    # (app/services/tag_postings.py); smaller tags stay on the SQL path.
+    TAG_POSTINGS_MIN_USAGE: int = Field(default=5000, ge=1)
+    # Tags whose subtree (self + descendants) holds at least this many links get
+    # precomputed image counts for the tag page (app/services/tag_subtree_counts.py).
+    TAG_SUBTREE_COUNTS_MIN_LINKS: int = Field(default=5000, ge=1)
+    # Latency budget for an exact filtered image count on a cache miss. Tag
+    # searches whose count would take longer are answered with an estimate
+    # (total_is_estimate) while the exact count is computed in the background.
+    FILTERED_COUNT_BUDGET_MS: int = Field(default=200, ge=0)
+    # Lifetime of a cached anonymous feed response (list_images, tag pages).
+    # Mutations invalidate entries immediately; the TTL bounds staleness of the
+    # counters that aren't mutations (favorites, ratings). 0 disables the cache.
+    FEED_RESPONSE_CACHE_TTL: int = Field(default=60, ge=0)
 
     # Meilisearch
     MEILISEARCH_URL: str = Field(default="http://localhost:7700")
@@ -280,6 +321,23 @@ class Settings(BaseSettings):
     # faster successful requests drop to DEBUG so routine traffic doesn't flood
     # the aggregated logs. See RequestLoggingMiddleware in app/main.py.
     SLOW_REQUEST_LOG_MS: float = 1000.0
+    # A request running the same SQL statement this many times logs a
+    # sql_repeated_statement warning (likely an N+1 loop); 0 disables.
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = Field(default=10, ge=0)
+    # Add a Server-Timing header (DB time and query count) to every response.
+    # Off by default: it tells any client how long our queries take.
+    SERVER_TIMING_HEADER: bool = False
+    # Port the arq worker serves its Prometheus metrics on (the API serves them
+    # at /metrics). 0 = don't serve.
+    WORKER_METRICS_PORT: int = 0
+    # Interface the worker's metrics server binds. Loopback by default; bind
+    # wider (e.g. 0.0.0.0 for a scraper in another container) with METRICS_TOKEN
+    # set, which the worker then requires as the API does.
+    WORKER_METRICS_HOST: str = "127.0.0.1"
+    # Bearer token Prometheus presents to scrape the API's /metrics (and the
+    # worker's, when set). Unset = the API endpoint is a 404: it exposes
+    # route-level traffic and pool state.
+    METRICS_TOKEN: str | None = None
 
     # Review System
     REVIEW_DEADLINE_DAYS: int = 7  # Default deadline for review voting
@@ -365,6 +423,16 @@ class Settings(BaseSettings):
             )
         return self
 
+    @model_validator(mode="after")
+    def validate_page_enrichment_connections(self) -> Settings:
+        """Enrichment connections must leave the pool room for request sessions."""
+        if self.PAGE_ENRICHMENT_CONNECTIONS >= self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW:
+            raise ValueError(
+                "PAGE_ENRICHMENT_CONNECTIONS must be below DB_POOL_SIZE + DB_MAX_OVERFLOW, "
+                "or requests holding a connection can exhaust the pool waiting for more."
+            )
+        return self
+
     @model_validator(mode="after")
     def validate_r2_enabled_requirements(self) -> Settings:
         """When R2_ENABLED=true, R2 credentials must be set.
@@ -7,22 +7,58 @@ This module provides dependency functions for:
 - Protecting routes with authentication requirements
 """
 
+from dataclasses import dataclass
 from typing import Annotated
 
 from fastapi import Cookie, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security.utils import get_authorization_scheme_param
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import verify_access_token
+from app.core.viewer_context import ViewerContext, get_viewer_context
 from app.models.user import Users
 
 # Define the security scheme for OpenAPI documentation
 security = HTTPBearer()
 
 
+@dataclass(frozen=True, slots=True)
+class RequestAuth:
+    """The request's access token and, if it verified, its user id."""
+
+    token: str | None
+    user_id: int | None
+
+
+def request_auth(request: Request) -> RequestAuth:
+    """
+    Verify the request's access token once and share the result.
+
+    Checks the Authorization header (Bearer token) first, then the access_token
+    cookie. The first call (RequestLoggingMiddleware, or the first auth dependency
+    when the middleware isn't installed) verifies the token and stores the result
+    on ``request.state``; every later call in the same request reuses it.
+    """
+    auth: RequestAuth | None = getattr(request.state, "auth", None)
+    if auth is None:
+        scheme, credentials = get_authorization_scheme_param(request.headers.get("Authorization"))
+        token = credentials if scheme.lower() == "bearer" and credentials else None
+        token = token or request.cookies.get("access_token")
+        auth = RequestAuth(token=token, user_id=verify_access_token(token) if token else None)
+        request.state.auth = auth
+    return auth
+
+
+# The auth dependencies below declare the access_token cookie and the bearer scheme
+# so they show up in the OpenAPI schema (Swagger UI's Authorize button); the token
+# itself is read and verified once per request by request_auth.
+
+
 async def get_current_user_id(
+    request: Request,
     access_token: Annotated[str | None, Cookie()] = None,
     credentials: Annotated[
         HTTPAuthorizationCredentials | None, Depends(HTTPBearer(auto_error=False))
@@ -36,6 +72,7 @@ async def get_current_user_id(
     with both Swagger UI (header) and browser requests (cookie).
 
     Args:
+        request: The request (see request_auth)
         access_token: Access token from cookie
         credentials: HTTP Bearer credentials from Authorization header
 
@@ -45,30 +82,34 @@ async def get_current_user_id(
     Raises:
         HTTPException: 401 if token is missing, invalid, or expired
     """
-    # Prefer Authorization header, fall back to cookie
-    token = None
-    if credentials:
-        token = credentials.credentials
-    elif access_token:
-        token = access_token
-
-    if not token:
+    auth = request_auth(request)
+
+    if not auth.token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Verify token and extract user_id
-    user_id = verify_access_token(token)
-    if user_id is None:
+    if auth.user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user_id
+    return auth.user_id
+
+
+async def get_optional_user_id(
+    request: Request,
+    access_token: Annotated[str | None, Cookie()] = None,
+    credentials: Annotated[
+        HTTPAuthorizationCredentials | None, Depends(HTTPBearer(auto_error=False))
+    ] = None,
+) -> int | None:
+    """User ID from a valid access token, or None when missing or invalid."""
+    return request_auth(request).user_id
 
 
 async def get_current_user(
@@ -111,10 +152,7 @@ async def get_current_user(
 
 
 async def get_optional_current_user(
-    access_token: Annotated[str | None, Cookie()] = None,
-    credentials: Annotated[
-        HTTPAuthorizationCredentials | None, Depends(HTTPBearer(auto_error=False))
-    ] = None,
+    user_id: Annotated[int | None, Depends(get_optional_user_id)],
     db: AsyncSession = Depends(get_db),
 ) -> Users | None:
     """
@@ -124,32 +162,90 @@ async def get_optional_current_user(
     Checks both Authorization header (Bearer token) and access_token cookie.
 
     Args:
-        access_token: Access token from cookie
-        credentials: Optional HTTP Bearer credentials
+        user_id: User ID from a valid token, if any
         db: Database session
 
     Returns:
         User object if authenticated, None otherwise
     """
-    # Get token from either header or cookie (prefer header)
-    token = None
-    if credentials:
-        token = credentials.credentials
-    elif access_token:
-        token = access_token
-
-    if not token:
+    if user_id is None:
         return None
+    result = await db.execute(select(Users).where(Users.user_id == user_id))  # type: ignore[arg-type]
+    user = result.scalar_one_or_none()
+    return user if user and user.active else None
+
+
+async def _require_viewer(db: AsyncSession, user_id: int) -> ViewerContext:
+    viewer = await get_viewer_context(db, user_id)
+    if viewer is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    if not viewer.active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User account is inactive",
+        )
+    return viewer
+
 
-    try:
-        user_id = verify_access_token(token)
-        if user_id is None:
-            return None
-        result = await db.execute(select(Users).where(Users.user_id == user_id))  # type: ignore[arg-type]
-        user = result.scalar_one_or_none()
-        return user if user and user.active else None
-    except HTTPException:
+async def _optional_viewer(db: AsyncSession, user_id: int | None) -> ViewerContext | None:
+    if user_id is None:
         return None
+    viewer = await get_viewer_context(db, user_id)
+    return viewer if viewer and viewer.active else None
+
+
+async def get_current_viewer(
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> ViewerContext:
+    """
+    Cached account flags and preferences of the authenticated user.
+
+    For read-only handlers: same checks as get_current_user, without loading the
+    full user row. Handlers that modify the user depend on get_current_user.
+
+    Raises:
+        HTTPException: 401 if user not found or inactive
+    """
+    return await _require_viewer(db, user_id)
+
+
+async def get_optional_viewer(
+    user_id: Annotated[int | None, Depends(get_optional_user_id)],
+    db: AsyncSession = Depends(get_db),
+) -> ViewerContext | None:
+    """
+    Cached viewer context if authenticated, otherwise None.
+
+    The read-only counterpart of get_optional_current_user.
+    """
+    return await _optional_viewer(db, user_id)
+
+
+async def get_current_read_viewer(
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+) -> ViewerContext:
+    """
+    get_current_viewer for handlers on get_read_db.
+
+    FastAPI caches a dependency per request, so the viewer lookup and the
+    handler share one read session instead of each holding a pooled
+    connection. A cache miss reads the user from the replica; the user's own
+    writes still stick to the primary (see get_read_db).
+    """
+    return await _require_viewer(db, user_id)
+
+
+async def get_optional_read_viewer(
+    user_id: Annotated[int | None, Depends(get_optional_user_id)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+) -> ViewerContext | None:
+    """get_optional_viewer on the handler's read session, like get_current_read_viewer."""
+    return await _optional_viewer(db, user_id)
 
 
 async def require_admin(
@@ -254,4 +350,8 @@ async def get_verified_user(
 CurrentUser = Annotated[Users, Depends(get_current_user)]
 VerifiedUser = Annotated[Users, Depends(get_verified_user)]
 OptionalCurrentUser = Annotated[Users | None, Depends(get_optional_current_user)]
+CurrentViewer = Annotated[ViewerContext, Depends(get_current_viewer)]
+OptionalViewer = Annotated[ViewerContext | None, Depends(get_optional_viewer)]
+CurrentReadViewer = Annotated[ViewerContext, Depends(get_current_read_viewer)]
+OptionalReadViewer = Annotated[ViewerContext | None, Depends(get_optional_read_viewer)]
 AdminUser = Annotated[Users, Depends(require_admin)]
@@ -2,38 +2,63 @@
 Database configuration and session management
 """
 
-from collections.abc import AsyncGenerator, AsyncIterator
-from contextlib import asynccontextmanager
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator, AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any
 
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy import text as sql_text
-from sqlalchemy.engine import make_url
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import QueuePool
 
 from app.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import Gauge
+from app.core.redis import shared_redis
+
+logger = get_logger(__name__)
 
 # Create declarative base for models
 Base = declarative_base()
 
-# Ensure all connections use UTC timezone for consistent datetime handling;
-# each driver spells the session setting differently.
-_connect_args: dict[str, Any] = (
-    {"server_settings": {"timezone": "UTC"}}
-    if make_url(settings.DATABASE_URL).get_backend_name() == "postgresql"
-    else {"init_command": "SET time_zone = '+00:00'"}
-)
+
+def _connect_args(url: str) -> dict[str, Any]:
+    # Ensure all connections use UTC timezone for consistent datetime handling;
+    # each driver spells the session setting differently.
+    if make_url(url).get_backend_name() == "postgresql":
+        return {"server_settings": {"timezone": "UTC"}}
+    return {"init_command": "SET time_zone = '+00:00'"}
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,  # Verify connections before using
+        pool_recycle=3600,  # Recycle connections every hour (MariaDB wait_timeout is 8 hours)
+        connect_args=_connect_args(url),
+    )
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DB_ECHO,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=3600,  # Recycle connections every hour (MariaDB wait_timeout is 8 hours)
-    connect_args=_connect_args,
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Read replica engine, when DATABASE_READ_URL is set (see get_read_db)
+read_engine = _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -44,6 +69,99 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Sessions on the replica; the primary when no replica is configured
+ReadSessionLocal = async_sessionmaker(
+    read_engine or engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+def _pool_stats() -> dict[tuple[str, ...], float]:
+    stats: dict[tuple[str, ...], float] = {}
+    for name, pool_engine in (("primary", engine), ("replica", read_engine)):
+        pool = pool_engine.pool if pool_engine is not None else None
+        if not isinstance(pool, QueuePool):
+            continue
+        # overflow() starts at -pool_size and counts up as the pool fills.
+        stats[(name, "checked_out")] = pool.checkedout()
+        stats[(name, "idle")] = pool.checkedin()
+        stats[(name, "overflow")] = max(0, pool.overflow())
+        stats[(name, "size")] = pool.size()
+    return stats
+
+
+Gauge(
+    "db_pool_connections",
+    "SQLAlchemy pool connections by state (checked_out, idle, overflow) and pool size.",
+    _pool_stats,
+    ("engine", "state"),
+)
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """SQL statements executed inside a track_queries() block, and their total time."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round(self.seconds * 1000, 1)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times: the signature of an N+1 loop."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+# Every block currently tracking in this context (blocks nest: a test's bound
+# around a request the logging middleware also tracks).
+_active_query_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar(
+    "active_query_stats", default=()
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the SQL statements run inside the block, and the time spent in them.
+
+    Covers every engine, and tasks started inside the block (they inherit the
+    context), so parallel page stages on pooled sessions count toward the request
+    that started them. RequestLoggingMiddleware wraps each request in one.
+    """
+    stats = QueryStats()
+    token = _active_query_stats.set((*_active_query_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active_query_stats.reset(token)
+
+
+# Registered on the Engine class rather than on `engine` below, so the test
+# engine and any other engine the app creates are instrumented the same way.
+# The async engine runs these in a greenlet that shares the caller's context.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore[no-untyped-def]
+    if _active_query_stats.get() and context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore[no-untyped-def]
+    active = _active_query_stats.get()
+    started = getattr(context, "_query_started", None)
+    if not active or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for stats in active:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements[statement] += 1
+
 
 def is_postgres(db: AsyncSession) -> bool:
     """Whether this session is bound to Postgres — the dialect-branch switch.
@@ -73,6 +191,57 @@ async def get_db() -> AsyncGenerator[AsyncSession]:
             raise
 
 
+def _primary_sticky_key(user_id: int) -> str:
+    return f"db:read_primary:{user_id}"
+
+
+async def stick_to_primary(user_id: int) -> None:
+    """Send ``user_id``'s replica reads to the primary for DB_READ_STICKY_SECONDS.
+
+    RequestLoggingMiddleware calls this when one of the user's writes succeeds,
+    before the response goes out, so the pages they load next show the write
+    even if the replica hasn't replayed it yet. A no-op without a replica.
+    """
+    client = shared_redis()
+    if read_engine is None or client is None:
+        return
+    try:
+        await client.set(_primary_sticky_key(user_id), "1", ex=settings.DB_READ_STICKY_SECONDS)
+    except Exception:
+        logger.warning("db_primary_sticky_set_failed", user_id=user_id, exc_info=True)
+
+
+async def _reads_from_primary(user_id: int | None) -> bool:
+    if user_id is None:
+        return False
+    client = shared_redis()
+    if client is None:
+        return True
+    try:
+        return bool(await client.exists(_primary_sticky_key(user_id)))
+    except Exception:
+        # Can't tell whether they just wrote: the primary is always consistent.
+        logger.warning("db_primary_sticky_check_failed", user_id=user_id, exc_info=True)
+        return True
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession]:
+    """
+    Dependency for read-only endpoints: a session on the read replica.
+
+    Falls back to the primary when no replica is configured, and for a user
+    whose own write landed in the last DB_READ_STICKY_SECONDS (read-your-writes).
+    Nothing is committed; only use it on endpoints that never write.
+    """
+    from app.core.auth import request_auth
+
+    session_factory = ReadSessionLocal
+    if read_engine is not None and await _reads_from_primary(request_auth(request).user_id):
+        session_factory = AsyncSessionLocal
+    async with session_factory() as session:
+        yield session
+
+
 def get_async_session() -> AsyncSession:
     """
     Get a standalone async database session for background tasks.
@@ -87,6 +256,14 @@ def get_async_session() -> AsyncSession:
     return AsyncSessionLocal()
 
 
+def get_async_read_session() -> AsyncSession:
+    """
+    Standalone session on the read replica (the primary when none is configured),
+    for background reads that don't need to see the latest writes.
+    """
+    return ReadSessionLocal()
+
+
 @asynccontextmanager
 async def statement_timeout(db: AsyncSession, seconds: float | None) -> AsyncIterator[None]:
     """Bound how long each statement inside the block may run.
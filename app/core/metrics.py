@@ -0,0 +1,213 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A deliberately small registry (counters, histograms and callback gauges) so the
+API needs no client library: modules declare their metrics at import time and
+record into them; ``GET /metrics`` (app/main.py, for scrapers holding
+``METRICS_TOKEN``) renders every registered metric.
+
+Values are per process. Each API worker process serves its own /metrics and
+Prometheus aggregates across them; the arq worker, which has no HTTP server,
+serves the same exposition on ``WORKER_METRICS_PORT`` when that is set: bound to
+``WORKER_METRICS_HOST`` (loopback by default) and, when ``METRICS_TOKEN`` is
+set, only to scrapers presenting it, like the API's.
+
+Recording is a dict update on the event loop thread: cheap enough for per-request
+and per-Redis-call use, and not meant to be called from executor threads.
+"""
+
+import asyncio
+import hmac
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Sequence
+from functools import partial
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus client defaults: 5ms to 10s.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+type Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _labels(self, values: Labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [*zip(self.labelnames, values, strict=True), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+
+_registry: list[_Metric] = []
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{self._labels(labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Observations bucketed by upper bound, with their count and sum."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: non-cumulative bucket counts (last = +Inf), then sum.
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> Iterator[str]:
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                le = self._labels(labels, (("le", _format_value(bound)),))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{self._labels(labels)} {_format_value(total[0])}"
+            yield f"{self.name}_count{self._labels(labels)} {cumulative}"
+
+
+class Gauge(_Metric):
+    """A current value, read from ``collect`` when the metrics are rendered.
+
+    ``collect`` returns the value per label combination; a combination it leaves
+    out (a pool that isn't started) is simply not exported.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def _samples(self) -> Iterator[str]:
+        try:
+            values = self.collect()
+        except Exception:
+            logger.warning("metrics_gauge_collect_failed", metric=self.name, exc_info=True)
+            return
+        for labels, value in values.items():
+            yield f"{self.name}{self._labels(labels)} {_format_value(value)}"
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text format."""
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+# Shared by the caches that report through cached_single_flight and by hand.
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+async def _serve_metrics(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, token: str | None
+) -> None:
+    try:
+        # Read the request head; every path answers with the exposition, given
+        # the token when there is one.
+        supplied = b""
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"authorization":
+                supplied = value.strip().removeprefix(b"Bearer ")
+        if not token or hmac.compare_digest(supplied, token.encode()):
+            status, content_type, body = "200 OK", CONTENT_TYPE, render_metrics().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b"Not Found"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n".encode()
+            + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int, host: str, token: str | None) -> asyncio.Server:
+    """Serve the exposition over plain HTTP (the arq worker, which has no API).
+
+    With a ``token``, a request without ``Authorization: Bearer <token>`` gets a
+    404, as on the API's /metrics.
+    """
+    server = await asyncio.start_server(partial(_serve_metrics, token=token), host=host, port=port)
+    logger.info("metrics_server_started", host=host, port=port)
+    return server
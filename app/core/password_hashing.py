@@ -0,0 +1,141 @@
+"""Off-loop password hashing for request handlers.
+
+bcrypt is deliberately slow (~250 ms per hash at the default cost), and the
+synchronous helpers in app.core.security would hold the event loop for that
+long, so a burst of logins stalls every other request the worker is serving.
+Handlers await :func:`verify_password_async` / :func:`get_password_hash_async`
+instead: the work runs on a small dedicated thread pool (bcrypt releases the
+GIL), at most ``PASSWORD_HASH_WORKERS`` at a time.
+
+Admission is bounded like the ML inference slot: callers wait briefly for a
+free worker, but once ``PASSWORD_HASH_MAX_WAITING`` are already queued, or the
+wait exceeds ``PASSWORD_HASH_QUEUE_TIMEOUT``, they get a 429 instead of piling
+up behind a credential-stuffing run. Queue depth and rejections are exported
+on /metrics.
+
+A slot is held until the hashing thread finishes, not until the awaiting
+request does: a cancelled request (client disconnect, server timeout) cannot
+stop bcrypt mid-hash, so freeing its slot early would let more hashes run than
+there are workers.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import Counter, Gauge, Labels
+from app.core.security import get_password_hash, verify_password
+
+logger = get_logger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+_waiting = 0
+_in_flight = 0
+
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hashing_rejected_total",
+    "Password hashing requests answered with 429, by reason (queue_full or timeout).",
+    ("reason",),
+)
+
+
+class PasswordHashingBusy(HTTPException):
+    """429 raised when the password hashing queue is full or the wait times out."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many sign-in attempts are being processed; please retry shortly.",
+            headers={"Retry-After": "2"},
+        )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _executor
+
+
+def _release_slot() -> None:
+    global _in_flight
+    _in_flight -= 1
+    _slots.release()
+
+
+async def _run[T](func: Callable[..., T], *args: str) -> T:
+    global _waiting, _in_flight
+    if _slots.locked() and _waiting >= settings.PASSWORD_HASH_MAX_WAITING:
+        PASSWORD_HASH_REJECTED.inc("queue_full")
+        logger.warning("password_hashing_queue_full", waiting=_waiting)
+        raise PasswordHashingBusy()
+
+    _waiting += 1
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except TimeoutError:
+        PASSWORD_HASH_REJECTED.inc("timeout")
+        logger.warning("password_hashing_queue_timeout", waiting=_waiting)
+        raise PasswordHashingBusy() from None
+    finally:
+        _waiting -= 1
+
+    _in_flight += 1
+    loop = asyncio.get_running_loop()
+    # The slot goes back when the thread is done (or the job is cancelled before
+    # it starts), whatever happens to this coroutine in the meantime.
+    future = _get_executor().submit(func, *args)
+    future.add_done_callback(lambda _: _call_soon(loop, _release_slot))
+    return await asyncio.wrap_future(future, loop=loop)
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> None:
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass  # loop already closed (shutdown); nothing left to admit
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing pool.
+
+    Raises:
+        PasswordHashingBusy: 429 when the pool is saturated
+    """
+    return await _run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the hashing pool.
+
+    Raises:
+        PasswordHashingBusy: 429 when the pool is saturated
+    """
+    return await _run(get_password_hash, password)
+
+
+def _hashing_slot_stats() -> dict[Labels, float]:
+    return {("waiting",): _waiting, ("in_flight",): _in_flight}
+
+
+Gauge(
+    "password_hashing_slots",
+    "Password hashes holding a worker (in_flight) or queued for one (waiting).",
+    _hashing_slot_stats,
+    ("state",),
+)
+
+
+def shutdown_password_hashing() -> None:
+    """Release the pool's threads (API lifespan shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
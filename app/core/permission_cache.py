@@ -3,27 +3,79 @@ Permission caching layer for high-performance permission checks.
 
 Caches user permissions in Redis with configurable TTL.
 Handles cache invalidation on permission changes.
+
+Two tiers sit in front of Redis so steady-state checks make no round trip:
+
+- a request-scoped memo (entered per request by the logging middleware via
+  :func:`permission_memo`), so the several checks one request makes resolve once;
+- a bounded in-process LRU, active only while this process is subscribed to
+  ``PERMISSION_CHANNEL`` (:func:`start_permission_cache`, API lifespan).
+
+Invalidations delete the Redis key and publish the affected user ids on the
+channel; every subscribed process drops them from its LRU. While the subscription
+is down the LRU is bypassed (and emptied on reconnect), so a missed message can't
+leave a process serving revoked permissions.
 """
 
+import asyncio
 import json
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import cast
 
 import redis.asyncio as redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.logging import get_logger
+from app.core.metrics import record_cache
 from app.core.permissions import get_user_permissions
+from app.core.redis import shared_redis
 from app.models.permissions import UserGroups
 
+logger = get_logger(__name__)
+
 # Cache TTL: 5 minutes (permissions rarely change)
 PERMISSION_CACHE_TTL = 300
 
+# Pub/sub channel carrying comma-separated user ids whose permissions changed.
+PERMISSION_CHANNEL = "permissions:invalidate"
+
+# In-process LRU: users kept, and how long an entry lives (bounds a lost message).
+_LOCAL_MAX_USERS = 10_000
+_LOCAL_TTL = 60.0
+_RETRY_SECONDS = 5.0
+
+_local: OrderedDict[int, tuple[float, frozenset[str]]] = OrderedDict()
+_subscribed = False
+# Bumped on every invalidation received, so a lookup that raced one doesn't put
+# the permissions it read before the change into the LRU.
+_generation = 0
+_listener_task: asyncio.Task[None] | None = None
+
+_request_memo: ContextVar[dict[int, frozenset[str]] | None] = ContextVar(
+    "permission_request_memo", default=None
+)
+
 
 def _make_cache_key(user_id: int) -> str:
     """Generate Redis cache key for user permissions."""
     return f"user_permissions:{user_id}"
 
 
+@contextmanager
+def permission_memo() -> Iterator[None]:
+    """Memoize permission lookups for the duration of one request."""
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
 async def get_cached_user_permissions(
     db: AsyncSession,
     redis_client: redis.Redis,  # type: ignore[type-arg]
@@ -32,8 +84,9 @@ async def get_cached_user_permissions(
     """
     Get user permissions with caching.
 
-    First checks Redis cache, falls back to database query if cache miss.
-    Stores result in cache with TTL for subsequent requests.
+    Checks the request memo and the in-process LRU, then the Redis cache, and
+    falls back to a database query on a miss. Stores result in cache with TTL for
+    subsequent requests.
 
     Args:
         db: Database session
@@ -43,6 +96,30 @@ async def get_cached_user_permissions(
     Returns:
         Set of permission strings
     """
+    memo = _request_memo.get()
+    if memo is not None:
+        record_cache("permissions_memo", hit=user_id in memo)
+        if user_id in memo:
+            return set(memo[user_id])
+
+    permissions = _local_get(user_id)
+    record_cache("permissions_local", hit=permissions is not None)
+    if permissions is None:
+        generation = _generation
+        permissions = frozenset(await _fetch_user_permissions(db, redis_client, user_id))
+        if _subscribed and generation == _generation:
+            _local_put(user_id, permissions)
+
+    if memo is not None:
+        memo[user_id] = permissions
+    return set(permissions)
+
+
+async def _fetch_user_permissions(
+    db: AsyncSession,
+    redis_client: redis.Redis,  # type: ignore[type-arg]
+    user_id: int,
+) -> set[str]:
     cache_key = _make_cache_key(user_id)
 
     # Try cache first
@@ -50,10 +127,13 @@ async def get_cached_user_permissions(
     if cached:
         try:
             cached_str = cast(str, cached.decode("utf-8") if isinstance(cached, bytes) else cached)
-            return set(json.loads(cached_str))
+            permissions = set(json.loads(cached_str))
+            record_cache("permissions", hit=True)
+            return permissions
         except json.JSONDecodeError, TypeError, AttributeError:
             # Cache corrupted, fall through to database
             pass
+    record_cache("permissions", hit=False)
 
     # Cache miss - query database
     permissions = await get_user_permissions(db, user_id)
@@ -81,8 +161,7 @@ async def invalidate_user_permissions(
         redis_client: Redis client
         user_id: User ID whose cache should be invalidated
     """
-    cache_key = _make_cache_key(user_id)
-    await redis_client.delete(cache_key)
+    await _invalidate(redis_client, [user_id])
 
 
 async def invalidate_group_permissions(
@@ -105,6 +184,109 @@ async def invalidate_group_permissions(
     result = await db.execute(select(UserGroups.user_id).where(UserGroups.group_id == group_id))  # type: ignore[call-overload]
     user_ids = [row[0] for row in result.fetchall()]
 
-    # Invalidate each user's cache
+    await _invalidate(redis_client, user_ids)
+
+
+async def _invalidate(
+    redis_client: redis.Redis,  # type: ignore[type-arg]
+    user_ids: list[int],
+) -> None:
+    if not user_ids:
+        return
+    memo = _request_memo.get()
     for user_id in user_ids:
-        await invalidate_user_permissions(redis_client, user_id)
+        _local.pop(user_id, None)
+        if memo is not None:
+            memo.pop(user_id, None)
+    await redis_client.delete(*(_make_cache_key(user_id) for user_id in user_ids))
+    # Best-effort: other processes' LRU entries also expire within _LOCAL_TTL.
+    try:
+        await redis_client.publish(PERMISSION_CHANNEL, ",".join(map(str, user_ids)))
+    except Exception:
+        logger.warning("permission_invalidation_publish_failed", exc_info=True)
+
+
+def _local_get(user_id: int) -> frozenset[str] | None:
+    if not _subscribed:
+        return None
+    entry = _local.get(user_id)
+    if entry is None:
+        return None
+    expires_at, permissions = entry
+    if expires_at <= time.monotonic():
+        del _local[user_id]
+        return None
+    _local.move_to_end(user_id)
+    return permissions
+
+
+def _local_put(user_id: int, permissions: frozenset[str]) -> None:
+    _local[user_id] = (time.monotonic() + _LOCAL_TTL, permissions)
+    _local.move_to_end(user_id)
+    while len(_local) > _LOCAL_MAX_USERS:
+        _local.popitem(last=False)
+
+
+def _drop_local(user_ids: Iterable[int]) -> None:
+    global _generation
+    _generation += 1
+    for user_id in user_ids:
+        _local.pop(user_id, None)
+
+
+def _reset_local(subscribed: bool) -> None:
+    global _subscribed, _generation
+    _subscribed = subscribed
+    _generation += 1
+    _local.clear()
+
+
+async def _listen(client: redis.Redis) -> None:  # type: ignore[type-arg]
+    """Follow invalidations until cancelled, resubscribing after a disconnect."""
+    while True:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(PERMISSION_CHANNEL)
+            # Anything could have changed while unsubscribed.
+            _reset_local(subscribed=True)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode()
+                try:
+                    _drop_local(int(user_id) for user_id in data.split(","))
+                except ValueError:
+                    _reset_local(subscribed=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("permission_cache_listener_disconnected", exc_info=True)
+            _reset_local(subscribed=False)
+            await asyncio.sleep(_RETRY_SECONDS)
+        finally:
+            await pubsub.aclose()
+
+
+async def start_permission_cache() -> None:
+    """Enable the in-process tier and follow invalidations (API lifespan, after
+    ``start_redis``)."""
+    global _listener_task
+    client = shared_redis()
+    if client is None:
+        return
+    _listener_task = asyncio.get_running_loop().create_task(_listen(client))
+
+
+async def stop_permission_cache() -> None:
+    """Stop following invalidations and drop the in-process tier."""
+    global _listener_task
+    if _listener_task is not None and not _listener_task.done():
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+    _listener_task = None
+    _reset_local(subscribed=False)
@@ -10,6 +10,11 @@ ec5c5fa4e3e5) that maintains the denormalized counters:
 - ``images.posts``/``last_post``  <- posts INSERT/UPDATE/DELETE, soft-delete aware
 - ``users.posts``                 <- posts INSERT/UPDATE/DELETE, soft-delete aware
 
+and the Meilisearch sync outbox (app/services/search_outbox.py):
+
+- ``search_outbox``               <- tags INSERT/UPDATE/DELETE,
+                                     tag_external_links INSERT/UPDATE/DELETE
+
 Layout differs from MariaDB deliberately: one function per (source table,
 event) covering every counter that event touches, instead of one trigger per
 target table — same semantics, fewer objects, and each event's full effect
@@ -187,6 +192,61 @@ _TRIGGER_TRIOS = (
         END IF;
         """,
     ),
+    # Search outbox (migration 3f9c1d7a2b64 on MariaDB): queue the tag for
+    # re-indexing when a column its search document carries changes. The
+    # usage_count updates above land here too.
+    _trigger(
+        "tags_search_outbox_insert",
+        "INSERT",
+        "tags",
+        "INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);",
+    ),
+    _trigger(
+        "tags_search_outbox_update",
+        "UPDATE",
+        "tags",
+        """
+        IF (NEW.title, NEW."desc", NEW.type, NEW.usage_count, NEW.alias_of, NEW.date_added)
+           IS DISTINCT FROM
+           (OLD.title, OLD."desc", OLD.type, OLD.usage_count, OLD.alias_of, OLD.date_added)
+        THEN
+            INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);
+        END IF;
+        """,
+    ),
+    _trigger(
+        "tags_search_outbox_delete",
+        "DELETE",
+        "tags",
+        "INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id);",
+    ),
+    _trigger(
+        "tag_external_links_search_outbox_insert",
+        "INSERT",
+        "tag_external_links",
+        "INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);",
+    ),
+    # Migration 8d41e6b0c3a5: a link re-pointed to another tag (alias merge)
+    # changes both tags' documents.
+    _trigger(
+        "tag_external_links_search_outbox_update",
+        "UPDATE",
+        "tag_external_links",
+        """
+        IF (NEW.tag_id, NEW.url) IS DISTINCT FROM (OLD.tag_id, OLD.url) THEN
+            INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id);
+            IF NEW.tag_id <> OLD.tag_id THEN
+                INSERT INTO search_outbox (tag_id) VALUES (NEW.tag_id);
+            END IF;
+        END IF;
+        """,
+    ),
+    _trigger(
+        "tag_external_links_search_outbox_delete",
+        "DELETE",
+        "tag_external_links",
+        "INSERT INTO search_outbox (tag_id) VALUES (OLD.tag_id);",
+    ),
 )
 
 
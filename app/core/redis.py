@@ -1,14 +1,145 @@
+"""
+Process-wide Redis clients.
+
+Each API process (lifespan) and arq worker (startup) opens one client per Redis
+use here and shares it: the request dependency, the arq enqueue pool, and the
+module-level clients of the tag graph, posting lists and feed caches. Every
+client sits on a bounded ``BlockingConnectionPool`` (``REDIS_MAX_CONNECTIONS``;
+a request waits up to ``REDIS_POOL_TIMEOUT`` for a free connection rather than
+opening more) whose idle connections are pinged after ``REDIS_HEALTH_CHECK_INTERVAL``
+seconds, so a connection Redis dropped is replaced instead of failing a request.
+
+There are three pools because connections differ in what they decode:
+
+- the text client (``REDIS_URL``, responses decoded as UTF-8), for nearly everything;
+- the binary client (``REDIS_URL``, raw bytes), for the posting-list bitmaps;
+- the queue pool (``ARQ_REDIS_URL``), for enqueuing arq jobs.
+
+Outside those processes (tests, scripts) nothing is started: ``get_redis`` falls
+back to a short-lived client per request, and the module-level users stay
+disabled as before.
+"""
+
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
 
 import redis.asyncio as redis
 
 from app.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import Gauge, Histogram
+
+logger = get_logger(__name__)
+
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_duration_seconds",
+    "Round trip of commands on the shared Redis clients, by command.",
+    ("command",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+_text_client: redis.Redis | None = None  # type: ignore[type-arg]
+_binary_client: redis.Redis | None = None  # type: ignore[type-arg]
+_queue_pool: redis.BlockingConnectionPool | None = None
+
+
+class _TimedRedis(redis.Redis):  # type: ignore[type-arg]
+    """Client that records each command's latency (pipelines and pub/sub aren't timed)."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.observe(time.perf_counter() - start, str(args[0]).upper())
+
+
+def _pool(url: str, *, decode_responses: bool) -> redis.BlockingConnectionPool:
+    return redis.BlockingConnectionPool.from_url(
+        url,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        encoding="utf-8",
+        decode_responses=decode_responses,
+    )
+
+
+async def start_redis() -> None:
+    """Open the shared pools (API lifespan / worker startup, before anything that
+    uses them)."""
+    global _text_client, _binary_client, _queue_pool
+    _text_client = _TimedRedis(connection_pool=_pool(settings.REDIS_URL, decode_responses=True))
+    _binary_client = _TimedRedis(connection_pool=_pool(settings.REDIS_URL, decode_responses=False))
+    _queue_pool = _pool(settings.ARQ_REDIS_URL, decode_responses=False)
+    logger.info("redis_pools_started", max_connections=settings.REDIS_MAX_CONNECTIONS)
+
+
+async def stop_redis() -> None:
+    """Close the shared pools (after everything that uses them has stopped)."""
+    global _text_client, _binary_client, _queue_pool
+    for client in (_text_client, _binary_client):
+        if client is not None:
+            await client.connection_pool.disconnect()
+    if _queue_pool is not None:
+        await _queue_pool.disconnect()
+    _text_client = _binary_client = None
+    _queue_pool = None
+
+
+def shared_redis() -> redis.Redis | None:  # type: ignore[type-arg]
+    """The process's text client, or None before :func:`start_redis`."""
+    return _text_client
+
+
+def shared_binary_redis() -> redis.Redis | None:  # type: ignore[type-arg]
+    """The process's raw-bytes client, or None before :func:`start_redis`."""
+    return _binary_client
+
+
+def shared_queue_pool() -> redis.BlockingConnectionPool | None:
+    """The pool arq jobs are enqueued through, or None before :func:`start_redis`."""
+    return _queue_pool
+
+
+def redis_pool_stats() -> dict[str, dict[str, int]]:
+    """Connections in use and idle per started pool, against the pool limit."""
+    pools = {
+        "text": _text_client.connection_pool if _text_client is not None else None,
+        "binary": _binary_client.connection_pool if _binary_client is not None else None,
+        "queue": _queue_pool,
+    }
+    return {
+        name: {
+            "in_use": len(pool._in_use_connections),
+            "idle": len(pool._available_connections),
+            "max": pool.max_connections,
+        }
+        for name, pool in pools.items()
+        if pool is not None
+    }
+
+
+Gauge(
+    "redis_pool_connections",
+    "Connections of the shared Redis pools by state (in_use, idle) and pool limit (max).",
+    lambda: {
+        (pool, state): value
+        for pool, stats in redis_pool_stats().items()
+        for state, value in stats.items()
+    },
+    ("pool", "state"),
+)
 
 
 async def get_redis() -> AsyncGenerator[redis.Redis]:  # type: ignore[type-arg]
     """
     Dependency for getting async redis connection.
     """
+    if _text_client is not None:
+        yield _text_client
+        return
     client = redis.from_url(
         str(settings.REDIS_URL),
         encoding="utf-8",
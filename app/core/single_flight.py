@@ -0,0 +1,233 @@
+"""
+Single-flight recomputation for Redis-cached values.
+
+A plain get-then-setex cache lets every concurrent caller that misses run the
+same expensive computation: when a popular filtered-count entry expires, each
+in-flight ``list_images`` request runs the ~700ms count at once. Here exactly one
+caller recomputes:
+
+- Within a process, callers that miss while a recompute is running await its
+  future instead of starting their own. If the leader is cancelled (its client
+  went away), the followers are not: they start over, and one of them leads.
+- Across processes, a Redis lock (``<key>:lock``) elects the leader. The others
+  serve the stale copy (``<key>:stale``) when there is one, else poll until the
+  leader has stored the value. The leader holds the lock under its own token and
+  renews it while it computes, so a slow recompute keeps it; it releases only
+  its own lock, never one a later leader took after it expired.
+
+Entries have two lifetimes. The soft TTL is the freshness contract the caller
+already had: the entry itself (``<key>``) expires after it. The hard TTL bounds
+the stale copy, which is only ever served while a recompute is in flight.
+"""
+
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+
+import redis.asyncio as redis
+
+from app.core.logging import get_logger
+from app.core.metrics import record_cache
+
+logger = get_logger(__name__)
+
+# Lifetime of the lock between renewals. A live leader renews it every third of
+# this; a crashed one stops, the lock expires and a follower recomputes itself,
+# so a dead leader can't wedge the key.
+DEFAULT_LOCK_TTL_SECONDS = 10.0
+
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Follower poll interval while waiting for a leader in another process.
+_POLL_SECONDS = 0.025
+
+# Recomputes in flight in this process, by key.
+_inflight: dict[str, asyncio.Future[object]] = {}
+
+
+class _LeaderCancelled(Exception):
+    """Set on the in-process future when its leader is cancelled; followers retry."""
+
+
+def _retrieve_exception(future: asyncio.Future[object]) -> None:
+    # A failed recompute nobody waited on must not log "exception never retrieved".
+    if not future.cancelled():
+        future.exception()
+
+
+async def single_flight[T](
+    redis_client: redis.Redis | None,  # type: ignore[type-arg]
+    key: str,
+    compute: Callable[[], Awaitable[T]],
+    *,
+    read: Callable[[], Awaitable[T | None]],
+    read_stale: Callable[[], Awaitable[T | None]] | None = None,
+    lock_ttl: float = DEFAULT_LOCK_TTL_SECONDS,
+) -> T:
+    """Run ``compute`` once across every concurrent caller that missed ``key``.
+
+    ``compute`` must store its result where ``read`` finds it: followers in other
+    processes learn the leader is done by reading it back. ``read_stale`` supplies
+    what a follower serves instead of waiting. Call this after your own cache
+    read has missed; it does not read first.
+    """
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        stale = await read_stale() if read_stale is not None else None
+        if stale is not None:
+            return stale
+        try:
+            return await asyncio.shield(inflight)  # type: ignore[return-value]
+        except _LeaderCancelled:
+            return await single_flight(
+                redis_client,
+                key,
+                compute,
+                read=read,
+                read_stale=read_stale,
+                lock_ttl=lock_ttl,
+            )
+
+    future: asyncio.Future[object] = asyncio.get_running_loop().create_future()
+    future.add_done_callback(_retrieve_exception)
+    _inflight[key] = future
+    try:
+        value = await _lead_or_follow(redis_client, key, compute, read, read_stale, lock_ttl)
+    except asyncio.CancelledError:
+        # Not future.cancel(): that would cancel every follower awaiting it.
+        future.set_exception(_LeaderCancelled(key))
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+async def _lead_or_follow[T](
+    redis_client: redis.Redis | None,  # type: ignore[type-arg]
+    key: str,
+    compute: Callable[[], Awaitable[T]],
+    read: Callable[[], Awaitable[T | None]],
+    read_stale: Callable[[], Awaitable[T | None]] | None,
+    lock_ttl: float,
+) -> T:
+    if redis_client is None:
+        return await compute()
+
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    lock_ms = int(lock_ttl * 1000)
+    if await redis_client.set(lock_key, token, nx=True, px=lock_ms):
+        renewal = asyncio.create_task(_renew_lock(redis_client, lock_key, token, lock_ms))
+        try:
+            return await compute()
+        finally:
+            renewal.cancel()
+            await redis_client.eval(_RELEASE_SCRIPT, 1, lock_key, token)  # type: ignore[misc]
+
+    # Another process is recomputing; it keeps the lock alive until it is done.
+    stale = await read_stale() if read_stale is not None else None
+    if stale is not None:
+        return stale
+    while True:
+        await asyncio.sleep(_POLL_SECONDS)
+        value = await read()
+        if value is not None:
+            return value
+        if not await redis_client.exists(lock_key):
+            break
+    # The leader gave up (or died) without storing anything: do it ourselves.
+    logger.info("single_flight_leader_missing", key=key)
+    return await compute()
+
+
+async def _renew_lock(
+    redis_client: redis.Redis,  # type: ignore[type-arg]
+    lock_key: str,
+    token: str,
+    lock_ms: int,
+) -> None:
+    """Keep the leader's lock alive until cancelled, or until it is no longer ours."""
+    try:
+        while True:
+            await asyncio.sleep(lock_ms / 3000)
+            if not await redis_client.eval(_RENEW_SCRIPT, 1, lock_key, token, lock_ms):  # type: ignore[misc]
+                logger.warning("single_flight_lock_lost", key=lock_key)
+                return
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        # The lock then expires on its own and a follower takes over.
+        logger.warning("single_flight_lock_renew_failed", key=lock_key, exc_info=True)
+
+
+async def cached_single_flight[T](
+    redis_client: redis.Redis | None,  # type: ignore[type-arg]
+    key: str,
+    compute: Callable[[], Awaitable[T]],
+    *,
+    soft_ttl: int,
+    hard_ttl: int,
+    loads: Callable[[str], T],
+    dumps: Callable[[T], str],
+    lock_ttl: float = DEFAULT_LOCK_TTL_SECONDS,
+    metric: str | None = None,
+) -> T:
+    """Get-or-compute for a Redis-cached value, recomputed single-flight on a miss.
+
+    The entry is stored under ``key`` for ``soft_ttl`` seconds, exactly like a
+    plain setex; a copy kept for ``hard_ttl`` seconds is served to the callers
+    that arrive while the recompute runs. An entry ``loads`` can't parse counts
+    as a miss. With ``metric`` set, the lookup is counted as a hit or miss of
+    that cache in ``cache_requests_total``.
+    """
+    if redis_client is None:
+        return await compute()
+
+    async def read_key(k: str) -> T | None:
+        raw = await redis_client.get(k)
+        if raw is None:
+            return None
+        try:
+            return loads(raw.decode() if isinstance(raw, bytes) else raw)
+        except Exception:
+            logger.warning("single_flight_unparseable_entry", key=k)
+            return None
+
+    cached = await read_key(key)
+    if metric is not None:
+        record_cache(metric, hit=cached is not None)
+    if cached is not None:
+        return cached
+
+    async def compute_and_store() -> T:
+        value = await compute()
+        encoded = dumps(value)
+        await redis_client.setex(key, soft_ttl, encoded)
+        await redis_client.setex(f"{key}:stale", max(hard_ttl, soft_ttl), encoded)
+        return value
+
+    return await single_flight(
+        redis_client,
+        key,
+        compute_and_store,
+        read=lambda: read_key(key),
+        read_stale=lambda: read_key(f"{key}:stale"),
+        lock_ttl=lock_ttl,
+    )
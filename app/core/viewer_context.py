@@ -0,0 +1,150 @@
+"""
+Cached viewer context for authenticated read endpoints.
+
+``get_current_user`` loads the whole legacy ``users`` row (≈60 columns) on every
+authenticated request, yet the read endpoints on the hot path (image lists, tag
+pages, image detail, bookmarks, recommendations) only look at a handful of them: whether the
+account is active, whether it is an admin, and the browsing preferences. Those
+fields are small and change rarely, so they are cached per user_id in two tiers:
+
+- in process, for ``_LOCAL_TTL`` seconds (a burst of requests from one viewer
+  costs no round trip at all);
+- in Redis, for ``VIEWER_CONTEXT_TTL`` seconds, shared by every worker.
+
+Writers of these fields (profile updates, suspension and reactivation, group
+membership, logout-all) call :func:`invalidate_viewer_context` after their
+commit. That clears Redis and this process's copy; other processes' local copies
+expire within ``_LOCAL_TTL``. Inactive accounts are never cached, so a
+reactivation (including the automatic one at login) takes effect at once.
+
+Handlers that mutate the user keep depending on ``get_current_user``, which
+always loads the full row. The cache is only active in processes that started
+the shared Redis pools (app/core/redis.py); elsewhere every lookup reads the
+columns from the database.
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.core.redis import shared_redis
+from app.models.user import Users
+
+logger = get_logger(__name__)
+
+# Redis tier: explicit invalidation keeps it fresh; the TTL bounds anything missed.
+VIEWER_CONTEXT_TTL = 60
+# Process tier: not reachable by other workers' invalidations, so kept short.
+_LOCAL_TTL = 5.0
+# Past this many viewers the process tier starts over rather than growing.
+_LOCAL_MAX_ENTRIES = 10_000
+
+_local: dict[int, tuple[float, ViewerContext]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class ViewerContext:
+    """The authenticated viewer's account flags and browsing preferences.
+
+    Attribute-compatible with ``Users`` for these fields, so read paths that only
+    look at them accept either.
+    """
+
+    user_id: int
+    active: int
+    admin: int
+    show_all_images: int
+    hide_reposts: int
+    images_per_page: int
+    bookmark: int | None
+    sorting_pref: str
+    sorting_pref_order: str
+
+    @property
+    def id(self) -> int:
+        return self.user_id
+
+
+_COLUMNS = (
+    Users.user_id,
+    Users.active,
+    Users.admin,
+    Users.show_all_images,
+    Users.hide_reposts,
+    Users.images_per_page,
+    Users.bookmark,
+    Users.sorting_pref,
+    Users.sorting_pref_order,
+)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"viewer_context:{user_id}"
+
+
+async def get_viewer_context(db: AsyncSession, user_id: int) -> ViewerContext | None:
+    """The viewer context of ``user_id``, or None if the user does not exist."""
+    client = shared_redis()
+    if client is None:
+        return await _load(db, user_id)
+
+    now = time.monotonic()
+    local = _local.get(user_id)
+    if local is not None and local[0] > now:
+        return local[1]
+
+    context = None
+    try:
+        cached = await client.get(_cache_key(user_id))
+        if cached:
+            context = ViewerContext(**json.loads(cached))
+    except Exception:
+        logger.warning("viewer_context_cache_read_failed", user_id=user_id, exc_info=True)
+    if context is None:
+        context = await _load(db, user_id)
+        if context is None or not context.active:
+            return context
+        try:
+            await client.setex(_cache_key(user_id), VIEWER_CONTEXT_TTL, json.dumps(asdict(context)))
+        except Exception:
+            logger.warning("viewer_context_cache_write_failed", user_id=user_id, exc_info=True)
+    if len(_local) >= _LOCAL_MAX_ENTRIES:
+        _local.clear()
+    _local[user_id] = (now + _LOCAL_TTL, context)
+    return context
+
+
+async def invalidate_viewer_context(user_id: int) -> None:
+    """Drop the cached context of ``user_id``. Call after the commit that changed
+    it; best-effort, the TTLs bound a failure."""
+    _local.pop(user_id, None)
+    client = shared_redis()
+    if client is None:
+        return
+    try:
+        await client.delete(_cache_key(user_id))
+    except Exception:
+        logger.warning("viewer_context_invalidate_failed", user_id=user_id, exc_info=True)
+
+
+async def _load(db: AsyncSession, user_id: int) -> ViewerContext | None:
+    row = (
+        await db.execute(select(*_COLUMNS).where(Users.user_id == user_id))  # type: ignore[call-overload]
+    ).one_or_none()
+    if row is None:
+        return None
+    return ViewerContext(
+        user_id=row.user_id,
+        active=row.active,
+        admin=row.admin,
+        show_all_images=row.show_all_images,
+        hide_reposts=row.hide_reposts,
+        images_per_page=row.images_per_page,
+        bookmark=row.bookmark,
+        sorting_pref=row.sorting_pref,
+        sorting_pref_order=row.sorting_pref_order,
+    )
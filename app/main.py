@@ -3,28 +3,44 @@ FastAPI Application - Shuushuu API
 Modern backend for Shuushuu anime image board
 """
 
+import hmac
 import time
 import uuid
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from urllib.parse import parse_qs, urlencode
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from app.config import settings
-from app.core.database import AsyncSessionLocal
+from app.core.auth import request_auth
+from app.core.database import AsyncSessionLocal, QueryStats, stick_to_primary, track_queries
 from app.core.logging import (
     clear_request_context,
     configure_logging,
     get_logger,
     set_request_context,
 )
+from app.core.metrics import CONTENT_TYPE, Counter, Histogram, render_metrics
+from app.core.password_hashing import shutdown_password_hashing
+from app.core.permission_cache import (
+    permission_memo,
+    start_permission_cache,
+    stop_permission_cache,
+)
 from app.core.permission_sync import sync_permissions
-from app.core.security import verify_access_token
+from app.core.redis import start_redis, stop_redis
+from app.services.feed_count_cache import start_feed_counters, stop_feed_counters
+from app.services.feed_response_cache import start_feed_response_cache, stop_feed_response_cache
 from app.services.ml_runtime import warm_load_if_enabled
+from app.services.tag_autocomplete import start_tag_autocomplete, stop_tag_autocomplete
+from app.services.tag_graph import start_tag_graph, stop_tag_graph
+from app.services.tag_postings import start_tag_postings, stop_tag_postings
+from app.services.tag_subtree_counts import start_tag_subtree_counts, stop_tag_subtree_counts
 from app.tasks.queue import close_queue
 
 # Configure logging on module import
@@ -33,6 +49,7 @@ logger = get_logger(__name__)
 
 
 _REDACTED_PARAMS = {"token", "code", "access_token", "refresh_token", "password"}
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
 
 
 def _log_level_for(status_code: int, elapsed_ms: float) -> str:
@@ -60,23 +77,54 @@ def _redact_query(query_string: str) -> str:
     return urlencode(redacted, doseq=True)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to add request ID and logging context to each request."""
+def _server_timing(sql: QueryStats, elapsed_ms: float) -> str:
+    """Server-Timing value: time to first byte and the DB share of it, so browser
+    dev tools show both per request."""
+    return f'app;dur={elapsed_ms}, db;dur={sql.elapsed_ms};desc="{sql.count} queries"'
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, to the last response byte, by route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Requests served, by route template and status code.",
+    ("method", "route", "status"),
+)
+
+
+def _route_label(scope: Scope) -> str:
+    """The matched route's path template (``/api/v1/images/{image_id}``), so label
+    cardinality stays bounded by the route table rather than by the URLs seen."""
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
 
-    async def dispatch(self, request: Request, call_next):  # type: ignore[no-untyped-def]
+class RequestLoggingMiddleware:
+    """Middleware to add request ID and logging context to each request.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware``: that runs the app in a separate
+    task and pipes the response through a memory stream, a measurable cost on the
+    small JSON responses that make up most traffic, and it loses streaming
+    back-pressure. See scripts/bench_logging_middleware.py.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Add request tracking context to each request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate unique request ID
         request_id = str(uuid.uuid4())
+        request = Request(scope)
 
-        # Extract user_id from JWT if present (lightweight decode, no DB hit)
-        user_id = None
-        auth_header = request.headers.get("authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            user_id = verify_access_token(auth_header[7:])
-        if user_id is None:
-            token = request.cookies.get("access_token")
-            if token:
-                user_id = verify_access_token(token)
+        # Verify the access token once (no DB hit); the auth dependencies reuse it
+        user_id = request_auth(request).user_id
 
         # Set context for this request (will be included in all logs)
         set_request_context(request_id, user_id=user_id)
@@ -84,28 +132,58 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         # Add request ID to request state for access in endpoints
         request.state.request_id = request_id
 
+        status_code = 500
+        elapsed_ms = 0.0
+        start = time.monotonic()
+        writer_id = user_id if scope["method"] not in _SAFE_METHODS else None
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code, elapsed_ms
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+                if writer_id is not None and status_code < 400:
+                    # Before the response leaves, so the user's next read can't
+                    # beat it to the replica (read-your-writes, get_read_db).
+                    await stick_to_primary(writer_id)
+                headers = MutableHeaders(scope=message)
+                # Add request ID to response headers for debugging
+                headers["X-Request-ID"] = request_id
+                if settings.SERVER_TIMING_HEADER:
+                    headers.append("Server-Timing", _server_timing(sql, elapsed_ms))
+            await send(message)
+
         try:
-            start = time.monotonic()
-            response = await call_next(request)
-            elapsed_ms = round((time.monotonic() - start) * 1000, 1)
-            # Add request ID to response headers for debugging
-            response.headers["X-Request-ID"] = request_id
-            log = getattr(logger, _log_level_for(response.status_code, elapsed_ms))
+            with permission_memo(), track_queries() as sql:
+                await self.app(scope, receive, send_with_request_id)
+            log = getattr(logger, _log_level_for(status_code, elapsed_ms))
+            query = scope["query_string"].decode("latin-1")
+            path = scope["path"] + ("?" + _redact_query(query) if query else "")
             log(
                 "request_complete",
-                method=request.method,
-                path=str(request.url.path)
-                + ("?" + _redact_query(str(request.url.query)) if request.url.query else ""),
-                status_code=response.status_code,
+                method=scope["method"],
+                path=path,
+                status_code=status_code,
                 elapsed_ms=elapsed_ms,
+                db_queries=sql.count,
+                db_ms=sql.elapsed_ms,
                 # client_host + user_agent let anonymous 401s be clustered by source
-                # (one user fat-fingering vs. credential stuffing). request.client is
-                # None when the ASGI server reports no client (e.g. some test harnesses).
-                client_host=request.client.host if request.client else None,
+                # (one user fat-fingering vs. credential stuffing). The client is
+                # None when the ASGI server reports none (e.g. some test harnesses).
+                client_host=scope["client"][0] if scope.get("client") else None,
                 user_agent=request.headers.get("user-agent"),
             )
-            return response
+            threshold = settings.SQL_REPEATED_STATEMENT_THRESHOLD
+            for statement, count in sql.repeated(threshold) if threshold else ():
+                logger.warning(
+                    "sql_repeated_statement", path=path, count=count, statement=statement[:500]
+                )
         finally:
+            # Here rather than after the call, so an unhandled exception (a 500
+            # unless a response had already started) is counted too.
+            route = _route_label(scope)
+            HTTP_REQUEST_SECONDS.observe(time.monotonic() - start, scope["method"], route)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status_code))
             # Clear context after request completes
             clear_request_context()
 
@@ -124,6 +202,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     async with AsyncSessionLocal() as db:
         await sync_permissions(db)
 
+    # Shared Redis pools: everything below that talks to Redis borrows from them
+    await start_redis()
+    # In-process permission cache tier, kept fresh by pub/sub invalidations
+    await start_permission_cache()
+
+    # Load the in-process tag graph (alias/hierarchy lookups) and follow changes
+    await start_tag_graph()
+    # In-process tag autocomplete index for /tags?search= and /search
+    await start_tag_autocomplete()
+    # Posting-list bitmaps for tag-filtered image searches
+    await start_tag_postings()
+    # Precomputed hierarchy image counts for the tag page
+    await start_tag_subtree_counts()
+    # Write-through global feed counters (and background filtered-count refresh)
+    await start_feed_counters()
+    # Generation bumps that invalidate cached anonymous feed responses
+    await start_feed_response_cache()
+
     # Initialize Meilisearch search service
     from meilisearch_python_sdk import AsyncClient as MeilisearchClient
 
@@ -160,7 +256,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     set_search_service(None)
     if meilisearch_client:
         await meilisearch_client.aclose()
+    await stop_tag_graph()
+    await stop_tag_autocomplete()
+    await stop_tag_postings()
+    await stop_tag_subtree_counts()
+    await stop_feed_counters()
+    await stop_feed_response_cache()
+    await stop_permission_cache()
     await close_queue()  # Close arq pool
+    await stop_redis()
+    shutdown_password_hashing()
 
 
 # Create FastAPI application
@@ -219,6 +324,20 @@ async def health() -> dict[str, str]:
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    """Prometheus exposition of this process's metrics (app/core/metrics.py).
+
+    Only for a scraper presenting ``Authorization: Bearer <METRICS_TOKEN>``; a
+    404 for everyone else, and for everyone when no token is configured.
+    """
+    token = settings.METRICS_TOKEN
+    supplied = request.headers.get("authorization", "").removeprefix("Bearer ")
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
 # Import and include routers
 from app.api.v1 import router as api_v1_router  # noqa: E402
 
@@ -52,6 +52,7 @@ from app.models.permissions import GroupPerms, Groups, Perms, UserGroups, UserPe
 from app.models.privmsg import Privmsgs
 from app.models.refresh_token import RefreshTokens
 from app.models.review_vote import ReviewVotes
+from app.models.search_outbox import SearchOutbox
 from app.models.tag import Tags
 from app.models.tag_audit_log import TagAuditLog
 from app.models.tag_external_link import TagExternalLinks
@@ -73,6 +74,7 @@ __all__ = [
     "Favorites",
     "TagLinks",
     "UserTagAffinity",
+    "SearchOutbox",
     "TagExternalLinks",
     "TagMappings",
     "CharacterSourceLinks",
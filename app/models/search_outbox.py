@@ -0,0 +1,30 @@
+"""SQLModel for the Meilisearch sync outbox (app/services/search_outbox.py)."""
+
+from datetime import UTC, datetime
+
+from sqlalchemy import BigInteger, Column, text
+from sqlmodel import Field, SQLModel
+
+from app.models.types import UnsignedInt, UtcDateTime
+
+
+class SearchOutbox(SQLModel, table=True):
+    """A tag whose search document needs rewriting.
+
+    Written only by triggers on tags and tag_external_links, in the same
+    transaction as the change, and deleted by the drain job once the tag is
+    re-indexed. No FK to tags by design: a deleted tag's row is how its
+    document gets removed.
+    """
+
+    __tablename__ = "search_outbox"
+
+    id: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, primary_key=True, autoincrement=True),
+    )
+    tag_id: int = Field(sa_column=Column(UnsignedInt, nullable=False))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(UtcDateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    )
@@ -222,11 +222,14 @@ class ImageDetailedResponse(ImageResponse):
         next_image_id: int | None = None,
         has_open_report: bool = False,
         can_see_reason: bool = False,
+        tags: list[TagSummary] | None = None,
     ) -> Self:
         """Create response from database model with relationships.
 
         ``can_see_reason`` gates the moderation reason (owner + mods); when False the
         reason fields stay null so a normal viewer never sees why an image is hidden.
+        ``tags`` are the image's tags already fetched by the caller (list pages, see
+        app.services.image_list_loader); without them they come from ``tag_links``.
         """
         data = ImageResponse.model_validate(image).model_dump()
 
@@ -235,7 +238,9 @@ class ImageDetailedResponse(ImageResponse):
             data["user"] = UserSummary.model_validate(image.user)
 
         # Add tags if loaded through tag_links, sorted by type then alphabetically
-        if hasattr(image, "tag_links") and image.tag_links:
+        if tags is not None:
+            data["tags"] = tags or None
+        elif hasattr(image, "tag_links") and image.tag_links:
             sorted_links = sort_tag_links_for_display(image.tag_links)
             data["tags"] = [TagSummary.model_validate(tl.tag) for tl in sorted_links]
 
@@ -303,6 +308,12 @@ class ImageDetailedListResponse(BaseModel):
     # non-deleted comment for the returned images, oldest first, keyed by
     # image id. Images without comments are absent from the map.
     comments: dict[int, list[CommentResponse]] | None = None
+    # Keyset cursor for the page after this one (pass back as ?cursor=). Null on a
+    # short (final) page and for sorts that only support offset paging.
+    next_cursor: str | None = None
+    # True when `total` is an estimate: the exact count for this filter would have
+    # blown the latency budget and is being computed for later requests.
+    total_is_estimate: bool = False
 
 
 class ImageUploadResponse(BaseModel):
@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel
 
+from app.schemas.base import UTCDatetime
 from app.schemas.tag import TagResponse
 
 
@@ -10,6 +11,10 @@ class TagSearchHit(TagResponse):
 
     model_config = {"from_attributes": True}
 
+    # When the hit's search document was written; None when the hit was read
+    # from the database (its document predates the current document version).
+    indexed_at: UTCDatetime | None = None
+
 
 class SearchResponse(BaseModel):
     """Response from the search endpoint."""
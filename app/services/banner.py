@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.elements import ColumnElement
 
 from app.config import settings
+from app.core.single_flight import cached_single_flight
 from app.models.misc import Banners, BannerSize, BannerTheme, UserBannerPins, UserBannerPreferences
 from app.schemas.banner import BannerPinResponse, BannerPreferencesResponse, BannerResponse
 
@@ -70,7 +71,8 @@ async def get_current_banner(
     """Get the current banner for a theme and size.
 
     Checks Redis cache first. On cache miss, queries the database for eligible banners,
-    filters invalid rows via BannerResponse validation, selects randomly, caches, and returns.
+    filters invalid rows via BannerResponse validation, selects randomly, caches, and returns
+    (single-flight: concurrent misses share one pick).
 
     If user_id is provided, resolves preferred size and pinned banners before rotation.
     """
@@ -112,50 +114,52 @@ async def get_current_banner(
 
     cache_key = _make_cache_key(theme, effective_size.value)
 
-    cached = await redis_client.get(cache_key)
-    if cached:
-        cached_str = cached.decode("utf-8") if isinstance(cached, bytes) else str(cached)
-        try:
-            return BannerResponse.model_validate_json(cached_str)
-        except Exception:
-            # Stale/invalid cache entry - delete and fall through to DB lookup
-            await redis_client.delete(cache_key)
-
-    theme_filter = Banners.supports_dark if theme == "dark" else Banners.supports_light
+    async def pick_banner() -> BannerResponse:
+        theme_filter = Banners.supports_dark if theme == "dark" else Banners.supports_light
 
-    active_filter = cast(ColumnElement[bool], Banners.active == True)  # noqa: E712
-    theme_filter_expr = cast(ColumnElement[bool], theme_filter == True)  # noqa: E712
-    size_filter = cast(ColumnElement[bool], Banners.size == effective_size)
+        active_filter = cast(ColumnElement[bool], Banners.active == True)  # noqa: E712
+        theme_filter_expr = cast(ColumnElement[bool], theme_filter == True)  # noqa: E712
+        size_filter = cast(ColumnElement[bool], Banners.size == effective_size)
 
-    query = select(Banners).where(active_filter, theme_filter_expr, size_filter)
+        query = select(Banners).where(active_filter, theme_filter_expr, size_filter)
 
-    result = await db.execute(query)
-    banners = result.scalars().all()
+        result = await db.execute(query)
+        banners = result.scalars().all()
 
-    if not banners:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No banners available for theme '{theme}' and size '{effective_size.value}'",
-        )
-
-    valid_responses: list[BannerResponse] = []
-    for banner in banners:
-        try:
-            valid_responses.append(BannerResponse.model_validate(banner))
-        except Exception:
-            continue  # Skip banners with invalid layout (e.g. partial three-part)
-
-    if not valid_responses:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No valid banners available for theme '{theme}' and size '{effective_size.value}'",
-        )
+        if not banners:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No banners available for theme '{theme}' and size '{effective_size.value}'",
+            )
 
-    response = random.choice(valid_responses)
+        valid_responses: list[BannerResponse] = []
+        for banner in banners:
+            try:
+                valid_responses.append(BannerResponse.model_validate(banner))
+            except Exception:
+                continue  # Skip banners with invalid layout (e.g. partial three-part)
 
-    await redis_client.setex(cache_key, _compute_ttl_seconds(), response.model_dump_json())
+        if not valid_responses:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No valid banners available for theme '{theme}' and size '{effective_size.value}'",
+            )
 
-    return response
+        return random.choice(valid_responses)
+
+    # A rotation expiring under load is picked once; the other requests keep
+    # showing the previous banner meanwhile. A stale/invalid entry counts as a miss.
+    ttl = _compute_ttl_seconds()
+    return await cached_single_flight(
+        redis_client,
+        cache_key,
+        pick_banner,
+        soft_ttl=ttl,
+        hard_ttl=ttl + settings.BANNER_CACHE_TTL,
+        loads=BannerResponse.model_validate_json,
+        dumps=BannerResponse.model_dump_json,
+        metric="banner",
+    )
 
 
 async def list_banners(
@@ -1,15 +1,26 @@
-"""TTL-cached global image counts for the default-feed pagination total.
+"""Global image counts for the default-feed pagination total, and filtered-count caching.
 
 ``list_images`` computes the bare default-feed total as ``count(visible) + count(my
 own hidden)``, where ``count(visible) = count(all) - count(hidden)``. The three global
 counts (``count(all)``, ``count(hidden)``, and ``count(repost)``) are the same for
-every viewer, so we cache them with a short TTL rather than recomputing per request.
-The cached total can lag an image create/delete/status-change by up to the TTL — a
-non-issue for a pagination counter over a million-row feed, and not worth the
-invalidation coupling.
+every viewer, so they live in Redis as write-through counters: every image create,
+delete and status change adjusts them after its commit (``record_feed_count_change``),
+and ``reconcile_feed_counts`` (arq, every 10 minutes) resets them from the DB to
+correct any drift. The request path only reads them; it counts from the DB only when
+the counters are missing altogether (fresh Redis).
+
+Filtered totals are TTL-cached per query (``FEED_COUNT_TTL``) and recounted
+single-flight when they expire, so a popular query's count runs once rather than once
+per concurrent request. Those whose exact count would blow the latency budget
+(``FILTERED_COUNT_BUDGET_MS``) are answered with an estimate instead, flagged
+``total_is_estimate`` in the response, while the exact count runs in the background
+and lands in the cache for later requests.
 """
 
+import asyncio
 import hashlib
+import math
+from dataclasses import dataclass
 from typing import Any
 
 import redis.asyncio as redis
@@ -17,12 +28,20 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select
 
-from app.config import ImageStatus
+from app.config import ImageStatus, settings
+from app.core.database import get_async_read_session
+from app.core.logging import get_logger
+from app.core.metrics import record_cache
+from app.core.redis import shared_redis
+from app.core.single_flight import cached_single_flight, single_flight
 from app.models.image import Images
+from app.models.tag import Tags
 from app.services.image_visibility import PUBLIC_IMAGE_STATUSES
 
-# TTL-only — no per-mutation invalidation. The count can lag a create/delete/status
-# change by at most FEED_COUNT_TTL seconds; acceptable for a pagination counter.
+logger = get_logger(__name__)
+
+# TTL-only — no per-mutation invalidation. A filtered count can lag a create/delete/
+# status change by at most FEED_COUNT_TTL seconds; acceptable for a pagination counter.
 FEED_COUNT_TTL = 60
 
 _KEY_TOTAL = "feed:count:total"
@@ -30,27 +49,47 @@ _KEY_HIDDEN = "feed:count:hidden"
 _KEY_REPOST = "feed:count:repost"
 _FILTERED_KEY_PREFIX = "feed:count:filtered:"
 
+# How long an expired filtered count may still be served to the callers that
+# arrive while its recount runs (see app/core/single_flight.py).
+_FEED_COUNT_STALE_TTL = 600
 
-async def get_feed_counts(
-    db: AsyncSession,
-    redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
-) -> tuple[int, int, int]:
-    """Return ``(count_all, count_hidden, count_repost)``, cache-backed when a client is given.
+# INCRBY each counter that exists. A missing counter stays missing (rather than
+# starting from the delta), so the next read recounts it from the DB.
+_ADJUST_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('INCRBY', key, ARGV[i])
+    end
+end
+"""
 
-    On a cache hit returns the stored values; on a miss (or no client) computes all
-    three from the DB and caches them. ``status NOT IN PUBLIC`` is index-backed
-    (idx_status), so the miss path is still cheap relative to the naive OR scan.
-    The ``status == REPOST`` equality scan hits the same index, so it is equally cheap.
-    """
-    if redis_client is not None:
-        # Three separate .get() calls (not .mget): the test mock_redis stubs .get but not
-        # .mget, so .mget would silently miss the cache in tests.
-        cached_total = await redis_client.get(_KEY_TOTAL)
-        cached_hidden = await redis_client.get(_KEY_HIDDEN)
-        cached_repost = await redis_client.get(_KEY_REPOST)
-        if cached_total is not None and cached_hidden is not None and cached_repost is not None:
-            return int(cached_total), int(cached_hidden), int(cached_repost)
+# Exact tag-filtered counts run at roughly 1M tag_links rows per ~700ms (the
+# semijoin figure in get_filtered_count); the cost model for the latency budget.
+_LINKS_PER_MS = 1400
+
+# In-flight background refinements in this process, by cache key. Holding the
+# task also keeps it from being garbage-collected mid-count.
+_refining: dict[str, asyncio.Task[None]] = {}
+
+_client: redis.Redis | None = None  # type: ignore[type-arg]
+
+
+async def start_feed_counters() -> None:
+    """Take the shared client for the write-through and background paths (API
+    lifespan / worker startup, after ``start_redis``). Without it those paths are
+    no-ops and the counters are kept right by reconciliation alone."""
+    global _client
+    _client = shared_redis()
+
+
+async def stop_feed_counters() -> None:
+    global _client
+    _client = None
 
+
+async def _count_feed(db: AsyncSession) -> tuple[int, int, int]:
+    """Count ``(all, hidden, repost)`` images. ``status NOT IN PUBLIC`` and
+    ``status == REPOST`` are both idx_status-backed."""
     total = (await db.execute(select(func.count()).select_from(Images))).scalar() or 0
     hidden = (
         await db.execute(
@@ -64,13 +103,99 @@ async def get_feed_counts(
             select(func.count()).select_from(Images).where(Images.status == ImageStatus.REPOST)  # type: ignore[arg-type]
         )
     ).scalar() or 0
+    return total, hidden, repost
 
-    if redis_client is not None:
-        await redis_client.setex(_KEY_TOTAL, FEED_COUNT_TTL, total)
-        await redis_client.setex(_KEY_HIDDEN, FEED_COUNT_TTL, hidden)
-        await redis_client.setex(_KEY_REPOST, FEED_COUNT_TTL, repost)
 
-    return total, hidden, repost
+async def _store_feed_counts(
+    redis_client: redis.Redis,  # type: ignore[type-arg]
+    counts: tuple[int, int, int],
+) -> None:
+    total, hidden, repost = counts
+    await redis_client.set(_KEY_TOTAL, total)
+    await redis_client.set(_KEY_HIDDEN, hidden)
+    await redis_client.set(_KEY_REPOST, repost)
+
+
+async def get_feed_counts(
+    db: AsyncSession,
+    redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
+) -> tuple[int, int, int]:
+    """Return ``(count_all, count_hidden, count_repost)``, counter-backed when a client is given.
+
+    Reads the write-through counters; only when one is missing (or no client) are
+    all three counted from the DB, and then stored as the counters' new baseline.
+    That recount is single-flight: with a fresh Redis, one caller counts while the
+    rest wait for its counters.
+    """
+    if redis_client is None:
+        return await _count_feed(db)
+
+    async def read_counters() -> tuple[int, int, int] | None:
+        # Three separate .get() calls (not .mget): the test mock_redis stubs .get but not
+        # .mget, so .mget would silently miss the cache in tests.
+        cached_total = await redis_client.get(_KEY_TOTAL)
+        cached_hidden = await redis_client.get(_KEY_HIDDEN)
+        cached_repost = await redis_client.get(_KEY_REPOST)
+        if cached_total is None or cached_hidden is None or cached_repost is None:
+            return None
+        return int(cached_total), int(cached_hidden), int(cached_repost)
+
+    cached = await read_counters()
+    record_cache("feed_counts", hit=cached is not None)
+    if cached is not None:
+        return cached
+
+    async def recount() -> tuple[int, int, int]:
+        counts = await _count_feed(db)
+        await _store_feed_counts(redis_client, counts)
+        return counts
+
+    return await single_flight(redis_client, _KEY_TOTAL, recount, read=read_counters)
+
+
+def _feed_contribution(image_status: int | None) -> tuple[int, int, int]:
+    """What one image with ``image_status`` adds to ``(all, hidden, repost)``."""
+    if image_status is None:
+        return 0, 0, 0
+    return (
+        1,
+        int(image_status not in PUBLIC_IMAGE_STATUSES),
+        int(image_status == ImageStatus.REPOST),
+    )
+
+
+async def record_feed_count_change(old_status: int | None, new_status: int | None) -> None:
+    """Adjust the feed counters for one image: created (``old_status=None``), deleted
+    (``new_status=None``) or moved between statuses.
+
+    Call after the commit that made the change. A Redis failure is logged, not
+    raised, and the next reconcile corrects the counters.
+    """
+    if _client is None:
+        return
+    before = _feed_contribution(old_status)
+    after = _feed_contribution(new_status)
+    deltas = [b - a for a, b in zip(before, after, strict=True)]
+    if not any(deltas):
+        return
+    try:
+        await _client.eval(_ADJUST_SCRIPT, 3, _KEY_TOTAL, _KEY_HIDDEN, _KEY_REPOST, *deltas)  # type: ignore[misc]
+    except Exception:
+        logger.warning(
+            "feed_count_adjust_failed", old_status=old_status, new_status=new_status, exc_info=True
+        )
+
+
+async def reconcile_feed_counts(db: AsyncSession) -> tuple[int, int, int]:
+    """Reset the feed counters from the DB; returns the fresh counts.
+
+    A write-through adjustment landing between the count and the store is lost (or
+    counted twice) until the next run — drift of a few images, for ten minutes.
+    """
+    counts = await _count_feed(db)
+    if _client is not None:
+        await _store_feed_counts(_client, counts)
+    return counts
 
 
 def filtered_count_key(count_query: Select[Any]) -> str:
@@ -87,25 +212,144 @@ def filtered_count_key(count_query: Select[Any]) -> str:
     return _FILTERED_KEY_PREFIX + hashlib.sha256(material.encode()).hexdigest()
 
 
+@dataclass(frozen=True)
+class CountEstimate:
+    """A cheap stand-in for a filtered count, and what the exact count would cost."""
+
+    total: int
+    # tag_links rows the exact count's semijoins would visit.
+    scan_links: int
+
+    @property
+    def over_budget(self) -> bool:
+        return self.scan_links > settings.FILTERED_COUNT_BUDGET_MS * _LINKS_PER_MS
+
+
+async def estimate_tag_count(
+    db: AsyncSession,
+    include_groups: list[set[int]],
+    exclude_ids: set[int],
+    redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
+    *,
+    public_only: bool,
+    hide_reposts: bool,
+) -> CountEstimate:
+    """Estimate a tag-only filtered count from tags.usage_count and the feed counts.
+
+    Each include group (an OR of tag ids) is at most the sum of its tags' usage
+    counts; groups, exclusions and visibility are combined assuming independence.
+    The result is a guess even for a single tag: usage_count counts its links on
+    images of every status, and the hidden and repost shares are the global ones,
+    not the tag's. Costs one PK lookup on tags plus the (cached) global feed counts.
+    """
+    every_tag = set().union(*include_groups, exclude_ids)
+    usage: dict[int, int] = {}
+    if every_tag:
+        rows = await db.execute(
+            select(Tags.tag_id, Tags.usage_count).where(  # type: ignore[call-overload]
+                Tags.tag_id.in_(every_tag)  # type: ignore[union-attr]
+            )
+        )
+        usage = {tag_id: count or 0 for tag_id, count in rows.tuples()}
+
+    group_sizes = [sum(usage.get(t, 0) for t in group) for group in include_groups]
+    excluded = sum(usage.get(t, 0) for t in exclude_ids)
+    scan_links = sum(group_sizes) + excluded
+
+    count_all, count_hidden, count_repost = await get_feed_counts(db, redis_client)
+    if count_all == 0 or not group_sizes:
+        return CountEstimate(total=0, scan_links=scan_links)
+
+    fraction = math.prod(min(1.0, size / count_all) for size in group_sizes)
+    fraction *= max(0.0, 1.0 - excluded / count_all)
+    hidden_share = (count_hidden if public_only else 0) + (count_repost if hide_reposts else 0)
+    fraction *= max(0.0, 1.0 - hidden_share / count_all)
+    total = min(round(count_all * fraction), min(group_sizes))
+    return CountEstimate(total=total, scan_links=scan_links)
+
+
 async def get_filtered_count(
     db: AsyncSession,
     count_query: Select[Any],
     redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
-) -> int:
+    estimate: CountEstimate | None = None,
+) -> tuple[int, bool]:
     """TTL-cached pagination total for a filtered (non-bare-feed) list_images query.
 
     Popular tag filters make the exact count a ~million-row semijoin (~700ms) that
     was recomputed on every page of every viewer; the page query itself is ~1ms.
     Same staleness contract as the global feed counts above.
+
+    Returns ``(total, is_estimate)``. On a cache miss with an over-budget
+    ``estimate``, the exact count is computed in the background, so the next
+    request past it gets the cached exact total. Meanwhile the last exact total
+    (the single-flight ``:stale`` copy) is served if there is one, and the
+    estimate only when there is none.
     """
     key = filtered_count_key(count_query)
-    if redis_client is not None:
-        cached = await redis_client.get(key)
+
+    async def exact_count() -> int:
+        return (await db.execute(count_query)).scalar() or 0
+
+    if redis_client is None:
+        return await exact_count(), False
+
+    # Estimate only when the exact count can be refined in the background.
+    if estimate is not None and estimate.over_budget and _client is not None:
+        cached, stale = await redis_client.mget(key, f"{key}:stale")
+        record_cache("feed_filtered_count", hit=cached is not None)
         if cached is not None:
-            return int(cached)
+            return int(cached), False
+        _schedule_refinement(key, count_query)
+        if stale is not None:
+            return int(stale), False
+        return estimate.total, True
+
+    total = await cached_single_flight(
+        redis_client,
+        key,
+        exact_count,
+        soft_ttl=FEED_COUNT_TTL,
+        hard_ttl=_FEED_COUNT_STALE_TTL,
+        loads=int,
+        dumps=str,
+        metric="feed_filtered_count",
+    )
+    return total, False
+
+
+def _schedule_refinement(key: str, count_query: Select[Any]) -> None:
+    if key in _refining:
+        return
+    task = asyncio.get_running_loop().create_task(_refine_filtered_count(key, count_query))
+    _refining[key] = task
+    task.add_done_callback(lambda _: _refining.pop(key, None))
+
 
-    total = (await db.execute(count_query)).scalar() or 0
+async def _refine_filtered_count(key: str, count_query: Select[Any]) -> None:
+    """Run an exact filtered count off the request path and cache it.
 
-    if redis_client is not None:
-        await redis_client.setex(key, FEED_COUNT_TTL, total)
-    return total
+    Uses its own session (on the read replica, when there is one) and the module
+    client: the request's are closed by the time this finishes. Single-flight,
+    so the API processes that all served an estimate for the same query run its
+    count once.
+    """
+    if _client is None:
+        return
+
+    async def exact_count() -> int:
+        async with get_async_read_session() as db:
+            return (await db.execute(count_query)).scalar() or 0
+
+    try:
+        await cached_single_flight(
+            _client,
+            key,
+            exact_count,
+            soft_ttl=FEED_COUNT_TTL,
+            hard_ttl=_FEED_COUNT_STALE_TTL,
+            loads=int,
+            dumps=str,
+        )
+    except Exception:
+        logger.warning("filtered_count_refine_failed", key=key, exc_info=True)
@@ -0,0 +1,133 @@
+"""Rendered-response cache for shared image listings.
+
+Anonymous visitors on the home feed, and everyone on tag pages, get the same
+response for the same query, so ``list_images`` (anonymous viewers) and
+``get_images_by_tag`` (every viewer) store the rendered JSON in Redis and serve
+it back as bytes: one Redis round trip, no count, no imageset, no serialization.
+
+Invalidation is by generation. ``feed_cache:generation`` is bumped after every
+image, status or tag mutation (``bump_feed_generation``), and entries are keyed
+under the generation current when their request started, so a bump orphans
+every entry at once (they age out by TTL) and a render that raced a mutation
+lands under the old generation, where it is never read. The ETag combines the
+generation with a digest of the body, so clients revalidate to a 304 until the
+next mutation, or until the entry re-renders with different content.
+
+Only processes that call :func:`start_feed_response_cache` (the API lifespan and
+the arq worker) cache or invalidate; elsewhere lookups miss without caching, since
+nothing would bump the generation there.
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.core.redis import shared_redis
+
+logger = get_logger(__name__)
+
+GENERATION_KEY = "feed_cache:generation"
+_ENTRY_KEY_PREFIX = "feed_cache:entry:"
+
+# Clients must revalidate every time; the ETag makes that a 304 when nothing changed.
+CACHE_CONTROL = "no-cache"
+
+# Read the generation and the entry for it in one round trip.
+_READ_SCRIPT = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+return {generation, redis.call('GET', ARGV[1] .. generation)}
+"""
+
+_client: redis.Redis | None = None  # type: ignore[type-arg]
+
+
+async def start_feed_response_cache() -> None:
+    """Take the shared client for the cache (API lifespan / worker startup, after
+    ``start_redis``)."""
+    global _client
+    _client = shared_redis()
+
+
+async def stop_feed_response_cache() -> None:
+    global _client
+    _client = None
+
+
+async def bump_feed_generation() -> None:
+    """Invalidate every cached listing. Call after the commit of an image, status or
+    tag mutation; best-effort, entries also expire on their own."""
+    if _client is None:
+        return
+    try:
+        await _client.incr(GENERATION_KEY)
+    except Exception:
+        logger.warning("feed_cache_bump_failed", exc_info=True)
+
+
+def _query_digest(request: Request) -> str:
+    """The request's path and query, normalized: parameter order and blank values
+    don't make distinct entries."""
+    params = sorted((k, v) for k, v in request.query_params.multi_items() if v.strip())
+    material = request.url.path.rstrip("/") + "?" + repr(params)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match per RFC 7232 §3.2: '*' or a comma-separated list of ETags."""
+    inm = request.headers.get("if-none-match", "").strip()
+    if inm == "*":
+        return True
+    return etag in {token.strip() for token in inm.split(",") if token.strip()}
+
+
+def _response(request: Request, etag: str, body: str) -> Response:
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if _is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@dataclass
+class FeedCacheSlot:
+    """A cache miss for one request: where its rendered response goes."""
+
+    client: redis.Redis  # type: ignore[type-arg]
+    request: Request
+    key: str
+    generation: str
+
+    async def store(self, payload: BaseModel) -> Response:
+        """Render ``payload``, cache it under this slot, and answer the request with it."""
+        body = payload.model_dump_json(by_alias=True)
+        digest = hashlib.sha1(body.encode()).hexdigest()[:16]
+        etag = f'W/"{self.generation}-{digest}"'
+        try:
+            await self.client.setex(self.key, settings.FEED_RESPONSE_CACHE_TTL, f"{etag}\n{body}")
+        except Exception:
+            logger.warning("feed_cache_store_failed", exc_info=True)
+        return _response(self.request, etag, body)
+
+
+async def lookup_feed_response(request: Request) -> Response | FeedCacheSlot | None:
+    """The cached response for ``request``, or the slot to store it in on a miss.
+
+    None means "don't cache" (cache off or Redis unavailable): render as usual.
+    """
+    client = _client
+    if client is None or settings.FEED_RESPONSE_CACHE_TTL <= 0:
+        return None
+    prefix = f"{_ENTRY_KEY_PREFIX}{_query_digest(request)}:"
+    try:
+        generation, entry = await client.eval(_READ_SCRIPT, 1, GENERATION_KEY, prefix)  # type: ignore[misc]
+    except Exception:
+        logger.warning("feed_cache_lookup_failed", exc_info=True)
+        return None
+    if entry is not None:
+        etag, _, body = entry.partition("\n")
+        return _response(request, etag, body)
+    return FeedCacheSlot(client, request, prefix + str(generation), str(generation))
@@ -9,12 +9,12 @@ from typing import Any
 from feedgenerator import Atom1Feed, Enclosure  # type: ignore[import-untyped]
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.config import ImageStatus, TagType, settings
 from app.models.image import Images
 from app.models.tag_link import TagLinks
 from app.schemas.image import ImageDetailedResponse
+from app.services.image_list_loader import image_list_load, load_tag_summaries
 
 TAG_TYPE_NAME: dict[int, str] = {
     TagType.THEME: "Theme",
@@ -154,19 +154,16 @@ async def fetch_feed_entries(
 ) -> list[ImageDetailedResponse]:
     """Full hydration query for feed rendering.
 
-    Eager-loads the uploader and every linked tag (plus the tag row itself for
-    title/type). Converts results via ImageDetailedResponse.from_db_model, which
-    handles the tag_links -> tags mapping that from_attributes cannot do.
+    Loads the list-page image columns with the uploader summary, plus every
+    linked tag (title/type/usage) via load_tag_summaries, and converts results
+    via ImageDetailedResponse.from_db_model.
     """
     if tag_ids == []:
         return []
 
     query = (
         select(Images)
-        .options(
-            selectinload(Images.user),  # type: ignore[arg-type]
-            selectinload(Images.tag_links).selectinload(TagLinks.tag),  # type: ignore[arg-type]
-        )
+        .options(*image_list_load())
         .where(Images.status == ImageStatus.ACTIVE)  # type: ignore[arg-type]
         .order_by(Images.image_id.desc())  # type: ignore[union-attr]
         .limit(limit)
@@ -183,7 +180,11 @@ async def fetch_feed_entries(
 
     result = await db.execute(query)
     images = result.scalars().all()
-    return [ImageDetailedResponse.from_db_model(image) for image in images]
+    tags_by_image = await load_tag_summaries(db, [image.image_id for image in images])  # type: ignore[misc]
+    return [
+        ImageDetailedResponse.from_db_model(image, tags=tags_by_image[image.image_id])  # type: ignore[index]
+        for image in images
+    ]
 
 
 class _ShuushuuAtom1Feed(Atom1Feed):  # type: ignore[misc]
@@ -0,0 +1,112 @@
+"""
+Lean row loading for image list pages.
+
+A 100-image page loaded with ``selectinload(Images.tag_links).selectinload(TagLinks.tag)``
+builds ~2,000 TagLinks and Tags ORM objects (identity map, instance state, every
+column of every tag) only for ``from_db_model`` to copy four fields out of each.
+List endpoints use these two helpers instead:
+
+- :func:`image_list_load` is the query option: only the image columns the list
+  responses (and keyset cursors) read, plus the ``image_uploader_load()`` summary.
+- :func:`load_tag_summaries` fetches the page's tags as plain
+  (image_id, tag_id, title, type, usage_count) rows in one query and returns them
+  as ``TagSummary`` lists in display order, ready for ``from_db_model(tags=...)``.
+
+Columns left out (``ip``, ``iqdb_hash``, moderation bookkeeping, tag-type flags)
+are deferred, and touching one on a list row raises instead of lazy-loading
+under asyncio, so a response field that needs another column must be added here.
+"""
+
+from collections import defaultdict
+from collections.abc import Collection
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Load, load_only
+
+from app.core.user_loader import image_uploader_load
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+from app.schemas.image import TAG_TYPE_SORT_ORDER, TagSummary
+
+# Every Images column ImageDetailedResponse reads, plus the sort columns a keyset
+# cursor is encoded from (date_added, last_post, total_pixels).
+_LIST_COLUMNS = (
+    Images.image_id,
+    Images.user_id,
+    Images.filename,
+    Images.ext,
+    Images.original_filename,
+    Images.md5_hash,
+    Images.filesize,
+    Images.width,
+    Images.height,
+    Images.caption,
+    Images.miscmeta,
+    Images.source_url,
+    Images.status,
+    Images.rating,
+    Images.locked,
+    Images.posts,
+    Images.favorites,
+    Images.bayesian_rating,
+    Images.num_ratings,
+    Images.date_added,
+    Images.medium,
+    Images.large,
+    Images.last_post,
+    Images.total_pixels,
+    Images.replacement_id,
+    Images.reason_category,
+    Images.status_reason,
+    Images.r2_location,
+)
+
+
+def image_list_load() -> tuple[Load, Load]:
+    """
+    Return the load options for a list page's image rows.
+
+    Usage: select(Images).options(*image_list_load())
+
+    Pair with :func:`load_tag_summaries` for the tags; the rows carry no
+    tag_links.
+    """
+    return (
+        load_only(*_LIST_COLUMNS),  # type: ignore[arg-type]
+        image_uploader_load(),
+    )
+
+
+async def load_tag_summaries(
+    db: AsyncSession, image_ids: Collection[int]
+) -> dict[int, list[TagSummary]]:
+    """Tags of ``image_ids`` by image, in display order (type, then title).
+
+    Images without tags map to an empty list.
+    """
+    by_image: dict[int, list[TagSummary]] = {image_id: [] for image_id in image_ids}
+    if not by_image:
+        return by_image
+    rows = await db.execute(
+        select(  # type: ignore[call-overload]
+            TagLinks.image_id,
+            Tags.tag_id,
+            Tags.title,
+            Tags.type,
+            Tags.usage_count,
+        )
+        .join(Tags, Tags.tag_id == TagLinks.tag_id)
+        .where(TagLinks.image_id.in_(by_image))  # type: ignore[attr-defined]
+    )
+    grouped: defaultdict[int, list[tuple[int, str, int, int]]] = defaultdict(list)
+    for image_id, tag_id, title, tag_type, usage_count in rows.tuples():
+        grouped[image_id].append((tag_id, title, tag_type, usage_count))
+    for image_id, tags in grouped.items():
+        tags.sort(key=lambda t: (TAG_TYPE_SORT_ORDER.get(t[2], 99), (t[1] or "").lower()))
+        by_image[image_id] = [
+            TagSummary(tag_id=tag_id, title=title, type=tag_type, usage_count=usage_count or 0)
+            for tag_id, title, tag_type, usage_count in tags
+        ]
+    return by_image
@@ -1,10 +1,11 @@
 """Side effects for image status transitions.
 
-Currently just the R2 bucket-move enqueue. Any status-change code path must
-route through this helper (or enqueue `sync_image_status_job` directly) so
-the canonical R2 object follows the public/protected boundary — otherwise
-a public→protected transition leaves the image reachable via CDN until the
-edge TTL expires.
+The R2 bucket-move enqueue, plus the post-commit Redis updates (feed counters,
+subtree counts, feed response cache) that ride along with it. Any status-change
+code path must route through this helper (or enqueue `sync_image_status_job`
+directly) so the canonical R2 object follows the public/protected boundary —
+otherwise a public→protected transition leaves the image reachable via CDN
+until the edge TTL expires.
 """
 
 from datetime import UTC, datetime
@@ -20,6 +21,7 @@ from app.models.image import Images
 from app.models.image_status_history import ImageStatusHistory
 from app.models.user import Users
 from app.services.ml_suggestion_lifecycle import sync_suggestions_for_status_transition
+from app.services.post_commit import after_image_status_change
 from app.services.repost import migrate_repost_data
 from app.services.review_lifecycle import supersede_open_reviews_for_status_change
 from app.tasks.queue import enqueue_job
@@ -39,7 +41,11 @@ async def enqueue_r2_sync_on_status_change(
     be called AFTER the DB commit that persists `new_status`; the worker
     loads the row in a fresh session and derives the destination bucket
     from its current status.
+
+    Also runs ``post_commit.after_image_status_change``, which every
+    committed status change needs regardless of R2.
     """
+    await after_image_status_change(image_id, old_status, new_status)
     if not settings.R2_ENABLED or old_status == new_status:
         return
     if (old_status in PUBLIC_IMAGE_STATUSES_FOR_R2) == (new_status in PUBLIC_IMAGE_STATUSES_FOR_R2):
@@ -9,6 +9,7 @@ Determines whether a user can view an image file based on:
 Note: This controls FILE access only. API metadata endpoints remain unrestricted.
 """
 
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import ImageStatus
@@ -26,6 +27,21 @@ PUBLIC_IMAGE_STATUSES: frozenset[int] = frozenset(
     }
 )
 
+# Moderators: see every image file and every image's moderation reason.
+IMAGE_MODERATOR_PERMISSIONS: list[str | Permission] = [
+    Permission.IMAGE_EDIT,
+    Permission.REVIEW_VIEW,
+]
+
+
+async def can_moderate_images(
+    db: AsyncSession,
+    user_id: int,
+    redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
+) -> bool:
+    """Whether the user holds IMAGE_EDIT or REVIEW_VIEW (cache-backed with Redis)."""
+    return await has_any_permission(db, user_id, IMAGE_MODERATOR_PERMISSIONS, redis_client)
+
 
 async def can_view_image_file(
     image: Images,
@@ -66,8 +82,4 @@ async def can_view_image_file(
 
     # Moderators can view all - check for IMAGE_EDIT or REVIEW_VIEW
     assert user.user_id is not None
-    return await has_any_permission(
-        db,
-        user.user_id,
-        [Permission.IMAGE_EDIT, Permission.REVIEW_VIEW],
-    )
+    return await can_moderate_images(db, user.user_id)
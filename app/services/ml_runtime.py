@@ -14,6 +14,7 @@ from fastapi import HTTPException, status
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import Gauge, Labels
 
 if TYPE_CHECKING:
     from app.services.ml_service import MLTagSuggestionService
@@ -23,6 +24,8 @@ logger = get_logger(__name__)
 _ml_service: MLTagSuggestionService | None = None
 _ml_service_lock = asyncio.Lock()
 _inference_semaphore = asyncio.Semaphore(settings.ML_ANALYZE_CONCURRENCY)
+_inference_waiting = 0
+_inference_in_flight = 0
 
 
 class InferenceBusy(HTTPException):
@@ -73,6 +76,8 @@ async def inference_slot() -> AsyncIterator[None]:
     inferences and only get a 429 under sustained overload. Waiting coroutines
     suspend (no thread/core held), so the queue itself is free.
     """
+    global _inference_waiting, _inference_in_flight
+    _inference_waiting += 1
     try:
         await asyncio.wait_for(
             _inference_semaphore.acquire(),
@@ -80,12 +85,28 @@ async def inference_slot() -> AsyncIterator[None]:
         )
     except TimeoutError:
         raise InferenceBusy() from None
+    finally:
+        _inference_waiting -= 1
+    _inference_in_flight += 1
     try:
         yield
     finally:
+        _inference_in_flight -= 1
         _inference_semaphore.release()
 
 
+def _inference_slot_stats() -> dict[Labels, float]:
+    return {("waiting",): _inference_waiting, ("in_flight",): _inference_in_flight}
+
+
+Gauge(
+    "ml_inference_slots",
+    "Inference calls holding a slot (in_flight) or queued for one (waiting).",
+    _inference_slot_stats,
+    ("state",),
+)
+
+
 async def warm_load_if_enabled() -> None:
     """Pre-load the model at API startup when the feature is on, so the first
     /analyze doesn't eat the ~1.5 s cold load. Never raises: a load failure is
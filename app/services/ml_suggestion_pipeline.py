@@ -27,6 +27,7 @@ from app.models.tag import Tags
 from app.models.tag_link import TagLinks
 from app.services.ml_categories import SUGGESTION_CATEGORIES
 from app.services.ml_raw_store import ingest_raw_predictions
+from app.services.tag_graph import get_tag_graph
 from app.services.tag_mapping_service import resolve_external_tags
 from app.services.tag_resolver import resolve_tag_relationships
 
@@ -162,6 +163,9 @@ async def fetch_parent_map(db: AsyncSession, tag_ids: set[int]) -> dict[int, int
     tags outside the input set. Depth-capped at 10 like
     filter_redundant_suggestions' walk.
     """
+    graph = get_tag_graph()
+    if graph is not None:
+        return graph.parent_map(tag_ids)
     parent_of: dict[int, int | None] = {}
     to_fetch = set(tag_ids)
     for _ in range(10):
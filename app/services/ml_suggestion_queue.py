@@ -17,6 +17,7 @@ from sqlalchemy.orm import aliased
 from app.models.ml_tag_suggestion import MlTagSuggestions
 from app.models.tag import Tags
 from app.models.tag_link import TagLinks
+from app.services.tag_graph import get_tag_graph
 
 # Anti-join: excludes suggestions whose tag is already applied to the image.
 # Tags can be applied without going through the review flow (manual tag add,
@@ -36,6 +37,9 @@ async def _descendant_tag_ids(db: AsyncSession, tag_id: int) -> set[int]:
     """All tags whose inheritedfrom chain leads to ``tag_id`` (children,
     grandchildren, ...), excluding ``tag_id`` itself. Breadth-first with the
     same depth cap the pipeline's ancestor walks use."""
+    graph = get_tag_graph()
+    if graph is not None:
+        return set(graph.descendant_ids(tag_id))
     descendants: set[int] = set()
     frontier = {tag_id}
     for _ in range(10):
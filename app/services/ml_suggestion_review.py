@@ -26,7 +26,7 @@ from app.schemas.ml_tag_suggestion import (
     ReviewSuggestionsResponse,
 )
 from app.services.ml_suggestion_pipeline import fetch_parent_map
-from app.services.search import sync_tags_to_search
+from app.services.post_commit import after_tag_links_change, after_tags_change
 from app.services.tag_type_flags import refresh_image_tag_type_flags
 
 
@@ -144,7 +144,7 @@ async def _apply_reviews_for_image(
     - set status / reviewed_at / reviewed_by_user_id on each suggestion row
     - refresh_image_tag_type_flags(db, image_id) when any TagLink was created
 
-    Does NOT call db.commit() and does NOT call sync_tags_to_search.
+    Does NOT call db.commit() and does NOT call after_tags_change.
     Returns (created_link_tag_ids, removed_suggestion_ids): the set of
     canonical tag_ids for which a new TagLink was created, and the
     suggestion_ids of any PENDING ancestor suggestions cascade-deleted as a
@@ -304,13 +304,15 @@ async def review_ml_tag_suggestions(
         removed_suggestion_ids,
     ) = await retry_on_transient_conflict(db, _apply, what="ml_review_apply")
 
-    # Sync affected tags to Meilisearch (usage_count updated by DB trigger).
+    # Refresh the affected tags in autocomplete and search (usage_count updated
+    # by DB trigger).
     # Non-DB side effect: stays outside the retried unit so it never repeats.
     if created:
         tag_results = await db.execute(
             select(Tags).where(Tags.tag_id.in_(created))  # type: ignore[union-attr]
         )
-        await sync_tags_to_search(list(tag_results.scalars().all()), db=db)
+        await after_tags_change(list(tag_results.scalars().all()))
+        await after_tag_links_change(db, [image_id], created)
 
     return ReviewSuggestionsResponse(
         approved=approved_count,
@@ -331,7 +333,7 @@ async def bulk_review_suggestions(
     by image_id, then calls _apply_reviews_for_image once per distinct image.
     Missing suggestion_ids go to errors without aborting valid ones.
 
-    Emits a single db.commit() and a single batched sync_tags_to_search over
+    Emits a single db.commit() and a single batched after_tags_change over
     all created TagLinks — never N commits or N syncs.
     """
     suggestion_ids = [r["suggestion_id"] for r in reviews]
@@ -345,7 +347,13 @@ async def bulk_review_suggestions(
     # the other writer are visible under the new snapshot (no double-apply),
     # and rows the other writer removed simply fall through to the
     # missing-suggestion errors path.
+    # Images that gained a TagLink in the committed attempt, for the
+    # posting-list sync below. Reset per attempt so a rolled-back one
+    # doesn't leak into it.
+    linked_image_ids: set[int] = set()
+
     async def _apply() -> tuple[int, int, list[str], set[int], list[int]]:
+        linked_image_ids.clear()
         suggestions_result = await db.execute(
             select(MlTagSuggestions).where(
                 MlTagSuggestions.suggestion_id.in_(suggestion_ids)  # type: ignore[union-attr]
@@ -385,6 +393,8 @@ async def bulk_review_suggestions(
                 db, image_id, items, user_id
             )
             all_created_tag_ids |= created
+            if created:
+                linked_image_ids.add(image_id)
             all_removed_suggestion_ids.extend(removed_suggestion_ids)
 
         # Single commit spanning all images.
@@ -406,13 +416,14 @@ async def bulk_review_suggestions(
         all_removed_suggestion_ids,
     ) = await retry_on_transient_conflict(db, _apply, what="ml_review_bulk_apply")
 
-    # Single batched search-sync over the union of created tag_ids.
+    # Single batched tag refresh over the union of created tag_ids.
     # Non-DB side effect: stays outside the retried unit so it never repeats.
     if all_created_tag_ids:
         tag_results = await db.execute(
             select(Tags).where(Tags.tag_id.in_(all_created_tag_ids))  # type: ignore[union-attr]
         )
-        await sync_tags_to_search(list(tag_results.scalars().all()), db=db)
+        await after_tags_change(list(tag_results.scalars().all()))
+        await after_tag_links_change(db, linked_image_ids, all_created_tag_ids)
 
     return ReviewSuggestionsResponse(
         approved=approved_count,
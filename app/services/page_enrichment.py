@@ -0,0 +1,104 @@
+"""Concurrent per-page lookups for image list endpoints.
+
+Once a list endpoint has its page of images it still needs a handful of small
+lookups keyed on the page's ids: the viewer's favorites, open reports, permission
+checks, ML pending counts, tags and their context sources, comments. None of them
+depends on another, but an AsyncSession runs one statement at a time, so on the
+request's session they add up to one round trip after another.
+
+:func:`gather_stages` runs them as independent stages, each on its own session
+(and so its own pooled connection) against the request session's engine. A
+stage is a callable taking the session to use; it must return plain data (ids,
+counts, response models), never ORM instances, because its session is closed
+when it finishes.
+
+Those extra connections come out of one budget for the whole process,
+``PAGE_ENRICHMENT_CONNECTIONS``, taken without waiting: a stage that finds the
+budget spent runs on the request session instead, one at a time with the
+request's other such stages. A request never waits for a connection while
+holding its own, so a burst of list requests cannot fill the pool with
+connections that are each waiting for another one.
+
+When the request session is bound to a connection rather than an engine (the
+test suite's transaction-per-test sessions) or the budget is 0, the stages run
+one after another on the request session instead, with the same results.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Collection
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.config import settings
+from app.models.favorite import Favorites
+from app.schemas.image import TagSummary
+from app.services.image_list_loader import load_tag_summaries
+from app.services.tag_context import stamp_tag_context
+
+type Stage[T] = Callable[[AsyncSession], Awaitable[T]]
+
+# Stage sessions open right now, across every request in the process.
+_connections_in_use = 0
+
+
+async def gather_stages(db: AsyncSession, *stages: Stage[Any] | None) -> list[Any]:
+    """Run ``stages`` concurrently and return their results in order.
+
+    A None stage (one the caller skipped for this viewer) yields None.
+    """
+    active = [stage for stage in stages if stage is not None]
+    bind = db.bind
+    if (
+        len(active) < 2
+        or settings.PAGE_ENRICHMENT_CONNECTIONS < 1
+        or not isinstance(bind, AsyncEngine)
+    ):
+        return [await stage(db) if stage is not None else None for stage in stages]
+
+    on_request_session = asyncio.Lock()
+
+    async def run(stage: Stage[Any]) -> Any:
+        global _connections_in_use
+        # Check-and-take has no await in between, so it is atomic on the loop.
+        if _connections_in_use >= settings.PAGE_ENRICHMENT_CONNECTIONS:
+            async with on_request_session:
+                return await stage(db)
+        _connections_in_use += 1
+        try:
+            async with AsyncSession(bind=bind, expire_on_commit=False) as session:
+                return await stage(session)
+        finally:
+            _connections_in_use -= 1
+
+    results = iter(await asyncio.gather(*(run(stage) for stage in active)))
+    return [next(results) if stage is not None else None for stage in stages]
+
+
+def viewer_favorites(user_id: int, image_ids: Collection[int]) -> Stage[set[int]]:
+    """Stage: the subset of ``image_ids`` the viewer has favorited."""
+
+    async def stage(db: AsyncSession) -> set[int]:
+        if not image_ids:
+            return set()
+        rows = await db.execute(
+            select(Favorites.image_id).where(  # type: ignore[call-overload]
+                Favorites.user_id == user_id,
+                Favorites.image_id.in_(image_ids),  # type: ignore[attr-defined]
+            )
+        )
+        return set(rows.scalars().all())
+
+    return stage
+
+
+def page_tags(image_ids: Collection[int]) -> Stage[dict[int, list[TagSummary]]]:
+    """Stage: load_tag_summaries for the page, context sources already stamped."""
+
+    async def stage(db: AsyncSession) -> dict[int, list[TagSummary]]:
+        by_image = await load_tag_summaries(db, image_ids)
+        await stamp_tag_context(db, list(by_image.values()))
+        return by_image
+
+    return stage
@@ -0,0 +1,96 @@
+"""Post-commit hooks for image, tag-link and tag changes.
+
+Several Redis structures mirror what the database says about an image:
+
+- the tag posting lists (app/services/tag_postings.py);
+- the tag page's subtree counts (app/services/tag_subtree_counts.py);
+- the global feed counters (app/services/feed_count_cache.py);
+- the rendered anonymous listings (app/services/feed_response_cache.py).
+
+A write path calls one hook here after its commit and gets all of them
+brought up to date:
+
+- :func:`after_tag_links_change` from every tag_links write path;
+- :func:`after_image_status_change` from
+  ``image_status.enqueue_r2_sync_on_status_change``, which every status
+  change goes through.
+
+A parent or alias edit, or deleting a tag with children, calls
+:func:`after_tag_hierarchy_change`: the subtree counts only follow a hierarchy
+on rebuild.
+
+Tag edits have hooks of their own: :func:`after_tags_change` and
+:func:`after_tag_delete` update this process's tag autocomplete index and ask
+the worker to drain the search outbox (app/services/search_outbox.py), which
+the tags triggers have already queued the change in. Handlers never wait on
+Meilisearch.
+
+Every hook is best-effort: each structure logs its own Redis failures and is
+repaired by its nightly rebuild or TTL.
+"""
+
+from collections.abc import Collection, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tag import Tags
+from app.services.feed_count_cache import record_feed_count_change
+from app.services.feed_response_cache import bump_feed_generation
+from app.services.search_outbox import request_drain
+from app.services.tag_autocomplete import tag_deleted, tags_changed
+from app.services.tag_postings import sync_tag_postings
+from app.services.tag_subtree_counts import (
+    record_subtree_status_change,
+    record_tag_hierarchy_change,
+    sync_tag_subtree_counts,
+)
+
+
+async def after_tag_links_change(
+    db: AsyncSession,
+    image_ids: Collection[int],
+    tag_ids: Collection[int] | None = None,
+) -> None:
+    """Bring the Redis mirrors in line with the committed tag_links of ``image_ids``.
+
+    ``tag_ids`` are the tags whose links changed. Pass None when the caller
+    doesn't track them (uploads, repost migration, image deletion), and every
+    indexed tag is rechecked. The cached listings are always invalidated: the
+    tag pages list images of every status, and count them.
+    """
+    if not image_ids:
+        return
+    await sync_tag_postings(db, image_ids, tag_ids)
+    await sync_tag_subtree_counts(db, image_ids)
+    await bump_feed_generation()
+
+
+async def after_image_status_change(image_id: int, old_status: int, new_status: int) -> None:
+    """Move the image between the feed counters and subtree counts, and invalidate
+    the cached listings."""
+    await record_feed_count_change(old_status, new_status)
+    if old_status != new_status:
+        await bump_feed_generation()
+        await record_subtree_status_change(image_id, new_status)
+
+
+async def after_tag_hierarchy_change() -> None:
+    """Send tag pages to SQL until the subtree counts are rebuilt for the new hierarchy."""
+    await record_tag_hierarchy_change()
+
+
+async def after_tags_change(tags: Sequence[Tags]) -> None:
+    """Show committed tag creates/edits in autocomplete now and in search after a drain.
+
+    ``tags`` must be loaded or refreshed after the commit: the index copies their fields.
+    """
+    if not tags:
+        return
+    await tags_changed(tags)
+    await request_drain()
+
+
+async def after_tag_delete(tag_id: int) -> None:
+    """Drop a deleted tag from autocomplete now and from search after a drain."""
+    await tag_deleted(tag_id)
+    await request_drain()
@@ -12,6 +12,7 @@ import redis.asyncio as redis
 from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.single_flight import cached_single_flight
 from app.models import ImageRatings, Images
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,8 @@ logger = logging.getLogger(__name__)
 # These change negligibly per individual rating so a 5-minute TTL is fine.
 _GLOBAL_RATING_STATS_KEY = "rating:global_stats"
 _GLOBAL_RATING_STATS_TTL = 300
+# Served past the TTL only while one caller recomputes (app/core/single_flight.py).
+_GLOBAL_RATING_STATS_STALE_TTL = 3600
 
 
 @dataclass
@@ -38,45 +41,43 @@ async def _get_global_rating_stats(
     """
     Get global rating statistics (C and m) for Bayesian calculation.
 
-    Uses Redis cache when available to avoid full table scans on image_ratings.
+    Uses Redis cache when available to avoid full table scans on image_ratings;
+    an expired entry is recomputed single-flight, so a burst of rating jobs
+    scans the table once.
 
     Returns:
         Tuple of (avg_ratings_per_image, global_avg_rating)
     """
-    # Try cache first
-    if redis_client is not None:
-        cached = await redis_client.get(_GLOBAL_RATING_STATS_KEY)
-        if cached:
-            try:
-                data = json.loads(cached)
-                return float(data["c"]), float(data["m"])
-            except json.JSONDecodeError, KeyError, TypeError:
-                pass
-
-    # Cache miss or no Redis — query database
-    avg_ratings_per_image_result = await db.execute(
-        select(
-            # NULLIF: with zero ratings this is 0/0 — NULL on MySQL but an
-            # error on Postgres. NULL falls through to the 10.0 default below
-            # on both.
-            func.count(ImageRatings.user_id)  # type: ignore[arg-type]
-            / func.nullif(func.count(func.distinct(ImageRatings.image_id)), 0)
-        )
-    )
-    avg_ratings_per_image = float(avg_ratings_per_image_result.scalar() or 10.0)
 
-    global_avg_rating_result = await db.execute(select(func.avg(ImageRatings.rating)))
-    global_avg_rating = float(global_avg_rating_result.scalar() or 5.0)
-
-    # Store in cache
-    if redis_client is not None:
-        await redis_client.setex(
-            _GLOBAL_RATING_STATS_KEY,
-            _GLOBAL_RATING_STATS_TTL,
-            json.dumps({"c": avg_ratings_per_image, "m": global_avg_rating}),
+    async def compute() -> tuple[float, float]:
+        avg_ratings_per_image_result = await db.execute(
+            select(
+                # NULLIF: with zero ratings this is 0/0 — NULL on MySQL but an
+                # error on Postgres. NULL falls through to the 10.0 default below
+                # on both.
+                func.count(ImageRatings.user_id)  # type: ignore[arg-type]
+                / func.nullif(func.count(func.distinct(ImageRatings.image_id)), 0)
+            )
         )
-
-    return avg_ratings_per_image, global_avg_rating
+        avg_ratings_per_image = float(avg_ratings_per_image_result.scalar() or 10.0)
+
+        global_avg_rating_result = await db.execute(select(func.avg(ImageRatings.rating)))
+        global_avg_rating = float(global_avg_rating_result.scalar() or 5.0)
+        return avg_ratings_per_image, global_avg_rating
+
+    def loads(raw: str) -> tuple[float, float]:
+        data = json.loads(raw)
+        return float(data["c"]), float(data["m"])
+
+    return await cached_single_flight(
+        redis_client,
+        _GLOBAL_RATING_STATS_KEY,
+        compute,
+        soft_ttl=_GLOBAL_RATING_STATS_TTL,
+        hard_ttl=_GLOBAL_RATING_STATS_STALE_TTL,
+        loads=loads,
+        dumps=lambda stats: json.dumps({"c": stats[0], "m": stats[1]}),
+    )
 
 
 async def recalculate_image_ratings(
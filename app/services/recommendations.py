@@ -20,6 +20,7 @@ from sqlalchemy import bindparam, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import ImageStatus, settings
+from app.core.viewer_context import ViewerContext
 from app.models.character_source_link import CharacterSourceLinks
 from app.models.tag import Tags
 from app.models.user import Users
@@ -116,7 +117,12 @@ def compose_day_list(
 
 
 async def get_recommended_images(
-    db: AsyncSession, user: Users, *, page: int, per_page: int, day: date | None = None
+    db: AsyncSession,
+    user: Users | ViewerContext,
+    *,
+    page: int,
+    per_page: int,
+    day: date | None = None,
 ) -> RecommendationPage:
     """Compose one page of the caller's seeded day list.
 
@@ -280,7 +286,9 @@ def _visibility_sql(show_all: bool, hide_reposts: bool) -> tuple[str, str, dict[
     return status_clause, hide_reposts_clause, params
 
 
-async def load_favorite_pools(db: AsyncSession, user: Users, *, cap: int) -> list[FavoritePool]:
+async def load_favorite_pools(
+    db: AsyncSession, user: Users | ViewerContext, *, cap: int
+) -> list[FavoritePool]:
     """The user's favorites as per-favorite recent-match lists, ordered combos
     (by position) then favorite tags (sources before artists, by position).
     Recall is per favorite so the composer's round-robin can keep one prolific
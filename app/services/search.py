@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 from typing import Any
 
 from meilisearch_python_sdk import AsyncClient
@@ -14,11 +16,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.logging import get_logger
 from app.models.tag import Tags
 from app.models.tag_external_link import TagExternalLinks
+from app.schemas.search import TagSearchHit
+from app.services.tag_autocomplete import tag_deleted, tags_changed
 
 logger = get_logger(__name__)
 
 TAGS_INDEX_NAME = "tags"
 
+# Bump when the document shape changes. /search answers from documents of this
+# version alone and hydrates older ones from the database, so a deploy keeps
+# serving correct hits until scripts/reindex_search.py rewrites the index.
+TAG_DOCUMENT_VERSION = 2
+
 # Module-level reference set during app lifespan
 _search_service: SearchService | None = None
 
@@ -29,42 +38,42 @@ def set_search_service(service: SearchService | None) -> None:
     _search_service = service
 
 
-async def _get_parent_usage_count(db: AsyncSession, alias_of: int) -> int | None:
-    """Look up a parent tag's usage_count. Returns None if not found."""
-    result = await db.execute(
-        select(Tags.usage_count).where(Tags.tag_id == alias_of)  # type: ignore[call-overload]
-    )
-    return result.scalar_one_or_none()
-
-
-async def _get_parent_usage_counts(db: AsyncSession, tags: list[Tags]) -> dict[int, int]:
-    """Look up parent usage_counts for all alias tags in a batch.
+async def _get_alias_parents(db: AsyncSession, tags: list[Tags]) -> dict[int, tuple[str, int]]:
+    """Look up the parent (title, usage_count) of every alias tag in a batch.
 
-    Returns a mapping of alias tag_id -> parent usage_count.
+    Returns a mapping of alias tag_id -> (parent title, parent usage_count).
     """
     alias_tags = {tag.tag_id: tag.alias_of for tag in tags if tag.alias_of is not None}
     if not alias_tags:
         return {}
     parent_ids = set(alias_tags.values())
     result = await db.execute(
-        select(Tags.tag_id, Tags.usage_count).where(  # type: ignore[call-overload]
+        select(Tags.tag_id, Tags.title, Tags.usage_count).where(  # type: ignore[call-overload]
             Tags.tag_id.in_(parent_ids)  # type: ignore[union-attr]
         )
     )
-    parent_counts: dict[int, int] = {row.tag_id: row.usage_count for row in result.all()}
+    parents = {row.tag_id: (row.title, row.usage_count) for row in result.all()}
     return {
-        alias_id: parent_counts[parent_id]  # type: ignore[misc]
+        alias_id: parents[parent_id]  # type: ignore[misc]
         for alias_id, parent_id in alias_tags.items()
-        if parent_id in parent_counts
+        if parent_id in parents
     }
 
 
-async def _get_external_urls(db: AsyncSession, tag_id: int) -> list[str]:
-    """Fetch external URLs for a single tag."""
+async def _get_aliases(db: AsyncSession, tags: list[Tags]) -> list[Tags]:
+    """The alias tags pointing at any of ``tags``.
+
+    Their documents carry the parent's title and usage_count, so they are
+    re-indexed whenever the parent is. Loaded with populate_existing: a
+    long-lived session (the outbox drain) may already hold them with old values.
+    """
+    parent_ids = [tag.tag_id for tag in tags if tag.alias_of is None]
+    if not parent_ids:
+        return []
     result = await db.execute(
-        select(TagExternalLinks.url).where(  # type: ignore[call-overload]
-            TagExternalLinks.tag_id == tag_id
-        )
+        select(Tags)
+        .where(Tags.alias_of.in_(parent_ids))  # type: ignore[union-attr]
+        .execution_options(populate_existing=True)
     )
     return list(result.scalars().all())
 
@@ -93,27 +102,28 @@ async def sync_tag_to_search(
     db: AsyncSession | None = None,
     service: SearchService | None = None,
 ) -> None:
-    """Sync a tag to Meilisearch. Best-effort -- never raises.
+    """Sync a tag to Meilisearch directly. Best-effort -- never raises.
 
-    Awaits the Meilisearch call but runs after the MySQL commit, so the
-    write path has already succeeded. Typically completes in <10ms.
+    For scripts that hold a SearchService of their own. Request handlers call
+    ``post_commit.after_tags_change`` instead and leave the push to the search
+    outbox drain.
 
     Args:
         tag: The tag to sync
-        db: Optional DB session for looking up parent usage_count on alias tags
+        db: Optional DB session for looking up the alias parent's title and
+            usage_count, external URLs, and the tag's own aliases (re-indexed
+            with it, since their documents carry its title and usage_count)
         service: SearchService instance, or None to use module-level default
     """
+    await tags_changed([tag])
     svc = service or _search_service
     if svc is None:
         return
     try:
-        parent_usage_count = None
-        external_urls = None
         if db is not None:
-            if tag.alias_of is not None:
-                parent_usage_count = await _get_parent_usage_count(db, tag.alias_of)
-            external_urls = await _get_external_urls(db, tag.tag_id)  # type: ignore[arg-type]
-        await svc.index_tag(tag, parent_usage_count=parent_usage_count, external_urls=external_urls)
+            await svc.index_tags_from_db(db, [tag, *await _get_aliases(db, [tag])])
+        else:
+            await svc.index_tag(tag)
     except Exception:
         logger.warning("meilisearch_sync_failed", tag_id=tag.tag_id, exc_info=True)
 
@@ -126,22 +136,25 @@ async def sync_tags_to_search(
 ) -> None:
     """Sync multiple tags to Meilisearch in a single call. Best-effort -- never raises.
 
-    Awaits the Meilisearch call but runs after the MySQL commit, so the
-    write path has already succeeded.
+    For scripts, like sync_tag_to_search.
 
     Args:
         tags: The tags to sync
-        db: Optional DB session for looking up parent usage_counts on alias tags
+        db: Optional DB session for the alias parent / external URL lookups and
+            the tags' own aliases, as in sync_tag_to_search
         service: SearchService instance, or None to use module-level default
     """
     if not tags:
         return
+    await tags_changed(tags)
     svc = service or _search_service
     if svc is None:
         return
     try:
         if db is not None:
-            await svc.index_tags_from_db(db, tags)
+            tag_ids = {tag.tag_id for tag in tags}
+            aliases = [a for a in await _get_aliases(db, tags) if a.tag_id not in tag_ids]
+            await svc.index_tags_from_db(db, [*tags, *aliases])
         else:
             await svc.index_tags(tags)
     except Exception:
@@ -149,15 +162,16 @@ async def sync_tags_to_search(
 
 
 async def sync_tag_delete_to_search(tag_id: int, *, service: SearchService | None = None) -> None:
-    """Remove a tag from Meilisearch. Best-effort -- never raises.
+    """Remove a tag from Meilisearch directly. Best-effort -- never raises.
 
-    Awaits the Meilisearch call but runs after the MySQL commit, so the
-    write path has already succeeded. Typically completes in <10ms.
+    For scripts, like sync_tag_to_search; request handlers call
+    ``post_commit.after_tag_delete``.
 
     Args:
         tag_id: ID of the tag to remove
         service: SearchService instance, or None to use module-level default
     """
+    await tag_deleted(tag_id)
     svc = service or _search_service
     if svc is None:
         return
@@ -173,48 +187,111 @@ class TagSearchResult:
 
     tag_ids: list[int]
     total: int
+    # The matching documents, in the same order as tag_ids
+    documents: list[dict[str, Any]] = field(default_factory=list)
 
 
 def _tag_to_document(
     tag: Tags,
     *,
     parent_usage_count: int | None = None,
+    alias_of_name: str | None = None,
     external_urls: list[str] | None = None,
 ) -> dict[str, Any]:
     """Convert a Tags model to a Meilisearch document.
 
+    The document holds everything a /search hit returns (tag_hit_from_document),
+    so search never has to read the tag back from the database.
+
     Args:
         tag: The tag to convert.
         parent_usage_count: If provided and the tag is an alias, use this
             instead of the tag's own usage_count for ranking purposes.
+        alias_of_name: The parent's title, if the tag is an alias. An alias
+            indexed without it gets no document version, so search hydrates
+            it from the database rather than returning it without the name.
         external_urls: URLs associated with this tag (artist sites, etc.).
             Searchable at lower priority than title/desc.
     """
+    is_alias = tag.alias_of is not None
     usage_count = tag.usage_count
-    if tag.alias_of is not None and parent_usage_count is not None:
+    if is_alias and parent_usage_count is not None:
         usage_count = parent_usage_count
     # Index date_added as a Unix int so Meilisearch can sort it numerically.
     date_added = int(tag.date_added.timestamp()) if tag.date_added is not None else 0
+    complete = not is_alias or (alias_of_name is not None and parent_usage_count is not None)
     return {
         "tag_id": tag.tag_id,
         "title": tag.title,
         "desc": tag.desc,
         "type": tag.type,
         "usage_count": usage_count,
+        "own_usage_count": tag.usage_count,
         "alias_of": tag.alias_of,
+        "alias_of_name": alias_of_name if is_alias else None,
+        "alias_of_usage_count": parent_usage_count if is_alias else None,
         "external_urls": external_urls or [],
         "date_added": date_added,
+        "doc_version": TAG_DOCUMENT_VERSION if complete else 0,
+        "indexed_at": int(time.time()),
     }
 
 
-async def configure_tags_index(client: AsyncClient) -> None:
+async def build_tag_documents(db: AsyncSession, tags: list[Tags]) -> list[dict[str, Any]]:
+    """Meilisearch documents for ``tags``, with alias parents and external URLs from the DB."""
+    parents = await _get_alias_parents(db, tags)
+    urls_map = await _get_external_urls_batch(db, [tag.tag_id for tag in tags])  # type: ignore[misc]
+    docs = []
+    for tag in tags:
+        parent_title, parent_usage_count = parents.get(tag.tag_id, (None, None))  # type: ignore[arg-type]
+        docs.append(
+            _tag_to_document(
+                tag,
+                parent_usage_count=parent_usage_count,
+                alias_of_name=parent_title,
+                external_urls=urls_map.get(tag.tag_id),  # type: ignore[arg-type]
+            )
+        )
+    return docs
+
+
+def tag_hit_from_document(doc: dict[str, Any]) -> TagSearchHit | None:
+    """Build a search hit from its Meilisearch document alone.
+
+    Returns None for a document of another TAG_DOCUMENT_VERSION (or an alias
+    indexed without its parent's fields): the caller reads that tag from the
+    database instead.
+    """
+    if doc.get("doc_version") != TAG_DOCUMENT_VERSION:
+        return None
+    return TagSearchHit(
+        tag_id=doc["tag_id"],
+        title=doc["title"],
+        desc=doc["desc"],
+        type=doc["type"],
+        usage_count=doc["own_usage_count"],
+        alias_of=doc["alias_of"],
+        alias_of_name=doc["alias_of_name"],
+        alias_of_usage_count=doc["alias_of_usage_count"],
+        date_added=datetime.fromtimestamp(doc["date_added"], UTC) if doc["date_added"] else None,
+        indexed_at=datetime.fromtimestamp(doc["indexed_at"], UTC),
+    )
+
+
+async def configure_tags_index(client: AsyncClient, index_name: str | None = None) -> None:
     """Create and configure the tags index in Meilisearch.
 
     Sets ranking rules, filterable attributes, and searchable attributes.
     Idempotent — safe to call on every startup.
+
+    Args:
+        client: Meilisearch client.
+        index_name: Index to configure instead of the live tags index (the
+            reindex script builds a replacement under another name).
     """
+    index_name = index_name or TAGS_INDEX_NAME
     try:
-        await client.create_index(TAGS_INDEX_NAME, primary_key="tag_id")
+        await client.create_index(index_name, primary_key="tag_id")
     except MeilisearchApiError as exc:
         # "index_already_exists" is expected on every restart after the first.
         # Anything else (auth failure, network issue, malformed request) should
@@ -223,7 +300,7 @@ async def configure_tags_index(client: AsyncClient) -> None:
         if exc.code != "index_already_exists":
             raise
 
-    index = client.index(TAGS_INDEX_NAME)
+    index = client.index(index_name)
     # "sort" placed first so user-selected sort dominates relevance — when a
     # caller passes sort=["title:asc"] they expect strict alphabetical, not
     # alphabetical-grouped-by-relevance. Without an explicit sort param the
@@ -252,7 +329,7 @@ async def configure_tags_index(client: AsyncClient) -> None:
     # total and can paginate the full corpus.
     await index.update_pagination(Pagination(max_total_hits=500_000))
 
-    logger.info("meilisearch_tags_index_configured")
+    logger.info("meilisearch_tags_index_configured", index=index_name)
 
 
 class SearchService:
@@ -266,11 +343,15 @@ class SearchService:
         tag: Tags,
         *,
         parent_usage_count: int | None = None,
+        alias_of_name: str | None = None,
         external_urls: list[str] | None = None,
     ) -> None:
         """Index or update a single tag in Meilisearch."""
         doc = _tag_to_document(
-            tag, parent_usage_count=parent_usage_count, external_urls=external_urls
+            tag,
+            parent_usage_count=parent_usage_count,
+            alias_of_name=alias_of_name,
+            external_urls=external_urls,
         )
         index = self.client.index(TAGS_INDEX_NAME)
         await index.add_documents([doc])
@@ -281,6 +362,7 @@ class SearchService:
         tags: list[Tags],
         *,
         parent_usage_counts: dict[int, int] | None = None,
+        alias_of_names: dict[int, str] | None = None,
         external_urls_map: dict[int, list[str]] | None = None,
     ) -> None:
         """Bulk index multiple tags in Meilisearch.
@@ -289,16 +371,19 @@ class SearchService:
             tags: Tags to index.
             parent_usage_counts: Optional mapping of tag_id -> parent usage_count
                 for alias tags, so they rank by parent popularity.
+            alias_of_names: Optional mapping of tag_id -> parent title for alias tags.
             external_urls_map: Optional mapping of tag_id -> list of external URLs.
         """
         if not tags:
             return
         counts = parent_usage_counts or {}
+        names = alias_of_names or {}
         urls_map = external_urls_map or {}
         docs = [
             _tag_to_document(
                 tag,
                 parent_usage_count=counts.get(tag.tag_id),  # type: ignore[arg-type]
+                alias_of_name=names.get(tag.tag_id),  # type: ignore[arg-type]
                 external_urls=urls_map.get(tag.tag_id),  # type: ignore[arg-type]
             )
             for tag in tags
@@ -308,25 +393,19 @@ class SearchService:
         logger.debug("meilisearch_tags_indexed", count=len(docs))
 
     async def index_tags_from_db(self, db: AsyncSession, tags: list[Tags]) -> None:
-        """Bulk index tags, fetching parent usage counts and external URLs from the DB.
+        """Bulk index tags, fetching alias parents and external URLs from the DB.
 
-        Public entry point for callers (e.g. the reindex script) that have a
+        Public entry point for callers (e.g. the search outbox drain) that have a
         DB session and a list of tags but don't want to manage the auxiliary
         lookups themselves. Errors propagate; for best-effort sync, use the
         module-level `sync_tags_to_search` instead.
         """
         if not tags:
             return
-        parent_counts = await _get_parent_usage_counts(db, tags)
-        external_urls_map = await _get_external_urls_batch(
-            db,
-            [tag.tag_id for tag in tags],  # type: ignore[misc]
-        )
-        await self.index_tags(
-            tags,
-            parent_usage_counts=parent_counts,
-            external_urls_map=external_urls_map,
-        )
+        docs = await build_tag_documents(db, tags)
+        index = self.client.index(TAGS_INDEX_NAME)
+        await index.add_documents(docs)
+        logger.debug("meilisearch_tags_indexed", count=len(docs))
 
     async def delete_tag(self, tag_id: int) -> None:
         """Remove a tag from the Meilisearch index."""
@@ -334,6 +413,36 @@ class SearchService:
         await index.delete_document(str(tag_id))
         logger.debug("meilisearch_tag_deleted", tag_id=tag_id)
 
+    async def delete_tags(self, tag_ids: list[int]) -> None:
+        """Remove multiple tags from the Meilisearch index in a single call."""
+        if not tag_ids:
+            return
+        index = self.client.index(TAGS_INDEX_NAME)
+        await index.delete_documents([str(tag_id) for tag_id in tag_ids])
+        logger.debug("meilisearch_tags_deleted", count=len(tag_ids))
+
+    async def reindex_tag_ids(self, db: AsyncSession, tag_ids: set[int]) -> int:
+        """Rewrite the documents of ``tag_ids`` from the database, with their aliases.
+
+        Ids no longer in the tags table are removed from the index. Errors
+        propagate. Returns the number of documents written.
+        """
+        if not tag_ids:
+            return 0
+        # populate_existing: tags already in the session's identity map (an
+        # earlier drain batch, the caller's own) must be refreshed, not reused.
+        result = await db.execute(
+            select(Tags)
+            .where(Tags.tag_id.in_(tag_ids))  # type: ignore[union-attr]
+            .execution_options(populate_existing=True)
+        )
+        tags = list(result.scalars().all())
+        found = {tag.tag_id for tag in tags}
+        aliases = [a for a in await _get_aliases(db, tags) if a.tag_id not in found]
+        await self.index_tags_from_db(db, [*tags, *aliases])
+        await self.delete_tags(sorted(tag_ids - found))  # type: ignore[operator]
+        return len(tags) + len(aliases)
+
     async def search_tags(
         self,
         query: str,
@@ -355,7 +464,7 @@ class SearchService:
             sort: Meilisearch sort spec, e.g. ["title:asc"]. None = relevance.
 
         Returns:
-            TagSearchResult with ordered tag IDs and total count
+            TagSearchResult with ordered tag IDs, their documents and total count
         """
         filters: list[str] = []
         if type_filter is not None:
@@ -381,4 +490,6 @@ class SearchService:
             hits=len(tag_ids),
             total=results.estimated_total_hits,
         )
-        return TagSearchResult(tag_ids=tag_ids, total=results.estimated_total_hits or 0)
+        return TagSearchResult(
+            tag_ids=tag_ids, total=results.estimated_total_hits or 0, documents=results.hits
+        )
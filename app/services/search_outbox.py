@@ -0,0 +1,92 @@
+"""
+Transactional outbox for the Meilisearch tag index.
+
+Triggers on tags and tag_external_links (MariaDB migration 3f9c1d7a2b64,
+app/core/pg_triggers.py) write a ``search_outbox`` row in the same transaction
+as every change a tag's search document reflects. That includes the
+usage_count updates the tag_links triggers make on every tagging.
+
+``drain_search_outbox`` (run every few seconds by the arq worker) reads the
+rows in id order, coalesces them per tag, rewrites those documents with one
+bulk ``add_documents`` per batch and only then deletes the rows. A failed push
+leaves them for the next run, so a Meilisearch outage delays updates instead of
+losing them. Each drained batch is also announced to the API workers' tag
+autocomplete indexes.
+
+Request handlers never push to Meilisearch themselves. After committing a tag
+edit they call :func:`request_drain` (through the post-commit hooks in
+app/services/post_commit.py), which queues a drain at once instead of waiting
+for the next cron tick.
+"""
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.models.search_outbox import SearchOutbox
+from app.services.search import SearchService
+from app.services.tag_autocomplete import tag_ids_changed
+from app.tasks.queue import enqueue_job
+
+logger = get_logger(__name__)
+
+# Outbox rows per batch; a batch becomes one add_documents call (plus the
+# aliases of the tags in it) and one delete_documents call.
+DRAIN_BATCH_SIZE = 1000
+
+# Fixed job id: a burst of edits queues one drain, not one each. arq refuses the
+# id while that drain is queued or running, and the cron drain picks up any row
+# committed after it last read the outbox.
+DRAIN_JOB_ID = "search_outbox_drain"
+
+
+async def drain_search_outbox_batch(
+    db: AsyncSession, service: SearchService, batch_size: int = DRAIN_BATCH_SIZE
+) -> int:
+    """Re-index the tags behind the oldest ``batch_size`` outbox rows.
+
+    Returns the number of rows consumed (0 when the outbox is empty).
+    """
+    result = await db.execute(
+        select(SearchOutbox.id, SearchOutbox.tag_id)  # type: ignore[call-overload]
+        .order_by(SearchOutbox.id)
+        .limit(batch_size)
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    tag_ids = {row.tag_id for row in rows}
+    indexed = await service.reindex_tag_ids(db, tag_ids)
+
+    # Delete exactly the rows read, not "id <= max": a row with a lower id can
+    # still be in an uncommitted transaction, and must survive to the next run.
+    await db.execute(
+        delete(SearchOutbox).where(
+            SearchOutbox.id.in_([row.id for row in rows])  # type: ignore[union-attr]
+        )
+    )
+    await db.commit()
+    await tag_ids_changed(list(tag_ids))
+    logger.debug("search_outbox_batch_drained", rows=len(rows), documents=indexed)
+    return len(rows)
+
+
+async def drain_search_outbox(
+    db: AsyncSession, service: SearchService, batch_size: int = DRAIN_BATCH_SIZE
+) -> int:
+    """Drain the outbox batch by batch until it is empty. Errors propagate.
+
+    Returns the number of rows consumed.
+    """
+    drained = 0
+    while True:
+        count = await drain_search_outbox_batch(db, service, batch_size)
+        drained += count
+        if count < batch_size:
+            return drained
+
+
+async def request_drain() -> None:
+    """Queue a drain now, so a committed tag edit is searchable within seconds."""
+    await enqueue_job("drain_search_outbox_job", _job_id=DRAIN_JOB_ID)
@@ -0,0 +1,504 @@
+"""In-process tag autocomplete index.
+
+Autocomplete fires on every keystroke. ``/tags?search=`` answers it with a LIKE
+prefix scan or a FULLTEXT match plus a count query, and ``/search`` needs
+Meilisearch, which answers 503 while it is down. Every tag's display fields fit
+comfortably in memory, so each API worker keeps its own index and answers those
+queries with no database or network round trip:
+
+- a sorted array of ``(lowercased title, tag_id)`` for title-prefix matches;
+- a sorted array of the distinct title words, each with its posting set of tag
+  ids, for word-order independent matches: every query word must begin some
+  word of the title ("sakura kino" finds "kinomoto sakura").
+
+Query words go through the FULLTEXT path's token filter: words shorter than
+``FULLTEXT_MIN_TOKEN_SIZE`` and InnoDB stopwords are dropped, so "sakura the"
+matches like "sakura". Queries shorter than 3 characters, and queries with no
+word left after filtering, are title-prefix matches, like the LIKE path they
+replace. Matches rank the exact title first, then titles starting with the
+query, then the rest; within each group by usage_count (an alias ranks by its
+target's count, the one the UI shows), then title and tag_id.
+
+Freshness contract:
+
+- The tag post-commit hooks in ``app/services/post_commit.py``
+  (``after_tags_change`` / ``after_tag_delete``), which every tag write path
+  calls after commit, call :func:`tags_changed` / :func:`tag_deleted`. That
+  updates this process's index at once and publishes the ids; every other
+  worker re-reads those tags.
+- usage_count is kept by the tag_links triggers, which no hook sees. The same
+  triggers queue the tag in the search outbox, and ``drain_search_outbox``
+  calls :func:`tag_ids_changed` for every batch it indexes, so counts and
+  ranking follow within a drain interval.
+- Writers that bypass the API and the outbox publish nothing, so the index is
+  rebuilt from the ``tags`` table every ``TAG_INDEX_MAX_AGE_SECONDS`` (and after
+  the listener reconnects). The old index keeps serving while the rebuild runs.
+
+The index is only active in processes that call :func:`start_tag_autocomplete`
+(the API lifespan). Everywhere else :func:`get_tag_autocomplete` is None and the
+endpoints keep their database / Meilisearch paths. Changes made in the arq
+worker are still published, so the API workers pick them up.
+"""
+
+import asyncio
+import heapq
+import json
+import re
+import time
+import uuid
+from bisect import bisect_left, insort
+from collections.abc import Collection, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Self
+
+import redis.asyncio as redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_session
+from app.core.logging import get_logger
+from app.core.redis import shared_redis
+from app.models.tag import Tags
+
+logger = get_logger(__name__)
+
+TAG_INDEX_CHANNEL = "tag_autocomplete:changed"
+
+# Safety net for writers that bypass the API and so never publish a change.
+TAG_INDEX_MAX_AGE_SECONDS = 600
+
+# Shorter queries match title prefixes only (the /tags LIKE path's threshold).
+MIN_WORD_QUERY_LENGTH = 3
+
+# MySQL/MariaDB default fulltext stopwords that cause search failures when used with `+` (required) operator
+# Source: INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD
+FULLTEXT_STOPWORDS = frozenset(
+    {
+        "a",
+        "about",
+        "an",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "com",
+        "de",
+        "en",
+        "for",
+        "from",
+        "how",
+        "i",
+        "in",
+        "is",
+        "it",
+        "la",
+        "of",
+        "on",
+        "or",
+        "that",
+        "the",
+        "this",
+        "to",
+        "was",
+        "what",
+        "when",
+        "where",
+        "who",
+        "will",
+        "with",
+        "und",
+        "www",
+    }
+)
+
+# Minimum token size for InnoDB fulltext (innodb_ft_min_token_size default is 3)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# Seconds the listener waits before resubscribing after losing its Redis connection,
+# and the minimum gap between rebuild attempts after a failed one.
+_RETRY_SECONDS = 5.0
+
+_WORD = re.compile(r"\w+")
+# Sorts after every character a title can contain, closing a prefix range.
+_PREFIX_END = "\U0010ffff"
+
+
+def _fulltext_words(words: Iterable[str]) -> list[str]:
+    """The query words FULLTEXT would search for, longest first."""
+    return sorted(
+        (
+            word
+            for word in words
+            if len(word) >= FULLTEXT_MIN_TOKEN_SIZE and word not in FULLTEXT_STOPWORDS
+        ),
+        key=len,
+        reverse=True,
+    )
+
+
+@dataclass(slots=True)
+class IndexedTag:
+    """The fields a tag autocomplete hit returns."""
+
+    tag_id: int
+    title: str | None
+    desc: str | None
+    type: int
+    usage_count: int
+    alias_of: int | None
+    date_added: datetime | None
+
+    @classmethod
+    def from_model(cls, tag: Tags) -> Self:
+        return cls(
+            tag_id=tag.tag_id,  # type: ignore[arg-type]
+            title=tag.title,
+            desc=tag.desc,
+            type=tag.type,
+            usage_count=tag.usage_count,
+            alias_of=tag.alias_of,
+            date_added=tag.date_added,
+        )
+
+    @property
+    def key(self) -> str:
+        return (self.title or "").lower()
+
+
+@dataclass(slots=True)
+class TagMatches:
+    """One page of autocomplete matches and the total number of matches."""
+
+    total: int
+    # TagResponse fields per hit, in rank order
+    tags: list[dict[str, Any]]
+
+
+class TagAutocompleteIndex:
+    """Title-prefix and word-prefix lookups over every tag, ranked by usage_count."""
+
+    def __init__(self, tags: Iterable[IndexedTag] = ()) -> None:
+        self._tags: dict[int, IndexedTag] = {tag.tag_id: tag for tag in tags}
+        self._postings: dict[str, set[int]] = {}
+        for tag in self._tags.values():
+            for word in set(_WORD.findall(tag.key)):
+                self._postings.setdefault(word, set()).add(tag.tag_id)
+        self._titles = sorted((tag.key, tag.tag_id) for tag in self._tags.values())
+        self._words = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def upsert(self, tag: IndexedTag) -> None:
+        """Add ``tag``, replacing the entry with the same tag_id."""
+        self.remove(tag.tag_id)
+        self._tags[tag.tag_id] = tag
+        insort(self._titles, (tag.key, tag.tag_id))
+        for word in set(_WORD.findall(tag.key)):
+            ids = self._postings.get(word)
+            if ids is None:
+                ids = self._postings[word] = set()
+                insort(self._words, word)
+            ids.add(tag.tag_id)
+
+    def remove(self, tag_id: int) -> None:
+        old = self._tags.pop(tag_id, None)
+        if old is None:
+            return
+        entry = (old.key, tag_id)
+        i = bisect_left(self._titles, entry)
+        if i < len(self._titles) and self._titles[i] == entry:
+            del self._titles[i]
+        for word in set(_WORD.findall(old.key)):
+            ids = self._postings.get(word)
+            if ids is None:
+                continue
+            ids.discard(tag_id)
+            if not ids:
+                del self._postings[word]
+                del self._words[bisect_left(self._words, word)]
+
+    def _title_prefix(self, prefix: str) -> list[int]:
+        lo = bisect_left(self._titles, (prefix,))
+        hi = bisect_left(self._titles, (prefix + _PREFIX_END,))
+        return [tag_id for _, tag_id in self._titles[lo:hi]]
+
+    def _word_prefix(self, prefix: str) -> set[int]:
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + _PREFIX_END)
+        return set().union(*(self._postings[word] for word in self._words[lo:hi]))
+
+    def _displayed_count(self, tag: IndexedTag) -> int:
+        target = self._tags.get(tag.alias_of) if tag.alias_of is not None else None
+        return target.usage_count if target is not None else tag.usage_count
+
+    def search(
+        self,
+        query: str,
+        *,
+        type_id: int | None = None,
+        exclude_aliases: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> TagMatches | None:
+        """Rank the tags matching ``query`` and return one page of them.
+
+        Returns None for a query this index can't answer (3+ characters but no
+        word characters): the caller uses its own search path instead.
+        """
+        needle = query.lower()
+        candidates: Iterable[int]
+        if len(query) < MIN_WORD_QUERY_LENGTH:
+            candidates = self._title_prefix(needle)
+        elif not (words := set(_WORD.findall(needle))):
+            return None
+        elif not (terms := _fulltext_words(words)):
+            # Only stopwords and short words: the FULLTEXT path's LIKE fallback.
+            candidates = self._title_prefix(needle)
+        else:
+            # Longest (most selective) word first, so the intersection starts small.
+            matched = self._word_prefix(terms[0])
+            for word in terms[1:]:
+                if not matched:
+                    break
+                matched &= self._word_prefix(word)
+            candidates = matched
+
+        tags = self._tags
+        matches = [
+            tags[tag_id]
+            for tag_id in candidates
+            if (type_id is None or tags[tag_id].type == type_id)
+            and not (exclude_aliases and tags[tag_id].alias_of is not None)
+        ]
+
+        def rank(tag: IndexedTag) -> tuple[int, int, str, int]:
+            key = tag.key
+            group = 0 if key == needle else 1 if key.startswith(needle) else 2
+            return (group, -self._displayed_count(tag), key, tag.tag_id)
+
+        page = heapq.nsmallest(offset + limit, matches, key=rank)[offset:]
+        return TagMatches(total=len(matches), tags=[self._hit(tag) for tag in page])
+
+    def _hit(self, tag: IndexedTag) -> dict[str, Any]:
+        target = self._tags.get(tag.alias_of) if tag.alias_of is not None else None
+        return {
+            "tag_id": tag.tag_id,
+            "title": tag.title,
+            "desc": tag.desc,
+            "type": tag.type,
+            "usage_count": tag.usage_count,
+            "alias_of": tag.alias_of,
+            "alias_of_name": target.title if target is not None else None,
+            "alias_of_usage_count": target.usage_count if target is not None else None,
+            "date_added": tag.date_added,
+        }
+
+
+async def load_indexed_tags(
+    db: AsyncSession, tag_ids: Iterable[int] | None = None
+) -> list[IndexedTag]:
+    """Read the indexed columns for ``tag_ids``, or for every tag."""
+    query = select(
+        Tags.tag_id,  # type: ignore[call-overload]
+        Tags.title,
+        Tags.desc,
+        Tags.type,
+        Tags.usage_count,
+        Tags.alias_of,
+        Tags.date_added,
+    )
+    if tag_ids is not None:
+        query = query.where(Tags.tag_id.in_(list(tag_ids)))  # type: ignore[union-attr]
+    result = await db.execute(query)
+    return [IndexedTag(*row) for row in result.tuples()]
+
+
+# Process-wide state. Only start_tag_autocomplete() enables the index; see module docstring.
+_enabled = False
+_index: TagAutocompleteIndex | None = None
+_loaded_at = float("-inf")
+_last_rebuild_failure = float("-inf")
+# Ids changed while a rebuild is reading the table: re-read after it swaps in.
+_changed_during_rebuild: set[int] | None = None
+_rebuild_task: asyncio.Task[None] | None = None
+_listener_task: asyncio.Task[None] | None = None
+# Marks this process's own announcements, so its listener skips them.
+_ORIGIN = uuid.uuid4().hex
+
+
+def get_tag_autocomplete() -> TagAutocompleteIndex | None:
+    """The index if this process has one loaded, else None.
+
+    Never blocks: an index past its max age keeps serving while a rebuild is
+    scheduled in the background.
+    """
+    if not _enabled or _index is None:
+        return None
+    if time.monotonic() - _loaded_at >= TAG_INDEX_MAX_AGE_SECONDS:
+        _schedule_rebuild()
+    return _index
+
+
+async def _rebuild() -> None:
+    global _index, _loaded_at, _last_rebuild_failure, _changed_during_rebuild
+    started = time.monotonic()
+    _changed_during_rebuild = set()
+    try:
+        async with get_async_session() as db:
+            tags = await load_indexed_tags(db)
+        # Building sorts ~all titles and words: keep it off the event loop.
+        index = await asyncio.to_thread(TagAutocompleteIndex, tags)
+    except Exception:
+        _changed_during_rebuild = None
+        _last_rebuild_failure = time.monotonic()
+        logger.warning("tag_autocomplete_rebuild_failed", exc_info=True)
+        return
+    changed, _changed_during_rebuild = _changed_during_rebuild, None
+    _index = index
+    _loaded_at = started
+    logger.info(
+        "tag_autocomplete_loaded",
+        tags=len(index),
+        elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+    )
+    if changed:
+        await _refresh(changed)
+
+
+def _schedule_rebuild() -> None:
+    global _rebuild_task
+    if _rebuild_task is not None and not _rebuild_task.done():
+        return
+    if time.monotonic() - _last_rebuild_failure < _RETRY_SECONDS:
+        return
+    _rebuild_task = asyncio.get_running_loop().create_task(_rebuild())
+
+
+async def _refresh(tag_ids: Iterable[int]) -> None:
+    """Re-read ``tag_ids`` into the index; ids no longer in the table are removed."""
+    ids = set(tag_ids)
+    if _changed_during_rebuild is not None:
+        _changed_during_rebuild.update(ids)
+    async with get_async_session() as db:
+        tags = await load_indexed_tags(db, ids)
+    if _index is None:
+        return
+    for tag in tags:
+        _index.upsert(tag)
+    for tag_id in ids - {tag.tag_id for tag in tags}:
+        _index.remove(tag_id)
+
+
+async def _publish(tag_ids: Sequence[int]) -> None:
+    redis_client = shared_redis()
+    if redis_client is None or not tag_ids:
+        return
+    try:
+        await redis_client.publish(
+            TAG_INDEX_CHANNEL, json.dumps({"origin": _ORIGIN, "ids": list(tag_ids)})
+        )
+    except Exception:
+        logger.warning("tag_autocomplete_publish_failed", exc_info=True)
+
+
+async def tags_changed(tags: Sequence[Tags]) -> None:
+    """Apply committed tag creates/edits here and announce them to the other workers.
+
+    Best-effort: never raises, the write itself already succeeded.
+    """
+    tag_ids = [tag.tag_id for tag in tags if tag.tag_id is not None]
+    if _changed_during_rebuild is not None:
+        _changed_during_rebuild.update(tag_ids)
+    if _index is not None:
+        try:
+            for tag in tags:
+                if tag.tag_id is not None:
+                    _index.upsert(IndexedTag.from_model(tag))
+        except Exception:
+            logger.warning("tag_autocomplete_update_failed", exc_info=True)
+            _schedule_rebuild()
+    await _publish(tag_ids)
+
+
+async def tag_ids_changed(tag_ids: Collection[int]) -> None:
+    """Re-read tags changed behind the API's back here and announce them.
+
+    For writers that hold ids rather than rows: the search outbox drain, whose
+    tags include every usage_count change. Best-effort, like tags_changed.
+    """
+    if not tag_ids:
+        return
+    if _enabled:
+        try:
+            await _refresh(tag_ids)
+        except Exception:
+            logger.warning("tag_autocomplete_refresh_failed", exc_info=True)
+            _schedule_rebuild()
+    await _publish(list(tag_ids))
+
+
+async def tag_deleted(tag_id: int) -> None:
+    """Drop a deleted tag here and announce it. Best-effort, like tags_changed."""
+    if _index is not None:
+        _index.remove(tag_id)
+    if _changed_during_rebuild is not None:
+        _changed_during_rebuild.add(tag_id)
+    await _publish([tag_id])
+
+
+async def _listen(redis_client: redis.Redis) -> None:  # type: ignore[type-arg]
+    """Follow the change channel for the life of the process."""
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(TAG_INDEX_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    change = json.loads(message["data"])
+                    if change["origin"] != _ORIGIN:
+                        await _refresh(int(tag_id) for tag_id in change["ids"])
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.warning("tag_autocomplete_refresh_failed", exc_info=True)
+                    _schedule_rebuild()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("tag_autocomplete_listener_disconnected", exc_info=True)
+            # Changes published while disconnected were never delivered.
+            _schedule_rebuild()
+            await asyncio.sleep(_RETRY_SECONDS)
+        finally:
+            await pubsub.aclose()
+
+
+async def start_tag_autocomplete() -> None:
+    """Build the index and start following changes (API lifespan startup)."""
+    global _enabled, _listener_task
+    redis_client = shared_redis()
+    if redis_client is None:
+        return
+    _enabled = True
+    _listener_task = asyncio.get_running_loop().create_task(_listen(redis_client))
+    await _rebuild()
+
+
+async def stop_tag_autocomplete() -> None:
+    """Stop the listener and drop the index (API lifespan shutdown)."""
+    global _enabled, _index, _listener_task, _rebuild_task
+    _enabled = False
+    _index = None
+    for task in (_listener_task, _rebuild_task):
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    _listener_task = _rebuild_task = None
@@ -18,17 +18,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import TagType
 from app.models.character_source_link import CharacterSourceLinks
 from app.models.tag import Tags
-from app.schemas.image import ImageDetailedResponse
+from app.schemas.image import ImageDetailedResponse, TagSummary
 
 
 async def stamp_context_sources(
     db: AsyncSession, responses: Sequence[ImageDetailedResponse]
 ) -> None:
     """Mutate responses in place per the exactly-one rule."""
+    await stamp_tag_context(db, [r.tags for r in responses if r.tags])
+
+
+async def stamp_tag_context(db: AsyncSession, pages: Sequence[Sequence[TagSummary]]) -> None:
+    """stamp_context_sources on bare per-image tag lists (load_tag_summaries
+    output), for callers that stamp before building their responses."""
     page_tag_ids: set[int] = set()
     has_character = False
-    for r in responses:
-        for t in r.tags or []:
+    for tags in pages:
+        for t in tags:
             if t.type_id in (TagType.CHARACTER, TagType.SOURCE):
                 page_tag_ids.add(t.tag_id)
                 has_character = has_character or t.type_id == TagType.CHARACTER
@@ -54,8 +60,8 @@ async def stamp_context_sources(
     # source-only pages, one query too late.)
     char_ids = {
         canon.get(t.tag_id, t.tag_id)
-        for r in responses
-        for t in r.tags or []
+        for tags in pages
+        for t in tags
         if t.type_id == TagType.CHARACTER
     }
 
@@ -73,13 +79,9 @@ async def stamp_context_sources(
     if not links:
         return
 
-    for r in responses:
-        if not r.tags:
-            continue
-        image_sources = {
-            canon.get(t.tag_id, t.tag_id) for t in r.tags if t.type_id == TagType.SOURCE
-        }
-        for t in r.tags:
+    for tags in pages:
+        image_sources = {canon.get(t.tag_id, t.tag_id) for t in tags if t.type_id == TagType.SOURCE}
+        for t in tags:
             if t.type_id != TagType.CHARACTER:
                 continue
             linked = links.get(canon.get(t.tag_id, t.tag_id))
@@ -0,0 +1,312 @@
+"""In-process tag graph: alias targets and the inheritedfrom hierarchy.
+
+Tag searches resolve every requested tag's alias and expand its subtree before the
+real query runs — one ``Tags`` fetch plus one recursive CTE per tag. The graph those
+lookups walk is small (one row per tag, three integer columns) and changes only when
+a tag is created, edited or deleted, so each API worker keeps a copy in memory and
+answers alias/hierarchy/ancestor lookups without touching the database.
+
+Freshness contract:
+
+- Mutations in ``app/api/v1/tags.py`` call :func:`publish_tag_graph_change` after
+  commit. It bumps a Redis version counter and publishes the new version; every
+  worker's listener marks its copy stale on receipt. The publishing worker marks
+  its own copy stale immediately, so it reads its own writes.
+- A stale graph is never served. :func:`get_tag_graph` returns None and schedules
+  a background reload; callers fall back to their database query meanwhile.
+- Writers that bypass the API (scripts, manual SQL) publish nothing, so a graph
+  older than ``TAG_GRAPH_MAX_AGE_SECONDS`` is treated as stale as well.
+
+The graph is only active in processes that call :func:`start_tag_graph` (the API
+lifespan). Everywhere else — tests, the arq worker, scripts — ``get_tag_graph()``
+is None and every caller keeps its existing database path.
+"""
+
+import asyncio
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Self
+
+import redis.asyncio as redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_session
+from app.core.logging import get_logger
+from app.core.redis import shared_redis
+from app.models.tag import Tags
+
+logger = get_logger(__name__)
+
+TAG_GRAPH_VERSION_KEY = "tag_graph:version"
+TAG_GRAPH_CHANNEL = "tag_graph:changed"
+
+# Safety net for writers that bypass the API and so never publish a change.
+TAG_GRAPH_MAX_AGE_SECONDS = 600
+
+# Same cap as get_tag_hierarchy's CTE default and the ML pipeline's ancestor walks.
+MAX_HIERARCHY_DEPTH = 10
+
+# Seconds the listener waits before resubscribing after losing its Redis connection,
+# and the minimum gap between reload attempts after a failed one.
+_RETRY_SECONDS = 5.0
+
+
+@dataclass
+class TagGraph:
+    """Snapshot of every tag's alias target and parent, plus the reverse child index."""
+
+    version: int
+    tag_ids: frozenset[int]
+    alias_of: dict[int, int]
+    parent_of: dict[int, int]
+    children: dict[int, tuple[int, ...]]
+    loaded_at: float = field(default_factory=time.monotonic)
+    # Memo of descendant_ids results. A snapshot never changes, so entries never
+    # go stale; a reload replaces the whole graph (and with it this memo).
+    _descendants: dict[tuple[int, int], tuple[int, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, version: int, rows: Iterable[tuple[int, int | None, int | None]]) -> Self:
+        """Build a graph from ``(tag_id, alias_of, inheritedfrom_id)`` rows."""
+        tag_ids: set[int] = set()
+        alias_of: dict[int, int] = {}
+        parent_of: dict[int, int] = {}
+        children: dict[int, list[int]] = {}
+        for tag_id, alias, parent in rows:
+            tag_ids.add(tag_id)
+            if alias is not None:
+                alias_of[tag_id] = alias
+            if parent is not None:
+                parent_of[tag_id] = parent
+                children.setdefault(parent, []).append(tag_id)
+        return cls(
+            version=version,
+            tag_ids=frozenset(tag_ids),
+            alias_of=alias_of,
+            parent_of=parent_of,
+            children={parent: tuple(sorted(kids)) for parent, kids in children.items()},
+        )
+
+    def resolve_alias(self, tag_id: int) -> int:
+        """The tag an alias points at, else ``tag_id`` itself (one hop, like resolve_tag_alias)."""
+        return self.alias_of.get(tag_id, tag_id)
+
+    def descendant_ids(self, tag_id: int, levels: int = MAX_HIERARCHY_DEPTH) -> tuple[int, ...]:
+        """Children, grandchildren, ... of ``tag_id`` down ``levels`` generations.
+
+        Excludes ``tag_id`` itself. Breadth-first with a visited set, so a corrupt
+        inheritedfrom cycle terminates instead of repeating ids.
+        """
+        key = (tag_id, levels)
+        cached = self._descendants.get(key)
+        if cached is not None:
+            return cached
+        seen = {tag_id}
+        found: list[int] = []
+        frontier = [tag_id]
+        for _ in range(levels):
+            next_frontier = [
+                child
+                for parent in frontier
+                for child in self.children.get(parent, ())
+                if child not in seen
+            ]
+            if not next_frontier:
+                break
+            seen.update(next_frontier)
+            found.extend(next_frontier)
+            frontier = next_frontier
+        result = tuple(found)
+        self._descendants[key] = result
+        return result
+
+    def hierarchy(self, tag_id: int, max_depth: int = MAX_HIERARCHY_DEPTH) -> list[int]:
+        """Self plus descendants, with get_tag_hierarchy's depth semantics.
+
+        ``max_depth=1`` is the tag alone; each extra level adds one generation. An
+        unknown tag yields ``[]``, matching the CTE's empty anchor row.
+        """
+        if tag_id not in self.tag_ids or max_depth < 1:
+            return []
+        return [tag_id, *self.descendant_ids(tag_id, max_depth - 1)]
+
+    def parent_map(self, tag_ids: Iterable[int]) -> dict[int, int | None]:
+        """``tag_id -> inheritedfrom_id`` over the ancestry of ``tag_ids``.
+
+        Same shape as ml_suggestion_pipeline.fetch_parent_map: only existing tags
+        appear as keys, and the walk is depth-capped.
+        """
+        parent_of: dict[int, int | None] = {}
+        frontier = {t for t in tag_ids if t in self.tag_ids}
+        for _ in range(MAX_HIERARCHY_DEPTH):
+            if not frontier:
+                break
+            for tag_id in frontier:
+                parent_of[tag_id] = self.parent_of.get(tag_id)
+            frontier = {
+                parent
+                for tag_id in frontier
+                if (parent := self.parent_of.get(tag_id)) is not None
+                and parent not in parent_of
+                and parent in self.tag_ids
+            }
+        return parent_of
+
+
+async def load_tag_graph(db: AsyncSession, version: int = 0) -> TagGraph:
+    """Read the three graph columns for every tag into a new snapshot."""
+    result = await db.execute(
+        select(Tags.tag_id, Tags.alias_of, Tags.inheritedfrom_id)  # type: ignore[call-overload]
+    )
+    return TagGraph.from_rows(version, result.tuples())
+
+
+# Process-wide state. Only start_tag_graph() enables the graph; see module docstring.
+_enabled = False
+_graph: TagGraph | None = None
+# Highest version announced over pub/sub; a graph below it missed a change.
+_announced_version = 0
+# Set by a local mutation; cleared when a reload starts (not ends), so a change
+# landing mid-reload leaves the fresh snapshot stale and triggers another.
+_dirty = False
+_redis_client: redis.Redis | None = None  # type: ignore[type-arg]
+_reload_task: asyncio.Task[None] | None = None
+_last_reload_failure = float("-inf")
+_listener_task: asyncio.Task[None] | None = None
+
+
+def _is_fresh(graph: TagGraph) -> bool:
+    return (
+        not _dirty
+        and graph.version >= _announced_version
+        and time.monotonic() - graph.loaded_at < TAG_GRAPH_MAX_AGE_SECONDS
+    )
+
+
+def get_tag_graph() -> TagGraph | None:
+    """The current graph if loaded and fresh, else None (and a reload is scheduled).
+
+    Never blocks: a caller that gets None uses its database path for this request.
+    """
+    if not _enabled:
+        return None
+    if _graph is not None and _is_fresh(_graph):
+        return _graph
+    _schedule_reload()
+    return None
+
+
+def mark_tag_graph_stale() -> None:
+    """Drop this process's graph until the next reload completes."""
+    global _dirty
+    _dirty = True
+
+
+async def _read_version(redis_client: redis.Redis) -> int:  # type: ignore[type-arg]
+    raw = await redis_client.get(TAG_GRAPH_VERSION_KEY)
+    return int(raw) if raw is not None else 0
+
+
+async def _reload(redis_client: redis.Redis) -> None:  # type: ignore[type-arg]
+    """Replace the graph. The version is read *before* the tags, so a change committed
+    between the two reads is announced with a higher version and forces another reload."""
+    global _graph, _dirty, _last_reload_failure
+    _dirty = False
+    started = time.monotonic()
+    try:
+        version = await _read_version(redis_client)
+        async with get_async_session() as db:
+            graph = await load_tag_graph(db, version)
+    except Exception:
+        _dirty = True
+        _last_reload_failure = time.monotonic()
+        logger.warning("tag_graph_reload_failed", exc_info=True)
+        return
+    _graph = graph
+    logger.info(
+        "tag_graph_loaded",
+        version=version,
+        tags=len(graph.tag_ids),
+        elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+    )
+
+
+def _schedule_reload() -> None:
+    global _reload_task
+    if _redis_client is None or (_reload_task is not None and not _reload_task.done()):
+        return
+    if time.monotonic() - _last_reload_failure < _RETRY_SECONDS:
+        return
+    _reload_task = asyncio.get_running_loop().create_task(_reload(_redis_client))
+
+
+async def _listen(redis_client: redis.Redis) -> None:  # type: ignore[type-arg]
+    """Follow the change channel for the life of the process."""
+    global _announced_version
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(TAG_GRAPH_CHANNEL)
+            # Changes published while we were not subscribed were never delivered.
+            # Re-reading the counter after subscribing closes that gap.
+            _announced_version = max(_announced_version, await _read_version(redis_client))
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    _announced_version = max(_announced_version, int(message["data"]))
+                except ValueError, TypeError:
+                    mark_tag_graph_stale()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("tag_graph_listener_disconnected", exc_info=True)
+            # Anything could have changed while disconnected.
+            mark_tag_graph_stale()
+            await asyncio.sleep(_RETRY_SECONDS)
+        finally:
+            await pubsub.aclose()
+
+
+async def start_tag_graph() -> None:
+    """Load the graph and start following invalidations (API lifespan startup)."""
+    global _enabled, _redis_client, _listener_task
+    _redis_client = shared_redis()
+    if _redis_client is None:
+        return
+    _enabled = True
+    _listener_task = asyncio.get_running_loop().create_task(_listen(_redis_client))
+    await _reload(_redis_client)
+
+
+async def stop_tag_graph() -> None:
+    """Stop the listener and drop the graph (API lifespan shutdown)."""
+    global _enabled, _graph, _redis_client, _listener_task, _reload_task
+    _enabled = False
+    _graph = None
+    for task in (_listener_task, _reload_task):
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    _listener_task = _reload_task = None
+    _redis_client = None
+
+
+async def publish_tag_graph_change(redis_client: redis.Redis) -> None:  # type: ignore[type-arg]
+    """Announce a committed alias/parent/tag-set change to every worker.
+
+    Call after the commit: a worker reloading on this message must see the change.
+    Best-effort — a Redis failure is logged, not raised, because the mutation
+    itself already succeeded; other workers converge within the max-age window.
+    """
+    mark_tag_graph_stale()
+    try:
+        version = await redis_client.incr(TAG_GRAPH_VERSION_KEY)
+        await redis_client.publish(TAG_GRAPH_CHANNEL, version)
+    except Exception:
+        logger.warning("tag_graph_publish_failed", exc_info=True)
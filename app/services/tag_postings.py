@@ -0,0 +1,490 @@
+"""Per-tag posting lists for tag-filtered image searches.
+
+``GET /images?tags=46,169&tags_mode=all`` stacks one ``IN (SELECT image_id FROM
+tag_links ...)`` per tag, and the pagination count has to materialize the whole
+semijoin (~700ms for the two most popular tags). This module keeps each popular
+tag's image-id set as a Redis bitmap — bit ``n`` of ``tag_postings:tag:{tag_id}``
+is set when image ``n`` carries the tag — so ALL/ANY/exclude/hierarchy filters
+become BITOP AND/OR/NOT over a few hundred KB, and the count is a BITCOUNT.
+
+Only tags with ``usage_count >= TAG_POSTINGS_MIN_USAGE`` get a bitmap: a bitmap
+costs ``max_image_id / 8`` bytes whatever the tag's size, and small tags are cheap
+in SQL anyway. ``tag_postings:indexed`` lists the tags that have one. A filter that
+also touches small tags (typically descendants in a hierarchy) merges their links
+in from SQL at query time, up to ``MAX_MERGED_LINKS``; past that, or when a group
+has no indexed tag at all, the caller keeps its SQL path.
+
+Maintenance:
+
+- ``rebuild_tag_postings`` (arq, nightly) rebuilds every bitmap from tag_links and
+  drops tags that fell below the threshold.
+- Every tag_links write path calls :func:`sync_tag_postings` after its commit
+  (through ``post_commit.after_tag_links_change``). It
+  re-reads the touched (image, tag) pairs and sets each bit to the committed state,
+  so it is idempotent and safe to call with a superset of what changed.
+- While a rebuild runs, each sync also journals its image ids. A sync landing
+  between a tag's SELECT and its RENAME writes to the key about to be replaced;
+  the rebuild re-syncs every journaled image once all its RENAMEs are done.
+- A sync that fails marks the index stale (``tag_postings:stale``) and enqueues a
+  rebuild. Until that rebuild completes, :func:`match_tags` returns None and
+  callers keep their SQL path.
+- Writers that bypass those paths (scripts, manual SQL) drift until the next rebuild.
+
+Visibility is applied with two short-lived bitmaps built from ``images.status``
+(non-public images, reposts), with the same staleness contract as the cached feed
+counts (``FEED_COUNT_TTL``).
+
+The bitmap decides which images list_images checks: under image_id order it
+picks the page's candidate ids, and an image whose bit is missing is never
+looked at. That is why the index must not go stale silently, see above. A stray
+set bit is harmless there, since the page query keeps its tag predicates. Counts
+are read straight from the bitmaps.
+
+Only processes that call :func:`start_tag_postings` (the API lifespan and the arq
+worker) use the index; everywhere else every function here is a no-op and callers
+keep their SQL path.
+"""
+
+import uuid
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass, field
+
+import redis.asyncio as redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ImageStatus, settings
+from app.core.logging import get_logger
+from app.core.redis import shared_binary_redis
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+from app.services.feed_count_cache import FEED_COUNT_TTL
+from app.services.image_visibility import PUBLIC_IMAGE_STATUSES
+from app.tasks.queue import enqueue_job
+
+logger = get_logger(__name__)
+
+INDEXED_TAGS_KEY = "tag_postings:indexed"
+HIDDEN_IMAGES_KEY = "tag_postings:hidden"
+REPOST_IMAGES_KEY = "tag_postings:reposts"
+STALE_KEY = "tag_postings:stale"
+_REBUILDING_KEY = "tag_postings:rebuilding"
+_JOURNAL_KEY = "tag_postings:rebuild_journal"
+_TAG_KEY_PREFIX = "tag_postings:tag:"
+_TEMP_KEY_PREFIX = "tag_postings:tmp:"
+
+# Outlives the rebuild job's timeout; a rebuild that dies leaves no flag behind.
+_REBUILDING_TTL_SECONDS = 2 * 3600
+
+# Images re-synced per batch when a rebuild replays its journal.
+_JOURNAL_REPLAY_CHUNK = 1000
+
+# Upper bound on small-tag links merged in from SQL for one query. Beyond it the
+# merge costs about what the SQL semijoin would, so the caller keeps SQL.
+MAX_MERGED_LINKS = 50_000
+
+# Temp keys outlive a request only if it dies before release(); this reaps them.
+_TEMP_KEY_TTL_SECONDS = 60
+
+# Bytes read per GETRANGE while walking a result bitmap for page candidates.
+_SCAN_CHUNK_BYTES = 4096
+
+# a AND NOT b, where b may be shorter than a. BITOP NOT only spans b's own length,
+# and BITOP AND zero-fills the shorter operand, so a short NOT would wipe a's tail;
+# pad it with 0xFF (= "not excluded") up to a's length first.
+_AND_NOT_SCRIPT = """
+local len_a = redis.call('STRLEN', KEYS[2])
+redis.call('BITOP', 'NOT', KEYS[4], KEYS[3])
+local len_not = redis.call('STRLEN', KEYS[4])
+if len_not < len_a then
+    redis.call('SETRANGE', KEYS[4], len_not, string.rep('\\255', len_a - len_not))
+end
+redis.call('BITOP', 'AND', KEYS[1], KEYS[2], KEYS[4])
+redis.call('DEL', KEYS[4])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return len_a
+"""
+
+# Journal the synced image ids while a rebuild runs (see the module docstring).
+# KEYS: rebuilding flag, journal. ARGV: journal TTL, then the image ids. Also
+# used by app/services/tag_subtree_counts.py, which follows the same protocol.
+JOURNAL_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 2, #ARGV, 1000 do
+    redis.call('SADD', KEYS[2], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Clear the stale mark only if no sync has failed since the rebuild started.
+CLEAR_STALE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_client: redis.Redis | None = None  # type: ignore[type-arg]
+
+
+def tag_key(tag_id: int) -> str:
+    return f"{_TAG_KEY_PREFIX}{tag_id}"
+
+
+def bitmap_from_ids(image_ids: Iterable[int]) -> bytes:
+    """Encode image ids as a Redis bitmap (bit ``n`` = byte ``n // 8``, MSB first)."""
+    ids = list(image_ids)
+    if not ids:
+        return b""
+    bitmap = bytearray(max(ids) // 8 + 1)
+    for image_id in ids:
+        bitmap[image_id >> 3] |= 0x80 >> (image_id & 7)
+    return bytes(bitmap)
+
+
+def ids_from_bitmap(chunk: bytes, first_byte: int, *, descending: bool) -> list[int]:
+    """Decode the set bits of a bitmap slice starting at byte ``first_byte``."""
+    found: list[int] = []
+    positions = range(len(chunk) - 1, -1, -1) if descending else range(len(chunk))
+    bits = range(7, -1, -1) if descending else range(8)
+    for pos in positions:
+        byte = chunk[pos]
+        if not byte:
+            continue
+        base = (first_byte + pos) * 8
+        found.extend(base + bit for bit in bits if byte & (0x80 >> bit))
+    return found
+
+
+async def start_tag_postings() -> None:
+    """Take the index's Redis client (API lifespan / worker startup, after
+    ``start_redis``).
+
+    The shared binary client rather than the app's usual one: bitmaps are binary,
+    so responses must not be decoded as UTF-8.
+    """
+    global _client
+    _client = shared_binary_redis()
+
+
+async def stop_tag_postings() -> None:
+    global _client
+    _client = None
+
+
+async def sync_tag_postings(
+    db: AsyncSession,
+    image_ids: Collection[int],
+    tag_ids: Collection[int] | None = None,
+) -> None:
+    """Bring the bits for ``image_ids`` x ``tag_ids`` in line with tag_links.
+
+    Call after the commit that changed the links. ``tag_ids=None`` resyncs the
+    images against every indexed tag — for callers that don't track which tags
+    changed (uploads, repost migration, image deletion).
+
+    A Redis failure is logged, not raised, because the write already succeeded.
+    It marks the index stale instead, and the rebuild it enqueues repairs the
+    bits. Write paths call it through
+    ``post_commit.after_tag_links_change``.
+    """
+    if _client is None or not image_ids:
+        return
+    try:
+        # Before the bits: a rebuild that starts after this check has already
+        # taken the SELECT that sees this commit.
+        await _client.eval(  # type: ignore[misc]
+            JOURNAL_SCRIPT, 2, _REBUILDING_KEY, _JOURNAL_KEY, _REBUILDING_TTL_SECONDS, *image_ids
+        )
+        if tag_ids is None:
+            touched = {int(t) for t in await _client.smembers(INDEXED_TAGS_KEY)}  # type: ignore[misc]
+        else:
+            ordered = list(tag_ids)
+            flags = await _client.smismember(INDEXED_TAGS_KEY, ordered) if ordered else []  # type: ignore[misc]
+            touched = {t for t, flag in zip(ordered, flags, strict=True) if flag}
+        if not touched:
+            return
+        rows = await db.execute(
+            select(TagLinks.image_id, TagLinks.tag_id).where(  # type: ignore[call-overload]
+                TagLinks.image_id.in_(image_ids),  # type: ignore[attr-defined]
+                TagLinks.tag_id.in_(touched),  # type: ignore[attr-defined]
+            )
+        )
+        linked = set(rows.tuples())
+        async with _client.pipeline(transaction=False) as pipe:
+            for image_id in image_ids:
+                for tag_id in touched:
+                    pipe.setbit(tag_key(tag_id), image_id, int((image_id, tag_id) in linked))
+            await pipe.execute()
+    except Exception:
+        logger.warning("tag_postings_sync_failed", image_ids=list(image_ids), exc_info=True)
+        await _mark_stale(_client)
+
+
+async def _mark_stale(client: redis.Redis) -> None:  # type: ignore[type-arg]
+    """Send tag searches to SQL until a rebuild has repaired a failed sync."""
+    try:
+        await client.set(STALE_KEY, uuid.uuid4().hex)
+    except Exception:
+        logger.warning("tag_postings_mark_stale_failed", exc_info=True)
+    await enqueue_job("rebuild_tag_postings_job", _job_id="tag_postings_stale_rebuild")
+
+
+async def rebuild_tag_postings(db: AsyncSession) -> int:
+    """Rebuild every popular tag's bitmap from tag_links; return how many were built.
+
+    Each bitmap is written to a scratch key and RENAMEd into place, so readers
+    never see a half-built one. A sync landing between a tag's SELECT and its
+    RENAME writes to the old key; the journal replay at the end re-applies it.
+    Clears the stale mark left by a sync that failed before the rebuild started.
+    """
+    if _client is None:
+        return 0
+    stale_mark = await _client.get(STALE_KEY)
+    await _client.set(_REBUILDING_KEY, 1, ex=_REBUILDING_TTL_SECONDS)
+    popular = (
+        await db.execute(
+            select(Tags.tag_id).where(  # type: ignore[call-overload]
+                Tags.usage_count >= settings.TAG_POSTINGS_MIN_USAGE,
+                Tags.alias_of.is_(None),  # type: ignore[union-attr]
+            )
+        )
+    ).scalars()
+    popular_ids = set(popular.all())
+
+    for tag_id in sorted(popular_ids):
+        links = await db.execute(
+            select(TagLinks.image_id).where(TagLinks.tag_id == tag_id)  # type: ignore[call-overload]
+        )
+        scratch = f"{_TEMP_KEY_PREFIX}rebuild:{tag_id}"
+        async with _client.pipeline(transaction=True) as pipe:
+            pipe.set(scratch, bitmap_from_ids(links.scalars().all()))
+            pipe.rename(scratch, tag_key(tag_id))
+            pipe.sadd(INDEXED_TAGS_KEY, tag_id)
+            await pipe.execute()
+
+    previously = {int(t) for t in await _client.smembers(INDEXED_TAGS_KEY)}  # type: ignore[misc]
+    dropped = previously - popular_ids
+    if dropped:
+        async with _client.pipeline(transaction=True) as pipe:
+            pipe.srem(INDEXED_TAGS_KEY, *dropped)
+            pipe.delete(*(tag_key(t) for t in dropped))
+            await pipe.execute()
+
+    # Every key is in place: later syncs write to it directly. Replay the ones
+    # that landed meanwhile, on a fresh snapshot so their commits are visible.
+    async with _client.pipeline(transaction=True) as pipe:
+        pipe.smembers(_JOURNAL_KEY)
+        pipe.delete(_JOURNAL_KEY, _REBUILDING_KEY)
+        journal, _ = await pipe.execute()
+    journaled = sorted(int(image_id) for image_id in journal)
+    await db.commit()
+    for start in range(0, len(journaled), _JOURNAL_REPLAY_CHUNK):
+        await sync_tag_postings(db, journaled[start : start + _JOURNAL_REPLAY_CHUNK])
+
+    if stale_mark is not None:
+        await _client.eval(CLEAR_STALE_SCRIPT, 1, STALE_KEY, stale_mark)  # type: ignore[misc]
+
+    logger.info(
+        "tag_postings_rebuilt",
+        tags=len(popular_ids),
+        dropped=len(dropped),
+        replayed=len(journaled),
+    )
+    return len(popular_ids)
+
+
+async def _visibility_bitmap(
+    client: redis.Redis,  # type: ignore[type-arg]
+    db: AsyncSession,
+    key: str,
+) -> str:
+    """Ensure the non-public / repost bitmap exists (rebuilt every FEED_COUNT_TTL)."""
+    if await client.exists(key):
+        return key
+    status_clause = (
+        Images.status.notin_(PUBLIC_IMAGE_STATUSES)  # type: ignore[attr-defined]
+        if key == HIDDEN_IMAGES_KEY
+        else Images.status == ImageStatus.REPOST
+    )
+    ids = (await db.execute(select(Images.image_id).where(status_clause))).scalars().all()  # type: ignore[call-overload]
+    await client.set(key, bitmap_from_ids(ids), ex=FEED_COUNT_TTL)
+    return key
+
+
+@dataclass
+class TagPostingMatch:
+    """The images matching one request's tag filters, as a (temporary) Redis bitmap.
+
+    Release it when done; its temp keys also expire on their own.
+    """
+
+    client: redis.Redis  # type: ignore[type-arg]
+    key: str
+    _temp_keys: list[str] = field(default_factory=list)
+
+    async def count(self, db: AsyncSession, *, public_only: bool, hide_reposts: bool) -> int:
+        """Number of matching images, optionally without non-public images / reposts."""
+        key = self.key
+        if public_only:
+            key = await self._and_not(
+                key, await _visibility_bitmap(self.client, db, HIDDEN_IMAGES_KEY)
+            )
+        if hide_reposts:
+            key = await self._and_not(
+                key, await _visibility_bitmap(self.client, db, REPOST_IMAGES_KEY)
+            )
+        return int(await self.client.bitcount(key))
+
+    async def image_ids(
+        self, limit: int, *, descending: bool, after: int | None = None
+    ) -> tuple[list[int], bool]:
+        """Up to ``limit`` matching ids in image_id order, starting past ``after``.
+
+        Returns ``(ids, exhausted)``; ``exhausted`` means no further match exists.
+        """
+        length = int(await self.client.strlen(self.key))
+        found: list[int] = []
+        if descending:
+            end = length - 1 if after is None else min(length - 1, after >> 3)
+            while end >= 0 and len(found) < limit:
+                start = max(0, end - _SCAN_CHUNK_BYTES + 1)
+                chunk = await self.client.getrange(self.key, start, end)
+                found.extend(
+                    i
+                    for i in ids_from_bitmap(chunk, start, descending=True)
+                    if after is None or i < after
+                )
+                end = start - 1
+            return found[:limit], end < 0 and len(found) <= limit
+
+        start = 0 if after is None else (after + 1) >> 3
+        while start < length and len(found) < limit:
+            end = min(length - 1, start + _SCAN_CHUNK_BYTES - 1)
+            chunk = await self.client.getrange(self.key, start, end)
+            found.extend(
+                i
+                for i in ids_from_bitmap(chunk, start, descending=False)
+                if after is None or i > after
+            )
+            start = end + 1
+        return found[:limit], start >= length and len(found) <= limit
+
+    async def release(self) -> None:
+        if self._temp_keys:
+            await self.client.delete(*self._temp_keys)
+            self._temp_keys.clear()
+
+    def _temp_key(self) -> str:
+        key = f"{_TEMP_KEY_PREFIX}{uuid.uuid4().hex}"
+        self._temp_keys.append(key)
+        return key
+
+    async def _combine(self, op: str, keys: list[str]) -> str:
+        if len(keys) == 1:
+            return keys[0]
+        dest = self._temp_key()
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.bitop(op, dest, *keys)
+            pipe.expire(dest, _TEMP_KEY_TTL_SECONDS)
+            await pipe.execute()
+        return dest
+
+    async def _and_not(self, key: str, excluded: str) -> str:
+        dest = self._temp_key()
+        scratch = self._temp_key()
+        await self.client.eval(
+            _AND_NOT_SCRIPT, 4, dest, key, excluded, scratch, _TEMP_KEY_TTL_SECONDS
+        )
+        return dest
+
+    async def _put(self, bitmap: bytes) -> str:
+        dest = self._temp_key()
+        await self.client.set(dest, bitmap, ex=_TEMP_KEY_TTL_SECONDS)
+        return dest
+
+
+async def match_tags(
+    db: AsyncSession,
+    include_groups: list[set[int]],
+    exclude_ids: set[int] | None = None,
+) -> TagPostingMatch | None:
+    """Resolve a tag filter to a bitmap: AND over ``include_groups`` (each group an OR
+    of tag ids — one requested tag's hierarchy), minus any image with an
+    ``exclude_ids`` tag. None means "not servable from the index; use SQL".
+    """
+    if _client is None or not include_groups or not all(include_groups):
+        return None
+    exclude_ids = exclude_ids or set()
+    try:
+        return await _match_tags(_client, db, include_groups, exclude_ids)
+    except Exception:
+        logger.warning("tag_postings_match_failed", exc_info=True)
+        return None
+
+
+async def _match_tags(
+    client: redis.Redis,  # type: ignore[type-arg]
+    db: AsyncSession,
+    include_groups: list[set[int]],
+    exclude_ids: set[int],
+) -> TagPostingMatch | None:
+    every_tag = sorted(set().union(*include_groups, exclude_ids))
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.exists(STALE_KEY)
+        pipe.smismember(INDEXED_TAGS_KEY, every_tag)
+        for tag_id in every_tag:
+            pipe.exists(tag_key(tag_id))
+        stale, flags, *exists = await pipe.execute()
+    # A failed sync may have left bits missing: the bitmap would hide images.
+    if stale:
+        return None
+    # A tag whose key was evicted counts as unindexed, not as empty.
+    indexed = {
+        t for t, flag, present in zip(every_tag, flags, exists, strict=True) if flag and present
+    }
+
+    # A group with no indexed tag is small: SQL drives from it cheaply.
+    if not all(group & indexed for group in include_groups):
+        return None
+
+    small = set(every_tag) - indexed
+    merged: dict[int, list[int]] = {}
+    if small:
+        small_links = (
+            await db.execute(
+                select(func.coalesce(func.sum(Tags.usage_count), 0)).where(
+                    Tags.tag_id.in_(small)  # type: ignore[union-attr]
+                )
+            )
+        ).scalar() or 0
+        if small_links > MAX_MERGED_LINKS:
+            return None
+        rows = await db.execute(
+            select(TagLinks.tag_id, TagLinks.image_id).where(  # type: ignore[call-overload]
+                TagLinks.tag_id.in_(small)  # type: ignore[attr-defined]
+            )
+        )
+        for tag_id, image_id in rows.tuples():
+            merged.setdefault(tag_id, []).append(image_id)
+
+    match = TagPostingMatch(client=client, key="")
+
+    async def group_key(group: set[int]) -> str | None:
+        keys = [tag_key(t) for t in sorted(group & indexed)]
+        extra_ids = [i for t in group - indexed for i in merged.get(t, ())]
+        if extra_ids:
+            keys.append(await match._put(bitmap_from_ids(extra_ids)))
+        return await match._combine("OR", keys) if keys else None
+
+    included = [await group_key(group) for group in include_groups]
+    match.key = await match._combine("AND", [k for k in included if k is not None])
+    if exclude_ids:
+        excluded = await group_key(exclude_ids)
+        if excluded is not None:
+            match.key = await match._and_not(match.key, excluded)
+    return match
@@ -0,0 +1,568 @@
+"""Precomputed hierarchy image counts for the tag page.
+
+``GET /tags/{tag_id}`` shows how many images carry the tag or any tag in its
+subtree, which is a ``count(DISTINCT image_id)`` over every link in the subtree,
+joined to images for visibility. For parent tags like "long hair" that is a scan
+over hundreds of thousands of links per page view. This module keeps the answer
+in Redis for every tag whose subtree holds at least ``TAG_SUBTREE_COUNTS_MIN_LINKS``
+links (a *root*); smaller subtrees stay on the SQL path, where they are cheap.
+
+Per root, ``tag_counts:subtree:{tag_id}`` is a hash of three distinct-image
+counts: ``all``, ``public`` (status in PUBLIC_IMAGE_STATUSES) and ``repost``.
+Reposts are public, so every visibility a viewer can ask for is one or two of
+these (:meth:`SubtreeCounts.visible`); signed-in viewers add their own hidden
+images with a query over their own uploads only.
+
+Counts are maintained write-through, idempotently, from bitmap state: per root,
+bit ``n`` of ``tag_counts:members:{tag_id}`` is set when image ``n`` has a tag in
+the subtree; ``tag_counts:hidden`` / ``tag_counts:reposts`` hold every image's
+visibility class. ``tag_counts:tag_roots`` maps each tag to the roots whose
+subtree contains it, and ``tag_counts:image_roots`` each image to the roots it
+is a member of, so a write touches only that image's own roots rather than
+every root, and never grows a root's bitmap for an image outside it.
+
+- Every tag_links write path calls ``post_commit.after_tag_links_change`` after
+  commit, which calls :func:`sync_tag_subtree_counts`: it re-reads the images'
+  links and moves each membership bit, and the counts with it, to the committed
+  state.
+- Status changes go through ``post_commit.after_image_status_change``, which
+  calls :func:`record_subtree_status_change` to move the image between classes
+  in every root it belongs to.
+- ``rebuild_tag_subtree_counts`` (arq, nightly) recomputes everything from the
+  DB, picks up new roots, and repairs drift from writers that bypass the hooks.
+- The write-through path moves images between roots, never tags. A committed
+  parent or alias edit goes through ``post_commit.after_tag_hierarchy_change``,
+  which calls :func:`record_tag_hierarchy_change` to mark the counts stale and
+  enqueue a rebuild, as a failed sync does.
+- While a rebuild runs, each link sync and status change journals its image
+  ids, as the tag posting lists do: the class bitmaps and roots written from an
+  older SELECT, or the image_roots index renamed in at the end, can overwrite
+  what the write did. Once image_roots is in place the rebuild re-syncs every
+  journaled image's links, sets its class from its status, and recounts the
+  roots it is or was in from their bitmaps.
+- A sync that fails, or a hierarchy edit, marks the counts stale
+  (``tag_counts:stale``) and enqueues a rebuild. Until that rebuild completes,
+  :func:`get_subtree_counts` returns None and get_tag counts in SQL.
+
+Only processes that call :func:`start_tag_subtree_counts` (the API lifespan and
+the arq worker) use the counts; everywhere else every function here is a no-op
+and get_tag keeps its SQL count.
+"""
+
+import uuid
+from collections.abc import Collection
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ImageStatus, settings
+from app.core.logging import get_logger
+from app.core.metrics import record_cache
+from app.core.redis import shared_binary_redis
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+from app.services.image_visibility import PUBLIC_IMAGE_STATUSES
+from app.services.tag_graph import load_tag_graph
+from app.services.tag_postings import CLEAR_STALE_SCRIPT, JOURNAL_SCRIPT, bitmap_from_ids
+from app.tasks.queue import enqueue_job
+
+logger = get_logger(__name__)
+
+ROOTS_KEY = "tag_counts:roots"
+TAG_ROOTS_KEY = "tag_counts:tag_roots"
+IMAGE_ROOTS_KEY = "tag_counts:image_roots"
+HIDDEN_IMAGES_KEY = "tag_counts:hidden"
+REPOST_IMAGES_KEY = "tag_counts:reposts"
+STALE_KEY = "tag_counts:stale"
+_REBUILDING_KEY = "tag_counts:rebuilding"
+_JOURNAL_KEY = "tag_counts:rebuild_journal"
+_COUNTS_KEY_PREFIX = "tag_counts:subtree:"
+_MEMBERS_KEY_PREFIX = "tag_counts:members:"
+_SCRATCH_KEY_PREFIX = "tag_counts:tmp:"
+
+# Move one image's membership to the roots in ARGV and adjust each root's counts
+# by the difference; the previous roots are read from image_roots, so only
+# those and the new ones are touched. KEYS: hidden, reposts, image_roots.
+# ARGV: members key prefix, counts key prefix, image id, present (0 when the
+# image was deleted), then the new roots. The image's class is read from the
+# class bitmaps, never changed here except to clear it for a deleted image:
+# status changes own it. A root whose counts hash is missing has not been built
+# (or was dropped) and is skipped.
+_SYNC_LINKS_SCRIPT = """
+local image = tonumber(ARGV[3])
+local hidden = redis.call('GETBIT', KEYS[1], image)
+local repost = redis.call('GETBIT', KEYS[2], image)
+local new, roots, kept = {}, {}, {}
+for i = 5, #ARGV do
+    new[ARGV[i]] = true
+    roots[#roots + 1] = ARGV[i]
+end
+local old = redis.call('HGET', KEYS[3], ARGV[3])
+if old then
+    for root in string.gmatch(old, '[^,]+') do
+        if not new[root] then
+            roots[#roots + 1] = root
+        end
+    end
+end
+for _, root in ipairs(roots) do
+    local counts = ARGV[2] .. root
+    if redis.call('EXISTS', counts) == 1 then
+        local bit = new[root] and 1 or 0
+        local delta = bit - redis.call('SETBIT', ARGV[1] .. root, image, bit)
+        if delta ~= 0 then
+            redis.call('HINCRBY', counts, 'all', delta)
+            redis.call('HINCRBY', counts, 'public', delta * (1 - hidden))
+            redis.call('HINCRBY', counts, 'repost', delta * repost)
+        end
+        if bit == 1 then
+            kept[#kept + 1] = root
+        end
+    end
+end
+if #kept > 0 then
+    redis.call('HSET', KEYS[3], ARGV[3], table.concat(kept, ','))
+else
+    redis.call('HDEL', KEYS[3], ARGV[3])
+end
+if ARGV[4] == '0' then
+    if hidden == 1 then
+        redis.call('SETBIT', KEYS[1], image, 0)
+    end
+    if repost == 1 then
+        redis.call('SETBIT', KEYS[2], image, 0)
+    end
+end
+"""
+
+# Move one image to a new class in every root it belongs to (per image_roots).
+# KEYS: hidden, reposts, image_roots. ARGV: counts key prefix, image id,
+# hidden, repost.
+_SYNC_STATUS_SCRIPT = """
+local image = tonumber(ARGV[2])
+local new_hidden, new_repost = tonumber(ARGV[3]), tonumber(ARGV[4])
+local old_hidden = redis.call('SETBIT', KEYS[1], image, new_hidden)
+local old_repost = redis.call('SETBIT', KEYS[2], image, new_repost)
+if old_hidden == new_hidden and old_repost == new_repost then
+    return
+end
+local roots = redis.call('HGET', KEYS[3], ARGV[2])
+if not roots then
+    return
+end
+for root in string.gmatch(roots, '[^,]+') do
+    local counts = ARGV[1] .. root
+    if redis.call('EXISTS', counts) == 1 then
+        redis.call('HINCRBY', counts, 'public', old_hidden - new_hidden)
+        redis.call('HINCRBY', counts, 'repost', new_repost - old_repost)
+    end
+end
+"""
+
+# Set journaled images' classes, then recompute each root's counts from its
+# bitmap and the class bitmaps rather than by delta, so the result does not
+# depend on what the rebuild's snapshot or a status change left in the class
+# bits. KEYS: hidden, reposts, scratch. ARGV: members key prefix, counts key
+# prefix, image count n, n (image, hidden, repost) triples, then the roots.
+_RECOUNT_SCRIPT = """
+local n = tonumber(ARGV[3])
+for i = 0, n - 1 do
+    local image = tonumber(ARGV[4 + 3 * i])
+    redis.call('SETBIT', KEYS[1], image, ARGV[5 + 3 * i])
+    redis.call('SETBIT', KEYS[2], image, ARGV[6 + 3 * i])
+end
+for i = 4 + 3 * n, #ARGV do
+    local counts = ARGV[2] .. ARGV[i]
+    if redis.call('EXISTS', counts) == 1 then
+        local members = ARGV[1] .. ARGV[i]
+        local all = redis.call('BITCOUNT', members)
+        redis.call('BITOP', 'AND', KEYS[3], members, KEYS[1])
+        local hidden = redis.call('BITCOUNT', KEYS[3])
+        redis.call('BITOP', 'AND', KEYS[3], members, KEYS[2])
+        local repost = redis.call('BITCOUNT', KEYS[3])
+        redis.call('HSET', counts, 'all', all, 'public', all - hidden, 'repost', repost)
+    end
+end
+redis.call('DEL', KEYS[3])
+"""
+
+# image_roots entries written per HSET while rebuilding.
+_REBUILD_CHUNK = 10_000
+
+# Outlives the rebuild job's timeout; a rebuild that dies leaves no flag behind.
+_REBUILDING_TTL_SECONDS = 2 * 3600
+
+# Images re-synced per batch when a rebuild replays its journal.
+_JOURNAL_REPLAY_CHUNK = 1000
+
+_client: redis.Redis | None = None  # type: ignore[type-arg]
+
+
+def counts_key(tag_id: int) -> str:
+    return f"{_COUNTS_KEY_PREFIX}{tag_id}"
+
+
+def members_key(tag_id: int) -> str:
+    return f"{_MEMBERS_KEY_PREFIX}{tag_id}"
+
+
+def _root_keys(roots: Collection[int]) -> list[str]:
+    return [key for root in roots for key in (members_key(root), counts_key(root))]
+
+
+def _image_class(status: int) -> tuple[int, int]:
+    """``(hidden, repost)`` bits for an image with ``status``."""
+    return int(status not in PUBLIC_IMAGE_STATUSES), int(status == ImageStatus.REPOST)
+
+
+@dataclass(frozen=True)
+class SubtreeCounts:
+    """Distinct images in a tag's subtree, by visibility class."""
+
+    all: int
+    public: int
+    repost: int
+
+    def visible(self, *, show_all: bool, hide_reposts: bool) -> int:
+        """What a viewer with these settings sees, before their own hidden images."""
+        total = self.all if show_all else self.public
+        return total - self.repost if hide_reposts else total
+
+
+async def start_tag_subtree_counts() -> None:
+    """Take the shared binary client (API lifespan / worker startup, after
+    ``start_redis``): the membership and class state are bitmaps."""
+    global _client
+    _client = shared_binary_redis()
+
+
+async def stop_tag_subtree_counts() -> None:
+    global _client
+    _client = None
+
+
+async def get_subtree_counts(tag_id: int) -> SubtreeCounts | None:
+    """The precomputed counts for ``tag_id``'s subtree; None when it has none
+    (not a root, not built yet, stale, or no Redis) and the caller should count
+    in SQL."""
+    if _client is None:
+        return None
+    try:
+        async with _client.pipeline(transaction=False) as pipe:
+            pipe.exists(STALE_KEY)
+            pipe.hmget(counts_key(tag_id), ["all", "public", "repost"])
+            stale, values = await pipe.execute()
+    except Exception:
+        logger.warning("tag_subtree_counts_read_failed", tag_id=tag_id, exc_info=True)
+        return None
+    # A failed sync may have left these counts behind the database.
+    hit = not stale and all(value is not None for value in values)
+    record_cache("tag_subtree_counts", hit=hit)
+    if not hit:
+        return None
+    return SubtreeCounts(*(int(value) for value in values))
+
+
+async def _roots_of(
+    client: redis.Redis,  # type: ignore[type-arg]
+    tag_ids: Collection[int],
+) -> dict[int, set[int]]:
+    ordered = list(tag_ids)
+    if not ordered:
+        return {}
+    values = await client.hmget(TAG_ROOTS_KEY, ordered)  # type: ignore[misc]
+    return {
+        tag_id: {int(root) for root in value.split(b",")}
+        for tag_id, value in zip(ordered, values, strict=True)
+        if value
+    }
+
+
+async def sync_tag_subtree_counts(db: AsyncSession, image_ids: Collection[int]) -> None:
+    """Bring the subtree membership of ``image_ids`` in line with tag_links.
+
+    Call after the commit that changed their links (or deleted them). Each
+    image's new roots come from its links, its previous ones from
+    ``tag_counts:image_roots``. Idempotent. Best-effort: a failure is logged,
+    marks the counts stale and enqueues the rebuild that repairs them.
+    """
+    if _client is None or not image_ids:
+        return
+    try:
+        # Before the reads: a rebuild that starts after this check has already
+        # taken the SELECTs that see this commit.
+        await _client.eval(  # type: ignore[misc]
+            JOURNAL_SCRIPT, 2, _REBUILDING_KEY, _JOURNAL_KEY, _REBUILDING_TTL_SECONDS, *image_ids
+        )
+        rows = await db.execute(
+            select(TagLinks.image_id, TagLinks.tag_id).where(  # type: ignore[call-overload]
+                TagLinks.image_id.in_(image_ids)  # type: ignore[attr-defined]
+            )
+        )
+        links: dict[int, set[int]] = {}
+        for image_id, tag_id in rows.tuples():
+            links.setdefault(image_id, set()).add(tag_id)
+        present = set(
+            (
+                await db.execute(
+                    select(Images.image_id).where(Images.image_id.in_(image_ids))  # type: ignore[call-overload,union-attr]
+                )
+            ).scalars()
+        )
+        roots_of = await _roots_of(_client, set().union(*links.values()))
+
+        async with _client.pipeline(transaction=False) as pipe:
+            for image_id in image_ids:
+                member_of = set().union(*(roots_of.get(t, set()) for t in links.get(image_id, ())))
+                pipe.eval(
+                    _SYNC_LINKS_SCRIPT,
+                    3,
+                    HIDDEN_IMAGES_KEY,
+                    REPOST_IMAGES_KEY,
+                    IMAGE_ROOTS_KEY,
+                    _MEMBERS_KEY_PREFIX,
+                    _COUNTS_KEY_PREFIX,
+                    image_id,
+                    int(image_id in present),
+                    *sorted(member_of),
+                )
+            await pipe.execute()
+    except Exception:
+        logger.warning("tag_subtree_counts_sync_failed", image_ids=list(image_ids), exc_info=True)
+        await _mark_stale(_client)
+
+
+async def record_subtree_status_change(image_id: int, new_status: int) -> None:
+    """Move one image to ``new_status``'s visibility class in the roots it belongs to.
+
+    Call after the commit that changed the status. Idempotent (the previous
+    class is read from Redis, not passed in) and best-effort: a failure marks the
+    counts stale, like a failed link sync. Journaled while a rebuild runs, as
+    link syncs are: the rebuild's class bitmaps come from an older SELECT.
+    """
+    if _client is None:
+        return
+    try:
+        await _client.eval(  # type: ignore[misc]
+            JOURNAL_SCRIPT, 2, _REBUILDING_KEY, _JOURNAL_KEY, _REBUILDING_TTL_SECONDS, image_id
+        )
+        await _client.eval(  # type: ignore[misc]
+            _SYNC_STATUS_SCRIPT,
+            3,
+            HIDDEN_IMAGES_KEY,
+            REPOST_IMAGES_KEY,
+            IMAGE_ROOTS_KEY,
+            _COUNTS_KEY_PREFIX,
+            image_id,
+            *_image_class(new_status),
+        )
+    except Exception:
+        logger.warning("tag_subtree_status_sync_failed", image_id=image_id, exc_info=True)
+        await _mark_stale(_client)
+
+
+async def record_tag_hierarchy_change() -> None:
+    """Send tag pages to SQL until a rebuild has followed a committed parent or alias edit.
+
+    Call after the commit. Without it a moved subtree would keep its old counts
+    until the nightly rebuild, while get_tag adds the viewer's own hidden images
+    over the live hierarchy.
+    """
+    if _client is None:
+        return
+    await _mark_stale(_client)
+
+
+async def _mark_stale(client: redis.Redis) -> None:  # type: ignore[type-arg]
+    """Send tag pages to SQL until a rebuild has repaired a failed sync or followed
+    a hierarchy edit."""
+    try:
+        await client.set(STALE_KEY, uuid.uuid4().hex)
+    except Exception:
+        logger.warning("tag_subtree_counts_mark_stale_failed", exc_info=True)
+    await enqueue_job("rebuild_tag_subtree_counts_job", _job_id="tag_subtree_counts_stale_rebuild")
+
+
+async def _image_roots_of(
+    client: redis.Redis,  # type: ignore[type-arg]
+    image_ids: list[int],
+) -> set[int]:
+    values = await client.hmget(IMAGE_ROOTS_KEY, image_ids)  # type: ignore[misc]
+    return {int(root) for value in values if value for root in value.split(b",")}
+
+
+async def _replay_journal(
+    client: redis.Redis,  # type: ignore[type-arg]
+    db: AsyncSession,
+    image_ids: list[int],
+) -> None:
+    """Re-apply the link syncs and status changes that landed during a rebuild.
+
+    A status change can flip an image's class bit before the rebuild writes a
+    root from its older snapshot; the status script then finds the bit already
+    set and leaves the root's counts alone. So after re-syncing the links, the
+    images' classes are set from ``Images.status`` and every root they are or
+    were in is recounted from its bitmap.
+    """
+    roots = await _image_roots_of(client, image_ids)
+    await sync_tag_subtree_counts(db, image_ids)
+    roots |= await _image_roots_of(client, image_ids)
+    statuses = (
+        await db.execute(
+            select(Images.image_id, Images.status).where(  # type: ignore[call-overload]
+                Images.image_id.in_(image_ids)  # type: ignore[union-attr]
+            )
+        )
+    ).tuples()
+    classes = [(image_id, *_image_class(status)) for image_id, status in statuses]
+    await client.eval(  # type: ignore[misc]
+        _RECOUNT_SCRIPT,
+        3,
+        HIDDEN_IMAGES_KEY,
+        REPOST_IMAGES_KEY,
+        f"{_SCRATCH_KEY_PREFIX}recount",
+        _MEMBERS_KEY_PREFIX,
+        _COUNTS_KEY_PREFIX,
+        len(classes),
+        *(value for image_class in classes for value in image_class),
+        *sorted(roots),
+    )
+
+
+async def rebuild_tag_subtree_counts(db: AsyncSession) -> int:
+    """Recompute every root's membership and counts from the DB; return the root count.
+
+    Each root's bitmap and counts are swapped in together, in one transaction, so
+    readers never see counts that disagree with the bitmap; the image -> roots
+    index is built aside and renamed in at the end. Either, like the class
+    bitmaps, can overwrite a sync or status change that landed while the rebuild
+    ran; the journal replay after the rename re-applies it. Clears the stale mark
+    left by a failed sync or a hierarchy edit before the rebuild started.
+    """
+    if _client is None:
+        return 0
+    stale_mark = await _client.get(STALE_KEY)
+    await _client.set(_REBUILDING_KEY, 1, ex=_REBUILDING_TTL_SECONDS)
+
+    graph = await load_tag_graph(db)
+    usage = dict(
+        (
+            await db.execute(
+                select(Tags.tag_id, Tags.usage_count).where(  # type: ignore[call-overload]
+                    Tags.alias_of.is_(None)  # type: ignore[union-attr]
+                )
+            )
+        ).tuples()
+    )
+    subtrees: dict[int, list[int]] = {}
+    for tag_id in usage:
+        if (
+            graph.children.get(tag_id) is None
+            and usage[tag_id] < settings.TAG_SUBTREE_COUNTS_MIN_LINKS
+        ):
+            continue  # a leaf's subtree is itself
+        subtree = graph.hierarchy(tag_id)
+        if sum(usage.get(t, 0) for t in subtree) >= settings.TAG_SUBTREE_COUNTS_MIN_LINKS:
+            subtrees[tag_id] = subtree
+
+    hidden = set(
+        (
+            await db.execute(
+                select(Images.image_id).where(  # type: ignore[call-overload]
+                    Images.status.notin_(PUBLIC_IMAGE_STATUSES)  # type: ignore[attr-defined]
+                )
+            )
+        ).scalars()
+    )
+    reposts = set(
+        (
+            await db.execute(
+                select(Images.image_id).where(Images.status == ImageStatus.REPOST)  # type: ignore[call-overload,arg-type]
+            )
+        ).scalars()
+    )
+    async with _client.pipeline(transaction=True) as pipe:
+        pipe.set(HIDDEN_IMAGES_KEY, bitmap_from_ids(hidden))
+        pipe.set(REPOST_IMAGES_KEY, bitmap_from_ids(reposts))
+        await pipe.execute()
+
+    tag_roots: dict[int, list[int]] = {}
+    image_roots: dict[int, list[int]] = {}
+    for root, subtree in sorted(subtrees.items()):
+        members = set(
+            (
+                await db.execute(
+                    select(func.distinct(TagLinks.image_id)).where(  # type: ignore[call-overload]
+                        TagLinks.tag_id.in_(subtree)  # type: ignore[attr-defined]
+                    )
+                )
+            ).scalars()
+        )
+        scratch = f"{_SCRATCH_KEY_PREFIX}{root}"
+        async with _client.pipeline(transaction=True) as pipe:
+            pipe.set(scratch, bitmap_from_ids(members))
+            pipe.rename(scratch, members_key(root))
+            pipe.hset(
+                counts_key(root),
+                mapping={
+                    "all": len(members),
+                    "public": len(members - hidden),
+                    "repost": len(members & reposts),
+                },
+            )
+            pipe.sadd(ROOTS_KEY, root)
+            await pipe.execute()
+        for tag_id in subtree:
+            tag_roots.setdefault(tag_id, []).append(root)
+        for image_id in members:
+            image_roots.setdefault(image_id, []).append(root)
+
+    scratch = f"{_SCRATCH_KEY_PREFIX}image_roots"
+    await _client.delete(scratch)
+    entries = [(image_id, ",".join(map(str, roots))) for image_id, roots in image_roots.items()]
+    for start in range(0, len(entries), _REBUILD_CHUNK):
+        await _client.hset(scratch, mapping=dict(entries[start : start + _REBUILD_CHUNK]))  # type: ignore[misc]
+
+    previously = {int(root) for root in await _client.smembers(ROOTS_KEY)}  # type: ignore[misc]
+    dropped = previously - subtrees.keys()
+    async with _client.pipeline(transaction=True) as pipe:
+        if entries:
+            pipe.rename(scratch, IMAGE_ROOTS_KEY)
+        else:
+            pipe.delete(IMAGE_ROOTS_KEY)
+        pipe.delete(TAG_ROOTS_KEY)
+        if tag_roots:
+            pipe.hset(
+                TAG_ROOTS_KEY,
+                mapping={tag_id: ",".join(map(str, roots)) for tag_id, roots in tag_roots.items()},
+            )
+        if dropped:
+            pipe.srem(ROOTS_KEY, *dropped)
+            pipe.delete(*_root_keys(dropped))
+        await pipe.execute()
+
+    # image_roots is in place: later syncs read and write it directly. Replay
+    # the ones that landed meanwhile, on a fresh snapshot so their commits are
+    # visible.
+    async with _client.pipeline(transaction=True) as pipe:
+        pipe.smembers(_JOURNAL_KEY)
+        pipe.delete(_JOURNAL_KEY, _REBUILDING_KEY)
+        journal, _ = await pipe.execute()
+    journaled = sorted(int(image_id) for image_id in journal)
+    await db.commit()
+    for start in range(0, len(journaled), _JOURNAL_REPLAY_CHUNK):
+        await _replay_journal(_client, db, journaled[start : start + _JOURNAL_REPLAY_CHUNK])
+
+    if stale_mark is not None:
+        await _client.eval(CLEAR_STALE_SCRIPT, 1, STALE_KEY, stale_mark)  # type: ignore[misc]
+
+    logger.info(
+        "tag_subtree_counts_rebuilt",
+        roots=len(subtrees),
+        dropped=len(dropped),
+        replayed=len(journaled),
+    )
+    return len(subtrees)
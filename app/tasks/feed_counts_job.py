@@ -0,0 +1,32 @@
+"""Arq task reconciling the write-through feed counters."""
+
+from typing import Any
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def reconcile_feed_counts_job(ctx: dict[str, Any]) -> None:
+    """
+    Reset the global feed counters from the images table (every 10 minutes).
+
+    The API adjusts the counters after each image create/delete/status change;
+    this corrects whatever those adjustments missed (a Redis blip, a write path
+    that bypasses them, a direct DB edit).
+    """
+    from app.core.database import get_async_session
+    from app.services.feed_count_cache import reconcile_feed_counts
+
+    async with get_async_session() as db:
+        try:
+            total, hidden, repost = await reconcile_feed_counts(db)
+        except Exception as e:
+            logger.exception(
+                "feed_counts_reconcile_failed",
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            return
+
+    logger.info("feed_counts_reconciled", total=total, hidden=hidden, repost=repost)
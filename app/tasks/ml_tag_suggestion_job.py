@@ -13,9 +13,10 @@ from typing import Any
 import redis.asyncio as redis
 from sqlalchemy import select
 
-from app.config import settings
 from app.core.database import get_async_session
 from app.core.logging import bind_context, get_logger
+from app.core.metrics import record_cache
+from app.core.redis import shared_redis
 from app.models.image import Images
 from app.services.ml_suggestion_pipeline import (
     generate_and_store_suggestions,
@@ -25,9 +26,10 @@ from app.services.ml_suggestion_pipeline import (
 logger = get_logger(__name__)
 
 
-def _analyze_redis() -> redis.Redis:  # type: ignore[type-arg]
-    """Return a Redis client pointed at the analyze-cache DB (db 0, same as the API endpoint)."""
-    return redis.from_url(str(settings.REDIS_URL), encoding="utf-8", decode_responses=True)
+def _analyze_redis() -> redis.Redis | None:  # type: ignore[type-arg]
+    """The worker's shared Redis client, pointed at the analyze-cache DB (db 0, same
+    as the API endpoint); None outside a started worker."""
+    return shared_redis()
 
 
 async def generate_ml_tag_suggestions(
@@ -77,12 +79,10 @@ async def generate_ml_tag_suggestions(
             if image.md5_hash:
                 try:
                     client = _analyze_redis()
-                    try:
-                        blob = await client.get(f"ml:analyze:{image.md5_hash}")
-                    finally:
-                        await client.aclose()  # type: ignore[attr-defined]  # stub lags runtime; aclose is correct
+                    blob = await client.get(f"ml:analyze:{image.md5_hash}") if client else None
                     if blob:
                         cached_raw = json.loads(blob)
+                    record_cache("ml_analyze", hit=cached_raw is not None)
                 except Exception:
                     logger.warning(
                         "ml_tag_suggestion_job_cache_read_failed",
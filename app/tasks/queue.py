@@ -11,21 +11,35 @@ from arq.connections import ArqRedis, RedisSettings
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import Counter
+from app.core.redis import shared_queue_pool
 
 logger = get_logger(__name__)
 
 # Global pool instance (created on first use)
 _pool: ArqRedis | None = None
 
+# reason "duplicate": arq refused the job because one with the same _job_id exists.
+ENQUEUE_FAILURES = Counter(
+    "arq_enqueue_failures_total",
+    "Jobs that were not enqueued, by function and reason (duplicate or error).",
+    ("function", "reason"),
+)
+
 
 async def get_queue() -> ArqRedis:
     """
     Get or create arq Redis connection pool.
 
+    In processes that started the shared Redis pools (app/core/redis.py) this
+    wraps the shared queue pool; elsewhere it opens a pool of its own.
+
     Returns:
         ArqRedis pool instance
     """
     global _pool
+    if _pool is None and (shared := shared_queue_pool()) is not None:
+        _pool = ArqRedis(pool_or_conn=shared)
     if _pool is None:
         redis_settings = RedisSettings.from_dsn(settings.ARQ_REDIS_URL)
         _pool = await create_pool(redis_settings)
@@ -71,9 +85,11 @@ async def enqueue_job(
             return job.job_id
         else:
             logger.warning("job_enqueue_failed", function=function_name, kwargs=kwargs)
+            ENQUEUE_FAILURES.inc(function_name, "duplicate")
             return None
 
     except Exception as e:
+        ENQUEUE_FAILURES.inc(function_name, "error")
         logger.error(
             "job_enqueue_error",
             function=function_name,
@@ -0,0 +1,58 @@
+"""Arq task draining the Meilisearch sync outbox."""
+
+import secrets
+from typing import Any
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Runs overlap when a drain outlasts the cron interval; two drains pushing the
+# same tags could land an older document last. The lock expires on its own if
+# a worker dies mid-drain. Each run holds it under its own token and releases
+# it only if it still holds it: a drain that outlived the TTL must not delete
+# the lock the next run has taken since.
+_LOCK_KEY = "search_outbox:drain_lock"
+_LOCK_SECONDS = 300
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+async def drain_search_outbox_job(ctx: dict[str, Any]) -> None:
+    """
+    Push pending tag changes to Meilisearch (every 10 seconds).
+
+    No-op when the worker started without Meilisearch: the rows wait in the
+    outbox until a worker that has it drains them.
+    """
+    from app.core.database import get_async_session
+    from app.services.search import SearchService
+    from app.services.search_outbox import drain_search_outbox
+
+    client = ctx.get("meilisearch_client")
+    if client is None:
+        return
+
+    redis = ctx["redis"]
+    token = secrets.token_hex(16)
+    if not await redis.set(_LOCK_KEY, token, nx=True, ex=_LOCK_SECONDS):
+        return
+    try:
+        async with get_async_session() as db:
+            drained = await drain_search_outbox(db, SearchService(client))
+    except Exception as e:
+        logger.exception(
+            "search_outbox_drain_failed",
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+        return
+    finally:
+        await redis.eval(_RELEASE_SCRIPT, 1, _LOCK_KEY, token)
+
+    if drained:
+        logger.info("search_outbox_drained", rows=drained)
@@ -0,0 +1,32 @@
+"""Arq task for the nightly tag posting-list rebuild."""
+
+from typing import Any
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def rebuild_tag_postings_job(ctx: dict[str, Any]) -> None:
+    """
+    Nightly rebuild of the per-tag image bitmaps (04:30 UTC).
+
+    Repairs any drift from writers that bypass sync_tag_postings and picks up
+    tags that crossed TAG_POSTINGS_MIN_USAGE since the last run. Also the way to
+    build the index for the first time: enqueue ``rebuild_tag_postings_job``.
+    """
+    from app.core.database import get_async_session
+    from app.services.tag_postings import rebuild_tag_postings
+
+    async with get_async_session() as db:
+        try:
+            built = await rebuild_tag_postings(db)
+        except Exception as e:
+            logger.exception(
+                "tag_postings_rebuild_failed",
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            return
+
+    logger.info("tag_postings_rebuild_complete", tags=built)
@@ -0,0 +1,33 @@
+"""Arq task for the nightly rebuild of the tag page's hierarchy counts."""
+
+from typing import Any
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def rebuild_tag_subtree_counts_job(ctx: dict[str, Any]) -> None:
+    """
+    Nightly rebuild of the precomputed subtree image counts (04:45 UTC).
+
+    Repairs drift from writers that bypass the write-through hooks and picks up
+    tags whose subtree crossed TAG_SUBTREE_COUNTS_MIN_LINKS. Also enqueued after
+    a failed sync or a hierarchy edit, which mark the counts stale until it runs. Also the way to build the counts for the first
+    time: enqueue ``rebuild_tag_subtree_counts_job``.
+    """
+    from app.core.database import get_async_session
+    from app.services.tag_subtree_counts import rebuild_tag_subtree_counts
+
+    async with get_async_session() as db:
+        try:
+            roots = await rebuild_tag_subtree_counts(db)
+        except Exception as e:
+            logger.exception(
+                "tag_subtree_counts_rebuild_failed",
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            return
+
+    logger.info("tag_subtree_counts_rebuild_complete", roots=roots)
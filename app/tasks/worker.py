@@ -29,6 +29,7 @@ from app.services.image_status import enqueue_r2_sync_on_status_change
 from app.services.review_jobs import check_review_deadlines
 from app.services.user_cleanup import cleanup_unverified_accounts
 from app.tasks.email_jobs import send_password_reset_email_job, send_verification_email_job
+from app.tasks.feed_counts_job import reconcile_feed_counts_job
 from app.tasks.image_jobs import (
     add_to_iqdb_job,
     create_thumbnail_job,
@@ -42,6 +43,9 @@ from app.tasks.r2_jobs import (
     sync_image_status_job,
 )
 from app.tasks.rating_jobs import recalculate_rating_job
+from app.tasks.search_outbox_job import drain_search_outbox_job
+from app.tasks.tag_postings_job import rebuild_tag_postings_job
+from app.tasks.tag_subtree_counts_job import rebuild_tag_subtree_counts_job
 from app.tasks.taste_profile import refresh_user_tag_affinity_job
 
 # Same pattern as app/main.py: configure structlog at module import. arq is
@@ -157,9 +161,9 @@ async def startup(ctx: dict[str, Any]) -> None:
     # would crash-loop on the first missing import.
     _check_lockfile_freshness(logger)
 
-    # Initialize Meilisearch search service so worker tasks calling
-    # sync_tag_to_search / sync_tags_to_search actually sync (rather than
-    # silently no-opping on the module-level None default). Mirrors the
+    # Initialize Meilisearch so the search outbox drain has a client in ctx
+    # (without one it leaves the rows queued) and the module-level search
+    # service isn't silently None. Mirrors the
     # FastAPI lifespan in app/main.py and degrades gracefully if Meilisearch
     # is unreachable — the worker should still process non-search jobs.
     client: MeilisearchClient | None = None
@@ -181,6 +185,43 @@ async def startup(ctx: dict[str, Any]) -> None:
             exc_info=True,
         )
 
+    # Shared Redis pools for the job code (caches, counters, ML analyze cache)
+    from app.core.redis import start_redis
+
+    await start_redis()
+
+    # Tag posting-list bitmaps: the rebuild job writes them, and tag_links writes
+    # made by worker jobs keep them in sync.
+    from app.services.tag_postings import start_tag_postings
+
+    await start_tag_postings()
+
+    # Hierarchy image counts for the tag page: the rebuild job writes them, and
+    # tag_links and status changes made by worker jobs keep them in sync.
+    from app.services.tag_subtree_counts import start_tag_subtree_counts
+
+    await start_tag_subtree_counts()
+
+    # Feed counters: the reconcile job writes them, and status changes made by
+    # worker jobs (review deadlines) adjust them.
+    from app.services.feed_count_cache import start_feed_counters
+
+    await start_feed_counters()
+
+    # Status and tag changes made by worker jobs invalidate cached feed responses.
+    from app.services.feed_response_cache import start_feed_response_cache
+
+    await start_feed_response_cache()
+
+    # Prometheus exposition for the job-side metrics (ML analyze cache, Redis
+    # calls); the worker has no API to hang /metrics on.
+    if settings.WORKER_METRICS_PORT:
+        from app.core.metrics import start_metrics_server
+
+        ctx["metrics_server"] = await start_metrics_server(
+            settings.WORKER_METRICS_PORT, settings.WORKER_METRICS_HOST, settings.METRICS_TOKEN
+        )
+
     # Load the ML tagging model once per worker when the feature is enabled.
     # Deliberately NOT wrapped in try/except: if the flag is on but model
     # files are absent, the worker must fail to start rather than silently
@@ -197,15 +238,28 @@ async def startup(ctx: dict[str, Any]) -> None:
 async def shutdown(ctx: dict[str, Any]) -> None:
     """Worker shutdown - cleanup resources."""
     from app.core.logging import get_logger
+    from app.core.redis import stop_redis
+    from app.services.feed_count_cache import stop_feed_counters
+    from app.services.feed_response_cache import stop_feed_response_cache
     from app.services.search import set_search_service
+    from app.services.tag_postings import stop_tag_postings
+    from app.services.tag_subtree_counts import stop_tag_subtree_counts
 
     logger = get_logger(__name__)
     set_search_service(None)
+    await stop_tag_postings()
+    await stop_tag_subtree_counts()
+    await stop_feed_counters()
+    await stop_feed_response_cache()
     client = ctx.get("meilisearch_client")
     if client is not None:
         await client.aclose()
     if "ml_service" in ctx:
         await ctx["ml_service"].cleanup()
+    if "metrics_server" in ctx:
+        ctx["metrics_server"].close()
+        await ctx["metrics_server"].wait_closed()
+    await stop_redis()
     logger.info("arq_worker_shutdown")
 
 
@@ -249,6 +303,12 @@ class WorkerSettings:
         func(generate_ml_tag_suggestions, max_tries=3),
         # job_timeout (300s) would kill this ~30+ minute refresh; override per-function.
         func(refresh_user_tag_affinity_job, max_tries=1, timeout=7200),
+        func(rebuild_tag_postings_job, max_tries=1, timeout=3600),
+        # keep_result=0: a kept result would block the next stale rebuild's fixed job id.
+        func(rebuild_tag_subtree_counts_job, max_tries=1, timeout=3600, keep_result=0),
+        func(reconcile_feed_counts_job, max_tries=1),
+        # keep_result=0: a kept result would block request_drain's fixed job id.
+        func(drain_search_outbox_job, max_tries=1, keep_result=0),
     ]
 
     cron_jobs = [
@@ -257,4 +317,8 @@ class WorkerSettings:
         # Cron jobs are dispatched under a separate "cron:<name>" registry key from
         # func() entries, so the timeout above does NOT apply here — set it again.
         cron(refresh_user_tag_affinity_job, hour=5, minute=0, timeout=7200),  # nightly, 05:00 UTC
+        cron(rebuild_tag_postings_job, hour=4, minute=30, timeout=3600),  # nightly, 04:30 UTC
+        cron(rebuild_tag_subtree_counts_job, hour=4, minute=45, timeout=3600),  # nightly, 04:45 UTC
+        cron(reconcile_feed_counts_job, minute={0, 10, 20, 30, 40, 50}),  # every 10 minutes
+        cron(drain_search_outbox_job, second={0, 10, 20, 30, 40, 50}),  # every 10 seconds
     ]
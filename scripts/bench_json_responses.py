@@ -0,0 +1,215 @@
+"""Microbenchmark: FastAPI's default response rendering vs ModelJSONResponse.
+
+Renders one ImageDetailedListResponse the shape of a full list_images page (100
+images, each with its uploader and 8 tags, plus a ``comments`` map with 3
+comments per image) from two otherwise identical FastAPI apps: one returns the
+model and lets FastAPI validate and encode it against ``response_model``, the
+other returns it wrapped in ``ModelJSONResponse`` (app/api/responses.py). The
+payload is built once, so only the rendering is measured. Requests are driven
+straight through the ASGI interface, as in bench_logging_middleware.py.
+
+Reports requests/sec and response bytes/sec for each path, and checks that
+both produce the same JSON.
+
+    uv run python scripts/bench_json_responses.py
+    uv run python scripts/bench_json_responses.py --images 100 --comments 3 --json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from fastapi import FastAPI
+
+from app.api.responses import ModelJSONResponse
+from app.schemas.comment import CommentResponse
+from app.schemas.common import UserSummary
+from app.schemas.image import ImageDetailedListResponse, ImageDetailedResponse, TagSummary
+
+PATH = "/images"
+TAGS_PER_IMAGE = 8
+
+
+def build_payload(images: int, comments: int) -> ImageDetailedListResponse:
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    users = [
+        UserSummary(user_id=i, username=f"user{i}", avatar=f"{i}.png", groups=["users"])
+        for i in range(1, 21)
+    ]
+    items = [
+        ImageDetailedResponse(
+            image_id=image_id,
+            user_id=users[image_id % 20].user_id,
+            user=users[image_id % 20],
+            filename=f"2024-01-01-{image_id}",
+            ext="jpg",
+            caption=f"caption {image_id}",
+            width=1920,
+            height=1080,
+            filesize=512_000,
+            md5_hash=f"{image_id:032x}",
+            date_added=start + timedelta(minutes=image_id),
+            locked=0,
+            posts=comments,
+            favorites=image_id % 50,
+            bayesian_rating=3.5,
+            num_ratings=12,
+            medium=1,
+            large=1,
+            tags=[
+                TagSummary(
+                    tag_id=image_id * TAGS_PER_IMAGE + n,
+                    title=f"tag {image_id}-{n}",
+                    type=n % 4 + 1,
+                    usage_count=1000 + n,
+                )
+                for n in range(TAGS_PER_IMAGE)
+            ],
+        )
+        for image_id in range(1, images + 1)
+    ]
+    comments_map = {
+        item.image_id: [
+            CommentResponse(
+                post_id=item.image_id * 10 + n,
+                image_id=item.image_id,
+                user_id=users[n].user_id,
+                post_text=f"comment {n} on **image** {item.image_id}",
+                date=start + timedelta(hours=n),
+                update_count=0,
+                user=users[n],
+            )
+            for n in range(comments)
+        ]
+        for item in items
+    }
+    return ImageDetailedListResponse(
+        total=images * 100,
+        page=1,
+        per_page=images,
+        images=items,
+        comments=comments_map if comments else None,
+    )
+
+
+def _build(payload: ImageDetailedListResponse, fast: bool) -> FastAPI:
+    app = FastAPI()
+    if fast:
+
+        @app.get(PATH, response_model=ImageDetailedListResponse)
+        async def fast_path() -> ModelJSONResponse:
+            return ModelJSONResponse(payload)
+    else:
+
+        @app.get(PATH, response_model=ImageDetailedListResponse)
+        async def default_path() -> ImageDetailedListResponse:
+            return payload
+
+    return app
+
+
+_SCOPE: dict[str, Any] = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": PATH,
+    "raw_path": PATH.encode(),
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def _request(app: FastAPI) -> bytes:
+    sent_request = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # client never disconnects
+        return {"type": "http.disconnect"}
+
+    status = 0
+    body = bytearray()
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(dict(_SCOPE, state={}), receive, send)
+    if status != 200:
+        raise SystemExit(f"{PATH}: HTTP {status}")
+    return bytes(body)
+
+
+async def _requests_per_second(app: FastAPI, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _request(app)
+    return requests / (time.perf_counter() - start)
+
+
+async def _run(payload: ImageDetailedListResponse, requests: int, rounds: int) -> dict[str, Any]:
+    apps = {"default": _build(payload, fast=False), "model_json": _build(payload, fast=True)}
+    bodies = {name: await _request(app) for name, app in apps.items()}
+    if json.loads(bodies["default"]) != json.loads(bodies["model_json"]):
+        raise SystemExit("model_json output differs from the default rendering")
+    for app in apps.values():  # warm up routing and serializer caches
+        await _requests_per_second(app, 20)
+    # Alternate rounds so drift (thermal, GC) hits both alike; report the median.
+    samples: dict[str, list[float]] = {name: [] for name in apps}
+    for _ in range(rounds):
+        for name, app in apps.items():
+            samples[name].append(await _requests_per_second(app, requests))
+    results: dict[str, Any] = {}
+    for name, values in samples.items():
+        rps = statistics.median(values)
+        results[name] = {
+            "requests_per_sec": round(rps, 1),
+            "body_bytes": len(bodies[name]),
+            "bytes_per_sec": round(rps * len(bodies[name])),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--images", type=int, default=100, help="images on the page")
+    parser.add_argument("--comments", type=int, default=3, help="comments per image (0 = no map)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per path (median)")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    payload = build_payload(args.images, args.comments)
+    results = asyncio.run(_run(payload, args.requests, args.rounds))
+    speedup = round(results["model_json"]["bytes_per_sec"] / results["default"]["bytes_per_sec"], 2)
+    if args.json:
+        print(json.dumps({"results": results, "speedup": speedup}))
+        return
+    for name, result in results.items():
+        print(
+            f"{name:10} {result['requests_per_sec']:10,.0f} req/s"
+            f" {result['bytes_per_sec'] / 1_000_000:10,.1f} MB/s"
+            f" ({result['body_bytes']:,} bytes/response)"
+        )
+    print(f"{'speedup':10} {speedup:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Microbenchmark: RequestLoggingMiddleware as plain ASGI vs BaseHTTPMiddleware.
+
+Serves GET /api/v1/meta/config (no DB, no Redis: the smallest JSON response the
+API has) from two otherwise identical FastAPI apps, one wrapped in the
+pure-ASGI RequestLoggingMiddleware from app/main.py and one in the previous
+``BaseHTTPMiddleware`` implementation reproduced below, and reports requests/sec
+for each. Requests are driven straight through the ASGI interface (no HTTP
+server, no httpx), so the numbers isolate the middleware and the app.
+
+    uv run python scripts/bench_logging_middleware.py
+    uv run python scripts/bench_logging_middleware.py --requests 50000 --concurrency 64 --json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import uuid
+from typing import Any
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api.v1 import meta
+from app.core.auth import request_auth
+from app.core.logging import clear_request_context, get_logger, set_request_context
+from app.main import RequestLoggingMiddleware, _log_level_for, _redact_query
+
+PATH = "/api/v1/meta/config"
+logger = get_logger(__name__)
+
+
+class BaseHTTPRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """The pre-ASGI RequestLoggingMiddleware, kept here as the baseline."""
+
+    async def dispatch(self, request: Request, call_next):  # type: ignore[no-untyped-def]
+        request_id = str(uuid.uuid4())
+        set_request_context(request_id, user_id=request_auth(request).user_id)
+        request.state.request_id = request_id
+        try:
+            start = time.monotonic()
+            response = await call_next(request)
+            elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+            response.headers["X-Request-ID"] = request_id
+            log = getattr(logger, _log_level_for(response.status_code, elapsed_ms))
+            log(
+                "request_complete",
+                method=request.method,
+                path=str(request.url.path)
+                + ("?" + _redact_query(str(request.url.query)) if request.url.query else ""),
+                status_code=response.status_code,
+                elapsed_ms=elapsed_ms,
+                client_host=request.client.host if request.client else None,
+                user_agent=request.headers.get("user-agent"),
+            )
+            return response
+        finally:
+            clear_request_context()
+
+
+def _build(middleware: type) -> FastAPI:
+    app = FastAPI()
+    app.include_router(meta.router, prefix="/api/v1")
+    app.add_middleware(middleware)
+    return app
+
+
+_SCOPE: dict[str, Any] = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": PATH,
+    "raw_path": PATH.encode(),
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench/1.0")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def _request(app: FastAPI) -> None:
+    sent_request = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # client never disconnects
+        return {"type": "http.disconnect"}
+
+    status = 0
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(dict(_SCOPE, state={}), receive, send)
+    if status != 200:
+        raise SystemExit(f"{PATH}: HTTP {status}")
+
+
+async def _requests_per_second(app: FastAPI, requests: int, concurrency: int) -> float:
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await _request(app)
+
+    share, extra = divmod(requests, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(share + (i < extra)) for i in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def _run(requests: int, concurrency: int, rounds: int) -> dict[str, float]:
+    apps = {
+        "base_http": _build(BaseHTTPRequestLoggingMiddleware),
+        "pure_asgi": _build(RequestLoggingMiddleware),
+    }
+    for app in apps.values():  # warm up imports, routing and validation caches
+        await _requests_per_second(app, 500, concurrency)
+    # Alternate rounds so drift (thermal, GC) hits both alike; report the median.
+    samples: dict[str, list[float]] = {name: [] for name in apps}
+    for _ in range(rounds):
+        for name, app in apps.items():
+            samples[name].append(await _requests_per_second(app, requests, concurrency))
+    return {name: round(statistics.median(values), 1) for name, values in samples.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=20_000, help="requests per round")
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight requests")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per app (median)")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    # Production drops the per-request DEBUG line; don't benchmark the console renderer.
+    logging.getLogger().setLevel(logging.INFO)
+
+    rps = asyncio.run(_run(args.requests, args.concurrency, args.rounds))
+    speedup = round(rps["pure_asgi"] / rps["base_http"], 2)
+    if args.json:
+        print(json.dumps({"requests_per_sec": rps, "speedup": speedup}))
+        return
+    for name, value in rps.items():
+        print(f"{name:10} {value:10,.0f} req/s")
+    print(f"{'speedup':10} {speedup:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
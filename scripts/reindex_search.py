@@ -1,32 +1,253 @@
-"""Bulk reindex all tags from MySQL to Meilisearch.
+"""Reindex tags from MySQL to Meilisearch.
 
 Usage:
     uv run python scripts/reindex_search.py
-    uv run python scripts/reindex_search.py --batch-size 500
+    uv run python scripts/reindex_search.py --batch-size 500 --concurrency 8
+    uv run python scripts/reindex_search.py --since 6h
+    uv run python scripts/reindex_search.py --since 2026-10-01T12:00
 
-Idempotent — safe to run anytime. Meilisearch upserts by primary key.
+A full run builds a fresh index (tags_new) and swaps it in for the live one
+once every batch has been applied, so searches never see a half-built index
+and documents of tags deleted from the database do not survive the rebuild.
+Changes made while it builds are re-applied to the live index after the swap.
+
+--since rewrites, in the live index, only the tags that changed after the
+given time (an ISO date/time in UTC, or an age such as 30m, 6h, 2d): created,
+edited (tag_audit_log), tagged (tag_links, which also holds the upload-time
+links tag_history does not record), untagged (tag_history), given a new
+external link, or still queued in the search outbox. Use it to catch up after a
+Meilisearch outage or restore rather than rebuilding everything.
+
+Idempotent — safe to run anytime.
 """
 
 import argparse
 import asyncio
+import re
 import sys
 import time
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from typing import Any
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from meilisearch_python_sdk import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import select, union
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from app.config import settings
+from app.models.search_outbox import SearchOutbox
 from app.models.tag import Tags
-from app.services.search import SearchService, configure_tags_index
+from app.models.tag_audit_log import TagAuditLog
+from app.models.tag_external_link import TagExternalLinks
+from app.models.tag_history import TagHistory
+from app.models.tag_link import TagLinks
+from app.services.search import (
+    TAGS_INDEX_NAME,
+    SearchService,
+    build_tag_documents,
+    configure_tags_index,
+)
+
+BUILD_INDEX_NAME = f"{TAGS_INDEX_NAME}_new"
+
+_AGE = re.compile(r"^(\d+)([smhd])$")
+_AGE_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+class Uploader:
+    """Keeps up to ``concurrency`` add_documents batches in flight.
+
+    A batch holds its slot until Meilisearch reports its task done, so the
+    reader is throttled by indexing speed rather than by how fast the HTTP
+    calls return. The first failed task stops further submissions.
+    """
+
+    def __init__(self, client: AsyncClient, index_name: str, concurrency: int) -> None:
+        self.client = client
+        self.index = client.index(index_name)
+        self.documents = 0
+        self.started = time.monotonic()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._pending: set[asyncio.Task[None]] = set()
+        self._error: Exception | None = None
+
+    @property
+    def rate(self) -> float:
+        return self.documents / max(time.monotonic() - self.started, 1e-9)
+
+    async def submit(self, docs: list[dict[str, Any]]) -> None:
+        await self._slots.acquire()
+        if self._error is not None:
+            self._slots.release()
+            raise self._error
+        task = asyncio.create_task(self._upload(docs))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
 
+    async def _upload(self, docs: list[dict[str, Any]]) -> None:
+        try:
+            info = await self.index.add_documents(docs)
+            await self.client.wait_for_task(
+                info.task_uid, timeout_in_ms=None, raise_for_status=True
+            )
+            self.documents += len(docs)
+            print(f"  Indexed {self.documents} documents ({self.rate:.0f} docs/s)...")
+        except Exception as exc:
+            self._error = self._error or exc
+        finally:
+            self._slots.release()
 
-async def reindex_tags(batch_size: int = 1000) -> None:
-    """Reindex all tags from MySQL to Meilisearch."""
+    async def finish(self) -> None:
+        """Wait for every submitted batch; raise the first failure."""
+        await asyncio.gather(*self._pending)
+        if self._error is not None:
+            raise self._error
+
+
+async def _wait(client: AsyncClient, task_uid: int) -> None:
+    await client.wait_for_task(task_uid, timeout_in_ms=None, raise_for_status=True)
+
+
+async def stream_tags(db: AsyncSession, batch_size: int) -> AsyncIterator[list[Tags]]:
+    """Every tag, in tag_id order, ``batch_size`` at a time.
+
+    Keyset pagination by tag_id: each batch fetches the next slice via
+    WHERE tag_id > last_id, avoiding the linear OFFSET scan that would
+    re-read up to ~230k rows on the final batch.
+    """
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(Tags)
+            .where(Tags.tag_id > last_id)  # type: ignore[arg-type,operator]
+            .order_by(Tags.tag_id)  # type: ignore[arg-type]
+            .limit(batch_size)
+        )
+        tags = list(result.scalars().all())
+        if not tags:
+            return
+        yield tags
+        new_last_id = tags[-1].tag_id
+        assert new_last_id is not None, "persisted tags always have a tag_id"
+        last_id = new_last_id
+        # The documents are built; don't keep every tag of the table in the session.
+        db.expunge_all()
+
+
+async def changed_tag_ids(db: AsyncSession, since: datetime) -> set[int]:
+    """Tags whose search document may have changed since ``since``.
+
+    tags has no modification time, so this unions the tables that record one,
+    plus whatever the search outbox has not drained yet. tag_links is among
+    them: uploads link tags without a tag_history row, and while a full rebuild
+    runs the outbox drain consumes their rows against the outgoing index.
+    """
+    query = union(
+        select(Tags.tag_id).where(Tags.date_added >= since),  # type: ignore[arg-type,operator]
+        select(TagAuditLog.tag_id).where(TagAuditLog.created_at >= since),  # type: ignore[arg-type,operator]
+        select(TagHistory.tag_id).where(TagHistory.date >= since),  # type: ignore[arg-type,operator]
+        select(TagLinks.tag_id).where(TagLinks.date_linked >= since),  # type: ignore[arg-type,operator]
+        select(TagExternalLinks.tag_id).where(TagExternalLinks.date_added >= since),  # type: ignore[arg-type]
+        select(SearchOutbox.tag_id),  # type: ignore[arg-type]
+    )
+    result = await db.execute(query)
+    return {tag_id for (tag_id,) in result.all() if tag_id is not None}
+
+
+async def reindex_changed(
+    db: AsyncSession, client: AsyncClient, since: datetime, batch_size: int, concurrency: int
+) -> int:
+    """Rewrite the live documents of tags changed since ``since``, with their aliases."""
+    tag_ids = sorted(await changed_tag_ids(db, since))
+    print(f"{len(tag_ids)} tags changed since {since.isoformat()}")
+
+    uploader = Uploader(client, TAGS_INDEX_NAME, concurrency)
+    service = SearchService(client)
+    queued: set[int] = set()
+    missing: list[int] = []
+    for start in range(0, len(tag_ids), batch_size):
+        chunk = tag_ids[start : start + batch_size]
+        result = await db.execute(
+            select(Tags).where(Tags.tag_id.in_(chunk))  # type: ignore[union-attr]
+        )
+        tags = list(result.scalars().all())
+        found = {tag.tag_id for tag in tags}
+        missing.extend(tag_id for tag_id in chunk if tag_id not in found)
+        # Aliases carry their parent's title and usage_count.
+        aliases = await db.execute(
+            select(Tags).where(Tags.alias_of.in_(chunk))  # type: ignore[union-attr]
+        )
+        batch = list(
+            {
+                tag.tag_id: tag
+                for tag in [*tags, *aliases.scalars().all()]
+                if tag.tag_id not in queued
+            }.values()
+        )
+        queued.update(tag.tag_id for tag in batch)  # type: ignore[misc]
+        if batch:
+            await uploader.submit(await build_tag_documents(db, batch))
+    await uploader.finish()
+
+    if missing:
+        await service.delete_tags(missing)
+        print(f"  Removed {len(missing)} deleted tags")
+    return uploader.documents
+
+
+async def rebuild_index(engine: Any, client: AsyncClient, batch_size: int, concurrency: int) -> int:
+    """Build every tag into a fresh index, then swap it in for the live one."""
+    started_at = datetime.now(UTC)
+
+    # Leftover from an interrupted run: start over rather than swap in a partial index.
+    await client.delete_index_if_exists(BUILD_INDEX_NAME)
+    # Both sides of the swap must exist, including on a first-ever build.
+    await configure_tags_index(client)
+    await configure_tags_index(client, BUILD_INDEX_NAME)
+
+    uploader = Uploader(client, BUILD_INDEX_NAME, concurrency)
+    async with AsyncSession(engine) as db:
+        async for tags in stream_tags(db, batch_size):
+            await uploader.submit(await build_tag_documents(db, tags))
+    await uploader.finish()
+
+    swap = await client.swap_indexes([(TAGS_INDEX_NAME, BUILD_INDEX_NAME)])
+    await _wait(client, swap.task_uid)
+    # After the swap, the build name holds the previous index.
+    await client.delete_index_if_exists(BUILD_INDEX_NAME)
+    print(f"Swapped {BUILD_INDEX_NAME} in as {TAGS_INDEX_NAME}")
+
+    # Writes during the build went to the old index; replay them on the new one.
+    # Two minutes of slack covers clock skew and transactions open at the start.
+    async with AsyncSession(engine) as db:
+        await reindex_changed(
+            db, client, started_at - timedelta(minutes=2), batch_size, concurrency
+        )
+    return uploader.documents
+
+
+def parse_since(value: str) -> datetime:
+    """An ISO date/time (UTC unless it says otherwise) or an age like 30m, 6h, 2d."""
+    if match := _AGE.match(value):
+        amount, unit = match.groups()
+        return datetime.now(UTC) - timedelta(**{_AGE_UNITS[unit]: int(amount)})
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected an ISO date/time or an age like 6h, got {value!r}"
+        ) from None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+async def reindex_tags(
+    batch_size: int = 1000, concurrency: int = 4, since: datetime | None = None
+) -> None:
+    """Reindex tags from MySQL to Meilisearch: everything, or what changed since ``since``."""
     engine = create_async_engine(settings.DATABASE_URL, echo=False)
     client = AsyncClient(
         url=settings.MEILISEARCH_URL,
@@ -34,39 +255,16 @@ async def reindex_tags(batch_size: int = 1000) -> None:
     )
 
     try:
-        # Configure index settings
-        await configure_tags_index(client)
-        service = SearchService(client)
-
-        async with AsyncSession(engine) as db:
-            # Keyset pagination by tag_id: each batch fetches the next slice
-            # via WHERE tag_id > last_id, avoiding the linear OFFSET scan that
-            # would re-read up to ~230k rows on the final batch.
-            indexed = 0
-            last_id = 0
-            start = time.monotonic()
-
-            while True:
-                result = await db.execute(
-                    select(Tags)
-                    .where(Tags.tag_id > last_id)  # type: ignore[arg-type,operator]
-                    .order_by(Tags.tag_id)  # type: ignore[arg-type]
-                    .limit(batch_size)
-                )
-                tags = list(result.scalars().all())
-
-                if not tags:
-                    break
-
-                await service.index_tags_from_db(db, tags)
-                indexed += len(tags)
-                new_last_id = tags[-1].tag_id
-                assert new_last_id is not None, "persisted tags always have a tag_id"
-                last_id = new_last_id
-                print(f"  Indexed {indexed} tags...")
-
-            elapsed = time.monotonic() - start
-            print(f"Done. Indexed {indexed} tags in {elapsed:.1f}s")
+        start = time.monotonic()
+        if since is None:
+            indexed = await rebuild_index(engine, client, batch_size, concurrency)
+        else:
+            await configure_tags_index(client)
+            async with AsyncSession(engine) as db:
+                indexed = await reindex_changed(db, client, since, batch_size, concurrency)
+        elapsed = time.monotonic() - start
+        rate = indexed / elapsed if elapsed else 0.0
+        print(f"Done. Indexed {indexed} documents in {elapsed:.1f}s ({rate:.0f} docs/s)")
 
     finally:
         await client.aclose()
@@ -76,9 +274,23 @@ async def reindex_tags(batch_size: int = 1000) -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Reindex tags to Meilisearch")
     parser.add_argument("--batch-size", type=int, default=1000, help="Batch size for indexing")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Batches in flight at once (each until Meilisearch has applied it)",
+    )
+    parser.add_argument(
+        "--since",
+        type=parse_since,
+        help="Only reindex tags changed since this ISO date/time or age (30m, 6h, 2d), "
+        "in place; without it the whole index is rebuilt and swapped in",
+    )
     args = parser.parse_args()
 
-    asyncio.run(reindex_tags(batch_size=args.batch_size))
+    asyncio.run(
+        reindex_tags(batch_size=args.batch_size, concurrency=args.concurrency, since=args.since)
+    )
 
 
 if __name__ == "__main__":
@@ -199,9 +199,9 @@ class TestFastFeedCount:
 
 @pytest.mark.api
 class TestFeedCountCache:
-    async def test_global_counts_cached_within_ttl(self, db_session: AsyncSession, redis_client):
-        """The three global counts are TTL-cached (no per-mutation invalidation): a new
-        image isn't reflected until the entry expires or is cleared. Also guards the
+    async def test_global_counts_served_from_counters(self, db_session: AsyncSession, redis_client):
+        """The three global counts are served from the Redis counters: an image written
+        behind their back isn't reflected until they are reset. Also guards the
         str<->int round-trip through Redis."""
         from app.services.feed_count_cache import (
             _KEY_HIDDEN,
@@ -221,11 +221,11 @@ class TestFeedCountCache:
                 isinstance(total1, int) and isinstance(hidden1, int) and isinstance(repost1, int)
             )  # parsed back from str
 
-            # New image is NOT reflected while the cache is warm (TTL, no invalidation).
+            # New image is NOT reflected: nothing adjusted the counters.
             await _img(db_session, a, "c2" + "0" * 30, 1)
             assert await get_feed_counts(db_session, redis_client) == (total1, hidden1, repost1)
 
-            # Once the entry is gone, a recompute picks the new image up.
+            # Once the counters are gone, a recount picks the new image up.
             await redis_client.delete(_KEY_TOTAL, _KEY_HIDDEN, _KEY_REPOST)
             total3, _h, _r = await get_feed_counts(db_session, redis_client)
             assert total3 == total1 + 1
@@ -250,6 +250,65 @@ class TestFeedCountCache:
         finally:
             await redis_client.delete(_KEY_TOTAL, _KEY_HIDDEN, _KEY_REPOST)
 
+    async def test_status_changes_adjust_counters(
+        self, db_session: AsyncSession, redis_client, monkeypatch
+    ):
+        from app.services import feed_count_cache
+        from app.services.feed_count_cache import (
+            _KEY_HIDDEN,
+            _KEY_REPOST,
+            _KEY_TOTAL,
+            get_feed_counts,
+            record_feed_count_change,
+        )
+
+        monkeypatch.setattr(feed_count_cache, "_client", redis_client)
+        await redis_client.delete(_KEY_TOTAL, _KEY_HIDDEN, _KEY_REPOST)
+        try:
+            # Missing counters are left missing, not started from the delta.
+            await record_feed_count_change(None, ImageStatus.ACTIVE)
+            assert await redis_client.get(_KEY_TOTAL) is None
+
+            total, hidden, repost = await get_feed_counts(db_session, redis_client)
+            await record_feed_count_change(None, ImageStatus.ACTIVE)  # upload
+            await record_feed_count_change(ImageStatus.ACTIVE, ImageStatus.REPOST)
+            await record_feed_count_change(ImageStatus.ACTIVE, ImageStatus.DEACTIVATED)
+            assert await get_feed_counts(db_session, redis_client) == (
+                total + 1,
+                hidden + 1,
+                repost + 1,
+            )
+
+            await record_feed_count_change(ImageStatus.DEACTIVATED, None)  # delete
+            assert await get_feed_counts(db_session, redis_client) == (total, hidden, repost + 1)
+        finally:
+            await redis_client.delete(_KEY_TOTAL, _KEY_HIDDEN, _KEY_REPOST)
+
+    async def test_reconcile_resets_drifted_counters(
+        self, db_session: AsyncSession, redis_client, monkeypatch
+    ):
+        from app.services import feed_count_cache
+        from app.services.feed_count_cache import (
+            _KEY_HIDDEN,
+            _KEY_REPOST,
+            _KEY_TOTAL,
+            get_feed_counts,
+            reconcile_feed_counts,
+        )
+
+        monkeypatch.setattr(feed_count_cache, "_client", redis_client)
+        await redis_client.delete(_KEY_TOTAL, _KEY_HIDDEN, _KEY_REPOST)
+        try:
+            u = await _user(db_session, "fcReconcile")
+            await _img(db_session, u, "rc0" + "0" * 29, 1)
+            truth = await get_feed_counts(db_session, redis_client)
+            await redis_client.set(_KEY_TOTAL, 999_999)
+
+            assert await reconcile_feed_counts(db_session) == truth
+            assert await get_feed_counts(db_session, redis_client) == truth
+        finally:
+            await redis_client.delete(_KEY_TOTAL, _KEY_HIDDEN, _KEY_REPOST)
+
 
 async def _tag(db, title):
     from app.models.tag import Tags
@@ -456,6 +515,139 @@ class TestFilteredCountCache:
             await _clear_filtered_keys(redis_client)
 
 
+@pytest.mark.api
+class TestEstimatedCount:
+    """Over-budget tag counts are served as estimates and refined in the background."""
+
+    @pytest.fixture
+    def refinements(self, monkeypatch, redis_client):
+        """Record scheduled refinements instead of running them on a second connection."""
+        from app.services import feed_count_cache
+
+        monkeypatch.setattr(feed_count_cache, "_client", redis_client)
+        scheduled: list[str] = []
+        monkeypatch.setattr(
+            feed_count_cache, "_schedule_refinement", lambda key, _query: scheduled.append(key)
+        )
+        return scheduled
+
+    async def _clear(self, redis_client):
+        keys = await redis_client.keys("feed:count:*")
+        if keys:
+            await redis_client.delete(*keys)
+
+    async def test_single_tag_estimate_uses_usage_count(self, db_session: AsyncSession):
+        from app.services.feed_count_cache import estimate_tag_count
+
+        owner = await _user(db_session, "estOwner")
+        tag = await _tag(db_session, "est-tag")
+        for n in range(3):
+            await _link(db_session, tag, await _img(db_session, owner, f"e{n}" + "0" * 30, 1))
+        await db_session.refresh(tag)
+
+        estimate = await estimate_tag_count(
+            db_session, [{tag.tag_id}], set(), public_only=False, hide_reposts=False
+        )
+        assert estimate.total == 3
+        assert estimate.scan_links == 3
+
+    async def test_over_budget_count_returns_estimate_then_cached_exact(
+        self,
+        client_real_redis: AsyncClient,
+        db_session: AsyncSession,
+        redis_client,
+        monkeypatch,
+        refinements,
+    ):
+        from app.config import settings
+
+        await self._clear(redis_client)
+        try:
+            owner = await _user(db_session, "estApi")
+            tag = await _tag(db_session, "est-api-tag")
+            await _link(db_session, tag, await _img(db_session, owner, "ea" + "0" * 30, 1))
+
+            monkeypatch.setattr(settings, "FILTERED_COUNT_BUDGET_MS", 0)
+            url = f"/api/v1/images/?tags={tag.tag_id}&per_page=1"
+            r1 = await client_real_redis.get(url)
+            assert r1.json()["total_is_estimate"] is True
+            assert len(refinements) == 1
+
+            # Once the refined exact count is cached, it is served as exact.
+            await redis_client.setex(refinements[0], 60, 1)
+            r2 = await client_real_redis.get(url)
+            assert r2.json()["total"] == 1
+            assert r2.json()["total_is_estimate"] is False
+        finally:
+            await self._clear(redis_client)
+
+    async def test_over_budget_miss_serves_stale_exact_count_before_estimate(
+        self,
+        client_real_redis: AsyncClient,
+        db_session: AsyncSession,
+        redis_client,
+        monkeypatch,
+        refinements,
+    ):
+        from app.config import settings
+
+        await self._clear(redis_client)
+        try:
+            owner = await _user(db_session, "estStale")
+            tag = await _tag(db_session, "est-stale-tag")
+            await _link(db_session, tag, await _img(db_session, owner, "et" + "0" * 30, 1))
+
+            monkeypatch.setattr(settings, "FILTERED_COUNT_BUDGET_MS", 0)
+            url = f"/api/v1/images/?tags={tag.tag_id}&per_page=1"
+            await client_real_redis.get(url)
+            # The fresh entry expired; its stale copy outlives it.
+            await redis_client.setex(f"{refinements[0]}:stale", 60, 5)
+
+            r = await client_real_redis.get(url)
+            assert r.json()["total"] == 5
+            assert r.json()["total_is_estimate"] is False
+            assert len(refinements) == 2
+        finally:
+            await self._clear(redis_client)
+
+    async def test_within_budget_count_is_exact(
+        self, client_real_redis: AsyncClient, db_session: AsyncSession, redis_client, refinements
+    ):
+        await self._clear(redis_client)
+        try:
+            owner = await _user(db_session, "estSmall")
+            tag = await _tag(db_session, "est-small-tag")
+            await _link(db_session, tag, await _img(db_session, owner, "es" + "0" * 30, 1))
+
+            r = await client_real_redis.get(f"/api/v1/images/?tags={tag.tag_id}&per_page=1")
+            assert r.json()["total"] == 1
+            assert r.json()["total_is_estimate"] is False
+            assert refinements == []
+        finally:
+            await self._clear(redis_client)
+
+
+@pytest.mark.api
+class TestTagPostingRelease:
+    async def test_failed_request_releases_the_posting_match(
+        self, client: AsyncClient, db_session: AsyncSession, monkeypatch
+    ):
+        from unittest.mock import AsyncMock, MagicMock
+
+        from app.api.v1 import images
+
+        tag = await _tag(db_session, "release-tag")
+        postings = MagicMock()
+        postings.count = AsyncMock(side_effect=RuntimeError("redis went away"))
+        postings.release = AsyncMock()
+        monkeypatch.setattr(images, "match_tags", AsyncMock(return_value=postings))
+
+        with pytest.raises(RuntimeError, match="redis went away"):
+            await client.get(f"/api/v1/images/?tags={tag.tag_id}")
+
+        postings.release.assert_awaited_once()
+
+
 @pytest.mark.unit
 class TestFilteredCountKey:
     """The cache key is derived from the compiled count query + bind params."""
@@ -0,0 +1,149 @@
+"""Tests for the anonymous feed response cache (app/services/feed_response_cache.py)."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ImageStatus
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+from app.services import feed_response_cache
+from app.services.feed_response_cache import bump_feed_generation
+from app.services.post_commit import after_tag_links_change
+
+FEED_URL = "/api/v1/images?per_page=5&sort_by=image_id&sort_order=DESC"
+
+
+@pytest.fixture
+async def feed_cache(monkeypatch, redis_client):
+    """Install the test Redis as the cache's client, starting from an empty cache."""
+    monkeypatch.setattr(feed_response_cache, "_client", redis_client)
+    keys = await redis_client.keys("feed_cache:*")
+    if keys:
+        await redis_client.delete(*keys)
+    yield redis_client
+    keys = await redis_client.keys("feed_cache:*")
+    if keys:
+        await redis_client.delete(*keys)
+
+
+async def _img(db: AsyncSession, n: int) -> Images:
+    image = Images(
+        user_id=1,
+        filename=f"respcache-{n}",
+        ext="jpg",
+        md5_hash=f"rc{n:030x}",
+        width=10,
+        height=10,
+        filesize=100,
+        status=ImageStatus.ACTIVE,
+    )
+    db.add(image)
+    await db.commit()
+    await db.refresh(image)
+    return image
+
+
+@pytest.mark.api
+class TestFeedResponseCache:
+    async def test_anonymous_feed_served_from_cache(
+        self, client: AsyncClient, db_session: AsyncSession, feed_cache
+    ):
+        await _img(db_session, 1)
+        first = await client.get(FEED_URL)
+        assert first.status_code == 200
+        assert first.headers["etag"].startswith('W/"')
+
+        # Written without a generation bump: the cached page is still served.
+        await _img(db_session, 2)
+        second = await client.get(FEED_URL)
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+
+    async def test_query_param_order_shares_an_entry(
+        self, client: AsyncClient, db_session: AsyncSession, feed_cache
+    ):
+        await _img(db_session, 1)
+        first = await client.get("/api/v1/images?per_page=5&sort_order=DESC")
+        await _img(db_session, 2)
+        second = await client.get("/api/v1/images?sort_order=DESC&per_page=5&tags=")
+        assert second.content == first.content
+
+    async def test_matching_if_none_match_returns_304(
+        self, client: AsyncClient, db_session: AsyncSession, feed_cache
+    ):
+        await _img(db_session, 1)
+        etag = (await client.get(FEED_URL)).headers["etag"]
+
+        response = await client.get(FEED_URL, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        stale = await client.get(FEED_URL, headers={"If-None-Match": 'W/"0-stale"'})
+        assert stale.status_code == 200
+
+    async def test_generation_bump_invalidates(
+        self, client: AsyncClient, db_session: AsyncSession, feed_cache
+    ):
+        await _img(db_session, 1)
+        first = await client.get(FEED_URL)
+        newer = await _img(db_session, 2)
+
+        await bump_feed_generation()
+
+        second = await client.get(FEED_URL)
+        assert second.json()["images"][0]["image_id"] == newer.image_id
+        assert second.headers["etag"] != first.headers["etag"]
+        revalidated = await client.get(FEED_URL, headers={"If-None-Match": first.headers["etag"]})
+        assert revalidated.status_code == 200
+
+    async def test_tag_page_invalidated_by_tag_link_sync(
+        self, client: AsyncClient, db_session: AsyncSession, feed_cache
+    ):
+        tag = Tags(title="respcache tag", type=1)
+        db_session.add(tag)
+        await db_session.commit()
+        image = await _img(db_session, 1)
+        url = f"/api/v1/tags/{tag.tag_id}/images"
+
+        assert (await client.get(url)).json()["total"] == 0
+
+        db_session.add(TagLinks(tag_id=tag.tag_id, image_id=image.image_id, user_id=1))
+        await db_session.commit()
+        assert (await client.get(url)).json()["total"] == 0  # still cached
+        await after_tag_links_change(db_session, [image.image_id], [tag.tag_id])
+        assert (await client.get(url)).json()["total"] == 1
+
+    async def test_tag_page_shared_by_signed_in_viewers(
+        self, authenticated_client: AsyncClient, db_session: AsyncSession, feed_cache
+    ):
+        tag = Tags(title="respcache shared tag", type=1)
+        db_session.add(tag)
+        await db_session.commit()
+        url = f"/api/v1/tags/{tag.tag_id}/images"
+
+        first = await authenticated_client.get(url)
+        assert "etag" in first.headers
+        etag = first.headers["etag"]
+        second = await authenticated_client.get(url, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+
+    async def test_authenticated_requests_bypass_cache(
+        self, authenticated_client: AsyncClient, db_session: AsyncSession, feed_cache
+    ):
+        await _img(db_session, 1)
+        first = await authenticated_client.get(FEED_URL)
+        assert "etag" not in first.headers
+        assert not await feed_cache.keys("feed_cache:entry:*")
+
+    async def test_disabled_without_client(
+        self, client: AsyncClient, db_session: AsyncSession, monkeypatch
+    ):
+        monkeypatch.setattr(feed_response_cache, "_client", None)
+        await _img(db_session, 1)
+        response = await client.get(FEED_URL)
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        await bump_feed_generation()
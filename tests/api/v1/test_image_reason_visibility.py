@@ -136,3 +136,31 @@ class TestImageReasonVisibility:
         )
         match = [i for i in r.json()["images"] if i["image_id"] == img.image_id]
         assert match and match[0]["status_reason"] is None
+
+    async def test_reason_on_user_pages_for_mod_not_plain(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        owner = await _make_user(db_session, "rsnpageowner")
+        img = await _deactivated_image(db_session, owner, "f" * 32, "repost of 12", 2)
+        img.status = -1  # REPOST: public, so it is on the owner's page for everyone
+        await db_session.commit()
+
+        mod = await _make_user(db_session, "rsnpagemod")
+        await _grant(db_session, mod.user_id, "review_view")
+        mtoken = await _login(client, mod.username)
+        r = await client.get(
+            f"/api/v1/users/{owner.user_id}/images",
+            headers={"Authorization": f"Bearer {mtoken}"},
+        )
+        assert r.status_code == 200
+        match = [i for i in r.json()["images"] if i["image_id"] == img.image_id]
+        assert match and match[0]["status_reason"] == "repost of 12"
+
+        plain = await _make_user(db_session, "rsnpageplain")
+        ptoken = await _login(client, plain.username)
+        r = await client.get(
+            f"/api/v1/users/{owner.user_id}/images",
+            headers={"Authorization": f"Bearer {ptoken}"},
+        )
+        match = [i for i in r.json()["images"] if i["image_id"] == img.image_id]
+        assert match and match[0]["status_reason"] is None
@@ -1596,6 +1596,103 @@ class TestImagesSorting:
         assert data["images"][-1]["filename"] == "date-2024-12-31"
 
 
+@pytest.mark.api
+class TestKeysetPagination:
+    """Tests for cursor/next_cursor keyset paging on GET /api/v1/images."""
+
+    async def _seed(self, db_session: AsyncSession, sample_image_data: dict) -> None:
+        # Favorites repeat in runs of three so every page boundary lands inside a tie
+        # group, which is where a keyset predicate goes wrong if the tiebreak is off.
+        for i in range(11):
+            image_data = sample_image_data.copy()
+            image_data["filename"] = f"keyset-{i:03d}"
+            image_data["md5_hash"] = f"keyset{i:026d}"
+            image_data["favorites"] = i // 3
+            db_session.add(Images(**image_data))
+        await db_session.commit()
+
+    async def _walk(self, client: AsyncClient, params: str) -> list[int]:
+        seen: list[int] = []
+        url = f"/api/v1/images?per_page=4&{params}"
+        response = await client.get(url)
+        while True:
+            assert response.status_code == 200
+            data = response.json()
+            seen.extend(img["image_id"] for img in data["images"])
+            if data["next_cursor"] is None:
+                return seen
+            response = await client.get(url, params={"cursor": data["next_cursor"]})
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            "sort_by=image_id&sort_order=DESC",
+            "sort_by=image_id&sort_order=ASC",
+            "sort_by=favorites&sort_order=DESC",
+            "sort_by=favorites&sort_order=ASC",
+            "sort_by=bayesian_rating&sort_order=DESC",
+        ],
+    )
+    async def test_cursor_walk_matches_offset_paging(
+        self, client: AsyncClient, db_session: AsyncSession, sample_image_data: dict, params
+    ):
+        """Following next_cursor visits exactly the rows offset paging does, in order."""
+        await self._seed(db_session, sample_image_data)
+
+        by_offset: list[int] = []
+        for page in (1, 2, 3):
+            response = await client.get(f"/api/v1/images?per_page=4&page={page}&{params}")
+            by_offset.extend(img["image_id"] for img in response.json()["images"])
+
+        assert len(by_offset) == 11
+        assert await self._walk(client, params) == by_offset
+
+    async def test_cursor_page_reports_full_total(
+        self, client: AsyncClient, db_session: AsyncSession, sample_image_data: dict
+    ):
+        await self._seed(db_session, sample_image_data)
+        first = (await client.get("/api/v1/images?per_page=4")).json()
+        second = (
+            await client.get("/api/v1/images?per_page=4", params={"cursor": first["next_cursor"]})
+        ).json()
+        assert second["total"] == first["total"] == 11
+
+    async def test_short_page_has_no_next_cursor(
+        self, client: AsyncClient, db_session: AsyncSession, sample_image_data: dict
+    ):
+        await self._seed(db_session, sample_image_data)
+        response = await client.get("/api/v1/images?per_page=20")
+        assert response.json()["next_cursor"] is None
+
+    async def test_cursor_from_other_sort_is_rejected(
+        self, client: AsyncClient, db_session: AsyncSession, sample_image_data: dict
+    ):
+        await self._seed(db_session, sample_image_data)
+        first = (await client.get("/api/v1/images?per_page=4&sort_by=favorites")).json()
+        response = await client.get(
+            "/api/v1/images?per_page=4&sort_by=image_id",
+            params={"cursor": first["next_cursor"]},
+        )
+        assert response.status_code == 400
+
+    async def test_garbage_cursor_is_400(self, client: AsyncClient):
+        response = await client.get("/api/v1/images", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    async def test_nullable_sort_rejects_cursor_and_emits_none(
+        self, client: AsyncClient, db_session: AsyncSession, sample_image_data: dict
+    ):
+        await self._seed(db_session, sample_image_data)
+        response = await client.get("/api/v1/images?per_page=4&sort_by=last_post")
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] is None
+
+        response = await client.get(
+            "/api/v1/images?sort_by=last_post", params={"cursor": "eyJ4IjoxfQ"}
+        )
+        assert response.status_code == 400
+
+
 @pytest.mark.api
 class TestImageDetail:
     """Tests for GET /api/v1/images/{id} endpoint."""
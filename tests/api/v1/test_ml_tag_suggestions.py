@@ -1474,7 +1474,7 @@ class TestReviewMlTagSuggestions:
 
         access_token = create_access_token(user_id=user.user_id)
         with patch(
-            "app.services.ml_suggestion_review.sync_tags_to_search",
+            "app.services.ml_suggestion_review.after_tags_change",
             new_callable=AsyncMock,
         ) as mock_sync:
             response = await client.post(
@@ -0,0 +1,116 @@
+"""
+Query-count bounds for list endpoints (the max_queries fixture, tests/conftest.py).
+
+These pin how the number of SQL statements scales, not exact counts: a list
+endpoint should run the same statements for a one-tag search as for a five-tag
+one, and the same for a 2-image page as for a 10-image page. A per-tag or per-row
+loop (resolve_tag_alias per tag, a lazy load per image) breaks that.
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import TagType
+from app.models.comment import Comments
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+
+
+async def _make_tags(db_session: AsyncSession, count: int) -> list[int]:
+    tags = [Tags(title=f"query count tag {n}", type=TagType.THEME) for n in range(count)]
+    db_session.add_all(tags)
+    await db_session.commit()
+    # One alias and one child, so alias resolution and hierarchy expansion both run.
+    alias = Tags(title="query count alias", type=TagType.THEME, alias_of=tags[0].tag_id)
+    child = Tags(title="query count child", type=TagType.THEME, inheritedfrom_id=tags[1].tag_id)
+    db_session.add_all([alias, child])
+    await db_session.commit()
+    return [alias.tag_id, *(tag.tag_id for tag in tags[1:])]  # type: ignore[misc]
+
+
+async def _make_images(
+    db_session: AsyncSession, sample_image_data: dict, numbers: range, tag_ids: list[int]
+) -> None:
+    for n in numbers:
+        image = Images(**{**sample_image_data, "filename": f"query-count-{n:03d}"})
+        db_session.add(image)
+        await db_session.flush()
+        db_session.add_all(
+            [TagLinks(image_id=image.image_id, tag_id=tag_id, user_id=1) for tag_id in tag_ids]
+        )
+        db_session.add(Comments(image_id=image.image_id, user_id=1, post_text=f"c{n}"))
+    await db_session.commit()
+
+
+async def _count(client: AsyncClient, max_queries, url: str, **params: str) -> int:
+    with max_queries(50) as sql:
+        response = await client.get(url, params=params)
+    assert response.status_code == 200, response.text
+    return sql.count
+
+
+@pytest.mark.api
+class TestListQueryCounts:
+    @pytest.mark.parametrize("tags_mode", ["all", "any"])
+    async def test_tag_search_queries_independent_of_tag_count(
+        self, client: AsyncClient, db_session: AsyncSession, max_queries, tags_mode: str
+    ):
+        tag_ids = [str(tag_id) for tag_id in await _make_tags(db_session, 5)]
+
+        one = await _count(
+            client, max_queries, "/api/v1/images", tags=tag_ids[0], tags_mode=tags_mode
+        )
+        five = await _count(
+            client, max_queries, "/api/v1/images", tags=",".join(tag_ids), tags_mode=tags_mode
+        )
+
+        assert five == one
+
+    async def test_exclude_tags_queries_independent_of_tag_count(
+        self, client: AsyncClient, db_session: AsyncSession, max_queries
+    ):
+        tag_ids = [str(tag_id) for tag_id in await _make_tags(db_session, 5)]
+
+        one = await _count(
+            client,
+            max_queries,
+            "/api/v1/images",
+            exclude_tags=tag_ids[0],
+            exclude_descendants="true",
+        )
+        five = await _count(
+            client,
+            max_queries,
+            "/api/v1/images",
+            exclude_tags=",".join(tag_ids),
+            exclude_descendants="true",
+        )
+
+        assert five == one
+
+    @pytest.mark.parametrize(
+        ("url", "params"),
+        [
+            ("/api/v1/images", {"include_comments": "true"}),
+            ("/api/v1/comments", {}),
+        ],
+    )
+    async def test_page_queries_independent_of_page_size(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sample_image_data: dict,
+        max_queries,
+        url: str,
+        params: dict[str, str],
+    ):
+        tag_ids = await _make_tags(db_session, 3)
+        await _make_images(db_session, sample_image_data, range(2), tag_ids)
+        small = await _count(client, max_queries, url, **params)
+
+        await _make_images(db_session, sample_image_data, range(2, 10), tag_ids)
+        large = await _count(client, max_queries, url, **params)
+
+        assert large == small
@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.search import get_search_service
 from app.config import TagType
 from app.models.tag import Tags
-from app.services.search import TagSearchResult
+from app.services.search import TagSearchResult, _tag_to_document
 
 
 @pytest.fixture
@@ -375,3 +375,58 @@ class TestSearchEndpoint:
         # Total comes from Meilisearch, but hits only include DB-verified tags
         assert data["total"] == 2
         assert data["hits"] == []
+
+    async def test_search_serves_current_documents_without_database(
+        self,
+        client_with_search: AsyncClient,
+        mock_search_service: AsyncMock,
+    ):
+        """Hits come from current documents even when the tags aren't in the DB."""
+        canonical = Tags(tag_id=99001, title="cat ears", type=TagType.THEME, usage_count=5000)
+        alias = Tags(tag_id=99002, title="neko mimi", type=TagType.THEME, alias_of=99001)
+        docs = [
+            _tag_to_document(alias, parent_usage_count=5000, alias_of_name="cat ears"),
+            _tag_to_document(canonical),
+        ]
+        mock_search_service.search_tags.return_value = TagSearchResult(
+            tag_ids=[99002, 99001], total=2, documents=docs
+        )
+
+        response = await client_with_search.get("/api/v1/search", params={"q": "cat"})
+        assert response.status_code == 200
+
+        hits = response.json()["hits"]
+        assert [h["tag_id"] for h in hits] == [99002, 99001]
+        assert hits[0]["alias_of_name"] == "cat ears"
+        assert hits[0]["alias_of_usage_count"] == 5000
+        assert hits[0]["is_alias"] is True
+        assert hits[1]["usage_count"] == 5000
+        assert hits[1]["indexed_at"] is not None
+
+    async def test_search_hydrates_stale_documents_from_database(
+        self,
+        client_with_search: AsyncClient,
+        db_session: AsyncSession,
+        mock_search_service: AsyncMock,
+    ):
+        """Documents from an older version are read back from the DB, in order."""
+        stale = Tags(title="stale doc tag", type=TagType.THEME, usage_count=7)
+        db_session.add(stale)
+        await db_session.commit()
+        await db_session.refresh(stale)
+        current = Tags(tag_id=99003, title="current doc tag", type=TagType.THEME, usage_count=1)
+        docs = [
+            {"tag_id": stale.tag_id, "title": "stale doc tag", "usage_count": 7},
+            _tag_to_document(current),
+        ]
+        mock_search_service.search_tags.return_value = TagSearchResult(
+            tag_ids=[stale.tag_id, 99003], total=2, documents=docs
+        )
+
+        response = await client_with_search.get("/api/v1/search", params={"q": "doc tag"})
+        assert response.status_code == 200
+
+        hits = response.json()["hits"]
+        assert [h["tag_id"] for h in hits] == [stale.tag_id, 99003]
+        assert hits[0]["usage_count"] == 7
+        assert hits[0]["indexed_at"] is None
@@ -17,7 +17,8 @@ os.environ.setdefault("ENVIRONMENT", "development")
 # and verify passwords constantly via fixtures and login flows).
 os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
@@ -30,7 +31,7 @@ from sqlalchemy.engine import make_url
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.core.database import get_db
+from app.core.database import QueryStats, get_db, get_read_db, track_queries
 from app.core.redis import get_redis
 from app.main import app as main_app
 
@@ -663,6 +664,7 @@ async def mock_redis():
     mock.delete = AsyncMock()  # For cache invalidation
     mock.incr = AsyncMock()
     mock.expire = AsyncMock()
+    mock.publish = AsyncMock()
     mock.close = AsyncMock()
 
     # Setup pipeline mock
@@ -742,6 +744,7 @@ def app(db_session: AsyncSession, mock_redis) -> FastAPI:
         yield mock_redis
 
     main_app.dependency_overrides[get_db] = override_get_db
+    main_app.dependency_overrides[get_read_db] = override_get_db
     main_app.dependency_overrides[get_redis] = override_get_redis
 
     yield main_app
@@ -760,6 +763,7 @@ def app_real_redis(db_session: AsyncSession, redis_client) -> FastAPI:
         yield redis_client
 
     main_app.dependency_overrides[get_db] = override_get_db
+    main_app.dependency_overrides[get_read_db] = override_get_db
     main_app.dependency_overrides[get_redis] = override_get_redis
 
     yield main_app
@@ -802,6 +806,33 @@ async def client_real_redis(app_real_redis: FastAPI) -> AsyncGenerator[AsyncClie
 # Each test gets a fresh, isolated set of data.
 
 
+@pytest.fixture
+def max_queries():
+    """
+    Assert an upper bound on the SQL statements run inside a block.
+
+    Counts every engine, including the pooled sessions a list endpoint fans its
+    page stages out to. On failure the message lists the statements by count,
+    so a per-row loop (N+1) stands out.
+
+    Usage:
+        async def test_listing(client, max_queries):
+            with max_queries(10) as sql:
+                response = await client.get("/api/v1/images")
+            # sql.count is the number of statements actually run
+    """
+
+    @contextmanager
+    def bound(limit: int) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= limit, f"{stats.count} queries (limit {limit}):\n" + "\n".join(
+            f"  {count}x {statement}" for statement, count in stats.statements.most_common()
+        )
+
+    return bound
+
+
 @pytest.fixture
 async def test_user(db_session: AsyncSession):
     """
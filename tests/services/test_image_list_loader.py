@@ -0,0 +1,70 @@
+"""
+Tests for lean list-row loading (app/services/image_list_loader.py).
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ImageStatus, TagType
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+from app.schemas.image import ImageDetailedResponse
+from app.services.image_list_loader import image_list_load, load_tag_summaries
+
+
+async def _mk_image(db: AsyncSession, n: int) -> int:
+    image = Images(
+        user_id=1,
+        filename=f"listload-{n}",
+        ext="jpg",
+        md5_hash=f"ll{n:030x}",
+        status=ImageStatus.ACTIVE,
+        iqdb_hash="x" * 64,
+    )
+    db.add(image)
+    await db.flush()
+    return image.image_id  # type: ignore[return-value]
+
+
+class TestImageListLoader:
+    async def test_tags_grouped_in_display_order(self, db_session: AsyncSession):
+        theme = Tags(title="listload sky", type=TagType.THEME)
+        theme_b = Tags(title="Listload Aqua", type=TagType.THEME)
+        artist = Tags(title="listload painter", type=TagType.ARTIST)
+        db_session.add_all([theme, theme_b, artist])
+        await db_session.flush()
+        tagged = await _mk_image(db_session, 1)
+        bare = await _mk_image(db_session, 2)
+        db_session.add_all(
+            TagLinks(tag_id=tag.tag_id, image_id=tagged, user_id=1)
+            for tag in (theme, theme_b, artist)
+        )
+        await db_session.commit()
+
+        by_image = await load_tag_summaries(db_session, [tagged, bare])
+
+        assert [t.tag for t in by_image[tagged]] == [
+            "listload painter",
+            "Listload Aqua",
+            "listload sky",
+        ]
+        assert by_image[bare] == []
+        assert await load_tag_summaries(db_session, []) == {}
+
+    async def test_rows_build_detailed_responses(self, db_session: AsyncSession):
+        image_id = await _mk_image(db_session, 3)
+        await db_session.commit()
+        db_session.expunge_all()
+
+        image = (
+            await db_session.execute(
+                select(Images).options(*image_list_load()).where(Images.image_id == image_id)  # type: ignore[arg-type]
+            )
+        ).scalar_one()
+        response = ImageDetailedResponse.from_db_model(image, tags=[])
+
+        assert response.image_id == image_id
+        assert response.user is not None
+        assert response.tags is None
+        assert "iqdb_hash" not in image.__dict__
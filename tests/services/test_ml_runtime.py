@@ -42,6 +42,14 @@ async def test_inference_slot_released_on_exception(monkeypatch):
     assert sem._value == 1  # released despite exception
 
 
+async def test_inference_slot_stats_count_slots_in_use(monkeypatch):
+    monkeypatch.setattr(ml_runtime, "_inference_semaphore", asyncio.Semaphore(2))
+    assert ml_runtime._inference_slot_stats()[("in_flight",)] == 0
+    async with inference_slot():
+        assert ml_runtime._inference_slot_stats()[("in_flight",)] == 1
+    assert ml_runtime._inference_slot_stats()[("in_flight",)] == 0
+
+
 async def test_get_ml_service_loads_once_under_concurrency(monkeypatch):
     """Concurrent cold-start callers must load the ONNX model exactly once and all
     receive the same singleton. The double-checked lock closes the check-then-set
@@ -0,0 +1,123 @@
+"""
+Tests for concurrent per-page lookups (app/services/page_enrichment.py).
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.models.favorite import Favorites
+from app.models.image import Images
+from app.services.page_enrichment import gather_stages, viewer_favorites
+from tests.conftest import TEST_DATABASE_URL
+
+
+async def _favorited_image(db: AsyncSession) -> int:
+    image = Images(user_id=1, filename="enrich-1", ext="jpg", md5_hash="e" * 32, status=1)
+    db.add(image)
+    await db.flush()
+    db.add(Favorites(user_id=1, image_id=image.image_id))
+    await db.commit()
+    return image.image_id  # type: ignore[return-value]
+
+
+class TestGatherStages:
+    async def test_results_in_order_with_skipped_stages(self, db_session: AsyncSession):
+        image_id = await _favorited_image(db_session)
+
+        async def count(session: AsyncSession) -> int:
+            return len((await session.execute(select(Images.image_id))).all())  # type: ignore[call-overload]
+
+        favorited, skipped, total = await gather_stages(
+            db_session, viewer_favorites(1, [image_id]), None, count
+        )
+
+        assert favorited == {image_id}
+        assert skipped is None
+        assert total >= 1
+
+    async def test_connection_bound_session_runs_stages_on_it(self, db_session: AsyncSession):
+        seen: list[AsyncSession] = []
+
+        async def record(session: AsyncSession) -> None:
+            seen.append(session)
+
+        await gather_stages(db_session, record, record)
+
+        assert seen == [db_session, db_session]
+
+    @pytest.mark.needs_commit
+    async def test_engine_bound_session_runs_stages_on_their_own_sessions(
+        self, db_session: AsyncSession, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "PAGE_ENRICHMENT_CONNECTIONS", 4)
+        image_id = await _favorited_image(db_session)
+        seen: list[AsyncSession] = []
+
+        async def record(session: AsyncSession) -> set[int]:
+            seen.append(session)
+            return await viewer_favorites(1, [image_id])(session)
+
+        results = await gather_stages(db_session, record, record, record)
+
+        assert results == [{image_id}] * 3
+        assert db_session not in seen
+        assert len(set(map(id, seen))) == 3
+
+    @pytest.mark.needs_commit
+    async def test_budget_of_zero_stays_on_the_request_session(
+        self, db_session: AsyncSession, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "PAGE_ENRICHMENT_CONNECTIONS", 0)
+        seen: list[AsyncSession] = []
+
+        async def record(session: AsyncSession) -> None:
+            seen.append(session)
+
+        await gather_stages(db_session, record, record)
+
+        assert seen == [db_session, db_session]
+
+    @pytest.mark.needs_commit
+    async def test_spent_budget_falls_back_to_the_request_session(
+        self, db_session: AsyncSession, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "PAGE_ENRICHMENT_CONNECTIONS", 1)
+        seen: list[AsyncSession] = []
+
+        async def record(session: AsyncSession) -> None:
+            seen.append(session)
+            await asyncio.sleep(0)
+
+        await gather_stages(db_session, record, record, record)
+
+        assert seen.count(db_session) == 2
+        assert len(set(map(id, seen))) == 2
+
+    async def test_concurrent_requests_do_not_exhaust_a_small_pool(self, monkeypatch):
+        # Every request holds one of the two connections while its stages run;
+        # waiting for a second one would deadlock until pool_timeout.
+        monkeypatch.setattr(settings, "PAGE_ENRICHMENT_CONNECTIONS", 1)
+        engine = create_async_engine(TEST_DATABASE_URL, pool_size=2, max_overflow=0, pool_timeout=5)
+
+        async def stage(session: AsyncSession) -> int:
+            value = (await session.execute(text("SELECT 1"))).scalar_one()
+            await asyncio.sleep(0.01)
+            return value
+
+        async def request() -> list[int]:
+            async with AsyncSession(engine) as db:
+                await db.execute(text("SELECT 1"))
+                return await gather_stages(db, stage, stage, stage)
+
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(request() for _ in range(12))), timeout=30
+            )
+        finally:
+            await engine.dispose()
+
+        assert results == [[1, 1, 1]] * 12
@@ -0,0 +1,112 @@
+"""Tests for the post-commit hooks (app/services/post_commit.py)."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ImageStatus
+from app.models.image import Images
+from app.models.tag import Tags
+from app.services import post_commit
+from app.services.post_commit import (
+    after_image_status_change,
+    after_tag_delete,
+    after_tag_hierarchy_change,
+    after_tag_links_change,
+    after_tags_change,
+)
+
+
+@pytest.fixture
+def bumps(monkeypatch) -> list[None]:
+    calls: list[None] = []
+
+    async def record() -> None:
+        calls.append(None)
+
+    monkeypatch.setattr(post_commit, "bump_feed_generation", record)
+    return calls
+
+
+@pytest.fixture
+def tag_hooks(monkeypatch) -> list[tuple[str, object]]:
+    calls: list[tuple[str, object]] = []
+
+    async def changed(tags) -> None:
+        calls.append(("changed", [tag.tag_id for tag in tags]))
+
+    async def deleted(tag_id: int) -> None:
+        calls.append(("deleted", tag_id))
+
+    async def drain() -> None:
+        calls.append(("drain", None))
+
+    monkeypatch.setattr(post_commit, "tags_changed", changed)
+    monkeypatch.setattr(post_commit, "tag_deleted", deleted)
+    monkeypatch.setattr(post_commit, "request_drain", drain)
+    return calls
+
+
+async def _mk_image(db: AsyncSession, n: int, status: int) -> int:
+    image = Images(
+        user_id=1, filename=f"hook-{n}", ext="jpg", md5_hash=f"{n + 900:032x}", status=status
+    )
+    db.add(image)
+    await db.commit()
+    return image.image_id  # type: ignore[return-value]
+
+
+class TestAfterTagLinksChange:
+    async def test_public_image_invalidates_feed_cache(self, db_session: AsyncSession, bumps):
+        image_id = await _mk_image(db_session, 0, ImageStatus.ACTIVE)
+        await after_tag_links_change(db_session, [image_id])
+        assert len(bumps) == 1
+
+    async def test_hidden_image_invalidates_feed_cache(self, db_session: AsyncSession, bumps):
+        # Tag pages list hidden images too, and count them.
+        image_id = await _mk_image(db_session, 1, ImageStatus.DEACTIVATED)
+        await after_tag_links_change(db_session, [image_id])
+        assert len(bumps) == 1
+
+    async def test_deleted_image_invalidates_feed_cache(self, db_session: AsyncSession, bumps):
+        await after_tag_links_change(db_session, [999_999_999])
+        assert len(bumps) == 1
+
+    async def test_no_images_is_a_no_op(self, db_session: AsyncSession, bumps):
+        await after_tag_links_change(db_session, [])
+        assert bumps == []
+
+
+class TestAfterImageStatusChange:
+    async def test_unchanged_status_keeps_feed_cache(self, bumps):
+        await after_image_status_change(1, ImageStatus.ACTIVE, ImageStatus.ACTIVE)
+        assert bumps == []
+
+    async def test_changed_status_invalidates_feed_cache(self, bumps):
+        await after_image_status_change(1, ImageStatus.ACTIVE, ImageStatus.DEACTIVATED)
+        assert len(bumps) == 1
+
+
+class TestAfterTagHierarchyChange:
+    async def test_marks_subtree_counts_stale(self, monkeypatch):
+        calls: list[None] = []
+
+        async def record() -> None:
+            calls.append(None)
+
+        monkeypatch.setattr(post_commit, "record_tag_hierarchy_change", record)
+        await after_tag_hierarchy_change()
+        assert len(calls) == 1
+
+
+class TestTagHooks:
+    async def test_change_updates_autocomplete_and_queues_drain(self, tag_hooks):
+        await after_tags_change([Tags(tag_id=1, title="a"), Tags(tag_id=2, title="b")])
+        assert tag_hooks == [("changed", [1, 2]), ("drain", None)]
+
+    async def test_no_tags_is_a_no_op(self, tag_hooks):
+        await after_tags_change([])
+        assert tag_hooks == []
+
+    async def test_delete_updates_autocomplete_and_queues_drain(self, tag_hooks):
+        await after_tag_delete(7)
+        assert tag_hooks == [("deleted", 7), ("drain", None)]
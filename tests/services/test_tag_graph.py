@@ -0,0 +1,153 @@
+"""
+Tests for the in-process tag graph (app/services/tag_graph.py).
+"""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.tags import get_tag_hierarchy, resolve_tag_alias_id
+from app.models.tag import Tags
+from app.services import tag_graph
+from app.services.ml_suggestion_pipeline import fetch_parent_map
+from app.services.tag_graph import TagGraph, load_tag_graph
+
+# 1 ─┬─ 2 ─── 4 ─── 5
+#    └─ 3
+# 6 is an alias of 1; 7 stands alone.
+ROWS = [
+    (1, None, None),
+    (2, None, 1),
+    (3, None, 1),
+    (4, None, 2),
+    (5, None, 4),
+    (6, 1, None),
+    (7, None, None),
+]
+
+
+@pytest.fixture
+def graph() -> TagGraph:
+    return TagGraph.from_rows(version=3, rows=ROWS)
+
+
+@pytest.fixture
+def active_graph(monkeypatch, graph: TagGraph) -> TagGraph:
+    """Install ``graph`` as this process's fresh, enabled tag graph."""
+    monkeypatch.setattr(tag_graph, "_enabled", True)
+    monkeypatch.setattr(tag_graph, "_graph", graph)
+    monkeypatch.setattr(tag_graph, "_announced_version", graph.version)
+    monkeypatch.setattr(tag_graph, "_dirty", False)
+    return graph
+
+
+class TestTagGraph:
+    def test_resolve_alias(self, graph: TagGraph):
+        assert graph.resolve_alias(6) == 1
+        assert graph.resolve_alias(2) == 2
+        assert graph.resolve_alias(999) == 999
+
+    def test_hierarchy_includes_self_and_all_descendants(self, graph: TagGraph):
+        assert sorted(graph.hierarchy(1)) == [1, 2, 3, 4, 5]
+        assert graph.hierarchy(1)[0] == 1
+
+    def test_hierarchy_depth_matches_cte_semantics(self, graph: TagGraph):
+        assert graph.hierarchy(1, max_depth=1) == [1]
+        assert sorted(graph.hierarchy(1, max_depth=2)) == [1, 2, 3]
+        assert sorted(graph.hierarchy(1, max_depth=3)) == [1, 2, 3, 4]
+
+    def test_hierarchy_of_unknown_tag_is_empty(self, graph: TagGraph):
+        assert graph.hierarchy(999) == []
+
+    def test_descendants_terminate_on_cycle(self):
+        cyclic = TagGraph.from_rows(version=0, rows=[(1, None, 2), (2, None, 1)])
+        assert cyclic.descendant_ids(1) == (2,)
+
+    def test_parent_map_walks_ancestry(self, graph: TagGraph):
+        assert graph.parent_map({5, 3}) == {5: 4, 4: 2, 2: 1, 1: None, 3: 1}
+        assert graph.parent_map({999}) == {}
+
+
+class TestFreshness:
+    def test_disabled_graph_is_never_served(self, monkeypatch, graph: TagGraph):
+        monkeypatch.setattr(tag_graph, "_enabled", False)
+        monkeypatch.setattr(tag_graph, "_graph", graph)
+        assert tag_graph.get_tag_graph() is None
+
+    def test_fresh_graph_is_served(self, active_graph: TagGraph):
+        assert tag_graph.get_tag_graph() is active_graph
+
+    def test_announced_newer_version_hides_graph(self, monkeypatch, active_graph: TagGraph):
+        monkeypatch.setattr(tag_graph, "_announced_version", active_graph.version + 1)
+        assert tag_graph.get_tag_graph() is None
+
+    def test_expired_graph_is_hidden(self, monkeypatch, active_graph: TagGraph):
+        monkeypatch.setattr(
+            active_graph,
+            "loaded_at",
+            time.monotonic() - tag_graph.TAG_GRAPH_MAX_AGE_SECONDS - 1,
+        )
+        assert tag_graph.get_tag_graph() is None
+
+    async def test_publish_marks_local_graph_stale(self, active_graph: TagGraph):
+        redis_client = MagicMock()
+        redis_client.incr = AsyncMock(return_value=4)
+        redis_client.publish = AsyncMock()
+
+        await tag_graph.publish_tag_graph_change(redis_client)
+
+        assert tag_graph.get_tag_graph() is None
+        redis_client.incr.assert_awaited_once_with(tag_graph.TAG_GRAPH_VERSION_KEY)
+        redis_client.publish.assert_awaited_once_with(tag_graph.TAG_GRAPH_CHANNEL, 4)
+
+    async def test_publish_swallows_redis_errors(self, active_graph: TagGraph):
+        redis_client = MagicMock()
+        redis_client.incr = AsyncMock(side_effect=ConnectionError("down"))
+
+        await tag_graph.publish_tag_graph_change(redis_client)
+
+        assert tag_graph.get_tag_graph() is None
+
+
+class TestDatabaseParity:
+    async def _make_tree(self, db: AsyncSession) -> dict[str, int]:
+        root = Tags(title="graph root", type=1)
+        db.add(root)
+        await db.flush()
+        child = Tags(title="graph child", type=1, inheritedfrom_id=root.tag_id)
+        alias = Tags(title="graph alias", type=1, alias_of=root.tag_id)
+        db.add_all([child, alias])
+        await db.flush()
+        grandchild = Tags(title="graph grandchild", type=1, inheritedfrom_id=child.tag_id)
+        db.add(grandchild)
+        await db.commit()
+        return {
+            "root": root.tag_id,
+            "child": child.tag_id,
+            "alias": alias.tag_id,
+            "grandchild": grandchild.tag_id,
+        }
+
+    async def test_loaded_graph_matches_database_lookups(self, db_session: AsyncSession):
+        ids = await self._make_tree(db_session)
+        graph = await load_tag_graph(db_session)
+
+        for depth in (1, 2, 10):
+            assert sorted(graph.hierarchy(ids["root"], depth)) == sorted(
+                await get_tag_hierarchy(db_session, ids["root"], depth)
+            )
+        assert graph.resolve_alias(ids["alias"]) == await resolve_tag_alias_id(
+            db_session, ids["alias"]
+        )
+        assert graph.parent_map({ids["grandchild"]}) == await fetch_parent_map(
+            db_session, {ids["grandchild"]}
+        )
+
+    async def test_lookups_use_active_graph(self, db_session: AsyncSession, active_graph: TagGraph):
+        # Tags 1-7 of the fixture graph don't exist in the database, so any
+        # answer here must have come from the in-process graph.
+        assert sorted(await get_tag_hierarchy(db_session, 1)) == [1, 2, 3, 4, 5]
+        assert await resolve_tag_alias_id(db_session, 6) == 1
+        assert await fetch_parent_map(db_session, {5}) == {5: 4, 4: 2, 2: 1, 1: None}
@@ -0,0 +1,220 @@
+"""
+Tests for the tag posting-list index (app/services/tag_postings.py).
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ImageStatus, settings
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+from app.services import tag_postings
+from app.services.tag_postings import (
+    INDEXED_TAGS_KEY,
+    STALE_KEY,
+    bitmap_from_ids,
+    ids_from_bitmap,
+    match_tags,
+    rebuild_tag_postings,
+    sync_tag_postings,
+    tag_key,
+)
+
+
+class TestBitmapEncoding:
+    def test_bit_order_matches_redis_setbit(self):
+        # SETBIT key 0 1 sets the MSB of byte 0; SETBIT key 9 1 sets 0x40 of byte 1.
+        assert bitmap_from_ids([0, 9]) == b"\x80\x40"
+        assert bitmap_from_ids([]) == b""
+
+    @pytest.mark.parametrize("descending", [False, True])
+    def test_round_trip(self, descending: bool):
+        ids = [1, 7, 8, 63, 64, 1000]
+        decoded = ids_from_bitmap(bitmap_from_ids(ids), 0, descending=descending)
+        assert decoded == sorted(ids, reverse=descending)
+
+    def test_decode_slice_offsets_ids(self):
+        bitmap = bitmap_from_ids([3, 17, 40])
+        assert ids_from_bitmap(bitmap[2:], 2, descending=False) == [17, 40]
+
+
+@pytest.fixture
+async def postings_redis(monkeypatch, redis_client) -> redis.Redis:  # type: ignore[type-arg]
+    """A binary client on the test Redis DB, installed as the index's client."""
+    kwargs = redis_client.connection_pool.connection_kwargs
+    client = redis.Redis(
+        host=kwargs["host"], port=kwargs["port"], db=kwargs["db"], decode_responses=False
+    )
+    monkeypatch.setattr(tag_postings, "_client", client)
+    monkeypatch.setattr(settings, "TAG_POSTINGS_MIN_USAGE", 2)
+    yield client
+    await client.aclose()
+
+
+async def _mk_image(db: AsyncSession, n: int, status: int = ImageStatus.ACTIVE) -> int:
+    image = Images(
+        user_id=1, filename=f"postings-{n}", ext="jpg", md5_hash=f"{n:032x}", status=status
+    )
+    db.add(image)
+    await db.flush()
+    return image.image_id  # type: ignore[return-value]
+
+
+async def _link(db: AsyncSession, tag_id: int, *image_ids: int) -> None:
+    db.add_all(TagLinks(tag_id=tag_id, image_id=image_id, user_id=1) for image_id in image_ids)
+    await db.commit()
+
+
+class TestPostingIndex:
+    async def _seed(self, db: AsyncSession) -> dict[str, int]:
+        """Two popular tags, one small tag, five images (the last one a repost)."""
+        red = Tags(title="postings red", type=1)
+        blue = Tags(title="postings blue", type=1)
+        rare = Tags(title="postings rare", type=1)
+        db.add_all([red, blue, rare])
+        await db.flush()
+        images = [await _mk_image(db, n) for n in range(4)]
+        images.append(await _mk_image(db, 4, status=ImageStatus.REPOST))
+        await _link(db, red.tag_id, *images)  # type: ignore[arg-type]
+        await _link(db, blue.tag_id, images[1], images[2])  # type: ignore[arg-type]
+        await _link(db, rare.tag_id, images[2])  # type: ignore[arg-type]
+        for tag in (red, blue, rare):
+            await db.refresh(tag)
+        return {
+            "red": red.tag_id,
+            "blue": blue.tag_id,
+            "rare": rare.tag_id,
+            **{f"img{n}": image_id for n, image_id in enumerate(images)},
+        }  # type: ignore[dict-item]
+
+    async def test_rebuild_indexes_only_popular_tags(
+        self, db_session: AsyncSession, postings_redis
+    ):
+        ids = await self._seed(db_session)
+
+        assert await rebuild_tag_postings(db_session) >= 2
+
+        indexed = {int(t) for t in await postings_redis.smembers(INDEXED_TAGS_KEY)}
+        assert {ids["red"], ids["blue"]} <= indexed
+        assert ids["rare"] not in indexed
+        assert await postings_redis.getbit(tag_key(ids["blue"]), ids["img1"]) == 1
+        assert await postings_redis.getbit(tag_key(ids["blue"]), ids["img0"]) == 0
+
+    async def test_match_counts_and_pages(self, db_session: AsyncSession, postings_redis):
+        ids = await self._seed(db_session)
+        await rebuild_tag_postings(db_session)
+
+        match = await match_tags(db_session, [{ids["red"]}, {ids["blue"]}])
+        assert match is not None
+        try:
+            assert await match.count(db_session, public_only=False, hide_reposts=False) == 2
+            page, exhausted = await match.image_ids(1, descending=True)
+            assert page == [ids["img2"]]
+            assert not exhausted
+            page, exhausted = await match.image_ids(5, descending=True, after=ids["img2"])
+            assert page == [ids["img1"]]
+            assert exhausted
+        finally:
+            await match.release()
+
+    async def test_visibility_and_exclusion(self, db_session: AsyncSession, postings_redis):
+        ids = await self._seed(db_session)
+        await rebuild_tag_postings(db_session)
+
+        match = await match_tags(db_session, [{ids["red"]}], exclude_ids={ids["blue"]})
+        assert match is not None
+        try:
+            assert await match.count(db_session, public_only=False, hide_reposts=False) == 3
+            assert await match.count(db_session, public_only=True, hide_reposts=True) == 2
+        finally:
+            await match.release()
+
+    async def test_small_tags_merge_from_sql(self, db_session: AsyncSession, postings_redis):
+        ids = await self._seed(db_session)
+        await rebuild_tag_postings(db_session)
+
+        # A group of only unindexed tags is left to SQL...
+        assert await match_tags(db_session, [{ids["rare"]}]) is None
+
+        # ...but alongside an indexed group its links are merged in.
+        match = await match_tags(db_session, [{ids["red"]}, {ids["rare"]}])
+        assert match is not None
+        try:
+            assert await match.image_ids(10, descending=False) == ([ids["img2"]], True)
+        finally:
+            await match.release()
+
+    async def test_sync_follows_link_changes(self, db_session: AsyncSession, postings_redis):
+        ids = await self._seed(db_session)
+        await rebuild_tag_postings(db_session)
+
+        await _link(db_session, ids["blue"], ids["img3"])
+        await sync_tag_postings(db_session, [ids["img3"]], [ids["blue"], ids["rare"]])
+
+        assert await postings_redis.getbit(tag_key(ids["blue"]), ids["img3"]) == 1
+        assert not await postings_redis.exists(tag_key(ids["rare"]))
+
+    async def test_evicted_bitmap_falls_back_to_sql(self, db_session: AsyncSession, postings_redis):
+        ids = await self._seed(db_session)
+        await rebuild_tag_postings(db_session)
+        await postings_redis.delete(tag_key(ids["red"]), tag_key(ids["blue"]))
+
+        assert await match_tags(db_session, [{ids["red"]}]) is None
+
+    async def test_sync_during_rebuild_is_replayed(
+        self, db_session: AsyncSession, postings_redis, monkeypatch
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_postings(db_session)
+        late_image = await _mk_image(db_session, 5)
+        await db_session.commit()
+        original_execute = db_session.execute
+        linked: list[int] = []
+
+        async def execute(statement, *args, **kwargs):
+            result = await original_execute(statement, *args, **kwargs)
+            if not linked and "FROM tag_links" in str(statement):
+                # A tagging commits and syncs after the rebuild read this tag's
+                # links, before its RENAME: the sync writes to the outgoing key.
+                (tag_id,) = statement.compile().params.values()
+                linked.append(tag_id)
+                await _link(db_session, tag_id, late_image)
+                await sync_tag_postings(db_session, [late_image], [tag_id])
+            return result
+
+        monkeypatch.setattr(db_session, "execute", execute)
+        await rebuild_tag_postings(db_session)
+
+        assert await postings_redis.getbit(tag_key(linked[0]), late_image) == 1
+        assert not await postings_redis.exists("tag_postings:rebuild_journal")
+
+    async def test_failed_sync_sends_searches_to_sql_until_rebuilt(
+        self, db_session: AsyncSession, postings_redis, monkeypatch
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_postings(db_session)
+        enqueued = AsyncMock()
+        monkeypatch.setattr(tag_postings, "enqueue_job", enqueued)
+        broken_db = MagicMock()
+        broken_db.execute = AsyncMock(side_effect=RuntimeError("connection lost"))
+
+        await sync_tag_postings(broken_db, [ids["img0"]])
+
+        assert await postings_redis.exists(STALE_KEY)
+        enqueued.assert_awaited_once()
+        assert await match_tags(db_session, [{ids["red"]}]) is None
+
+        await rebuild_tag_postings(db_session)
+        assert not await postings_redis.exists(STALE_KEY)
+        match = await match_tags(db_session, [{ids["red"]}])
+        assert match is not None
+        await match.release()
+
+    async def test_disabled_without_client(self, monkeypatch, db_session: AsyncSession):
+        monkeypatch.setattr(tag_postings, "_client", None)
+        assert await match_tags(db_session, [{1}]) is None
+        await sync_tag_postings(db_session, [1])
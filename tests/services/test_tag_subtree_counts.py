@@ -0,0 +1,330 @@
+"""
+Tests for the precomputed tag hierarchy counts (app/services/tag_subtree_counts.py).
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as redis
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ImageStatus, settings
+from app.models.image import Images
+from app.models.tag import Tags
+from app.models.tag_link import TagLinks
+from app.services import tag_subtree_counts
+from app.services.tag_subtree_counts import (
+    IMAGE_ROOTS_KEY,
+    ROOTS_KEY,
+    STALE_KEY,
+    SubtreeCounts,
+    get_subtree_counts,
+    members_key,
+    rebuild_tag_subtree_counts,
+    record_subtree_status_change,
+    record_tag_hierarchy_change,
+    sync_tag_subtree_counts,
+)
+
+
+class TestSubtreeCountsVisible:
+    @pytest.mark.parametrize(
+        ("show_all", "hide_reposts", "expected"),
+        [(True, False, 10), (False, False, 7), (True, True, 8), (False, True, 5)],
+    )
+    def test_visible(self, show_all: bool, hide_reposts: bool, expected: int):
+        counts = SubtreeCounts(all=10, public=7, repost=2)
+        assert counts.visible(show_all=show_all, hide_reposts=hide_reposts) == expected
+
+
+@pytest.fixture
+async def counts_redis(monkeypatch, redis_client) -> redis.Redis:  # type: ignore[type-arg]
+    """A binary client on the test Redis DB, installed as the counts' client."""
+    kwargs = redis_client.connection_pool.connection_kwargs
+    client = redis.Redis(
+        host=kwargs["host"], port=kwargs["port"], db=kwargs["db"], decode_responses=False
+    )
+    monkeypatch.setattr(tag_subtree_counts, "_client", client)
+    monkeypatch.setattr(settings, "TAG_SUBTREE_COUNTS_MIN_LINKS", 3)
+    yield client
+    await client.aclose()
+
+
+async def _mk_image(db: AsyncSession, n: int, status: int = ImageStatus.ACTIVE) -> int:
+    image = Images(
+        user_id=1, filename=f"subtree-{n}", ext="jpg", md5_hash=f"{n + 500:032x}", status=status
+    )
+    db.add(image)
+    await db.flush()
+    return image.image_id  # type: ignore[return-value]
+
+
+async def _link(db: AsyncSession, tag_id: int, *image_ids: int) -> None:
+    db.add_all(TagLinks(tag_id=tag_id, image_id=image_id, user_id=1) for image_id in image_ids)
+    await db.commit()
+
+
+class TestSubtreeCounts:
+    async def _seed(self, db: AsyncSession) -> dict[str, int]:
+        """A parent with a child tag, a small unrelated tag, and four images:
+        one active, one on the parent only, a repost and a hidden one."""
+        parent = Tags(title="subtree parent", type=1)
+        db.add(parent)
+        await db.flush()
+        child = Tags(title="subtree child", type=1, inheritedfrom_id=parent.tag_id)
+        rare = Tags(title="subtree rare", type=1)
+        db.add_all([child, rare])
+        await db.flush()
+        active = await _mk_image(db, 0)
+        parent_only = await _mk_image(db, 1)
+        repost = await _mk_image(db, 2, status=ImageStatus.REPOST)
+        hidden = await _mk_image(db, 3, status=ImageStatus.DEACTIVATED)
+        await _link(db, parent.tag_id, active, parent_only)  # type: ignore[arg-type]
+        await _link(db, child.tag_id, active, repost, hidden)  # type: ignore[arg-type]
+        await _link(db, rare.tag_id, active)  # type: ignore[arg-type]
+        return {
+            "parent": parent.tag_id,
+            "child": child.tag_id,
+            "rare": rare.tag_id,
+            "active": active,
+            "parent_only": parent_only,
+            "repost": repost,
+            "hidden": hidden,
+        }  # type: ignore[dict-item]
+
+    async def test_rebuild_counts_distinct_images_per_class(
+        self, db_session: AsyncSession, counts_redis
+    ):
+        ids = await self._seed(db_session)
+
+        assert await rebuild_tag_subtree_counts(db_session) >= 2
+
+        roots = {int(root) for root in await counts_redis.smembers(ROOTS_KEY)}
+        assert {ids["parent"], ids["child"]} <= roots
+        assert ids["rare"] not in roots
+        # "active" is linked to both parent and child but counted once.
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=3, repost=1)
+        assert await get_subtree_counts(ids["child"]) == SubtreeCounts(all=3, public=2, repost=1)
+        assert await get_subtree_counts(ids["rare"]) is None
+
+    async def test_sync_follows_link_changes(self, db_session: AsyncSession, counts_redis):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+
+        # Moving "parent_only" onto the child adds it to the child's subtree only.
+        await _link(db_session, ids["child"], ids["parent_only"])
+        await sync_tag_subtree_counts(db_session, [ids["parent_only"]])
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=3, repost=1)
+        assert await get_subtree_counts(ids["child"]) == SubtreeCounts(all=4, public=3, repost=1)
+
+        # "active" keeps the parent through its child link.
+        await db_session.execute(
+            delete(TagLinks).where(
+                TagLinks.tag_id == ids["parent"],  # type: ignore[arg-type]
+                TagLinks.image_id == ids["active"],  # type: ignore[arg-type]
+            )
+        )
+        await db_session.commit()
+        await sync_tag_subtree_counts(db_session, [ids["active"]])
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=3, repost=1)
+
+        # Idempotent: replaying a sync changes nothing.
+        await sync_tag_subtree_counts(db_session, [ids["parent_only"]])
+        assert await get_subtree_counts(ids["child"]) == SubtreeCounts(all=4, public=3, repost=1)
+
+    async def test_status_change_moves_image_between_classes(
+        self, db_session: AsyncSession, counts_redis
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+
+        await record_subtree_status_change(ids["hidden"], ImageStatus.ACTIVE)
+        await record_subtree_status_change(ids["repost"], ImageStatus.ACTIVE)
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=4, repost=0)
+
+        await record_subtree_status_change(ids["active"], ImageStatus.DEACTIVATED)
+        await record_subtree_status_change(ids["active"], ImageStatus.DEACTIVATED)
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=3, repost=0)
+
+    async def test_writes_touch_only_the_images_own_roots(
+        self, db_session: AsyncSession, counts_redis
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+        assert (
+            await counts_redis.hget(IMAGE_ROOTS_KEY, ids["parent_only"])
+            == str(ids["parent"]).encode()
+        )
+        child_bitmap = await counts_redis.get(members_key(ids["child"]))
+
+        # An image in no root, newer than every member: no root bitmap grows.
+        outsider = await _mk_image(db_session, 4)
+        await db_session.commit()
+        await sync_tag_subtree_counts(db_session, [outsider])
+        await record_subtree_status_change(outsider, ImageStatus.DEACTIVATED)
+        assert await counts_redis.get(members_key(ids["child"])) == child_bitmap
+        assert await counts_redis.hget(IMAGE_ROOTS_KEY, outsider) is None
+
+        # A member of the parent only leaves the child's bitmap alone.
+        await record_subtree_status_change(ids["parent_only"], ImageStatus.DEACTIVATED)
+        assert await counts_redis.get(members_key(ids["child"])) == child_bitmap
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=2, repost=1)
+
+    async def test_deleted_image_leaves_its_roots(self, db_session: AsyncSession, counts_redis):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+
+        await db_session.execute(delete(TagLinks).where(TagLinks.image_id == ids["repost"]))  # type: ignore[arg-type]
+        await db_session.execute(delete(Images).where(Images.image_id == ids["repost"]))  # type: ignore[arg-type]
+        await db_session.commit()
+        await sync_tag_subtree_counts(db_session, [ids["repost"]])
+
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=3, public=2, repost=0)
+        assert await get_subtree_counts(ids["child"]) == SubtreeCounts(all=2, public=1, repost=0)
+        assert await counts_redis.hget(IMAGE_ROOTS_KEY, ids["repost"]) is None
+
+    async def test_rebuild_without_roots_drops_stale_ones(
+        self, db_session: AsyncSession, counts_redis, monkeypatch
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+        assert await counts_redis.sismember(ROOTS_KEY, ids["parent"])
+
+        # No subtree qualifies any more (a raised threshold, or a small install).
+        monkeypatch.setattr(settings, "TAG_SUBTREE_COUNTS_MIN_LINKS", 10**9)
+        assert await rebuild_tag_subtree_counts(db_session) == 0
+
+        assert await counts_redis.smembers(ROOTS_KEY) == set()
+        assert await get_subtree_counts(ids["parent"]) is None
+        assert not await counts_redis.exists(IMAGE_ROOTS_KEY, members_key(ids["parent"]))
+
+    async def test_sync_during_rebuild_is_replayed(
+        self, db_session: AsyncSession, counts_redis, monkeypatch
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+        original_smembers = counts_redis.smembers
+        synced: list[None] = []
+
+        async def smembers(key):
+            if key == ROOTS_KEY and not synced:
+                # A tagging commits and syncs after every root was swapped in,
+                # before image_roots is renamed over the one the sync wrote to.
+                synced.append(None)
+                await _link(db_session, ids["child"], ids["parent_only"])
+                await sync_tag_subtree_counts(db_session, [ids["parent_only"]])
+            return await original_smembers(key)
+
+        monkeypatch.setattr(counts_redis, "smembers", smembers)
+        await rebuild_tag_subtree_counts(db_session)
+
+        roots = await counts_redis.hget(IMAGE_ROOTS_KEY, ids["parent_only"])
+        assert set(roots.split(b",")) == {str(ids["parent"]).encode(), str(ids["child"]).encode()}
+        assert not await counts_redis.exists("tag_counts:rebuild_journal")
+
+        # image_roots lists the child again, so a later unlink reaches its counts.
+        await db_session.execute(
+            delete(TagLinks).where(
+                TagLinks.tag_id == ids["child"],  # type: ignore[arg-type]
+                TagLinks.image_id == ids["parent_only"],  # type: ignore[arg-type]
+            )
+        )
+        await db_session.commit()
+        await sync_tag_subtree_counts(db_session, [ids["parent_only"]])
+        assert await get_subtree_counts(ids["child"]) == SubtreeCounts(all=3, public=2, repost=1)
+
+    @pytest.mark.parametrize(
+        "after",
+        [
+            # After the rebuild read the classes, before it writes them.
+            "images.status NOT IN",
+            # After it wrote the class bitmaps, before it swaps the first root in
+            # with counts from its older snapshot.
+            "FROM tag_links",
+        ],
+    )
+    async def test_status_change_during_rebuild_is_replayed(
+        self, db_session: AsyncSession, counts_redis, monkeypatch, after: str
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+        original_execute = db_session.execute
+        hidden: list[None] = []
+
+        async def execute(statement, *args, **kwargs):
+            result = await original_execute(statement, *args, **kwargs)
+            if not hidden and after in str(statement):
+                hidden.append(None)
+                await db_session.execute(
+                    update(Images)
+                    .where(Images.image_id == ids["active"])  # type: ignore[arg-type]
+                    .values(status=ImageStatus.DEACTIVATED)
+                )
+                await db_session.commit()
+                await record_subtree_status_change(ids["active"], ImageStatus.DEACTIVATED)
+            return result
+
+        monkeypatch.setattr(db_session, "execute", execute)
+        await rebuild_tag_subtree_counts(db_session)
+
+        assert hidden
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=2, repost=1)
+        assert await get_subtree_counts(ids["child"]) == SubtreeCounts(all=3, public=1, repost=1)
+        assert not await counts_redis.exists("tag_counts:rebuild_journal")
+
+        # The hidden bitmap agrees, so making it public again restores the counts.
+        await record_subtree_status_change(ids["active"], ImageStatus.ACTIVE)
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=3, repost=1)
+
+    async def test_failed_sync_sends_tag_pages_to_sql_until_rebuilt(
+        self, db_session: AsyncSession, counts_redis, monkeypatch
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+        enqueued = AsyncMock()
+        monkeypatch.setattr(tag_subtree_counts, "enqueue_job", enqueued)
+        broken_db = MagicMock()
+        broken_db.execute = AsyncMock(side_effect=RuntimeError("connection lost"))
+
+        await sync_tag_subtree_counts(broken_db, [ids["active"]])
+
+        assert await counts_redis.exists(STALE_KEY)
+        enqueued.assert_awaited_once()
+        assert await get_subtree_counts(ids["parent"]) is None
+
+        await rebuild_tag_subtree_counts(db_session)
+        assert not await counts_redis.exists(STALE_KEY)
+        assert await get_subtree_counts(ids["parent"]) == SubtreeCounts(all=4, public=3, repost=1)
+
+    async def test_hierarchy_change_sends_tag_pages_to_sql_until_rebuilt(
+        self, db_session: AsyncSession, counts_redis, monkeypatch
+    ):
+        ids = await self._seed(db_session)
+        await rebuild_tag_subtree_counts(db_session)
+        enqueued = AsyncMock()
+        monkeypatch.setattr(tag_subtree_counts, "enqueue_job", enqueued)
+
+        # The child leaves the parent: its images are no longer in the parent's subtree.
+        await db_session.execute(
+            update(Tags).where(Tags.tag_id == ids["child"]).values(inheritedfrom_id=None)  # type: ignore[arg-type]
+        )
+        await db_session.commit()
+        await record_tag_hierarchy_change()
+
+        enqueued.assert_awaited_once()
+        assert await get_subtree_counts(ids["parent"]) is None
+
+        # Two links of its own are below the threshold: the parent stops being a root.
+        await rebuild_tag_subtree_counts(db_session)
+        assert not await counts_redis.exists(STALE_KEY)
+        assert await get_subtree_counts(ids["parent"]) is None
+        assert await get_subtree_counts(ids["child"]) == SubtreeCounts(all=3, public=2, repost=1)
+
+    async def test_disabled_without_client(self, monkeypatch, db_session: AsyncSession):
+        monkeypatch.setattr(tag_subtree_counts, "_client", None)
+        assert await get_subtree_counts(1) is None
+        await sync_tag_subtree_counts(db_session, [1])
+        await record_subtree_status_change(1, ImageStatus.ACTIVE)
+        await record_tag_hierarchy_change()
+        assert await rebuild_tag_subtree_counts(db_session) == 0
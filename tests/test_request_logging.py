@@ -3,10 +3,11 @@
 import logging
 
 import pytest
-from httpx import AsyncClient
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
 
 from app.config import settings
-from app.main import _log_level_for
+from app.main import HTTP_REQUESTS, RequestLoggingMiddleware, _log_level_for
 
 
 class TestLogLevelForRequest:
@@ -100,3 +101,50 @@ async def test_fast_success_request_logged_at_debug(
         "fast 2xx request_complete should log at DEBUG; got "
         f"{[record.levelname for record in request_logs]}"
     )
+
+
+async def test_unhandled_exception_is_counted_as_500():
+    """A request whose handler raises still lands in http_requests_total."""
+    inner = FastAPI()
+
+    @inner.get("/boom")
+    async def boom() -> None:
+        raise RuntimeError("boom")
+
+    before = HTTP_REQUESTS.value("GET", "/boom", "500")
+    transport = ASGITransport(app=RequestLoggingMiddleware(inner), raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as boom_client:
+        await boom_client.get("/boom")
+
+    assert HTTP_REQUESTS.value("GET", "/boom", "500") == before + 1
+
+
+@pytest.mark.api
+async def test_metrics_endpoint_requires_the_scrape_token(client: AsyncClient, monkeypatch):
+    """/metrics is a 404 unless the request carries METRICS_TOKEN."""
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert (await client.get("/metrics")).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert (await client.get("/metrics")).status_code == 404
+    wrong = await client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 404
+
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+
+
+@pytest.mark.api
+async def test_health_does_not_expose_redis_pool_usage(client: AsyncClient):
+    """Pool sizing and saturation are only exported on the token-gated /metrics."""
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert "redis_pools" not in response.json()
+
+
+async def test_health_does_not_expose_password_hashing_queue(client: AsyncClient):
+    """bcrypt queue depth and 429 counts are only exported on /metrics."""
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
@@ -0,0 +1,119 @@
+"""Tests for the in-process Prometheus metrics (app/core/metrics.py)."""
+
+import asyncio
+
+import pytest
+
+from app.core import metrics
+from app.core.metrics import (
+    CACHE_REQUESTS,
+    Counter,
+    Gauge,
+    Histogram,
+    record_cache,
+    start_metrics_server,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty registry, so each test renders only the metrics it declares."""
+    monkeypatch.setattr(metrics, "_registry", [])
+    return metrics._registry
+
+
+@pytest.mark.unit
+class TestMetrics:
+    def test_counter_renders_per_label_combination(self, registry):
+        counter = Counter("jobs_total", "Jobs run.", ("queue",))
+        counter.inc("default")
+        counter.inc("default", amount=2)
+        counter.inc('odd"name')
+
+        lines = metrics.render_metrics().splitlines()
+
+        assert lines[:2] == ["# HELP jobs_total Jobs run.", "# TYPE jobs_total counter"]
+        assert 'jobs_total{queue="default"} 3.0' in lines
+        assert r'jobs_total{queue="odd\"name"} 1.0' in lines
+        assert counter.value("missing") == 0.0
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/x")
+
+        lines = metrics.render_metrics().splitlines()
+
+        assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{route="/x",le="1.0"} 3' in lines
+        assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum{route="/x"} 3.65' in lines
+        assert 'latency_seconds_count{route="/x"} 4' in lines
+        assert histogram.count("/x") == 4
+
+    def test_gauge_reads_collect_at_render_time(self, registry):
+        state = {"value": 1.0}
+        Gauge("pool_size", "Pool size.", lambda: {("db",): state["value"]}, ("pool",))
+        state["value"] = 5.0
+
+        assert 'pool_size{pool="db"} 5.0' in metrics.render_metrics().splitlines()
+
+    def test_failing_gauge_is_skipped(self, registry):
+        def broken() -> dict:
+            raise RuntimeError("pool gone")
+
+        Gauge("broken", "Broken.", broken)
+        Counter("after_total", "Still rendered.").inc()
+
+        rendered = metrics.render_metrics()
+
+        assert "broken{" not in rendered and "\nbroken " not in rendered
+        assert "after_total 1.0" in rendered
+
+    def test_record_cache_counts_hits_and_misses(self):
+        hits = CACHE_REQUESTS.value("test_cache", "hit")
+        misses = CACHE_REQUESTS.value("test_cache", "miss")
+
+        record_cache("test_cache", hit=True)
+        record_cache("test_cache", hit=False)
+        record_cache("test_cache", hit=False)
+
+        assert CACHE_REQUESTS.value("test_cache", "hit") == hits + 1
+        assert CACHE_REQUESTS.value("test_cache", "miss") == misses + 2
+
+
+async def _scrape(port: int, *headers: str) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        ("GET /metrics HTTP/1.1\r\n" + "".join(f"{h}\r\n" for h in headers) + "\r\n").encode()
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+@pytest.mark.unit
+class TestWorkerMetricsServer:
+    async def test_requires_the_token_when_one_is_set(self, registry):
+        Counter("scraped_total", "Scrapes.").inc()
+        server = await start_metrics_server(0, "127.0.0.1", "scrape-secret")
+        port = server.sockets[0].getsockname()[1]
+        try:
+            assert (await _scrape(port)).startswith(b"HTTP/1.1 404")
+            assert (await _scrape(port, "Authorization: Bearer wrong")).startswith(b"HTTP/1.1 404")
+            response = await _scrape(port, "Authorization: Bearer scrape-secret")
+            assert response.startswith(b"HTTP/1.1 200")
+            assert b"scraped_total 1.0" in response
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def test_serves_without_a_token_when_none_is_set(self, registry):
+        server = await start_metrics_server(0, "127.0.0.1", None)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            assert (await _scrape(port)).startswith(b"HTTP/1.1 200")
+        finally:
+            server.close()
+            await server.wait_closed()
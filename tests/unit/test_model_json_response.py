@@ -0,0 +1,73 @@
+"""Tests for the pydantic-core JSON response path (app/api/responses.py)."""
+
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api.responses import ModelJSONResponse
+from app.schemas.comment import CommentResponse
+from app.schemas.common import UserSummary
+from app.schemas.image import ImageDetailedListResponse, ImageDetailedResponse, TagSummary
+
+
+def _payload() -> ImageDetailedListResponse:
+    user = UserSummary(user_id=3, username="uploader", avatar="a.png", groups=["mods"])
+    image = ImageDetailedResponse(
+        image_id=10,
+        user_id=3,
+        user=user,
+        filename="2024-01-01-10",
+        ext="png",
+        caption="  café ☕ ",
+        date_added=datetime(2024, 1, 1, 12, 30, tzinfo=UTC),
+        locked=0,
+        posts=1,
+        favorites=2,
+        bayesian_rating=4.25,
+        num_ratings=3,
+        medium=1,
+        large=0,
+        tags=[TagSummary(tag_id=5, title="sakura kinomoto", type=4, usage_count=7)],
+        is_favorited=True,
+    )
+    comment = CommentResponse(
+        post_id=1,
+        image_id=10,
+        user_id=3,
+        post_text="**hi** & <b>",
+        date=datetime(2024, 1, 2, tzinfo=UTC),
+        update_count=0,
+        user=user,
+    )
+    return ImageDetailedListResponse(
+        total=1, page=1, per_page=20, images=[image], comments={10: [comment]}
+    )
+
+
+@pytest.mark.unit
+class TestModelJSONResponse:
+    async def test_matches_default_serialization(self):
+        payload = _payload()
+        app = FastAPI()
+
+        @app.get("/default", response_model=ImageDetailedListResponse)
+        async def default() -> ImageDetailedListResponse:
+            return payload
+
+        @app.get("/fast", response_model=ImageDetailedListResponse)
+        async def fast() -> ModelJSONResponse:
+            return ModelJSONResponse(payload)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            default_response = await ac.get("/default")
+            fast_response = await ac.get("/fast")
+
+        assert fast_response.status_code == 200
+        assert fast_response.headers["content-type"] == "application/json"
+        assert fast_response.json() == default_response.json()
+        assert fast_response.json()["images"][0]["tags"][0]["title"] == "sakura kinomoto"
+
+    def test_passes_non_model_content_through(self):
+        assert ModelJSONResponse(b"{}").body == b"{}"
@@ -0,0 +1,112 @@
+"""Tests for off-loop password hashing (app/core/password_hashing.py)."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import status
+
+from app.core import password_hashing
+from app.core.password_hashing import (
+    PasswordHashingBusy,
+    get_password_hash_async,
+    verify_password_async,
+)
+from app.core.security import verify_password
+
+
+@pytest.fixture
+def one_worker(monkeypatch):
+    """A single hashing slot with a short queue, for saturation tests."""
+    monkeypatch.setattr(password_hashing, "_slots", asyncio.Semaphore(1))
+    monkeypatch.setattr(password_hashing.settings, "PASSWORD_HASH_MAX_WAITING", 1)
+    monkeypatch.setattr(password_hashing.settings, "PASSWORD_HASH_QUEUE_TIMEOUT", 0.05)
+
+
+def _blocking(release: threading.Event):
+    def run(*args: str) -> bool:
+        release.wait(timeout=5)
+        return True
+
+    return run
+
+
+@pytest.mark.unit
+class TestPasswordHashing:
+    async def test_round_trip(self):
+        hashed = await get_password_hash_async("Str0ng!Pass")
+
+        assert verify_password("Str0ng!Pass", hashed)
+        assert await verify_password_async("Str0ng!Pass", hashed)
+        assert not await verify_password_async("wrong", hashed)
+
+    async def test_runs_off_the_event_loop(self, monkeypatch):
+        loop_thread = threading.get_ident()
+        seen: list[int] = []
+
+        def record(*args: str) -> bool:
+            seen.append(threading.get_ident())
+            return True
+
+        monkeypatch.setattr(password_hashing, "verify_password", record)
+
+        assert await verify_password_async("a", "b")
+        assert seen and seen[0] != loop_thread
+
+    async def test_wait_timeout_returns_429(self, monkeypatch, one_worker):
+        release = threading.Event()
+        monkeypatch.setattr(password_hashing, "verify_password", _blocking(release))
+        busy = asyncio.create_task(verify_password_async("a", "b"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(PasswordHashingBusy) as exc:
+            await verify_password_async("a", "b")
+
+        assert exc.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert exc.value.headers == {"Retry-After": "2"}
+        release.set()
+        assert await busy
+
+    async def test_full_queue_rejected_without_waiting(self, monkeypatch, one_worker):
+        monkeypatch.setattr(password_hashing.settings, "PASSWORD_HASH_QUEUE_TIMEOUT", 5.0)
+        release = threading.Event()
+        monkeypatch.setattr(password_hashing, "verify_password", _blocking(release))
+        running = asyncio.create_task(verify_password_async("a", "b"))
+        queued = asyncio.create_task(verify_password_async("a", "b"))
+        await asyncio.sleep(0.01)
+
+        stats = password_hashing._hashing_slot_stats()
+        assert (stats[("in_flight",)], stats[("waiting",)]) == (1, 1)
+        rejected = password_hashing.PASSWORD_HASH_REJECTED.value("queue_full")
+        with pytest.raises(PasswordHashingBusy):
+            await verify_password_async("a", "b")
+        assert password_hashing.PASSWORD_HASH_REJECTED.value("queue_full") == rejected + 1
+
+        release.set()
+        assert await running and await queued
+        stats = password_hashing._hashing_slot_stats()
+        assert (stats[("in_flight",)], stats[("waiting",)]) == (0, 0)
+
+    async def test_cancelled_request_holds_its_slot_until_the_hash_finishes(
+        self, monkeypatch, one_worker
+    ):
+        """The thread keeps hashing after the awaiting request is cancelled, so the
+        slot must stay taken until it is done, not free up on cancellation."""
+        release = threading.Event()
+        monkeypatch.setattr(password_hashing, "verify_password", _blocking(release))
+        request = asyncio.create_task(verify_password_async("a", "b"))
+        await asyncio.sleep(0.01)
+
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        assert password_hashing._slots.locked()
+        assert password_hashing._hashing_slot_stats()[("in_flight",)] == 1
+
+        release.set()
+        for _ in range(100):
+            if not password_hashing._slots.locked():
+                break
+            await asyncio.sleep(0.01)
+        assert not password_hashing._slots.locked()
+        assert password_hashing._hashing_slot_stats()[("in_flight",)] == 0
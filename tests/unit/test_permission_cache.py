@@ -1,17 +1,23 @@
 """Tests for permission caching."""
 
+import asyncio
 import json
 
 import pytest
 import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import permission_cache
 from app.core.permission_cache import (
     PERMISSION_CACHE_TTL,
+    PERMISSION_CHANNEL,
     _make_cache_key,
     get_cached_user_permissions,
     invalidate_group_permissions,
     invalidate_user_permissions,
+    permission_memo,
+    start_permission_cache,
+    stop_permission_cache,
 )
 from app.core.security import get_password_hash
 from app.models.permissions import Groups, Perms, UserGroups, UserPerms
@@ -616,3 +622,61 @@ class TestPermissionCache:
         assert not await has_all_permissions(
             db_session, user.user_id, ["image_edit", "tag_create"], redis_client
         )
+
+
+@pytest.mark.unit
+class TestPermissionCacheTiers:
+    """Request memo and pub/sub-invalidated in-process tier in front of Redis."""
+
+    @pytest.fixture
+    def fetches(self, monkeypatch) -> list[int]:
+        calls: list[int] = []
+
+        async def fetch(db, redis_client, user_id):
+            calls.append(user_id)
+            return {f"perm_{len(calls)}"}
+
+        monkeypatch.setattr(permission_cache, "_fetch_user_permissions", fetch)
+        return calls
+
+    async def test_request_memo(self, db_session: AsyncSession, mock_redis, fetches):
+        with permission_memo():
+            first = await get_cached_user_permissions(db_session, mock_redis, 5)
+            second = await get_cached_user_permissions(db_session, mock_redis, 5)
+        third = await get_cached_user_permissions(db_session, mock_redis, 5)
+
+        assert first == second == {"perm_1"}
+        assert third == {"perm_2"}
+        assert fetches == [5, 5]
+
+    async def test_local_tier_follows_invalidations(
+        self,
+        db_session: AsyncSession,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+        monkeypatch,
+        fetches,
+    ):
+        monkeypatch.setattr(permission_cache, "shared_redis", lambda: redis_client)
+        await start_permission_cache()
+        try:
+            for _ in range(100):
+                if permission_cache._subscribed:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert await get_cached_user_permissions(db_session, redis_client, 5) == {"perm_1"}
+            assert await get_cached_user_permissions(db_session, redis_client, 5) == {"perm_1"}
+            assert fetches == [5]
+
+            await invalidate_user_permissions(redis_client, 5)
+            assert await get_cached_user_permissions(db_session, redis_client, 5) == {"perm_2"}
+
+            # Another process's invalidation arrives over the channel.
+            await redis_client.publish(PERMISSION_CHANNEL, "5,6")
+            for _ in range(100):
+                if 5 not in permission_cache._local:
+                    break
+                await asyncio.sleep(0.01)
+            assert await get_cached_user_permissions(db_session, redis_client, 5) == {"perm_3"}
+        finally:
+            await stop_permission_cache()
@@ -0,0 +1,84 @@
+"""Tests for read-replica routing with read-your-writes (app/core/database.py)."""
+
+from collections.abc import Callable, Iterator
+from contextlib import nullcontext
+from typing import Any
+
+import pytest
+import redis.asyncio as redis
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+
+from app.core import database
+from app.core.auth import RequestAuth
+from app.core.database import get_db, get_read_db, stick_to_primary
+from app.main import app
+
+
+@pytest.fixture
+def replica(monkeypatch, redis_client: redis.Redis):  # type: ignore[type-arg]
+    """A configured replica; sessions are tagged with the engine they'd use."""
+    monkeypatch.setattr(database, "read_engine", object())
+    monkeypatch.setattr(database, "ReadSessionLocal", lambda: nullcontext("replica"))
+    monkeypatch.setattr(database, "AsyncSessionLocal", lambda: nullcontext("primary"))
+    monkeypatch.setattr(database, "shared_redis", lambda: redis_client)
+
+
+def _request(user_id: int | None) -> Request:
+    request = Request({"type": "http", "headers": [], "state": {}})
+    request.state.auth = RequestAuth(token=None, user_id=user_id)
+    return request
+
+
+async def _engine_for(user_id: int | None) -> str:
+    async for session in get_read_db(_request(user_id)):
+        return session  # type: ignore[return-value]
+    raise AssertionError("get_read_db yielded nothing")
+
+
+@pytest.mark.unit
+class TestReadReplicaRouting:
+    async def test_reads_go_to_replica(self, replica):
+        assert await _engine_for(None) == "replica"
+        assert await _engine_for(7) == "replica"
+
+    async def test_own_write_sticks_user_to_primary(self, replica, redis_client):
+        await stick_to_primary(7)
+
+        assert await _engine_for(7) == "primary"
+        assert await _engine_for(8) == "replica"
+        ttl = await redis_client.ttl("db:read_primary:7")
+        assert 0 < ttl <= database.settings.DB_READ_STICKY_SECONDS
+
+    async def test_without_redis_signed_in_reads_use_primary(self, replica, monkeypatch):
+        monkeypatch.setattr(database, "shared_redis", lambda: None)
+
+        assert await _engine_for(7) == "primary"
+        assert await _engine_for(None) == "replica"
+
+    async def test_without_replica_nothing_is_marked(self, monkeypatch, redis_client):
+        monkeypatch.setattr(database, "read_engine", None)
+        monkeypatch.setattr(database, "shared_redis", lambda: redis_client)
+
+        await stick_to_primary(7)
+
+        assert await redis_client.exists("db:read_primary:7") == 0
+
+
+def _calls(dependant: Dependant) -> Iterator[Callable[..., Any] | None]:
+    for sub in dependant.dependencies:
+        yield sub.call
+        yield from _calls(sub)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", ["/api/v1/images", "/api/v1/images/recommended"])
+def test_read_endpoints_hold_one_session(path: str):
+    """The viewer is resolved on the handler's read session, not a second one."""
+    (route,) = (
+        r for r in app.routes if isinstance(r, APIRoute) and r.path == path and "GET" in r.methods
+    )
+    calls = set(_calls(route.dependant))
+    assert get_read_db in calls
+    assert get_db not in calls
@@ -0,0 +1,43 @@
+"""Tests for the process-wide Redis pools (app/core/redis.py)."""
+
+import pytest
+
+from app.config import settings
+from app.core import redis as redis_core
+from app.core.redis import (
+    get_redis,
+    redis_pool_stats,
+    shared_binary_redis,
+    shared_queue_pool,
+    shared_redis,
+    start_redis,
+    stop_redis,
+)
+
+
+@pytest.mark.unit
+class TestRedisPools:
+    async def test_get_redis_hands_out_the_shared_client(self, monkeypatch):
+        monkeypatch.setattr(settings, "REDIS_MAX_CONNECTIONS", 7)
+        await start_redis()
+        try:
+            first = await anext(get_redis())
+            second = await anext(get_redis())
+
+            assert first is second is shared_redis()
+            assert shared_binary_redis() is not first
+            assert shared_queue_pool() is not None
+            assert redis_pool_stats() == {
+                name: {"in_use": 0, "idle": 0, "max": 7} for name in ("text", "binary", "queue")
+            }
+        finally:
+            await stop_redis()
+
+    async def test_unstarted_process_gets_a_client_per_request(self):
+        assert redis_core._text_client is None
+
+        first = await anext(get_redis())
+        second = await anext(get_redis())
+
+        assert first is not second
+        assert redis_pool_stats() == {}
@@ -0,0 +1,63 @@
+"""Tests for the request-scoped access token verification (app/core/auth.py)."""
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.core import auth
+from app.core.auth import get_current_user_id, request_auth
+from app.core.security import create_access_token
+
+
+def _request(authorization: str | None = None, cookie: str | None = None) -> Request:
+    headers = []
+    if authorization is not None:
+        headers.append((b"authorization", authorization.encode()))
+    if cookie is not None:
+        headers.append((b"cookie", f"access_token={cookie}".encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture
+def verifications(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    verify = auth.verify_access_token
+
+    def counting(token: str) -> int | None:
+        calls.append(token)
+        return verify(token)
+
+    monkeypatch.setattr(auth, "verify_access_token", counting)
+    return calls
+
+
+@pytest.mark.unit
+class TestRequestAuth:
+    async def test_token_verified_once_per_request(self, verifications):
+        request = _request(authorization=f"Bearer {create_access_token(7)}")
+
+        assert request_auth(request).user_id == 7
+        assert await get_current_user_id(request) == 7
+        assert await auth.get_optional_user_id(request) == 7
+        assert len(verifications) == 1
+
+    async def test_header_preferred_over_cookie(self, verifications):
+        request = _request(authorization="bearer not-a-jwt", cookie=create_access_token(7))
+
+        assert request_auth(request) == auth.RequestAuth(token="not-a-jwt", user_id=None)
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user_id(request)
+        assert exc.value.detail == "Could not validate credentials"
+
+    async def test_cookie_used_without_bearer_header(self, verifications):
+        request = _request(authorization="Basic abc", cookie=create_access_token(9))
+
+        assert request_auth(request).user_id == 9
+
+    async def test_missing_token(self, verifications):
+        request = _request()
+
+        assert await auth.get_optional_user_id(request) is None
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user_id(request)
+        assert exc.value.detail == "Not authenticated"
+        assert verifications == []
@@ -0,0 +1,174 @@
+"""Tests for the Meilisearch sync outbox (app/services/search_outbox.py)."""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import TagType
+from app.models.search_outbox import SearchOutbox
+from app.models.tag import Tags
+from app.models.tag_external_link import TagExternalLinks
+from app.services.search import SearchService
+from app.services.search_outbox import drain_search_outbox
+from app.tasks.search_outbox_job import _LOCK_KEY, drain_search_outbox_job
+
+
+def _make_service() -> tuple[SearchService, AsyncMock]:
+    client = MagicMock()
+    index_mock = AsyncMock()
+    client.index.return_value = index_mock
+    return SearchService(client), index_mock
+
+
+async def _queued(db: AsyncSession, tag_id: int) -> int:
+    result = await db.execute(select(SearchOutbox).where(SearchOutbox.tag_id == tag_id))
+    return len(result.scalars().all())
+
+
+async def _create_tag(db: AsyncSession, title: str) -> Tags:
+    tag = Tags(title=title, type=TagType.THEME)
+    db.add(tag)
+    await db.commit()
+    await db.refresh(tag)
+    return tag
+
+
+@pytest.mark.unit
+class TestSearchOutbox:
+    async def test_document_changes_are_queued_by_triggers(self, db_session: AsyncSession):
+        tag = await _create_tag(db_session, "outbox trigger tag")
+        other = await _create_tag(db_session, "outbox other tag")
+        assert await _queued(db_session, tag.tag_id) == 1
+
+        tag.usage_count = 5
+        await db_session.commit()
+        assert await _queued(db_session, tag.tag_id) == 2
+
+        # Not part of the search document: nothing to re-index.
+        tag.inheritedfrom_id = other.tag_id
+        await db_session.commit()
+        assert await _queued(db_session, tag.tag_id) == 2
+
+    async def test_repointed_external_link_queues_both_tags(self, db_session: AsyncSession):
+        alias = await _create_tag(db_session, "outbox link alias")
+        canonical = await _create_tag(db_session, "outbox link canonical")
+        db_session.add(TagExternalLinks(tag_id=alias.tag_id, url="https://example.com/a"))
+        await db_session.commit()
+        assert await _queued(db_session, alias.tag_id) == 2
+
+        # As the alias merge does it: a bulk UPDATE, no INSERT/DELETE.
+        await db_session.execute(
+            update(TagExternalLinks)
+            .where(TagExternalLinks.tag_id == alias.tag_id)  # type: ignore[arg-type]
+            .values(tag_id=canonical.tag_id)
+        )
+        await db_session.commit()
+
+        assert await _queued(db_session, alias.tag_id) == 3
+        assert await _queued(db_session, canonical.tag_id) == 2
+
+    async def test_drain_coalesces_per_tag_and_clears_rows(self, db_session: AsyncSession):
+        tag = await _create_tag(db_session, "outbox drain tag")
+        tag.usage_count = 3
+        await db_session.commit()
+        tag.usage_count = 4
+        await db_session.commit()
+        service, index_mock = _make_service()
+
+        assert await drain_search_outbox(db_session, service) >= 3
+
+        index_mock.add_documents.assert_awaited_once()
+        docs = index_mock.add_documents.call_args[0][0]
+        assert [doc["usage_count"] for doc in docs if doc["tag_id"] == tag.tag_id] == [4]
+        assert await _queued(db_session, tag.tag_id) == 0
+
+    async def test_drain_announces_tags_to_autocomplete(self, db_session: AsyncSession):
+        tag = await _create_tag(db_session, "outbox autocomplete tag")
+        tag.usage_count = 7
+        await db_session.commit()
+        service, _ = _make_service()
+
+        with patch("app.services.search_outbox.tag_ids_changed", AsyncMock()) as changed:
+            await drain_search_outbox(db_session, service)
+
+        announced = {tag_id for call in changed.await_args_list for tag_id in call.args[0]}
+        assert tag.tag_id in announced
+
+    async def test_drain_reads_fresh_rows_in_a_reused_session(self, db_session: AsyncSession):
+        tag = await _create_tag(db_session, "outbox stale tag")
+        service, index_mock = _make_service()
+        await drain_search_outbox(db_session, service)
+
+        # Changed behind the session's back: its identity map still says 0.
+        await db_session.execute(
+            text("UPDATE tags SET usage_count = 9 WHERE tag_id = :tag_id"),
+            {"tag_id": tag.tag_id},
+        )
+        await db_session.commit()
+        index_mock.reset_mock()
+
+        await drain_search_outbox(db_session, service)
+
+        docs = index_mock.add_documents.call_args[0][0]
+        assert [doc["usage_count"] for doc in docs if doc["tag_id"] == tag.tag_id] == [9]
+
+    async def test_deleted_tag_is_removed_from_index(self, db_session: AsyncSession):
+        tag = await _create_tag(db_session, "outbox deleted tag")
+        tag_id = tag.tag_id
+        await db_session.delete(tag)
+        await db_session.commit()
+        service, index_mock = _make_service()
+
+        await drain_search_outbox(db_session, service)
+
+        index_mock.delete_documents.assert_awaited_once_with([str(tag_id)])
+
+    async def test_failed_push_keeps_rows_for_next_run(self, db_session: AsyncSession):
+        tag = await _create_tag(db_session, "outbox failing tag")
+        service, index_mock = _make_service()
+        index_mock.add_documents.side_effect = Exception("Connection refused")
+
+        with pytest.raises(Exception, match="Connection refused"):
+            await drain_search_outbox(db_session, service)
+
+        await db_session.rollback()
+        assert await _queued(db_session, tag.tag_id) == 1
+
+
+@pytest.mark.unit
+class TestDrainSearchOutboxJob:
+    async def test_overrun_drain_leaves_the_next_runs_lock(self, redis_client):
+        async def overrun(db, service):
+            # The TTL lapsed mid-drain and the next run took the lock.
+            await redis_client.set(_LOCK_KEY, "next-run")
+            return 0
+
+        @asynccontextmanager
+        async def session():
+            yield MagicMock()
+
+        ctx = {"redis": redis_client, "meilisearch_client": MagicMock()}
+        with (
+            patch("app.core.database.get_async_session", session),
+            patch("app.services.search_outbox.drain_search_outbox", overrun),
+        ):
+            await drain_search_outbox_job(ctx)
+
+        assert await redis_client.get(_LOCK_KEY) == "next-run"
+
+    async def test_releases_its_own_lock(self, redis_client):
+        @asynccontextmanager
+        async def session():
+            yield MagicMock()
+
+        ctx = {"redis": redis_client, "meilisearch_client": MagicMock()}
+        with (
+            patch("app.core.database.get_async_session", session),
+            patch("app.services.search_outbox.drain_search_outbox", AsyncMock(return_value=0)),
+        ):
+            await drain_search_outbox_job(ctx)
+
+        assert await redis_client.get(_LOCK_KEY) is None
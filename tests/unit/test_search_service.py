@@ -4,10 +4,17 @@ from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import TagType
 from app.models.tag import Tags
-from app.services.search import SearchService, _tag_to_document
+from app.services.search import (
+    TAG_DOCUMENT_VERSION,
+    SearchService,
+    _tag_to_document,
+    build_tag_documents,
+    tag_hit_from_document,
+)
 
 TAGS_INDEX_NAME = "tags"
 
@@ -61,11 +68,17 @@ class TestIndexTag:
             "desc": "Main character from Cardcaptor Sakura",
             "type": TagType.CHARACTER,
             "usage_count": 42,
+            "own_usage_count": 42,
             "alias_of": None,
+            "alias_of_name": None,
+            "alias_of_usage_count": None,
             "external_urls": [],
             "date_added": docs[0]["date_added"],
+            "doc_version": TAG_DOCUMENT_VERSION,
+            "indexed_at": docs[0]["indexed_at"],
         }
         assert isinstance(docs[0]["date_added"], int)
+        assert isinstance(docs[0]["indexed_at"], int)
 
     async def test_index_tag_with_external_urls(self):
         """index_tag includes external_urls in the document."""
@@ -141,6 +154,53 @@ class TestTagToDocument:
         doc = _tag_to_document(tag)
         assert doc["date_added"] == 0
 
+    def test_alias_tag_carries_parent_fields(self):
+        """Alias documents hold the parent's title and usage_count, and their own count."""
+        alias_tag = _make_tag(tag_id=10, alias_of=99, usage_count=3)
+        doc = _tag_to_document(alias_tag, parent_usage_count=4545, alias_of_name="cat ears")
+        assert doc["alias_of_name"] == "cat ears"
+        assert doc["alias_of_usage_count"] == 4545
+        assert doc["own_usage_count"] == 3
+        assert doc["doc_version"] == TAG_DOCUMENT_VERSION
+
+    def test_alias_tag_without_parent_fields_is_unversioned(self):
+        """An alias indexed without its parent's fields can't be served as-is."""
+        alias_tag = _make_tag(tag_id=10, alias_of=99)
+        doc = _tag_to_document(alias_tag, parent_usage_count=4545)
+        assert doc["doc_version"] == 0
+
+
+@pytest.mark.unit
+class TestTagHitFromDocument:
+    """Tests for tag_hit_from_document."""
+
+    def test_round_trips_alias_document(self):
+        """A current document rebuilds the same hit the database would return."""
+        when = datetime(2024, 6, 15, 12, 0, 0, tzinfo=UTC)
+        alias_tag = _make_tag(tag_id=10, alias_of=99, usage_count=3, date_added=when)
+        doc = _tag_to_document(alias_tag, parent_usage_count=4545, alias_of_name="cat ears")
+
+        hit = tag_hit_from_document(doc)
+
+        assert hit is not None
+        assert hit.tag_id == 10
+        assert hit.title == "Sakura Kinomoto"
+        assert hit.type == TagType.CHARACTER
+        assert hit.usage_count == 3
+        assert hit.alias_of == 99
+        assert hit.alias_of_name == "cat ears"
+        assert hit.alias_of_usage_count == 4545
+        assert hit.is_alias is True
+        assert hit.date_added == when
+        assert hit.indexed_at is not None
+
+    def test_older_document_version_returns_none(self):
+        """Documents from before the current version are left to the database."""
+        doc = _tag_to_document(_make_tag())
+        doc["doc_version"] = TAG_DOCUMENT_VERSION - 1
+        assert tag_hit_from_document(doc) is None
+        assert tag_hit_from_document({"tag_id": 1, "title": "Sakura"}) is None
+
 
 @pytest.mark.unit
 class TestIndexTags:
@@ -169,6 +229,26 @@ class TestIndexTags:
         client.index.assert_not_called()
 
 
+@pytest.mark.unit
+class TestBuildTagDocuments:
+    """Tests for build_tag_documents (the DB lookups behind bulk indexing)."""
+
+    async def test_alias_carries_parent_title_and_count(self, db_session: AsyncSession):
+        parent = Tags(title="build docs parent", type=TagType.THEME, usage_count=12)
+        db_session.add(parent)
+        await db_session.commit()
+        alias = Tags(title="build docs alias", type=TagType.THEME, alias_of=parent.tag_id)
+        db_session.add(alias)
+        await db_session.commit()
+
+        docs = await build_tag_documents(db_session, [parent, alias])
+
+        assert [doc["tag_id"] for doc in docs] == [parent.tag_id, alias.tag_id]
+        assert docs[1]["alias_of_name"] == "build docs parent"
+        assert docs[1]["usage_count"] == 12
+        assert docs[1]["doc_version"] == TAG_DOCUMENT_VERSION
+
+
 @pytest.mark.unit
 class TestDeleteTag:
     """Tests for SearchService.delete_tag."""
@@ -183,6 +263,16 @@ class TestDeleteTag:
         index_mock = client.index(TAGS_INDEX_NAME)
         index_mock.delete_document.assert_awaited_once_with("42")
 
+    async def test_bulk_delete_sends_one_call(self):
+        """delete_tags removes every id in one delete_documents call."""
+        client = _make_mock_client()
+        service = SearchService(client)
+
+        await service.delete_tags([4, 2])
+
+        index_mock = client.index(TAGS_INDEX_NAME)
+        index_mock.delete_documents.assert_awaited_once_with(["4", "2"])
+
 
 @pytest.mark.unit
 class TestSearchTags:
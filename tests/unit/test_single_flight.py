@@ -0,0 +1,175 @@
+"""Tests for single-flight cache recomputation (app/core/single_flight.py)."""
+
+import asyncio
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.single_flight import cached_single_flight
+
+KEY = "test:single_flight"
+
+
+class _Counter:
+    """A compute function that counts its calls and takes a moment to finish."""
+
+    def __init__(self, value: int = 42, delay: float = 0.05) -> None:
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+async def _get(redis_client, compute, **overrides) -> int:
+    kwargs = {"soft_ttl": 60, "hard_ttl": 600, "loads": int, "dumps": str, "lock_ttl": 2.0}
+    kwargs.update(overrides)
+    return await cached_single_flight(redis_client, KEY, compute, **kwargs)
+
+
+@pytest.mark.unit
+class TestCachedSingleFlight:
+    async def test_concurrent_misses_compute_once(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        compute = _Counter()
+
+        results = await asyncio.gather(*(_get(redis_client, compute) for _ in range(10)))
+
+        assert results == [42] * 10
+        assert compute.calls == 1
+        assert await redis_client.get(KEY) == "42"
+
+    async def test_stores_entry_with_soft_ttl_and_stale_copy_with_hard_ttl(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        await _get(redis_client, _Counter(), soft_ttl=30, hard_ttl=300)
+
+        assert 0 < await redis_client.ttl(KEY) <= 30
+        assert 30 < await redis_client.ttl(f"{KEY}:stale") <= 300
+        assert not await redis_client.exists(f"{KEY}:lock")
+
+    async def test_hit_skips_compute(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        await redis_client.set(KEY, "7")
+        compute = _Counter()
+
+        assert await _get(redis_client, compute) == 7
+        assert compute.calls == 0
+
+    async def test_unparseable_entry_is_a_miss(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        await redis_client.set(KEY, "not a number")
+        compute = _Counter()
+
+        assert await _get(redis_client, compute) == 42
+        assert compute.calls == 1
+
+    async def test_follower_serves_stale_while_other_process_leads(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        await redis_client.set(f"{KEY}:lock", 1, ex=5)
+        await redis_client.set(f"{KEY}:stale", "5")
+        compute = _Counter()
+
+        assert await _get(redis_client, compute) == 5
+        assert compute.calls == 0
+
+    async def test_follower_waits_for_leader_without_stale_copy(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        await redis_client.set(f"{KEY}:lock", 1, ex=5)
+        compute = _Counter()
+
+        async def leader() -> None:
+            await asyncio.sleep(0.1)
+            await redis_client.set(KEY, "9")
+            await redis_client.delete(f"{KEY}:lock")
+
+        result, _ = await asyncio.gather(_get(redis_client, compute), leader())
+
+        assert result == 9
+        assert compute.calls == 0
+
+    async def test_follower_computes_when_leader_vanishes(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        await redis_client.set(f"{KEY}:lock", 1, px=100)
+        compute = _Counter()
+
+        assert await _get(redis_client, compute) == 42
+        assert compute.calls == 1
+
+    async def test_leader_failure_reaches_waiters_and_releases_lock(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        async def failing() -> int:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            *(_get(redis_client, failing) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert not await redis_client.exists(f"{KEY}:lock")
+
+    async def test_cancelled_leader_does_not_cancel_followers(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        compute = _Counter(delay=0.1)
+        leader = asyncio.create_task(_get(redis_client, compute))
+        await asyncio.sleep(0.02)
+        followers = [asyncio.create_task(_get(redis_client, compute)) for _ in range(3)]
+        await asyncio.sleep(0.02)
+
+        leader.cancel()
+
+        assert await asyncio.gather(*followers) == [42] * 3
+        assert leader.cancelled()
+        # One follower took over; the others waited on it.
+        assert compute.calls == 2
+
+    async def test_slow_leader_keeps_its_lock_past_the_ttl(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        compute = _Counter(delay=0.5)
+        leader = asyncio.create_task(_get(redis_client, compute, lock_ttl=0.15))
+        await asyncio.sleep(0.35)
+
+        assert await redis_client.exists(f"{KEY}:lock")
+        assert await leader == 42
+        assert not await redis_client.exists(f"{KEY}:lock")
+
+    async def test_leader_releases_only_its_own_lock(
+        self,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        async def outlived_lock() -> int:
+            # The lock expired mid-compute and another process's leader took it.
+            await redis_client.set(f"{KEY}:lock", "other-leader")
+            return 42
+
+        assert await _get(redis_client, outlived_lock) == 42
+        assert await redis_client.get(f"{KEY}:lock") == "other-leader"
+        await redis_client.delete(f"{KEY}:lock")
+
+    async def test_without_redis_just_computes(self):
+        compute = _Counter()
+        assert await _get(None, compute) == 42
+        assert compute.calls == 1
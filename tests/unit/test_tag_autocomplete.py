@@ -0,0 +1,103 @@
+"""Tests for the in-process tag autocomplete index (app/services/tag_autocomplete.py)."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import TagType
+from app.models.tag import Tags
+from app.services.tag_autocomplete import (
+    IndexedTag,
+    TagAutocompleteIndex,
+    load_indexed_tags,
+)
+
+
+def _tag(tag_id: int, title: str, usage_count: int = 0, **fields) -> IndexedTag:
+    return IndexedTag(
+        tag_id=tag_id,
+        title=title,
+        desc=fields.get("desc"),
+        type=fields.get("type", TagType.THEME),
+        usage_count=usage_count,
+        alias_of=fields.get("alias_of"),
+        date_added=None,
+    )
+
+
+def _ids(index: TagAutocompleteIndex, query: str, **kwargs) -> list[int]:
+    matches = index.search(query, **kwargs)
+    assert matches is not None
+    return [hit["tag_id"] for hit in matches.tags]
+
+
+@pytest.fixture
+def index() -> TagAutocompleteIndex:
+    return TagAutocompleteIndex(
+        [
+            _tag(1, "Kinomoto Sakura", 500, type=TagType.CHARACTER),
+            _tag(2, "Sakura", 80),
+            _tag(3, "sakura tree", 300),
+            _tag(4, "Haruno Sakura", 900, type=TagType.CHARACTER),
+            _tag(5, "cherry blossoms", 0, alias_of=3),
+            _tag(6, "Saki", 10),
+        ]
+    )
+
+
+@pytest.mark.unit
+class TestTagAutocompleteIndex:
+    def test_short_query_is_title_prefix(self, index):
+        assert _ids(index, "sa") == [3, 2, 6]
+
+    def test_exact_title_ranks_first(self, index):
+        assert _ids(index, "sakura") == [2, 3, 4, 1]
+
+    def test_words_match_in_any_order_by_prefix(self, index):
+        assert _ids(index, "sakura kino") == [1]
+        assert _ids(index, "kinomoto sak") == [1]
+        assert _ids(index, "sakura nothing") == []
+
+    def test_short_words_and_stopwords_are_dropped_like_fulltext(self, index):
+        assert _ids(index, "the sakura kino") == [1]
+        assert _ids(index, "sakura of ki") == [4, 1, 3, 2]
+
+    def test_query_of_only_dropped_words_is_title_prefix(self, index):
+        index.upsert(_tag(7, "the end", 5))
+        assert _ids(index, "the") == [7]
+
+    def test_alias_ranks_by_target_count_and_carries_target(self, index):
+        matches = index.search("blossom")
+        assert matches is not None
+        assert matches.tags[0]["alias_of_name"] == "sakura tree"
+        assert matches.tags[0]["alias_of_usage_count"] == 300
+
+    def test_filters_and_pagination(self, index):
+        assert _ids(index, "sakura", type_id=TagType.CHARACTER) == [4, 1]
+        assert _ids(index, "cherry", exclude_aliases=True) == []
+        matches = index.search("sakura", limit=2, offset=1)
+        assert matches is not None
+        assert matches.total == 4
+        assert [hit["tag_id"] for hit in matches.tags] == [3, 4]
+
+    def test_query_without_words_is_not_answered(self, index):
+        assert index.search("!!!") is None
+
+    def test_upsert_and_remove(self, index):
+        index.upsert(_tag(2, "Sakura Card", 80))
+        assert _ids(index, "card") == [2]
+        assert 2 not in _ids(index, "sakura tree")
+
+        index.remove(3)
+        assert _ids(index, "tree") == []
+        assert len(index) == 5
+
+    async def test_loads_from_database(self, db_session: AsyncSession):
+        tag = Tags(title="autocomplete loader tag", type=TagType.THEME, usage_count=4)
+        db_session.add(tag)
+        await db_session.commit()
+
+        index = TagAutocompleteIndex(await load_indexed_tags(db_session, [tag.tag_id]))  # type: ignore[list-item]
+
+        matches = index.search("loader auto")
+        assert matches is not None
+        assert [hit["title"] for hit in matches.tags] == ["autocomplete loader tag"]
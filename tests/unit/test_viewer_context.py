@@ -0,0 +1,68 @@
+"""Tests for the cached viewer context (app/core/viewer_context.py)."""
+
+import pytest
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import viewer_context
+from app.core.viewer_context import get_viewer_context, invalidate_viewer_context
+from app.models.user import Users
+
+
+@pytest.fixture
+def cached(monkeypatch, redis_client: redis.Redis):  # type: ignore[type-arg]
+    """Activate the cache on the test Redis with an empty process tier."""
+    monkeypatch.setattr(viewer_context, "shared_redis", lambda: redis_client)
+    monkeypatch.setattr(viewer_context, "_local", {})
+
+
+async def _set(db: AsyncSession, user_id: int, **fields: int) -> None:
+    user = await db.get(Users, user_id)
+    assert user is not None
+    for name, value in fields.items():
+        setattr(user, name, value)
+    await db.commit()
+
+
+@pytest.mark.unit
+class TestViewerContext:
+    async def test_cached_until_invalidated(self, db_session: AsyncSession, cached):
+        await _set(db_session, 1, show_all_images=0)
+        assert (await get_viewer_context(db_session, 1)).show_all_images == 0  # type: ignore[union-attr]
+
+        await _set(db_session, 1, show_all_images=1)
+        assert (await get_viewer_context(db_session, 1)).show_all_images == 0  # type: ignore[union-attr]
+
+        await invalidate_viewer_context(1)
+        assert (await get_viewer_context(db_session, 1)).show_all_images == 1  # type: ignore[union-attr]
+
+    async def test_redis_tier_shared_across_processes(
+        self,
+        db_session: AsyncSession,
+        cached,
+        monkeypatch,
+        redis_client: redis.Redis,  # type: ignore[type-arg]
+    ):
+        await get_viewer_context(db_session, 1)
+        monkeypatch.setattr(viewer_context, "_local", {})  # another worker
+        await _set(db_session, 1, hide_reposts=1)
+
+        context = await get_viewer_context(db_session, 1)
+
+        assert context is not None and context.hide_reposts == 0
+        assert await redis_client.exists("viewer_context:1")
+
+    async def test_inactive_accounts_not_cached(self, db_session: AsyncSession, cached):
+        await _set(db_session, 2, active=0)
+        assert (await get_viewer_context(db_session, 2)).active == 0  # type: ignore[union-attr]
+
+        await _set(db_session, 2, active=1)
+
+        assert (await get_viewer_context(db_session, 2)).active == 1  # type: ignore[union-attr]
+
+    async def test_without_shared_redis_reads_database(self, db_session: AsyncSession):
+        assert await get_viewer_context(db_session, 999_999) is None
+        await _set(db_session, 1, images_per_page=40)
+        assert (await get_viewer_context(db_session, 1)).images_per_page == 40  # type: ignore[union-attr]
+        await _set(db_session, 1, images_per_page=25)
+        assert (await get_viewer_context(db_session, 1)).images_per_page == 25  # type: ignore[union-attr]